@@ -35,6 +35,33 @@ class Settings(BaseSettings):
     database_url: str = Field(
         ..., description="PostgreSQL connection string", alias="DATABASE_URL"
     )
+    database_replica_urls: str = Field(
+        default="",
+        description="Comma-separated read replica connection strings (optional)",
+        alias="DATABASE_REPLICA_URLS",
+    )
+    replica_max_lag_seconds: float = Field(
+        default=10.0,
+        description="Replicas lagging more than this are skipped for reads",
+        alias="REPLICA_MAX_LAG_SECONDS",
+    )
+    read_your_writes_seconds: float = Field(
+        default=5.0,
+        description="After a write, a client's reads stay on the primary this long",
+        alias="READ_YOUR_WRITES_SECONDS",
+    )
+
+    # Search
+    search_backend: str = Field(
+        default="auto",
+        description="Name search backend: auto, pg_trgm or memory",
+        alias="SEARCH_BACKEND",
+    )
+    search_index_ttl_seconds: int = Field(
+        default=300,
+        description="Rebuild interval for the in-process trigram search index",
+        alias="SEARCH_INDEX_TTL_SECONDS",
+    )
 
     # Security & Authentication
     jwt_secret: str = Field(
@@ -275,6 +302,31 @@ class Settings(BaseSettings):
         description="Cache TTL for management scores in seconds (24 hours)",
         alias="CACHE_MANAGEMENT_SCORE_TTL",
     )
+    cache_l1_max_entries: int = Field(
+        default=10000,
+        description="Entries kept in each worker's in-process cache in front of Redis (0 disables it)",
+        alias="CACHE_L1_MAX_ENTRIES",
+    )
+    cache_l1_ttl_seconds: int = Field(
+        default=30,
+        description="Longest an entry (or a company's cache generation) is served from the in-process cache",
+        alias="CACHE_L1_TTL_SECONDS",
+    )
+    cache_early_refresh_beta: float = Field(
+        default=1.0,
+        description="Eagerness of probabilistic early refresh in get_or_set (0 disables it)",
+        alias="CACHE_EARLY_REFRESH_BETA",
+    )
+    supabase_cache_l1_ttl_seconds: int = Field(
+        default=60,
+        description="Longest a Supabase api_cache entry is served from the in-process cache",
+        alias="SUPABASE_CACHE_L1_TTL_SECONDS",
+    )
+    supabase_cache_prune_interval_seconds: int = Field(
+        default=3600,
+        description="Interval between deletes of expired api_cache rows",
+        alias="SUPABASE_CACHE_PRUNE_INTERVAL_SECONDS",
+    )
 
     # Congressional Trading Configuration (Phase 7)
     congressional_scraper_enabled: bool = Field(
@@ -330,6 +382,31 @@ class Settings(BaseSettings):
         description="Minimum minutes between notifications for same alert/trade combo",
         alias="ALERT_COOLDOWN_MINUTES",
     )
+    alert_cooldown_backend: str = Field(
+        default="auto",
+        description="Alert cooldown store: memory, redis, or auto (redis when REDIS_URL is set)",
+        alias="ALERT_COOLDOWN_BACKEND",
+    )
+    alert_index_ttl_seconds: int = Field(
+        default=300,
+        description="Rebuild interval for the in-process alert matching index",
+        alias="ALERT_INDEX_TTL_SECONDS",
+    )
+    notification_workers: int = Field(
+        default=4,
+        description="Maximum worker tasks per notification channel (each channel also has its own limit)",
+        alias="NOTIFICATION_WORKERS",
+    )
+    notification_max_attempts: int = Field(
+        default=5,
+        description="Delivery attempts before a queued notification is marked failed",
+        alias="NOTIFICATION_MAX_ATTEMPTS",
+    )
+    notification_retry_base_seconds: float = Field(
+        default=5.0,
+        description="First retry delay for queued notifications (doubles per attempt, jittered)",
+        alias="NOTIFICATION_RETRY_BASE_SECONDS",
+    )
     webhook_timeout_seconds: int = Field(
         default=10,
         description="Webhook request timeout",
@@ -340,6 +417,41 @@ class Settings(BaseSettings):
         description="Number of webhook retry attempts",
         alias="WEBHOOK_RETRY_COUNT",
     )
+    webhook_max_concurrency: int = Field(
+        default=20,
+        description="Webhook requests in flight at once (also the connection pool size)",
+        alias="WEBHOOK_MAX_CONCURRENCY",
+    )
+    webhook_retry_base_seconds: float = Field(
+        default=30.0,
+        description="First webhook retry delay (doubles per attempt, jittered)",
+        alias="WEBHOOK_RETRY_BASE_SECONDS",
+    )
+    event_backplane: str = Field(
+        default="auto",
+        description="Cross-worker event delivery: memory, redis, postgres (direct connections), or auto (redis or memory)",
+        alias="EVENT_BACKPLANE",
+    )
+    websocket_send_queue_size: int = Field(
+        default=256,
+        description="Messages buffered per trade stream connection before the slow consumer policy applies",
+        alias="WEBSOCKET_SEND_QUEUE_SIZE",
+    )
+    websocket_slow_consumer_policy: str = Field(
+        default="drop_oldest",
+        description="When a trade stream queue is full: drop_oldest or disconnect",
+        alias="WEBSOCKET_SLOW_CONSUMER_POLICY",
+    )
+    websocket_replay_buffer_size: int = Field(
+        default=1000,
+        description="Recent trade stream events kept in the event backplane for clients resuming with since=<seq>",
+        alias="WEBSOCKET_REPLAY_BUFFER_SIZE",
+    )
+    websocket_send_timeout_seconds: float = Field(
+        default=10.0,
+        description="Trade stream connections are closed when one send takes longer than this",
+        alias="WEBSOCKET_SEND_TIMEOUT_SECONDS",
+    )
 
     # Email Configuration (Phase 5B)
     email_service: str = Field(
@@ -697,8 +809,20 @@ class Settings(BaseSettings):
         Converts postgresql:// to postgresql+asyncpg:// by default.
         Force Port 5432 for Supabase to avoid Transaction Mode (PgBouncer) issues.
         """
-        url = self.database_url
-        
+        return self.to_async_database_url(self.database_url)
+
+    @property
+    def database_replica_urls_async(self) -> list[str]:
+        """Get async URLs for the configured read replicas."""
+        return [
+            self.to_async_database_url(url.strip())
+            for url in self.database_replica_urls.split(",")
+            if url.strip()
+        ]
+
+    @staticmethod
+    def to_async_database_url(url: str) -> str:
+        """Convert a PostgreSQL URL to its async driver form."""
         # FIX: Force Port 5432 for Supabase connections to bypass Transaction Mode pooler
         # Transaction Mode (6543) breaks SQLAlchemy/asyncpg prepared statements
         if "supabase.com" in url or "supabase.co" in url:
@@ -0,0 +1,116 @@
+"""
+HTTP conditional caching helpers.
+
+Routes build a weak ETag from the data versions their response depends on
+and call conditional_get() before doing the expensive work. A matching
+If-None-Match (or If-Modified-Since) short-circuits with an empty 304.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Cache-Control presets
+CACHE_PUBLIC_SHORT = "public, max-age=30, stale-while-revalidate=30"
+CACHE_PRIVATE_REVALIDATE = "private, no-cache"
+CACHE_PRIVATE_SHORT = "private, max-age=60"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the values a response depends on.
+
+    Args:
+        parts: Data versions, timestamps and request parameters
+
+    Returns:
+        Weak entity tag like W/"3f2a..."
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:32]}"'
+
+
+def _opaque(tag: str) -> str:
+    """Strip the weak prefix for weak comparison (RFC 9110 8.8.3.2)."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque(etag)
+    return any(_opaque(candidate) == target for candidate in if_none_match.split(","))
+
+
+def _http_date(value: datetime) -> str:
+    """Format a (naive UTC or aware) datetime as an HTTP date."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    """Check an If-Modified-Since header value against a timestamp."""
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = CACHE_PRIVATE_REVALIDATE,
+) -> Optional[Response]:
+    """
+    Apply validators to a GET response and answer 304 when the client is current.
+
+    Sets ETag, Last-Modified and Cache-Control on the route's injected
+    Response so they are merged into the normal 200 response.
+
+    Args:
+        request: Incoming request
+        response: Response injected into the route
+        etag: Entity tag from make_etag()
+        last_modified: Optional time of the last change
+        cache_control: Cache-Control value for this route
+
+    Returns:
+        A 304 Response to return immediately, or None to build the body
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Authorization",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        fresh = etag_matches(if_none_match, etag)
+    else:
+        fresh = last_modified is not None and not_modified_since(
+            request.headers.get("if-modified-since"), last_modified
+        )
+
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return None
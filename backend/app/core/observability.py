@@ -56,6 +56,52 @@ ai_api_duration_seconds = Histogram(
     ["provider"],
 )
 
+db_read_routing_total = Counter(
+    "db_read_routing_total",
+    "Read sessions by routing target and reason",
+    ["target", "reason"],
+)
+
+db_replica_lag_seconds = Gauge(
+    "db_replica_lag_seconds",
+    "Last measured replication lag per read replica",
+    ["replica"],
+)
+
+db_replica_available = Gauge(
+    "db_replica_available",
+    "1 if the read replica is currently eligible for reads",
+    ["replica"],
+)
+
+webhook_deliveries_total = Counter(
+    "webhook_deliveries_total",
+    "Webhook delivery attempts by endpoint and outcome",
+    ["webhook_id", "outcome"],
+)
+
+webhook_delivery_duration_seconds = Histogram(
+    "webhook_delivery_duration_seconds",
+    "Webhook delivery latency per endpoint",
+    ["webhook_id"],
+)
+
+websocket_connections = Gauge(
+    "websocket_connections",
+    "Open trade stream WebSocket connections",
+)
+
+websocket_send_queue_depth = Gauge(
+    "websocket_send_queue_depth",
+    "Trade stream messages queued for sending, across all connections",
+)
+
+websocket_messages_dropped_total = Counter(
+    "websocket_messages_dropped_total",
+    "Trade stream messages dropped for slow consumers, by policy",
+    ["policy"],
+)
+
 celery_tasks_total = Counter(
     "celery_tasks_total",
     "Total Celery tasks",
@@ -0,0 +1,175 @@
+"""
+Fast response serialization.
+
+orjson-backed JSON is the app's default response class, and bulk endpoints
+can answer in MessagePack when the client asks for it (Accept:
+application/msgpack). Hot listing routes build plain dicts straight from row
+tuples and return them through render_bulk(), which skips response_model
+validation and re-serialization; the response_model stays on the route for
+the OpenAPI schema.
+
+Values are encoded the way Pydantic encodes them in JSON mode (Decimal as a
+string, dates and datetimes as ISO 8601, UTC as "Z"), so switching a route to
+the fast path does not change its wire format.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Mapping, Optional
+from uuid import UUID
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Optional imports with fallbacks
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ACCEPT = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+# Headers that belong to the body, not to the route's injected Response
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+def _default(value: Any) -> Any:
+    """Encode types the serializers do not handle natively."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _lenient_default(value: Any) -> Any:
+    """Like _default, but falls back to str() instead of raising."""
+    try:
+        return _default(value)
+    except TypeError:
+        return str(value)
+
+
+def dumps(content: Any, lenient: bool = False) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON.
+
+    Args:
+        content: Value to serialize
+        lenient: Encode unknown types with str() instead of raising TypeError
+            (for broadcasts, where one odd value must not drop the message)
+    """
+    default = _lenient_default if lenient else _default
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            content,
+            default=default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content,
+        default=default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def packb(content: Any) -> bytes:
+    """Serialize to MessagePack (same value encoding as dumps)."""
+    if not MSGPACK_AVAILABLE:
+        raise RuntimeError("MessagePack responses require msgpack")
+    return msgpack.packb(content, default=_default, use_bin_type=True, datetime=False)
+
+
+def unpackb(data: bytes) -> Any:
+    """Deserialize MessagePack produced by packb."""
+    if not MSGPACK_AVAILABLE:
+        raise RuntimeError("MessagePack decoding requires msgpack")
+    return msgpack.unpackb(data, raw=False)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (falls back to the json module)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class MsgPackResponse(Response):
+    """MessagePack response for bulk payloads."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Check whether the client accepts MessagePack (and the server can send it)."""
+    if not MSGPACK_AVAILABLE:
+        return False
+    accept = request.headers.get("accept", "").lower()
+    return any(media_type in accept for media_type in _MSGPACK_ACCEPT)
+
+
+def render_bulk(
+    request: Request,
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Serialize a bulk payload without response_model validation.
+
+    Picks MessagePack or JSON from the Accept header and carries over headers
+    already set on the route's injected Response (ETag, Cache-Control, ...).
+
+    Args:
+        request: Incoming request
+        content: JSON-compatible payload (dicts/lists of plain values)
+        response: Response injected into the route, if any
+        status_code: HTTP status code
+        headers: Extra headers
+
+    Returns:
+        FastJSONResponse or MsgPackResponse
+    """
+    response_class = MsgPackResponse if wants_msgpack(request) else FastJSONResponse
+    rendered = response_class(content, status_code=status_code, headers=headers)
+
+    if response is not None:
+        rendered.raw_headers.extend(
+            (key, value)
+            for key, value in response.raw_headers
+            if key.decode("latin-1").lower() not in _BODY_HEADERS
+        )
+
+    vary = rendered.headers.get("vary")
+    if not vary:
+        rendered.headers["Vary"] = "Accept"
+    elif "accept" not in [part.strip().lower() for part in vary.split(",")]:
+        rendered.headers["Vary"] = f"{vary}, Accept"
+    return rendered
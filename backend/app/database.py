@@ -6,29 +6,37 @@ Provides async engine, session factory, and FastAPI dependency.
 """
 
 import asyncio
+import hashlib
+import itertools
 import logging
 import os
 import socket
 import ssl
 import time
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from contextlib import asynccontextmanager
 
 import certifi
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 from sqlalchemy.ext.asyncio import (  # type: ignore[import-untyped]
     create_async_engine,
     AsyncSession,
     AsyncEngine,
     async_sessionmaker,
 )
-from sqlalchemy.orm import declarative_base  # type: ignore[import-untyped]
+from sqlalchemy.orm import Session, declarative_base  # type: ignore[import-untyped]
 from sqlalchemy.pool import NullPool, QueuePool  # type: ignore[import-untyped]
-from sqlalchemy import text  # type: ignore[import-untyped]
-from sqlalchemy.exc import SQLAlchemyError  # type: ignore[import-untyped]
+from sqlalchemy import event, text  # type: ignore[import-untyped]
+from sqlalchemy.engine import make_url  # type: ignore[import-untyped]
+from sqlalchemy.exc import SQLAlchemyError, DBAPIError  # type: ignore[import-untyped]
 
 from app.config import settings
+from app.core.observability import (
+    db_read_routing_total,
+    db_replica_lag_seconds,
+    db_replica_available,
+)
 from app.utils.dns_resolver import resolve_database_url, DNSResolutionError
 
 # Configure logging
@@ -56,10 +64,50 @@ for logger_name in ["sqlalchemy.engine", "sqlalchemy.pool", "sqlalchemy.dialects
 # Declarative Base for SQLAlchemy models
 Base = declarative_base()
 
+# Read replica routing
+PRIMARY_STICKY_COOKIE = "ts_primary_until"
+REPLICA_LAG_CHECK_INTERVAL = 5.0  # Seconds between lag measurements per replica
+REPLICA_RETRY_AFTER = 30.0  # Seconds a failed replica is skipped
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+_RECENT_WRITERS_MAX = 10000
+
+
+class _Replica:
+    """Routing state for one read replica."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.label = make_url(url).host or "replica"
+        self.engine: AsyncEngine | None = None
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.lag_seconds: float | None = None
+        self.lag_checked_at: float = 0.0
+        self.down_until: float = 0.0
+
+    def is_eligible(self, now: float) -> bool:
+        """Usable unless recently failed, or lagging with a fresh measurement."""
+        if self.down_until > now:
+            return False
+        if self.lag_seconds is None or self.lag_due(now):
+            return True
+        return self.lag_seconds <= settings.replica_max_lag_seconds
+
+    def lag_due(self, now: float) -> bool:
+        return now - self.lag_checked_at >= REPLICA_LAG_CHECK_INTERVAL
+
 
 class DatabaseManager:
     """
     Manages database engine and session lifecycle.
+
+    Optional read replicas (DATABASE_REPLICA_URLS) serve get_read_session();
+    reads fall back to the primary when no replica is healthy and in-lag.
     """
 
     def __init__(self) -> None:
@@ -68,6 +116,11 @@ class DatabaseManager:
         self._database_available: bool = False  # Track database availability
         self._last_connection_attempt: float = 0  # Timestamp of last connection attempt
         self._resolved_database_url: str | None = None  # Cached resolved URL
+        self._replicas: List[_Replica] = [
+            _Replica(url) for url in settings.database_replica_urls_async
+        ]
+        self._replica_cycle = itertools.count()
+        self._recent_writers: Dict[str, float] = {}  # client key -> primary-until
 
     def _resolve_database_url(self) -> str:
         """Resolve database URL with DNS resolution."""
@@ -523,11 +576,202 @@ class DatabaseManager:
             self._invalidate_dns_cache()
             return self._handle_connection_exception(e)
 
+    @property
+    def has_replicas(self) -> bool:
+        """Whether any read replica is configured."""
+        return bool(self._replicas)
+
+    def _get_replica_factory(self, replica: _Replica) -> async_sessionmaker[AsyncSession]:
+        """Create the replica engine on first use (same tuning as the primary)."""
+        if replica.session_factory is None:
+            is_supabase = "supabase.com" in replica.url or "supabase.co" in replica.url
+            connect_args = self._build_connect_args(is_supabase)
+            connect_args["server_settings"] = {"application_name": "tradesignal_backend_read"}
+            engine_args = self._build_engine_args(
+                self._determine_pool_class(is_supabase), connect_args, is_supabase
+            )
+            try:
+                url = resolve_database_url(replica.url)
+            except Exception as dns_error:
+                logger.warning(f"Replica DNS resolution failed for {replica.label}: {dns_error}")
+                url = replica.url
+            replica.engine = self._create_engine_with_error_handling(url, engine_args)
+            replica.session_factory = async_sessionmaker(
+                replica.engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autocommit=False,
+                autoflush=False,
+            )
+        return replica.session_factory
+
+    def _pick_replica(self) -> Optional[_Replica]:
+        """Round-robin over eligible replicas."""
+        now = time.time()
+        eligible = [replica for replica in self._replicas if replica.is_eligible(now)]
+        if not eligible:
+            return None
+        return eligible[next(self._replica_cycle) % len(eligible)]
+
+    def _mark_replica_down(self, replica: _Replica, error: Exception) -> None:
+        logger.warning(
+            f"Read replica {replica.label} failed ({error}); "
+            f"using primary for {REPLICA_RETRY_AFTER:.0f}s"
+        )
+        replica.down_until = time.time() + REPLICA_RETRY_AFTER
+        db_replica_available.labels(replica.label).set(0)
+
+    async def _open_replica_session(
+        self, replica: _Replica, connection_timeout: float
+    ) -> AsyncSession | None:
+        """
+        Open a replica session, measuring lag when due.
+
+        Returns:
+            The session, or None if the replica is lagging too far behind
+        """
+        session = self._get_replica_factory(replica)()
+        now = time.time()
+        if not replica.lag_due(now):
+            return session
+        try:
+            result = await asyncio.wait_for(
+                session.execute(REPLICA_LAG_QUERY), timeout=connection_timeout
+            )
+            replica.lag_seconds = float(result.scalar() or 0)
+            replica.lag_checked_at = now
+        except BaseException:
+            await session.close()
+            raise
+
+        db_replica_lag_seconds.labels(replica.label).set(replica.lag_seconds)
+        within_lag = replica.lag_seconds <= settings.replica_max_lag_seconds
+        db_replica_available.labels(replica.label).set(1 if within_lag else 0)
+        if not within_lag:
+            await session.close()
+            return None
+        return session
+
+    @asynccontextmanager
+    async def get_read_session(
+        self,
+        prefer_primary: bool = False,
+        connection_timeout: float = 3.0,
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Get a session for read-only work, routed to a replica when possible.
+
+        Falls back to the primary when no replica is configured, all are
+        down or lagging, the replica cannot be reached, or prefer_primary is
+        set (read-your-writes after a mutation).
+
+        Args:
+            prefer_primary: Force the primary
+            connection_timeout: Timeout for the replica connection/lag check
+        """
+        replica = None
+        session = None
+        reason = "no_replica"
+        if prefer_primary and self._replicas:
+            reason = "read_your_writes"
+        elif self._replicas:
+            replica = self._pick_replica()
+            reason = "unavailable"
+            if replica is not None:
+                try:
+                    session = await self._open_replica_session(replica, connection_timeout)
+                    reason = "lagging"
+                except (asyncio.TimeoutError, SQLAlchemyError, OSError) as e:
+                    self._mark_replica_down(replica, e)
+                    reason = "replica_error"
+
+        if session is None:
+            db_read_routing_total.labels("primary", reason).inc()
+            async with self.get_session() as primary_session:
+                yield primary_session
+            return
+
+        db_read_routing_total.labels("replica", replica.label).inc()
+        try:
+            yield session
+            # Read-only: nothing to commit
+            await session.rollback()
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                self._mark_replica_down(replica, e)
+            await session.rollback()
+            raise
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    @staticmethod
+    def _client_key(request: Request) -> str | None:
+        """Identify a client by its credentials (hashed) for write stickiness."""
+        credential = request.headers.get("authorization") or request.headers.get("x-api-key")
+        if not credential:
+            return None
+        return hashlib.sha256(credential.encode()).hexdigest()
+
+    def mark_write(self, request: Request) -> float:
+        """
+        Record that a client just wrote, so its reads stay on the primary.
+
+        Returns:
+            Epoch time until which the client should read from the primary
+        """
+        now = time.time()
+        until = now + settings.read_your_writes_seconds
+        key = self._client_key(request)
+        if key:
+            if len(self._recent_writers) >= _RECENT_WRITERS_MAX:
+                self._recent_writers = {
+                    k: v for k, v in self._recent_writers.items() if v > now
+                }
+            self._recent_writers[key] = until
+        return until
+
+    def should_read_primary(self, request: Request) -> bool:
+        """Whether a request falls inside its client's read-your-writes window."""
+        now = time.time()
+        cookie = request.cookies.get(PRIMARY_STICKY_COOKIE)
+        if cookie:
+            try:
+                if float(cookie) > now:
+                    return True
+            except ValueError:
+                pass
+        key = self._client_key(request)
+        return bool(key) and self._recent_writers.get(key, 0) > now
+
+    def get_replica_status(self) -> List[Dict[str, object]]:
+        """Routing state of each replica (for health/metrics endpoints)."""
+        now = time.time()
+        return [
+            {
+                "replica": replica.label,
+                "eligible": replica.is_eligible(now),
+                "lag_seconds": replica.lag_seconds,
+                "lag_checked_seconds_ago": (
+                    round(now - replica.lag_checked_at, 1) if replica.lag_checked_at else None
+                ),
+                "down": replica.down_until > now,
+            }
+            for replica in self._replicas
+        ]
+
     async def close(self) -> None:
         if self._engine is not None:
             await self._engine.dispose()
             self._engine = None
             self._session_factory = None
+        for replica in self._replicas:
+            if replica.engine is not None:
+                await replica.engine.dispose()
+                replica.engine = None
+                replica.session_factory = None
 
 
 db_manager = DatabaseManager()
@@ -545,6 +789,15 @@ def _classify_db_error(e: Exception) -> tuple[str, str]:
     return "Database service unavailable.", "database_unavailable"
 
 
+def _unavailable(e: Exception) -> HTTPException:
+    """Map a session error to a 503 response."""
+    detail, error_code = _classify_db_error(e)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"message": detail, "error_code": error_code},
+    )
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     try:
         async with db_manager.get_session() as session:
@@ -553,18 +806,33 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         raise
     except SQLAlchemyError as e:
         logger.error(f"Database error: {e}")
-        detail, error_code = _classify_db_error(e)
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"message": detail, "error_code": error_code},
-        )
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"Unexpected error in get_db: {e}", exc_info=True)
-        detail, error_code = _classify_db_error(e)
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"message": detail, "error_code": error_code},
-        )
+        raise _unavailable(e)
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session dependency for read-only endpoints.
+
+    Routers opt in by depending on this instead of get_db. Routed to a read
+    replica when one is configured, healthy and within REPLICA_MAX_LAG_SECONDS;
+    otherwise (or right after the client wrote) the primary is used.
+    """
+    try:
+        async with db_manager.get_read_session(
+            prefer_primary=db_manager.should_read_primary(request)
+        ) as session:
+            yield session
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"Database error: {e}")
+        raise _unavailable(e)
+    except Exception as e:
+        logger.error(f"Unexpected error in get_read_db: {e}", exc_info=True)
+        raise _unavailable(e)
 
 async def init_db() -> None:
     try:
@@ -574,4 +842,114 @@ async def init_db() -> None:
         logger.info("Database tables initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database tables: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+# Work collected while a transaction flushes and acted on once it commits
+PENDING_INFO_KEY = "pending_after_commit"
+
+
+class Flushed(NamedTuple):
+    """The objects of a bucket's models written by one flush."""
+
+    new: List[Any]
+    dirty: List[Any]
+    deleted: List[Any]
+
+
+class _CommitBucket(NamedTuple):
+    models: Tuple[type, ...]
+    collect: Optional[Callable[[Session, Flushed], Optional[Iterable[Any]]]]
+    apply: Callable[[Session, List[Any]], None]
+    before_commit: bool
+
+
+_commit_buckets: Dict[str, _CommitBucket] = {}
+
+
+def pending_after_commit(
+    name: str,
+    apply: Callable[[Session, List[Any]], None],
+    models: Iterable[type] = (),
+    collect: Optional[Callable[[Session, Flushed], Optional[Iterable[Any]]]] = None,
+    before_commit: bool = False,
+) -> None:
+    """
+    Register a named bucket of work that runs when its transaction commits.
+
+    After each flush that wrote instances of models, collect(session, flushed)
+    may return items for the bucket; defer_until_commit() adds items directly.
+    On commit apply(session, items) receives everything collected, and a
+    rollback discards it. With before_commit the bucket is applied before the
+    transaction commits, so apply can still write in it.
+
+    All buckets share one set of Session listeners, so each flush walks its
+    new, dirty and deleted objects once.
+
+    Args:
+        name: Bucket name, unique per process
+        apply: Called with the session and the bucket's items
+        models: Model classes the collector is interested in
+        collect: Returns the items for one flush, if any
+        before_commit: Apply in before_commit instead of after_commit
+    """
+    _commit_buckets[name] = _CommitBucket(tuple(models), collect, apply, before_commit)
+
+
+def defer_until_commit(session: Session, name: str, *items: Any) -> None:
+    """Add items to a bucket of the session's current transaction."""
+    session.info.setdefault(PENDING_INFO_KEY, {}).setdefault(name, []).extend(items)
+
+
+def _collect_after_flush(session: Session, flush_context) -> None:
+    collectors = {name: bucket.collect for name, bucket in _commit_buckets.items() if bucket.collect is not None}
+    if not collectors:
+        return
+    written: Dict[str, Tuple[List[Any], List[Any], List[Any]]] = {}
+    # Model class -> names of the buckets collecting it
+    interested: Dict[type, List[str]] = {}
+    for group, objects in enumerate((session.new, session.dirty, session.deleted)):
+        for obj in objects:
+            names = interested.get(type(obj))
+            if names is None:
+                names = interested[type(obj)] = [
+                    name for name in collectors if isinstance(obj, _commit_buckets[name].models)
+                ]
+            for name in names:
+                written.setdefault(name, ([], [], []))[group].append(obj)
+    for name, groups in written.items():
+        items = collectors[name](session, Flushed(*groups))
+        if items:
+            defer_until_commit(session, name, *items)
+
+
+def _apply_before_commit(session: Session) -> None:
+    if not any(bucket.before_commit for bucket in _commit_buckets.values()):
+        return
+    # Pending changes are flushed after this hook; flush now so they are collected
+    session.flush()
+    pending = session.info.get(PENDING_INFO_KEY)
+    if not pending:
+        return
+    for name, bucket in _commit_buckets.items():
+        if bucket.before_commit and name in pending:
+            bucket.apply(session, pending.pop(name))
+
+
+def _apply_after_commit(session: Session) -> None:
+    pending = session.info.pop(PENDING_INFO_KEY, None)
+    if not pending:
+        return
+    for name, bucket in _commit_buckets.items():
+        if name in pending:
+            bucket.apply(session, pending[name])
+
+
+def _discard_after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_INFO_KEY, None)
+
+
+event.listen(Session, "after_flush", _collect_after_flush)
+event.listen(Session, "before_commit", _apply_before_commit)
+event.listen(Session, "after_commit", _apply_after_commit)
+event.listen(Session, "after_soft_rollback", _discard_after_rollback)
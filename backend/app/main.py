@@ -33,8 +33,9 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
-from app.database import db_manager
+from app.database import db_manager, PRIMARY_STICKY_COOKIE
 from app.core.limiter import limiter
+from app.core.serialization import FastJSONResponse
 from app.middleware.error_handler import register_error_handlers
 from app.services.cache_service import cache_service
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -238,6 +239,44 @@ async def _create_database_tables() -> None:
             logger.info("✅ Database tables created/verified")
         except asyncio.TimeoutError:
             logger.warning("⚠️  Database table creation timed out (tables may already exist)")
+
+        # Backfill the daily trade rollup on first start after it was added
+        try:
+            from app.services.trade_rollup_service import TradeRollupService
+
+            async with db_manager.get_session() as session:
+                if await TradeRollupService.ensure_built(session):
+                    logger.info("✅ Trade daily rollups backfilled")
+        except Exception as rollup_err:
+            logger.warning(f"⚠️  Trade rollup backfill failed: {rollup_err}")
+
+        # Backfill the trade listing read model the same way
+        try:
+            from app.services.trade_listing_service import TradeListingService
+
+            async with db_manager.get_session() as session:
+                if await TradeListingService.ensure_built(session):
+                    logger.info("✅ Trade listings backfilled")
+        except Exception as listing_err:
+            logger.warning(f"⚠️  Trade listing backfill failed: {listing_err}")
+
+        # Trigram indexes for name search (PostgreSQL only)
+        try:
+            from app.services.search_service import SearchService
+
+            if await SearchService.ensure_indexes(db_manager.get_engine()):
+                logger.info("✅ Search trigram indexes created/verified")
+        except Exception as search_err:
+            logger.warning(f"⚠️  Search index setup failed: {search_err}")
+
+        # Retry/latency columns on webhook deliveries (PostgreSQL only)
+        try:
+            from app.services.webhook_service import WebhookService
+
+            if await WebhookService.ensure_schema(db_manager.get_engine()):
+                logger.info("✅ Webhook delivery columns created/verified")
+        except Exception as webhook_err:
+            logger.warning(f"⚠️  Webhook schema setup failed: {webhook_err}")
     except Exception as e:
         logger.warning(f"⚠️  Failed to create tables: {e}")
 
@@ -288,6 +327,34 @@ async def _shutdown_application() -> None:
         await asyncio.gather(*_background_tasks, return_exceptions=True)
         logger.info("Background tasks cancelled")
 
+    # Stop notification workers (undelivered rows stay in the outbox)
+    try:
+        from app.services.notification_dispatch_service import notification_dispatcher
+        await notification_dispatcher.stop()
+    except Exception as e:
+        logger.warning(f"Notification dispatcher stop error: {e}")
+
+    # Stop webhook retries and close the pooled webhook client
+    try:
+        from app.services.webhook_service import webhook_retry_worker
+        await webhook_retry_worker.stop()
+    except Exception as e:
+        logger.warning(f"Webhook retry worker stop error: {e}")
+
+    # Stop receiving stream events from other workers
+    try:
+        from app.services.event_backplane import event_backplane
+        await event_backplane.stop()
+    except Exception as e:
+        logger.warning(f"Event backplane stop error: {e}")
+
+    # Close trade stream WebSockets and stop their writers
+    try:
+        from app.services.trade_event_manager import trade_event_manager
+        await trade_event_manager.close()
+    except Exception as e:
+        logger.warning(f"Trade stream shutdown error: {e}")
+
     # Close database connections (with shorter timeout and force close)
     try:
         try:
@@ -323,6 +390,13 @@ async def _shutdown_application() -> None:
             logger.warning(f"Scheduler stop error: {e}")
         _scheduler_service = None
 
+    # Stop pruning the Supabase cache
+    try:
+        from app.services.supabase_cache_service import supabase_cache_service
+        await supabase_cache_service.stop()
+    except Exception as e:
+        logger.warning(f"Supabase cache stop error: {e}")
+
     # Disconnect cache service
     try:
         await cache_service.disconnect()
@@ -330,6 +404,13 @@ async def _shutdown_application() -> None:
     except Exception as e:
         logger.warning(f"Cache service disconnect error: {e}")
 
+    # Close the alert cooldown store's Redis connection, if any
+    try:
+        from app.services.alert_cooldown_service import AlertCooldownService
+        await AlertCooldownService.close()
+    except Exception as e:
+        logger.warning(f"Alert cooldown store close error: {e}")
+
     logger.info("Application shutdown complete")
 
 
@@ -391,6 +472,22 @@ async def lifespan(app: FastAPI):
             except Exception as sched_err:
                 logger.warning(f"⚠️  Scheduler failed to start: {sched_err}")
                 _scheduler_service = None
+
+            # Deliver queued alert notifications, including any left from before a restart
+            try:
+                from app.services.notification_dispatch_service import notification_dispatcher
+                await notification_dispatcher.start()
+                logger.info("✅ Notification dispatcher started")
+            except Exception as dispatch_err:
+                logger.warning(f"⚠️  Notification dispatcher failed to start: {dispatch_err}")
+
+            # Resend failed and interrupted webhook deliveries when they are due
+            try:
+                from app.services.webhook_service import webhook_retry_worker
+                await webhook_retry_worker.start()
+                logger.info("✅ Webhook retry worker started")
+            except Exception as webhook_err:
+                logger.warning(f"⚠️  Webhook retry worker failed to start: {webhook_err}")
         else:
             logger.warning("=" * 80)
             logger.warning("⚠️  DATABASE UNAVAILABLE - Starting in degraded mode")
@@ -404,6 +501,28 @@ async def lifespan(app: FastAPI):
             task.add_done_callback(_background_tasks.discard)
             logger.info("🔄 Background database reconnection task started")
 
+        # Redis behind the in-process cache (optional; the cache works without it)
+        try:
+            await cache_service.connect()
+        except Exception as cache_err:
+            logger.warning(f"⚠️  Cache service failed to connect: {cache_err}")
+
+        # Prune expired Supabase api_cache rows in the background
+        try:
+            from app.services.supabase_cache_service import supabase_cache_service
+            await supabase_cache_service.start()
+        except Exception as prune_err:
+            logger.warning(f"⚠️  Supabase cache pruning failed to start: {prune_err}")
+
+        # Receive trade and alert stream events published by other workers;
+        # the listener reconnects on its own if its transport is down
+        try:
+            from app.services.event_backplane import event_backplane
+            await event_backplane.start()
+            logger.info("✅ Event backplane started")
+        except Exception as backplane_err:
+            logger.warning(f"⚠️  Event backplane failed to start: {backplane_err}")
+
         _log_startup_info(app)
 
     except asyncio.CancelledError as cancel_error:
@@ -438,6 +557,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan,
 )
 
@@ -472,6 +592,28 @@ from app.middleware.https_redirect import HTTPSRedirectMiddleware
 app.add_middleware(HTTPSRedirectMiddleware)
 
 
+# Read-your-writes: after a successful mutation, keep the client's reads on
+# the primary for READ_YOUR_WRITES_SECONDS (only matters with read replicas)
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if (
+        db_manager.has_replicas
+        and request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+    ):
+        until = db_manager.mark_write(request)
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            f"{until:.3f}",
+            max_age=max(1, int(settings.read_your_writes_seconds)),
+            httponly=True,
+            samesite="lax",
+            secure=settings.environment == "production",
+        )
+    return response
+
+
 # Request Logging Middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -8,10 +8,15 @@ with SQLAlchemy metadata.
 from app.models.company import Company
 from app.models.insider import Insider
 from app.models.trade import Trade, TransactionType, TransactionCode
+from app.models.trade_daily_rollup import TradeDailyRollup
+from app.models.data_version import DataVersion
+from app.models.trade_listing import TradeListing
+from app.models.company_snapshot import CompanySnapshot
 from app.models.congressperson import Congressperson, Chamber, Party
 from app.models.congressional_trade import CongressionalTrade, OwnerType
 from app.models.alert import Alert
 from app.models.alert_history import AlertHistory
+from app.models.notification_outbox import NotificationOutbox
 from app.models.scrape_job import ScrapeJob
 from app.models.scrape_history import ScrapeHistory
 from app.models.push_subscription import PushSubscription
@@ -118,6 +123,10 @@ __all__ = [
     "Trade",
     "TransactionType",
     "TransactionCode",
+    "TradeDailyRollup",
+    "DataVersion",
+    "TradeListing",
+    "CompanySnapshot",
     "Congressperson",
     "Chamber",
     "Party",
@@ -125,6 +134,7 @@ __all__ = [
     "OwnerType",
     "Alert",
     "AlertHistory",
+    "NotificationOutbox",
     "ScrapeJob",
     "ScrapeHistory",
     "PushSubscription",
@@ -0,0 +1,47 @@
+"""
+Company snapshot model for TradeSignal.
+
+One precomputed document per company holding everything the company page
+shows (profile and stats, quote, research scores, recent trades, insiders),
+each section stamped with when it was built. Maintained by
+CompanySnapshotService; the cache holds a copy under the same key.
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CompanySnapshot(Base):
+    """
+    Precomputed company page document.
+
+    Attributes:
+        company_id: Foreign key to Company (one snapshot per company)
+        ticker: Upper-cased ticker the page is looked up by
+        document: Snapshot document (see CompanySnapshotService.build_document)
+        stale: Set when trades or scores changed after the last build
+        built_at: Time of the last (full or partial) build
+    """
+
+    __tablename__ = "company_snapshots"
+
+    company_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("companies.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    ticker: Mapped[str] = mapped_column(String(10), nullable=False, unique=True, index=True)
+    document: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    stale: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    built_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of CompanySnapshot."""
+        return f"<CompanySnapshot(ticker={self.ticker}, stale={self.stale})>"
@@ -0,0 +1,37 @@
+"""
+Data version model for TradeSignal.
+
+Monotonic per-scope counters bumped in the same transaction as the data they
+describe. Used to build HTTP validators (ETag/Last-Modified) without
+re-reading the underlying data.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import String, BigInteger, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class DataVersion(Base):
+    """
+    Version counter for one data scope.
+
+    Attributes:
+        scope: Scope name (e.g. "trades", "trades:company:42")
+        version: Incremented on every change in the scope
+        updated_at: Time of the last change
+    """
+
+    __tablename__ = "data_versions"
+
+    scope: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of DataVersion."""
+        return f"<DataVersion(scope={self.scope}, version={self.version})>"
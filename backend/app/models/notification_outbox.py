@@ -0,0 +1,75 @@
+"""
+Notification outbox model for TradeSignal.
+
+Alert notifications are written here in the same transaction that triggers
+them and delivered afterwards by the notification dispatcher, so a trade
+write never waits on webhooks, email or push, and queued notifications
+survive restarts.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class NotificationOutbox(Base):
+    """
+    One pending (or finished) notification delivery.
+
+    Attributes:
+        alert_id: Alert that fired
+        trade_id: Trade that matched
+        user_id: Owner of the alert
+        channel: webhook, email, push or multi_channel
+        subscription_id: Push subscription for a per-device push row (a push
+            row without one fans out to every active subscription)
+        payload: Channel-specific data captured when the alert fired
+        status: pending, sent or failed (retries exhausted)
+        attempts: Delivery attempts so far
+        next_attempt_at: Earliest time of the next attempt
+        locked_until: Lease held by the worker delivering the row
+        last_error: Error of the last failed attempt
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    alert_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("alerts.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    trade_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("trades.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    channel: Mapped[str] = mapped_column(String(50), nullable=False)
+    subscription_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    payload: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of NotificationOutbox."""
+        return (
+            f"<NotificationOutbox(id={self.id}, alert_id={self.alert_id}, "
+            f"channel='{self.channel}', status='{self.status}')>"
+        )
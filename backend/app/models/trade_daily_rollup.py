@@ -0,0 +1,88 @@
+"""
+Trade daily rollup model for TradeSignal.
+
+Pre-aggregated trade activity per company, filing day and transaction type.
+Maintained by TradeRollupService whenever trades are written.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import (
+    String,
+    Integer,
+    ForeignKey,
+    Date,
+    Numeric,
+    PrimaryKeyConstraint,
+    Index,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TradeDailyRollup(Base):
+    """
+    Daily trade aggregate for one company and transaction type.
+
+    Attributes:
+        company_id: Foreign key to Company
+        day: Filing date of the aggregated trades
+        transaction_type: BUY or SELL
+        trade_count: Number of trades
+        total_shares: Sum of shares
+        total_value: Sum of total_value (NULL values ignored)
+        price_sum: Sum of non-NULL price_per_share (for average price)
+        price_count: Number of trades with a price_per_share
+        priced_count: Trades with positive price and value (the set listings
+            and /trades/stats use)
+        priced_shares: Sum of shares over priced trades
+        priced_value: Sum of total_value over priced trades
+        max_value: Largest priced trade value
+        insider_count: Distinct insiders trading that day
+    """
+
+    __tablename__ = "trade_daily_rollups"
+
+    company_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("companies.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    transaction_type: Mapped[str] = mapped_column(String(10), nullable=False)
+
+    trade_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_shares: Mapped[Decimal] = mapped_column(
+        Numeric(20, 4), default=0, nullable=False
+    )
+    total_value: Mapped[Decimal] = mapped_column(
+        Numeric(20, 2), default=0, nullable=False
+    )
+    price_sum: Mapped[Decimal] = mapped_column(
+        Numeric(20, 2), default=0, nullable=False
+    )
+    price_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    priced_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    priced_shares: Mapped[Decimal] = mapped_column(
+        Numeric(20, 4), default=0, nullable=False
+    )
+    priced_value: Mapped[Decimal] = mapped_column(
+        Numeric(20, 2), default=0, nullable=False
+    )
+    max_value: Mapped[Decimal | None] = mapped_column(Numeric(15, 2), nullable=True)
+    insider_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("company_id", "day", "transaction_type"),
+        # Market-wide date range scans (stats across all companies)
+        Index("ix_trade_daily_rollups_day", "day"),
+    )
+
+    def __repr__(self) -> str:
+        """String representation of TradeDailyRollup."""
+        return (
+            f"<TradeDailyRollup(company_id={self.company_id}, day={self.day}, "
+            f"type={self.transaction_type}, trades={self.trade_count})>"
+        )
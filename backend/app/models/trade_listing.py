@@ -0,0 +1,92 @@
+"""
+Trade listing model for TradeSignal.
+
+Denormalized read model for trade listings: one row per trade with the
+company ticker/name and insider name/roles inline, so listing endpoints read
+a single table with no joins or relationship loads. Kept in sync with
+trades, companies and insiders by TradeListingService.
+"""
+
+from datetime import datetime, date
+from decimal import Decimal
+
+from sqlalchemy import (
+    String,
+    Integer,
+    ForeignKey,
+    Date,
+    DateTime,
+    Boolean,
+    Numeric,
+    Text,
+    Index,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TradeListing(Base):
+    """
+    Flattened trade row for listings.
+
+    Attributes:
+        id: Trade ID (primary key, same as trades.id)
+        company_id / insider_id: Source foreign keys
+        ticker / company_name: Company columns copied inline
+        insider_name / insider_title / is_*: Insider columns copied inline
+        Remaining columns mirror the Trade columns of the same name.
+    """
+
+    __tablename__ = "trade_listings"
+
+    id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("trades.id", ondelete="CASCADE"), primary_key=True
+    )
+    company_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    insider_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Company (inline)
+    ticker: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    company_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # Insider (inline)
+    insider_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    insider_title: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    is_director: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    is_officer: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    is_ten_percent_owner: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    is_other: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+
+    # Trade
+    transaction_date: Mapped[date] = mapped_column(Date, nullable=False)
+    filing_date: Mapped[date] = mapped_column(Date, nullable=False)
+    transaction_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    transaction_code: Mapped[str | None] = mapped_column(String(2), nullable=True)
+    shares: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+    price_per_share: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+    total_value: Mapped[Decimal | None] = mapped_column(Numeric(15, 2), nullable=True)
+    shares_owned_after: Mapped[Decimal | None] = mapped_column(
+        Numeric(15, 4), nullable=True
+    )
+    ownership_type: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    derivative_transaction: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    sec_filing_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    form_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Default listing order and the keyset seek on (sort, id)
+        Index("ix_trade_listings_filing_date_id", "filing_date", "id"),
+        Index("ix_trade_listings_transaction_date_id", "transaction_date", "id"),
+        Index("ix_trade_listings_total_value", "total_value"),
+        Index("ix_trade_listings_ticker_filing_date", "ticker", "filing_date"),
+        Index("ix_trade_listings_company_filing_date", "company_id", "filing_date"),
+        Index("ix_trade_listings_insider_filing_date", "insider_id", "filing_date"),
+    )
+
+    def __repr__(self) -> str:
+        """String representation of TradeListing."""
+        return f"<TradeListing(id={self.id}, ticker={self.ticker}, type={self.transaction_type})>"
@@ -71,6 +71,9 @@ class WebhookDelivery(Base):
         response_code: HTTP response code
         response_body: Response body
         attempts: Number of delivery attempts
+        next_attempt_at: When a retrying delivery is due again
+        duration_ms: Latency of the last attempt
+        error: Error of the last failed attempt
         delivered_at: When webhook was successfully delivered
         created_at: When delivery was attempted
     """
@@ -89,6 +92,9 @@ class WebhookDelivery(Base):
     response_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
     response_body: Mapped[str | None] = mapped_column(Text, nullable=True)
     attempts: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+    duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
     delivered_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
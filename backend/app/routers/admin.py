@@ -19,6 +19,7 @@ from app.models.user import User
 from app.models.payment import Payment
 from app.models.subscription import Subscription, SubscriptionStatus
 from app.models.contact_submission import ContactSubmission
+from app.services.search_service import SearchService
 
 router = APIRouter()
 
@@ -449,19 +450,10 @@ async def search_user(
 ):
     """
     Search for a user by email, username, or full name.
+    Best matches first (exact, prefix, substring, then fuzzy).
     Returns user details including subscription and billing info.
     """
-    search_pattern = f"%{query}%"
-    result = await db.execute(
-        select(User)
-        .where(
-            (User.email.ilike(search_pattern))
-            | (User.username.ilike(search_pattern))
-            | (User.full_name.ilike(search_pattern))
-        )
-        .limit(10)
-    )
-    users = result.scalars().all()
+    users, _, _ = await SearchService.search(db, "users", query, limit=10)
 
     if not users:
         raise HTTPException(
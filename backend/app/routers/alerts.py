@@ -35,7 +35,11 @@ from app.schemas.alert import (
     AlertToggle,
     AlertHistoryResponse,
     AlertStatsResponse,
+    AlertPreviewRequest,
+    AlertPreviewResponse,
 )
+from app.services.alert_backtest_service import AlertBacktestService
+from app.services.event_backplane import ALERT_EVENTS, event_backplane
 from app.schemas.alert_debug import AlertDebugResponse # Import the new schema
 from app.schemas.common import PaginatedResponse
 
@@ -124,6 +128,12 @@ class AlertConnectionManager:
         """Send a message to a specific user's connections."""
         await self.broadcast(message, user_id=user_id)
 
+    async def deliver(self, event: dict):
+        """Event backplane handler: send a published notification to this worker's connections."""
+        message = event.get("message")
+        if message:
+            await self.broadcast(message, user_id=event.get("user_id"))
+
     @property
     def total_connections(self) -> int:
         """Get total number of active connections."""
@@ -131,6 +141,7 @@ class AlertConnectionManager:
 
 
 alert_manager = AlertConnectionManager()
+event_backplane.subscribe(ALERT_EVENTS, alert_manager.deliver)
 
 def get_alert_manager() -> AlertConnectionManager:
     return alert_manager
@@ -176,6 +187,35 @@ async def create_alert(
         )
 
 
+@router.post("/preview", response_model=AlertPreviewResponse)
+@limiter.limit("30/minute")
+async def preview_alert(
+    request: Request,
+    preview: AlertPreviewRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Backtest a draft alert against stored trades without creating it.
+
+    Accepts the simple alert filters (ticker, value range, transaction type,
+    insider roles) or an advanced rule **query_structure**. Returns hit
+    counts per month over the last **years** years and the most recent
+    matching trades.
+    """
+    return await AlertBacktestService.preview(
+        db,
+        years=preview.years,
+        sample_size=preview.sample_size,
+        ticker=preview.ticker,
+        transaction_type=preview.transaction_type,
+        min_value=preview.min_value,
+        max_value=preview.max_value,
+        insider_roles=preview.insider_roles,
+        query_structure=preview.query_structure,
+    )
+
+
 @router.get("/", response_model=PaginatedResponse[AlertResponse])
 @limiter.limit("60/minute")
 async def list_alerts(
@@ -11,8 +11,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.database import get_db
-from app.services import CompanyService, TradeService
+from app.database import get_db, get_read_db
+from app.core.serialization import render_bulk
+from app.services import CompanyService, CompanySnapshotService, TradeListingService
 from app.services.company_enrichment_service import CompanyEnrichmentService
 from app.services.company_profile_service import CompanyProfileService
 from app.services.stock_price_service import StockPriceService
@@ -22,7 +23,7 @@ from app.schemas.company import (
     CompanyUpdate,
     CompanyWithStats,
 )
-from app.schemas.trade import TradeFilter, TradeWithDetails
+from app.schemas.trade import TradeFilter, TradeListItem
 from app.schemas.common import PaginationParams, SortParams, PaginatedResponse
 
 router = APIRouter()
@@ -35,7 +36,7 @@ async def get_companies(
     request: Request,
     pagination: PaginationParams = Depends(),
     sector: str | None = Query(None, description="Filter by sector"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all companies with pagination.
@@ -65,7 +66,7 @@ async def search_companies(
     request: Request,
     q: str = Query(..., min_length=1, description="Search query (ticker or name)"),
     pagination: PaginationParams = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Search companies by ticker or name.
@@ -77,7 +78,7 @@ async def search_companies(
 
     Example: `/api/v1/companies/search?q=apple` matches "AAPL" and "Apple Inc."
     """
-    companies, total = await CompanyService.search(
+    companies, total, total_is_estimate = await CompanyService.search(
         db=db, query=q, skip=pagination.skip, limit=pagination.limit
     )
 
@@ -86,6 +87,7 @@ async def search_companies(
         total=total,
         page=pagination.page,
         limit=pagination.limit,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -164,14 +166,39 @@ async def get_company_by_ticker(
     return company_stats
 
 
-@router.get("/{ticker}/trades", response_model=PaginatedResponse[TradeWithDetails])
+@router.get("/{ticker}/snapshot")
+@limiter.limit("120/minute")
+async def get_company_snapshot(
+    request: Request, ticker: str, db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the precomputed company page document in one read.
+
+    **Parameters:**
+    - ticker: Stock ticker (case-insensitive)
+
+    Returns `{ticker, company_id, built_at, sections}` where each section
+    (profile, quote, scores, recent_trades, insiders) is `{as_of, data}`.
+    Sections are rebuilt in the background when trades, scores or the quote
+    change, so `as_of` tells how fresh each one is.
+    """
+    document = await CompanySnapshotService.get(db, ticker)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Company with ticker '{ticker}' not found",
+        )
+    return document
+
+
+@router.get("/{ticker}/trades", response_model=PaginatedResponse[TradeListItem])
 @limiter.limit("60/minute")
 async def get_company_trades(
     request: Request,
     ticker: str,
     pagination: PaginationParams = Depends(),
     sort: SortParams = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all trades for a specific company.
@@ -196,20 +223,24 @@ async def get_company_trades(
 
     # Get trades for this company
     filters = TradeFilter(company_id=company.id)
-    trades, total = await TradeService.get_all(
+    page = await TradeListingService.get_page(
         db=db,
         skip=pagination.skip,
         limit=pagination.limit,
         filters=filters,
         sort_by=sort.sort_by,
         order=sort.order,
+        count_mode="exact",
     )
 
-    return PaginatedResponse.create(
-        items=[TradeWithDetails.model_validate(trade) for trade in trades],
-        total=total,
-        page=pagination.page,
-        limit=pagination.limit,
+    return render_bulk(
+        request,
+        PaginatedResponse.create(
+            items=TradeListingService.to_items(page.items),
+            total=page.total,
+            page=pagination.page,
+            limit=pagination.limit,
+        ).model_dump(),
     )
 
 
@@ -19,7 +19,13 @@ from app.schemas.congressional_trade import (
     CongressionalTradeFilter,
     CongressionalTradeStats,
 )
-from app.schemas.common import PaginationParams, SortParams, PaginatedResponse
+from app.schemas.common import (
+    PaginationParams,
+    CursorParams,
+    SortParams,
+    PaginatedResponse,
+)
+from app.utils.pagination import InvalidCursorError
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +35,7 @@ router = APIRouter()
 @router.get("/", response_model=PaginatedResponse[CongressionalTradeWithDetails])
 async def get_congressional_trades(
     pagination: PaginationParams = Depends(),
+    cursor_params: CursorParams = Depends(),
     sort: SortParams = Depends(),
     filters: CongressionalTradeFilter = Depends(),
     current_user: User = Depends(get_current_active_user),
@@ -49,20 +56,26 @@ async def get_congressional_trades(
     - transaction_date_from/to: Date range
     - min_value/max_value: Amount range
     - significant_only: Show only trades > $100k
+
+    Pagination: pass next_cursor back as cursor for keyset paging;
+    count selects exact, cached, estimated or no total.
     """
     try:
-        trades, total = await CongressionalTradeService.get_all(
+        page = await CongressionalTradeService.get_page(
             db=db,
             skip=pagination.skip,
             limit=pagination.limit,
             filters=filters,
             sort_by=sort.sort_by,
             order=sort.order,
+            cursor=cursor_params.cursor,
+            page=pagination.page,
+            count_mode=cursor_params.count,
         )
 
         # Convert to response schema
         items = []
-        for trade in trades:
+        for trade in page.items:
             trade_dict = trade.to_dict()
             if trade.company:
                 trade_dict["company"] = trade.company.to_dict()
@@ -71,9 +84,16 @@ async def get_congressional_trades(
             items.append(trade_dict)
 
         return PaginatedResponse.create(
-            items=items, total=total, page=pagination.page, limit=pagination.limit
+            items=items,
+            total=page.total,
+            page=page.page,
+            limit=pagination.limit,
+            next_cursor=page.next_cursor,
+            total_is_estimate=page.total_is_estimate,
         )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching congressional trades: {e}")
         raise HTTPException(
@@ -13,14 +13,17 @@ Features:
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query, Header, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
 from pydantic import BaseModel, Field
 
-from app.database import get_db
+from app.database import get_db, db_manager
 from app.core.security import get_current_active_user, get_api_key_user, get_current_user_flexible
+from app.core.http_cache import CACHE_PRIVATE_REVALIDATE, conditional_get, make_etag
+from app.core.serialization import render_bulk
 from app.models.user import User
 from app.services.api_key_service import APIKeyService
 from app.schemas.api_key import (
@@ -32,9 +35,20 @@ from app.schemas.api_key import (
 from app.models.subscription import Subscription, SubscriptionTier
 from app.models.trade import Trade
 from app.models.company import Company
-from app.models.insider import Insider
+from app.models.trade_listing import TradeListing
 from app.middleware.feature_gating import require_feature
 from app.services.tier_service import TierService
+from app.services.data_version_service import (
+    TRADES_SCOPE,
+    DataVersionService,
+    company_trades_scope,
+)
+from app.services.trade_export_service import (
+    EXPORT_FORMATS,
+    PYARROW_AVAILABLE,
+    TradeExportService,
+)
+from app.schemas.trade import TradeFilter
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +135,8 @@ async def check_rate_limit(
 
 @router.get("/trades", response_model=List[TradeResponse])
 async def get_trades(
+    request: Request,
+    response: Response,
     ticker: Optional[str] = Query(None, description="Filter by ticker symbol"),
     days_back: int = Query(30, ge=1, le=365, description="Days to look back"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum results"),
@@ -130,55 +146,135 @@ async def get_trades(
     """
     Get insider trades.
 
+    Send `Accept: application/msgpack` to receive MessagePack instead of JSON.
+
     Requires API access (Pro tier or higher).
     """
     # Check API access
     await require_feature("api_access", "API access")(current_user, db)
     await check_rate_limit(current_user, db)
 
+    cutoff_date = datetime.utcnow() - timedelta(days=days_back)
+
+    # Unchanged data answers 304 and does not count as an API call
+    version, updated_at = (
+        await DataVersionService.get_versions(db, [TRADES_SCOPE])
+    )[TRADES_SCOPE]
+    not_modified = conditional_get(
+        request,
+        response,
+        make_etag(
+            "enterprise/trades", version, (ticker or "").upper(), days_back, limit,
+            cutoff_date.date(),
+        ),
+        updated_at,
+        CACHE_PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
+
     # Increment API usage
     await TierService.increment_api_usage(current_user.id, db)
 
-    # Build query
-    cutoff_date = datetime.utcnow() - timedelta(days=days_back)
+    # Flat rows from the trade listing read model (no joins)
     query = (
-        select(Trade, Company, Insider)
-        .join(Company, Trade.company_id == Company.id)
-        .join(Insider, Trade.insider_id == Insider.id)
-        .where(Trade.filing_date >= cutoff_date)
-        .order_by(desc(Trade.filing_date))
+        select(
+            TradeListing.id,
+            TradeListing.ticker,
+            TradeListing.company_name,
+            TradeListing.insider_name,
+            TradeListing.insider_title,
+            TradeListing.transaction_type,
+            TradeListing.shares,
+            TradeListing.price_per_share,
+            TradeListing.total_value,
+            TradeListing.filing_date,
+        )
+        .where(
+            TradeListing.filing_date >= cutoff_date,
+            TradeListing.ticker.is_not(None),
+            TradeListing.insider_name.is_not(None),
+        )
+        .order_by(desc(TradeListing.filing_date))
         .limit(limit)
     )
 
     if ticker:
-        query = query.where(Company.ticker == ticker.upper())
+        query = query.where(TradeListing.ticker == ticker.upper())
 
     result = await db.execute(query)
-    trades_data = result.all()
-
-    # Format response
-    trades = []
-    for trade, company, insider in trades_data:
-        trades.append(
-            TradeResponse(
-                id=trade.id,
-                ticker=company.ticker,
-                company_name=company.name,
-                insider_name=insider.name,
-                insider_role=insider.title,
-                transaction_type=trade.transaction_type,
-                shares=float(trade.shares) if trade.shares else 0.0,
-                price_per_share=float(trade.price_per_share) if trade.price_per_share else None,
-                total_value=float(trade.total_value) if trade.total_value else None,
-                filing_date=trade.filing_date.isoformat(),
-            )
+
+    # TradeResponse-shaped dicts straight from the row tuples (JSON or MessagePack)
+    trades = [
+        {
+            "id": row.id,
+            "ticker": row.ticker,
+            "company_name": row.company_name,
+            "insider_name": row.insider_name,
+            "insider_role": row.insider_title,
+            "transaction_type": row.transaction_type,
+            "shares": float(row.shares) if row.shares else 0.0,
+            "price_per_share": float(row.price_per_share) if row.price_per_share else None,
+            "total_value": float(row.total_value) if row.total_value else None,
+            "filing_date": row.filing_date.isoformat(),
+        }
+        for row in result.all()
+    ]
+
+    return render_bulk(request, trades, response)
+
+
+@router.get("/trades/export")
+async def export_trades(
+    format: str = Query(
+        "ndjson", pattern="^(ndjson|csv|parquet)$", description="ndjson, csv or parquet"
+    ),
+    filters: TradeFilter = Depends(),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream all matching insider trades as a file download.
+
+    Accepts the same filters as /trades (ticker, company_id, insider_id,
+    transaction_type, transaction date range, value/share bounds, ...).
+    Rows are streamed from a server-side cursor, so there is no row cap and
+    the whole export counts as a single API call.
+
+    Requires API access (Pro tier or higher).
+    """
+    await require_feature("api_access", "API access")(current_user, db)
+    await check_rate_limit(current_user, db)
+
+    if format == "parquet" and not PYARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available on this server",
         )
 
-    return trades
+    await TierService.increment_api_usage(current_user.id, db)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"trades-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+
+    async def _stream():
+        # The request session closes before the body is sent; use our own
+        async with db_manager.get_read_session() as session:
+            batches = TradeExportService.stream_batches(session, filters)
+            async for chunk in TradeExportService.encode(format, batches):
+                yield chunk
+
+    return StreamingResponse(
+        _stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/companies/{ticker}/insights", response_model=CompanyInsightsResponse)
 async def get_company_insights(
+    request: Request,
+    response: Response,
     ticker: str,
     days_back: int = Query(90, ge=1, le=365),
     current_user: User = Depends(get_current_active_user),
@@ -192,8 +288,6 @@ async def get_company_insights(
     await require_feature("api_access", "API access")(current_user, db)
     await check_rate_limit(current_user, db)
 
-    await TierService.increment_api_usage(current_user.id, db)
-
     # Get company
     result = await db.execute(
         select(Company).where(Company.ticker == ticker.upper())
@@ -206,8 +300,23 @@ async def get_company_insights(
             detail=f"Company {ticker} not found",
         )
 
-    # Get trade stats
     cutoff_date = datetime.utcnow() - timedelta(days=days_back)
+
+    scope = company_trades_scope(company.id)
+    version, updated_at = (await DataVersionService.get_versions(db, [scope]))[scope]
+    not_modified = conditional_get(
+        request,
+        response,
+        make_etag("enterprise/insights", company.id, version, days_back, cutoff_date.date()),
+        updated_at,
+        CACHE_PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
+
+    await TierService.increment_api_usage(current_user.id, db)
+
+    # Get trade stats
     result = await db.execute(
         select(
             func.count(Trade.id).label("total_trades"),
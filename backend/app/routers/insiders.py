@@ -9,15 +9,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.database import get_db
-from app.services import InsiderService, TradeService
+from app.database import get_db, get_read_db
+from app.core.serialization import render_bulk
+from app.services import InsiderService, TradeListingService
 from app.services.company_enrichment_service import CompanyEnrichmentService
 from app.schemas.insider import (
     InsiderRead,
     InsiderCreate,
     InsiderUpdate,
 )
-from app.schemas.trade import TradeFilter, TradeWithDetails
+from app.schemas.trade import TradeFilter, TradeListItem
 from app.schemas.common import PaginationParams, SortParams, PaginatedResponse
 
 router = APIRouter()
@@ -30,7 +31,7 @@ async def get_insiders(
     request: Request,
     pagination: PaginationParams = Depends(),
     company_id: int | None = Query(None, description="Filter by company"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all insiders with pagination.
@@ -60,7 +61,7 @@ async def search_insiders(
     request: Request,
     q: str = Query(..., min_length=1, description="Search query (name)"),
     pagination: PaginationParams = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Search insiders by name.
@@ -72,7 +73,7 @@ async def search_insiders(
 
     Example: `/api/v1/insiders/search?q=tim` matches "Tim Cook", "Timothy Apple", etc.
     """
-    insiders, total = await InsiderService.search(
+    insiders, total, total_is_estimate = await InsiderService.search(
         db=db, query=q, skip=pagination.skip, limit=pagination.limit
     )
 
@@ -81,6 +82,7 @@ async def search_insiders(
         total=total,
         page=pagination.page,
         limit=pagination.limit,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -116,14 +118,14 @@ async def get_insider(
     return InsiderRead.model_validate(insider)
 
 
-@router.get("/{insider_id}/trades", response_model=PaginatedResponse[TradeWithDetails])
+@router.get("/{insider_id}/trades", response_model=PaginatedResponse[TradeListItem])
 @limiter.limit("60/minute")
 async def get_insider_trades(
     request: Request,
     insider_id: int,
     pagination: PaginationParams = Depends(),
     sort: SortParams = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all trades for a specific insider.
@@ -148,20 +150,24 @@ async def get_insider_trades(
 
     # Get trades for this insider
     filters = TradeFilter(insider_id=insider_id)
-    trades, total = await TradeService.get_all(
+    page = await TradeListingService.get_page(
         db=db,
         skip=pagination.skip,
         limit=pagination.limit,
         filters=filters,
         sort_by=sort.sort_by,
         order=sort.order,
+        count_mode="exact",
     )
 
-    return PaginatedResponse.create(
-        items=[TradeWithDetails.model_validate(trade) for trade in trades],
-        total=total,
-        page=pagination.page,
-        limit=pagination.limit,
+    return render_bulk(
+        request,
+        PaginatedResponse.create(
+            items=TradeListingService.to_items(page.items),
+            total=page.total,
+            page=pagination.page,
+            limit=pagination.limit,
+        ).model_dump(),
     )
 
 
@@ -12,12 +12,13 @@ Provides endpoints for accessing research features:
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.database import get_db
 from app.core.security import get_current_active_user
+from app.core.http_cache import CACHE_PRIVATE_REVALIDATE, conditional_get, make_etag
 from app.models.user import User
 from app.models.company import Company
 from app.models.intrinsic_value import IntrinsicValueTarget
@@ -29,6 +30,7 @@ from app.services.ts_score_service import TSScoreService
 from app.services.risk_level_service import RiskLevelService
 from app.services.dcf_service import DCFService
 from app.services.cache_service import cache_service
+from app.services.data_version_service import DataVersionService, company_trades_scope
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -520,6 +522,8 @@ async def get_management_score(
 
 @router.get("/{ticker}/full-report")
 async def get_full_research_report(
+    request: Request,
+    response: Response,
     ticker: str,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_pro_tier)
@@ -531,6 +535,23 @@ async def get_full_research_report(
     """
     ticker = ticker.upper()
 
+    # Scores are derived from the research tables and the company's trades
+    research_versions = await DataVersionService.get_research_versions(db, [ticker])
+    company_result = await db.execute(select(Company.id).where(Company.ticker == ticker))
+    company_id = company_result.scalar_one_or_none()
+    trades_version = None
+    if company_id is not None:
+        scope = company_trades_scope(company_id)
+        trades_version = (await DataVersionService.get_versions(db, [scope]))[scope]
+    not_modified = conditional_get(
+        request,
+        response,
+        make_etag("full-report", ticker, research_versions[ticker], trades_version),
+        cache_control=CACHE_PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
+
     try:
         # Fetch all research components
         report = {
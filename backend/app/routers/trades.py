@@ -4,9 +4,10 @@ Trade API endpoints.
 REST API routes for trade operations.
 """
 
+import json
 import logging
 from typing import List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from fastapi import (
     APIRouter,
@@ -17,14 +18,24 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
     Request,
+    Response,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.database import get_db, db_manager
-from app.services import TradeService, trade_event_manager
+from app.database import get_db, get_read_db, db_manager
+from app.services import TradeService, TradeListingService, trade_event_manager
+from app.services.trade_event_manager import Subscription
 from app.services.tier_service import TierService
+from app.services.data_version_service import TRADES_SCOPE, DataVersionService
+from app.core.http_cache import (
+    CACHE_PRIVATE_REVALIDATE,
+    CACHE_PUBLIC_SHORT,
+    conditional_get,
+    make_etag,
+)
+from app.core.serialization import render_bulk
 from app.models.user import User
 from app.core.security import get_current_active_user, decode_token
 from app.schemas.trade import (
@@ -32,10 +43,17 @@ from app.schemas.trade import (
     TradeCreate,
     TradeUpdate,
     TradeWithDetails,
+    TradeListItem,
     TradeFilter,
     TradeStats,
 )
-from app.schemas.common import PaginationParams, SortParams, PaginatedResponse
+from app.schemas.common import (
+    PaginationParams,
+    CursorParams,
+    SortParams,
+    PaginatedResponse,
+)
+from app.utils.pagination import InvalidCursorError
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +68,15 @@ async def trade_stream(websocket: WebSocket):
 
     Requires Plus tier or higher for real-time updates.
     Pass authentication token as query parameter: ?token=YOUR_TOKEN
+
+    Optional filters (query parameters, or later as a
+    {"type": "subscribe", ...} message with the same keys):
+    tickers=AAPL,MSFT, transaction_types=BUY, min_value=100000
+
+    Events carry a "seq". To resume after a disconnect, reconnect with
+    since=<last seq received>: the stream starts with {"type": "resumed"}
+    and the missed events, or {"type": "resync"} if they are no longer
+    available and the client should reload.
     """
     # Accept connection first to send error message if needed
     await websocket.accept()
@@ -89,13 +116,47 @@ async def trade_stream(websocket: WebSocket):
         async with db_manager.get_session() as db:
             await TierService.check_real_time_access(user_id, db)
 
-        # User has access, proceed with connection
-        await trade_event_manager.connect(websocket)
-        await websocket.send_json({"type": "connection_ack"})
+        try:
+            subscription = Subscription.parse(
+                websocket.query_params.get("tickers"),
+                websocket.query_params.get("transaction_types"),
+                websocket.query_params.get("min_value"),
+            )
+            since = websocket.query_params.get("since")
+            since = int(since) if since not in (None, "") else None
+        except ValueError as e:
+            await websocket.send_json({"type": "error", "message": str(e)})
+            await websocket.close()
+            return
+
+        # User has access, proceed with connection. Once connected, every
+        # send goes through the connection's queue.
+        await websocket.send_json(
+            {
+                "type": "connection_ack",
+                "subscription": subscription.to_dict(),
+                "latest_seq": await trade_event_manager.latest_seq(),
+            }
+        )
+        await trade_event_manager.connect(websocket, subscription, since=since)
 
         try:
             while True:
-                await websocket.receive_text()
+                text = await websocket.receive_text()
+                if not text.startswith("{"):
+                    continue  # heartbeat
+                try:
+                    request = json.loads(text)
+                    if not isinstance(request, dict) or request.get("type") != "subscribe":
+                        continue
+                    subscription = Subscription.parse(
+                        request.get("tickers"), request.get("transaction_types"), request.get("min_value")
+                    )
+                except ValueError as e:
+                    trade_event_manager.send(websocket, {"type": "error", "message": str(e)})
+                    continue
+                trade_event_manager.subscribe(websocket, subscription)
+                trade_event_manager.send(websocket, {"type": "subscribed", "subscription": subscription.to_dict()})
         except WebSocketDisconnect:
             await trade_event_manager.disconnect(websocket)
         except Exception:  # pragma: no cover - defensive cleanup
@@ -110,15 +171,16 @@ async def trade_stream(websocket: WebSocket):
         await websocket.close()
 
 
-@router.get("/", response_model=PaginatedResponse[TradeWithDetails])
+@router.get("/", response_model=PaginatedResponse[TradeListItem])
 @limiter.limit("60/minute")
 async def get_trades(
     request: Request,
     pagination: PaginationParams = Depends(),
+    cursor_params: CursorParams = Depends(),
     sort: SortParams = Depends(),
     filters: TradeFilter = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all trades with pagination, filtering, and sorting.
@@ -126,6 +188,8 @@ async def get_trades(
     **Query Parameters:**
     - page: Page number (default: 1)
     - limit: Items per page (default: 20, max: 100)
+    - cursor: Cursor from a previous response's next_cursor (faster deep paging)
+    - count: Total count mode - exact, cached, estimated or none (default: cached)
     - sort_by: Field to sort by (default: transaction_date)
     - order: Sort order - asc or desc (default: desc)
 
@@ -160,31 +224,44 @@ async def get_trades(
                 max_allowed_date = today - timedelta(days=max_allowed_days)
                 filters.transaction_date_from = max_allowed_date.isoformat()
 
-    trades, total = await TradeService.get_all(
-        db=db,
-        skip=pagination.skip,
-        limit=pagination.limit,
-        filters=filters,
-        sort_by=sort.sort_by,
-        order=sort.order,
-    )
-
-    return PaginatedResponse.create(
-        items=[TradeWithDetails.model_validate(trade) for trade in trades],
-        total=total,
-        page=pagination.page,
-        limit=pagination.limit,
+    try:
+        page = await TradeListingService.get_page(
+            db=db,
+            skip=pagination.skip,
+            limit=pagination.limit,
+            filters=filters,
+            sort_by=sort.sort_by,
+            order=sort.order,
+            cursor=cursor_params.cursor,
+            page=pagination.page,
+            count_mode=cursor_params.count,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Listing dicts are built from row tuples; serialize them directly
+    return render_bulk(
+        request,
+        PaginatedResponse.create(
+            items=TradeListingService.to_items(page.items),
+            total=page.total,
+            page=page.page,
+            limit=pagination.limit,
+            next_cursor=page.next_cursor,
+            total_is_estimate=page.total_is_estimate,
+        ).model_dump(),
     )
 
 
-@router.get("/recent", response_model=List[TradeWithDetails])
+@router.get("/recent", response_model=List[TradeListItem])
 @limiter.limit("60/minute")
 async def get_recent_trades(
     request: Request,
+    response: Response,
     days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of trades"),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get recent trades.
@@ -197,6 +274,7 @@ async def get_recent_trades(
     Plus: 365 days, Pro/Enterprise: unlimited)
 
     Returns trades from the last N days, sorted by filing date (newest first).
+    Send `Accept: application/msgpack` to receive MessagePack instead of JSON.
     """
     # Enforce historical data days restriction
     max_allowed_days = await TierService.check_historical_data_access(
@@ -206,16 +284,28 @@ async def get_recent_trades(
         # Cap days to tier limit
         days = max_allowed_days
 
-    trades = await TradeService.get_recent(db=db, days=days, limit=limit)
-    return [TradeWithDetails.model_validate(trade) for trade in trades]
+    # Answer repeat polls with 304 until a trade write bumps the version
+    version, updated_at = (
+        await DataVersionService.get_versions(db, [TRADES_SCOPE])
+    )[TRADES_SCOPE]
+    etag = make_etag("trades/recent", version, days, limit, date.today())
+    not_modified = conditional_get(
+        request, response, etag, updated_at, CACHE_PRIVATE_REVALIDATE
+    )
+    if not_modified:
+        return not_modified
+
+    rows = await TradeListingService.get_recent(db=db, days=days, limit=limit)
+    return render_bulk(request, TradeListingService.to_items(rows), response)
 
 
 @router.get("/stats", response_model=TradeStats)
 @limiter.limit("60/minute")
 async def get_trade_statistics(
     request: Request,
+    response: Response,
     filters: TradeFilter = Depends(),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get trade statistics.
@@ -228,17 +318,29 @@ async def get_trade_statistics(
 
     **Filters:** Same filters as /trades endpoint
     """
+    version, updated_at = (
+        await DataVersionService.get_versions(db, [TRADES_SCOPE])
+    )[TRADES_SCOPE]
+    etag = make_etag(
+        "trades/stats", version, filters.model_dump_json(exclude_none=True)
+    )
+    not_modified = conditional_get(
+        request, response, etag, updated_at, CACHE_PUBLIC_SHORT
+    )
+    if not_modified:
+        return not_modified
+
     stats = await TradeService.get_statistics(db=db, filters=filters)
     return stats
 
 
-@router.get("/significant", response_model=List[TradeWithDetails])
+@router.get("/significant", response_model=List[TradeListItem])
 @limiter.limit("60/minute")
 async def get_significant_trades(
     request: Request,
     limit: int = Query(100, ge=1, le=500, description="Maximum number of trades"),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get significant trades (high value).
@@ -249,21 +351,22 @@ async def get_significant_trades(
     - limit: Maximum trades to return (1-500, default: 100)
     """
     filters = TradeFilter(significant_only=True)
-    trades, _ = await TradeService.get_all(
+    page = await TradeListingService.get_page(
         db=db,
         skip=0,
         limit=limit,
         filters=filters,
         sort_by="filing_date",
         order="desc",
+        count_mode="none",
     )
-    return [TradeWithDetails.model_validate(trade) for trade in trades]
+    return render_bulk(request, TradeListingService.to_items(page.items))
 
 
 @router.get("/{trade_id}", response_model=TradeWithDetails)
 @limiter.limit("60/minute")
 async def get_trade(
-    request: Request, trade_id: int, db: AsyncSession = Depends(get_db)
+    request: Request, trade_id: int, db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a single trade by ID.
@@ -7,19 +7,21 @@ Endpoints for data aggregation and formatting for frontend visualizations.
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.database import get_read_db
 from app.core.security import get_current_active_user
+from app.core.http_cache import CACHE_PRIVATE_REVALIDATE, conditional_get, make_etag
 from app.models.user import User
-from app.models.trade import Trade
 from app.models.company import Company
 from app.models.intrinsic_value import IntrinsicValueTarget
 from app.models.tradesignal_score import TradeSignalScore
 from app.models.risk_level import RiskLevelAssessment
+from app.services.trade_rollup_service import TradeRollupService
+from app.services.data_version_service import DataVersionService, company_trades_scope
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +30,12 @@ router = APIRouter(prefix="/visualizations", tags=["Visualizations"])
 
 @router.get("/trades/timeline/{ticker}")
 async def get_trades_timeline(
+    request: Request,
+    response: Response,
     ticker: str,
     days_back: int = Query(90, ge=1, le=365),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Dict[str, Any]:
     """
     Get trades timeline data for visualization.
@@ -51,36 +55,22 @@ async def get_trades_timeline(
             detail=f"Company {ticker} not found"
         )
 
-    # Get trades grouped by date
-    result = await db.execute(
-        select(
-            func.date(Trade.filing_date).label("date"),
-            func.count(Trade.id).label("count"),
-            func.sum(Trade.total_value).label("total_value"),
-            func.avg(Trade.price_per_share).label("avg_price"),
-        )
-        .join(Company)
-        .where(
-            and_(
-                Company.ticker == ticker.upper(),
-                Trade.filing_date >= start_date,
-            )
-        )
-        .group_by(func.date(Trade.filing_date))
-        .order_by(func.date(Trade.filing_date))
+    scope = company_trades_scope(company.id)
+    version, updated_at = (await DataVersionService.get_versions(db, [scope]))[scope]
+    not_modified = conditional_get(
+        request,
+        response,
+        make_etag("timeline", company.id, version, days_back, start_date.date()),
+        updated_at,
+        CACHE_PRIVATE_REVALIDATE,
     )
-    timeline_data = result.fetchall()
+    if not_modified:
+        return not_modified
 
-    # Format for frontend
-    timeline = [
-        {
-            "date": row.date.isoformat(),
-            "count": row.count,
-            "total_value": float(row.total_value or 0),
-            "avg_price": float(row.avg_price or 0),
-        }
-        for row in timeline_data
-    ]
+    # Daily aggregates come from the rollup, so cost scales with days in range
+    timeline = await TradeRollupService.get_daily_timeline(
+        db, company.id, start_date.date()
+    )
 
     return {
         "ticker": ticker.upper(),
@@ -96,16 +86,32 @@ async def get_trades_timeline(
 
 @router.get("/ivt/history/{ticker}")
 async def get_ivt_history(
+    request: Request,
+    response: Response,
     ticker: str,
     limit: int = Query(30, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Dict[str, Any]:
     """
     Get IVT calculation history for a ticker.
 
     Returns historical IVT values for price vs. IVT chart.
     """
+    ticker = ticker.upper()
+    versions = await DataVersionService.get_research_versions(db, [ticker])
+    latest_ivt_at = versions[ticker][0]
+    if latest_ivt_at is not None:
+        not_modified = conditional_get(
+            request,
+            response,
+            make_etag("ivt-history", ticker, latest_ivt_at.isoformat(), limit),
+            latest_ivt_at,
+            CACHE_PRIVATE_REVALIDATE,
+        )
+        if not_modified:
+            return not_modified
+
     result = await db.execute(
         select(IntrinsicValueTarget)
         .where(IntrinsicValueTarget.ticker == ticker.upper())
@@ -147,9 +153,11 @@ async def get_ivt_history(
 
 @router.get("/scores/comparison")
 async def get_scores_comparison(
+    request: Request,
+    response: Response,
     tickers: str = Query(..., description="Comma-separated list of tickers"),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Dict[str, Any]:
     """
     Get scores comparison for multiple tickers.
@@ -164,6 +172,18 @@ async def get_scores_comparison(
             detail="Maximum 10 tickers allowed for comparison"
         )
 
+    versions = await DataVersionService.get_research_versions(db, ticker_list)
+    stamps = [stamp for ticker in ticker_list for stamp in versions[ticker] if stamp]
+    not_modified = conditional_get(
+        request,
+        response,
+        make_etag("scores-comparison", *[(ticker, versions[ticker]) for ticker in ticker_list]),
+        max(stamps) if stamps else None,
+        CACHE_PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
+
     comparison_data = []
 
     for ticker in ticker_list:
@@ -219,10 +239,12 @@ async def get_scores_comparison(
 
 @router.get("/portfolio/performance/{portfolio_id}")
 async def get_portfolio_performance(
+    request: Request,
+    response: Response,
     portfolio_id: int,
     days_back: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Dict[str, Any]:
     """
     Get portfolio performance data for visualization.
@@ -250,6 +272,29 @@ async def get_portfolio_performance(
             detail="Portfolio not found"
         )
 
+    # Snapshots are append-only; the in-range count and newest id identify the set
+    result = await db.execute(
+        select(func.count(PortfolioPerformance.id), func.max(PortfolioPerformance.id))
+        .where(
+            and_(
+                PortfolioPerformance.portfolio_id == portfolio_id,
+                PortfolioPerformance.snapshot_date >= start_date,
+            )
+        )
+    )
+    snapshot_count, latest_snapshot_id = result.one()
+    not_modified = conditional_get(
+        request,
+        response,
+        make_etag(
+            "portfolio-performance", portfolio_id, portfolio.name,
+            snapshot_count, latest_snapshot_id, days_back,
+        ),
+        cache_control=CACHE_PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
+
     # Get performance snapshots
     result = await db.execute(
         select(PortfolioPerformance)
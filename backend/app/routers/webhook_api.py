@@ -6,7 +6,7 @@ Endpoints for managing webhook endpoints and viewing delivery history.
 
 import logging
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -107,6 +107,27 @@ async def get_webhook_deliveries(
     ]
 
 
+@router.get("/{webhook_id}/stats")
+async def get_webhook_stats(
+    webhook_id: int,
+    hours: int = Query(24, ge=1, le=720),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, Any]:
+    """Get delivery success rate and latency for a webhook."""
+    webhook_service = WebhookService(db)
+
+    # Verify webhook belongs to user
+    webhooks = await webhook_service.get_user_webhooks(current_user.id)
+    if not any(w.id == webhook_id for w in webhooks):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook not found",
+        )
+
+    return await webhook_service.get_endpoint_stats(webhook_id, hours=hours)
+
+
 @router.post("/{webhook_id}/test")
 async def test_webhook(
     webhook_id: int,
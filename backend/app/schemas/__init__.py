@@ -26,6 +26,7 @@ from app.schemas.trade import (
     TradeUpdate,
     TradeRead,
     TradeWithDetails,
+    TradeListItem,
     TradeFilter,
     TradeStats,
 )
@@ -47,6 +48,7 @@ from app.schemas.congressional_trade import (
 )
 from app.schemas.common import (
     PaginationParams,
+    CursorParams,
     SortParams,
     PaginatedResponse,
     SuccessResponse,
@@ -86,6 +88,7 @@ __all__ = [
     "TradeUpdate",
     "TradeRead",
     "TradeWithDetails",
+    "TradeListItem",
     "TradeFilter",
     "TradeStats",
     # Congressperson schemas
@@ -104,6 +107,7 @@ __all__ = [
     "CongressionalTradeStats",
     # Common schemas
     "PaginationParams",
+    "CursorParams",
     "SortParams",
     "PaginatedResponse",
     "SuccessResponse",
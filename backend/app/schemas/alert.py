@@ -5,8 +5,8 @@ Request/response validation for alert management.
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
-from datetime import datetime
+from typing import Any, Optional
+from datetime import date, datetime
 
 
 class AlertBase(BaseModel):
@@ -173,3 +173,60 @@ class AlertStatsResponse(BaseModel):
     total_notifications_sent: int
     notifications_last_24h: int
     failed_notifications_last_24h: int
+
+
+class AlertPreviewRequest(BaseModel):
+    """Draft alert to backtest: simple filters, or an advanced rule query."""
+
+    ticker: Optional[str] = Field(None, max_length=10, description="Filter by ticker")
+    min_value: Optional[float] = Field(None, ge=0, description="Minimum trade value USD")
+    max_value: Optional[float] = Field(None, ge=0, description="Maximum trade value USD")
+    transaction_type: Optional[str] = Field(None, description="BUY or SELL")
+    insider_roles: list[str] = Field(default_factory=list, description="Insider role filters")
+    query_structure: Optional[dict[str, Any]] = Field(
+        None, description="Advanced rule query (AND/OR/NOT); overrides the simple filters"
+    )
+    years: int = Field(1, ge=1, le=10, description="Look-back window in years")
+    sample_size: int = Field(10, ge=0, le=100, description="Most recent matches to return")
+
+    @field_validator("transaction_type")
+    @classmethod
+    def validate_transaction_type(cls, v: Optional[str]) -> Optional[str]:
+        """Validate transaction type if provided."""
+        if v is not None and v not in ["BUY", "SELL"]:
+            raise ValueError("transaction_type must be BUY or SELL")
+        return v
+
+
+class AlertPreviewMonth(BaseModel):
+    """Matches in one calendar month (YYYY-MM)."""
+
+    month: str
+    matches: int
+
+
+class AlertPreviewSample(BaseModel):
+    """A past trade the draft alert would have fired on."""
+
+    trade_id: int
+    ticker: Optional[str] = None
+    company_name: Optional[str] = None
+    insider_name: Optional[str] = None
+    insider_role: Optional[str] = None
+    transaction_type: Optional[str] = None
+    total_value: float
+    filing_date: date
+    matched_conditions: Optional[list[Any]] = None
+
+
+class AlertPreviewResponse(BaseModel):
+    """Backtest result for a draft alert."""
+
+    from_date: date
+    to_date: date
+    trades_scanned: int
+    total_matches: int
+    months: list[AlertPreviewMonth]
+    samples: list[AlertPreviewSample]
+    snapshot_age_seconds: float
+    elapsed_ms: float
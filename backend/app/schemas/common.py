@@ -22,6 +22,22 @@ class PaginationParams(BaseModel):
         return (self.page - 1) * self.limit
 
 
+class CursorParams(BaseModel):
+    """Schema for keyset (cursor) pagination parameters."""
+
+    cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor from a previous response's next_cursor. "
+        "When set, page is ignored and the next page is fetched by keyset.",
+    )
+    count: str = Field(
+        "cached",
+        pattern="^(exact|cached|estimated|none)$",
+        description="How to compute total: exact, cached (exact, reused briefly), "
+        "estimated (query planner estimate) or none",
+    )
+
+
 class SortParams(BaseModel):
     """Schema for sorting parameters."""
 
@@ -35,38 +51,63 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """Generic schema for paginated API responses."""
 
     items: List[T] = Field(default_factory=list, description="List of items")
-    total: int = Field(0, ge=0, description="Total number of items")
+    total: Optional[int] = Field(
+        0, ge=0, description="Total number of items (null when not counted)"
+    )
+    total_is_estimate: bool = Field(
+        False, description="Whether total is a query planner estimate"
+    )
     page: int = Field(1, ge=1, description="Current page")
     limit: int = Field(20, ge=1, description="Items per page")
-    pages: int = Field(1, ge=1, description="Total number of pages")
+    pages: Optional[int] = Field(
+        1, ge=1, description="Total number of pages (null when not counted)"
+    )
     has_next: bool = Field(False, description="Has next page")
     has_prev: bool = Field(False, description="Has previous page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page (keyset pagination)"
+    )
 
     @classmethod
     def create(
-        cls, items: List[T], total: int, page: int, limit: int
+        cls,
+        items: List[T],
+        total: Optional[int],
+        page: int,
+        limit: int,
+        next_cursor: Optional[str] = None,
+        total_is_estimate: bool = False,
     ) -> "PaginatedResponse[T]":
         """
         Create a paginated response.
 
         Args:
             items: List of items for current page
-            total: Total number of items
+            total: Total number of items (None if not counted)
             page: Current page number
             limit: Items per page
+            next_cursor: Cursor for the next page, if keyset paginated
+            total_is_estimate: Whether total is an estimate
 
         Returns:
             PaginatedResponse instance
         """
-        pages = (total + limit - 1) // limit if total > 0 else 1
+        if total is None:
+            pages = None
+            has_next = next_cursor is not None
+        else:
+            pages = (total + limit - 1) // limit if total > 0 else 1
+            has_next = next_cursor is not None or page < pages
         return cls(
             items=items,
             total=total,
+            total_is_estimate=total_is_estimate,
             page=page,
             limit=limit,
             pages=pages,
-            has_next=page < pages,
+            has_next=has_next,
             has_prev=page > 1,
+            next_cursor=next_cursor,
         )
 
 
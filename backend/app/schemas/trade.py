@@ -7,7 +7,7 @@ Handles request/response validation and serialization.
 from __future__ import annotations
 
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 from pydantic import BaseModel, Field, field_validator
 
@@ -137,6 +137,40 @@ class TradeWithDetails(TradeRead):
     profit_loss: float | None = Field(None, description="Profit/loss amount")
 
 
+class TradeCompanySummary(BaseModel):
+    """Company fields carried inline in trade listings."""
+
+    id: int = Field(..., description="Company ID")
+    ticker: str | None = Field(None, description="Stock ticker symbol")
+    name: str | None = Field(None, description="Company name")
+
+
+class TradeInsiderSummary(BaseModel):
+    """Insider fields carried inline in trade listings."""
+
+    id: int = Field(..., description="Insider ID")
+    name: str | None = Field(None, description="Insider's full name")
+    title: str | None = Field(None, description="Job title")
+    is_director: bool = Field(False, description="Is board director")
+    is_officer: bool = Field(False, description="Is corporate officer")
+    is_ten_percent_owner: bool = Field(False, description="Owns 10%+ of company stock")
+    is_other: bool = Field(False, description="Other relationship")
+    primary_role: str = Field("Unknown", description="Primary role")
+    roles: List[str] = Field(default_factory=list, description="All roles")
+
+
+class TradeListItem(TradeRead):
+    """Trade listing row, built from the trade_listings read model."""
+
+    company: TradeCompanySummary | None = Field(None, description="Company summary")
+    insider: TradeInsiderSummary | None = Field(None, description="Insider summary")
+    current_stock_price: float | None = Field(None, description="Current stock price")
+    price_change_percent: float | None = Field(
+        None, description="Price change since trade"
+    )
+    profit_loss: float | None = Field(None, description="Profit/loss amount")
+
+
 class TradeFilter(BaseModel):
     """Schema for trade filtering parameters."""
 
@@ -7,11 +7,17 @@ Import all services here for easy access.
 from app.services.company_service import CompanyService
 from app.services.insider_service import InsiderService
 from app.services.trade_service import TradeService
+from app.services.trade_listing_service import TradeListingService
+from app.services.search_service import SearchService
+from app.services.company_snapshot_service import CompanySnapshotService
 from app.services.trade_event_manager import trade_event_manager
 
 __all__ = [
     "CompanyService",
     "InsiderService",
     "TradeService",
+    "TradeListingService",
+    "SearchService",
+    "CompanySnapshotService",
     "trade_event_manager",
 ]
@@ -2,17 +2,19 @@
 Advanced Alert Service.
 
 Handles:
-- Complex query evaluation (AND/OR/NOT)
+- Complex query evaluation (AND/OR/NOT), via compiled rule predicates
 - Visual query builder support
 - Smart grouping
 - ML recommendations
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence
 from datetime import datetime, timedelta
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy.orm import selectinload
 
 from app.models.advanced_alert import (
     AdvancedAlertRule,
@@ -23,6 +25,7 @@ from app.models.advanced_alert import (
 from app.models.trade import Trade
 from app.models.company import Company
 from app.models.insider import Insider
+from app.services.alert_rule_compiler import compile_rule, trade_fields, trade_frame
 
 logger = logging.getLogger(__name__)
 
@@ -75,173 +78,140 @@ class AdvancedAlertService:
         if not rule or not rule.is_active:
             return False
 
-        # Evaluate query structure
-        matches = self._evaluate_query_structure(
-            rule.query_structure, trade, company, insider
-        )
-
-        if matches:
-            # Create trigger record
-            trigger = AlertTrigger(
-                rule_id=rule_id,
-                trade_id=trade.id,
-                matched_conditions=self._extract_matched_conditions(
-                    rule.query_structure, trade, company, insider
-                ),
-            )
+        # Evaluate the compiled query structure; matched conditions come from the same pass
+        compiled = compile_rule(rule.id, rule.query_structure)
+        matches, matched_conditions = compiled.evaluate(trade_fields(trade, company, insider))
+        if not matches:
+            return False
 
-            # ML confidence if enabled
-            if rule.use_ml_recommendations:
-                trigger.ml_confidence = await self._calculate_ml_confidence(
-                    rule, trade, company, insider
-                )
-                if (
-                    rule.ml_confidence_threshold
-                    and trigger.ml_confidence < rule.ml_confidence_threshold
-                ):
-                    return False  # Below confidence threshold
-
-            # Handle grouping
-            if rule.group_alerts:
-                group = await self._get_or_create_alert_group(rule_id, trade, company)
-                trigger.group_id = group.id
-                group.trade_count += 1
-            else:
-                # Send immediately
-                trigger.notification_sent = True
-                trigger.notification_sent_at = datetime.utcnow()
-
-            self.db.add(trigger)
-
-            # Update rule stats
-            rule.trigger_count += 1
-            rule.last_triggered_at = datetime.utcnow()
+        if not await self._record_trigger(rule, trade, company, insider, matched_conditions):
+            return False  # Below confidence threshold
+        await self.db.commit()
+        return True
 
-            await self.db.commit()
+    async def evaluate_rules_for_trades(self, trades: Sequence[Trade]) -> List[Dict[str, Any]]:
+        """
+        Evaluate all active rules against a batch of trades in one pass.
 
-        return matches
+        Trades are loaded once into a frame, and each compiled rule is
+        evaluated as column masks over the whole batch. Triggers are recorded
+        as in evaluate_alert_rule and committed once.
 
-    def _evaluate_query_structure(
-        self, query: Dict[str, Any], trade: Trade, company: Company, insider: Insider
-    ) -> bool:
-        """
-        Evaluate query structure recursively.
+        Args:
+            trades: Trades to evaluate (already flushed)
 
-        Supports AND, OR, NOT operators and nested conditions.
+        Returns:
+            One entry per trigger: rule_id, trade_id and matched_conditions
         """
-        operator = query.get("operator", "AND")
+        trade_ids = sorted({trade.id for trade in trades if trade.id is not None})
+        if not trade_ids:
+            return []
 
-        if operator == "NOT":
-            condition = query.get("condition", {})
-            return not self._evaluate_condition(condition, trade, company, insider)
+        result = await self.db.execute(
+            select(AdvancedAlertRule)
+            .where(AdvancedAlertRule.is_active.is_(True))
+            .order_by(AdvancedAlertRule.id)
+        )
+        rules = list(result.scalars().all())
+        if not rules:
+            return []
 
-        conditions = query.get("conditions", [])
+        result = await self.db.execute(
+            select(Trade)
+            .options(selectinload(Trade.company), selectinload(Trade.insider))
+            .where(Trade.id.in_(trade_ids))
+            .order_by(Trade.id)
+        )
+        rows = [
+            (trade, trade.company, trade.insider)
+            for trade in result.scalars().all()
+            if trade.company and trade.insider
+        ]
+        if not rows:
+            return []
+        frame = trade_frame(rows)
+
+        triggered = []
+        for rule in rules:
+            compiled = compile_rule(rule.id, rule.query_structure)
+            hits, masks = compiled.evaluate_frame(frame)
+            for position in np.flatnonzero(hits):
+                trade, company, insider = rows[position]
+                matched_conditions = compiled.matched_at(masks, position)
+                if await self._record_trigger(rule, trade, company, insider, matched_conditions):
+                    triggered.append(
+                        {
+                            "rule_id": rule.id,
+                            "trade_id": trade.id,
+                            "matched_conditions": matched_conditions,
+                        }
+                    )
+
+        if triggered:
+            await self.db.commit()
+        logger.info(
+            f"Evaluated {len(rules)} advanced alert rules against {len(rows)} trades: "
+            f"{len(triggered)} triggered"
+        )
+        return triggered
 
-        if operator == "AND":
-            return all(
-                self._evaluate_condition_or_group(c, trade, company, insider)
-                for c in conditions
-            )
-        elif operator == "OR":
-            return any(
-                self._evaluate_condition_or_group(c, trade, company, insider)
-                for c in conditions
-            )
+    async def _record_trigger(
+        self,
+        rule: AdvancedAlertRule,
+        trade: Trade,
+        company: Company,
+        insider: Insider,
+        matched_conditions: List[Dict[str, Any]],
+    ) -> bool:
+        """
+        Add a trigger for a matched trade (not committed).
 
-        return False
+        Returns False if ML confidence is below the rule's threshold.
+        """
+        # Create trigger record
+        trigger = AlertTrigger(
+            rule_id=rule.id,
+            trade_id=trade.id,
+            matched_conditions=matched_conditions,
+        )
 
-    def _evaluate_condition_or_group(
-        self, condition: Dict[str, Any], trade: Trade, company: Company, insider: Insider
-    ) -> bool:
-        """Evaluate a condition or nested group."""
-        if "operator" in condition:
-            # Nested group
-            return self._evaluate_query_structure(condition, trade, company, insider)
+        # ML confidence if enabled
+        if rule.use_ml_recommendations:
+            trigger.ml_confidence = await self._calculate_ml_confidence(
+                rule, trade, company, insider
+            )
+            if (
+                rule.ml_confidence_threshold
+                and trigger.ml_confidence < rule.ml_confidence_threshold
+            ):
+                return False  # Below confidence threshold
+
+        # Handle grouping
+        if rule.group_alerts:
+            group = await self._get_or_create_alert_group(rule, trade, company)
+            trigger.group_id = group.id
+            group.trade_count += 1
         else:
-            # Simple condition
-            return self._evaluate_condition(condition, trade, company, insider)
+            # Send immediately
+            trigger.notification_sent = True
+            trigger.notification_sent_at = datetime.utcnow()
 
-    def _evaluate_condition(
-        self, condition: Dict[str, Any], trade: Trade, company: Company, insider: Insider
-    ) -> bool:
-        """Evaluate a single condition."""
-        field = condition.get("field")
-        operator = condition.get("operator")
-        value = condition.get("value")
-
-        # Get field value
-        field_value = self._get_field_value(field, trade, company, insider)
-
-        # Apply operator
-        if operator == "equals":
-            return field_value == value
-        elif operator == "not_equals":
-            return field_value != value
-        elif operator == "greater_than":
-            return field_value > value
-        elif operator == "less_than":
-            return field_value < value
-        elif operator == "greater_than_or_equal":
-            return field_value >= value
-        elif operator == "less_than_or_equal":
-            return field_value <= value
-        elif operator == "contains":
-            return value in str(field_value).lower()
-        elif operator == "in":
-            return field_value in value if isinstance(value, list) else False
-        elif operator == "not_in":
-            return field_value not in value if isinstance(value, list) else True
-
-        return False
-
-    def _get_field_value(
-        self, field: str, trade: Trade, company: Company, insider: Insider
-    ) -> Any:
-        """Get field value from trade, company, or insider."""
-        field_map = {
-            "ticker": company.ticker,
-            "company_name": company.name,
-            "trade_value": float(trade.total_value) if trade.total_value else 0.0,
-            "shares": float(trade.shares) if trade.shares else 0.0,
-            "transaction_type": trade.transaction_type,
-            "insider_name": insider.name,
-            "insider_role": insider.title or insider.relationship,
-            "filing_date": trade.filing_date,
-        }
-
-        return field_map.get(field, None)
-
-    def _extract_matched_conditions(
-        self, query: Dict[str, Any], trade: Trade, company: Company, insider: Insider
-    ) -> List[Dict[str, Any]]:
-        """Extract which conditions matched."""
-        matched = []
-
-        conditions = query.get("conditions", [])
-        for condition in conditions:
-            if "operator" in condition:
-                # Nested group
-                nested_matched = self._extract_matched_conditions(
-                    condition, trade, company, insider
-                )
-                if nested_matched:
-                    matched.extend(nested_matched)
-            else:
-                # Simple condition
-                if self._evaluate_condition(condition, trade, company, insider):
-                    matched.append(condition)
-
-        return matched
+        self.db.add(trigger)
+
+        # Update rule stats
+        rule.trigger_count += 1
+        rule.last_triggered_at = datetime.utcnow()
+        return True
 
     async def _get_or_create_alert_group(
-        self, rule_id: int, trade: Trade, company: Company
+        self, rule: AdvancedAlertRule, trade: Trade, company: Company
     ) -> AlertGroup:
         """Get or create an alert group for smart grouping."""
         # Generate group key (e.g., "AAPL-2024-01-15")
-        group_key = f"{company.ticker}-{trade.filing_date.date()}"
+        group_key = f"{company.ticker}-{trade.filing_date.isoformat()}"
+        rule_id = rule.id
 
         # Check for existing group within window
-        rule = await self.db.get(AdvancedAlertRule, rule_id)
         window_start = datetime.utcnow() - timedelta(minutes=rule.group_window_minutes)
 
         result = await self.db.execute(
@@ -0,0 +1,319 @@
+"""
+Alert backtest service.
+
+Previews how often a draft alert would have fired, without creating it. Trades
+are evaluated in bulk over a columnar snapshot of the trades table (one
+pandas frame: categorical ticker, type, names and roles, float values, filing
+dates) instead of row by row through the ORM:
+- Simple alerts (ticker, type, value range, insider roles) become NumPy masks;
+  role filters are checked once per distinct role set, not once per trade.
+- Advanced rules are compiled with the alert rule compiler and evaluated as
+  column masks over the same frame.
+
+The snapshot is sorted by filing date so a look-back window is a slice. It is
+shared by every preview and rebuilt when the trades data version has changed
+and the snapshot is older than SNAPSHOT_REFRESH_SECONDS (or, regardless, after
+SNAPSHOT_MAX_AGE_SECONDS), or when a preview needs a longer window.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade import Trade
+from app.services.alert_matching_service import AlertRule
+from app.services.alert_rule_compiler import CompiledRule
+from app.services.data_version_service import TRADES_SCOPE, DataVersionService
+
+logger = logging.getLogger(__name__)
+
+MAX_YEARS = 10
+SNAPSHOT_REFRESH_SECONDS = 300
+SNAPSHOT_MAX_AGE_SECONDS = 3600
+
+_CATEGORY_COLUMNS = (
+    "ticker",
+    "company_name",
+    "transaction_type",
+    "insider_name",
+    "insider_role",
+    "insider_roles",
+)
+
+
+def _role_key(
+    is_officer: bool, is_director: bool, is_ten_percent_owner: bool, is_other: bool, title: Optional[str]
+) -> str:
+    """Casefolded insider roles (roles_list plus title) joined with "|", as alert matching sees them."""
+    roles = []
+    if is_officer:
+        roles.append("officer")
+    if is_director:
+        roles.append("director")
+    if is_ten_percent_owner:
+        roles.append("10% owner")
+    if is_other:
+        roles.append("other")
+    if title:
+        roles.append(title.casefold())
+    return "|".join(roles)
+
+
+@dataclass
+class TradeSnapshot:
+    """Columnar copy of recent trades, sorted by filing date."""
+
+    frame: pd.DataFrame
+    dates: np.ndarray  # filing_date as datetime64[D]
+    since: date
+    version: int
+    built_at: float
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    def window(self, since: date) -> pd.DataFrame:
+        start = int(np.searchsorted(self.dates, np.datetime64(since, "D"), side="left"))
+        return self.frame.iloc[start:]
+
+
+_snapshot: Optional[TradeSnapshot] = None
+_snapshot_lock = asyncio.Lock()
+
+
+def _years_ago(today: date, years: int) -> date:
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # Feb 29
+        return today.replace(year=today.year - years, day=28)
+
+
+def _role_mask(frame: pd.DataFrame, roles: Iterable[str]) -> np.ndarray:
+    column = frame["insider_roles"]
+    wanted = frozenset(roles)
+    per_key = [bool(wanted & frozenset(key.split("|"))) if key else False for key in column.cat.categories]
+    lookup = np.append(np.asarray(per_key, dtype=bool), False)
+    return lookup[column.cat.codes.to_numpy()]
+
+
+def alert_mask(frame: pd.DataFrame, rule: AlertRule) -> np.ndarray:
+    """Vectorized AlertRule.matches over a snapshot frame."""
+    mask = np.ones(len(frame), dtype=bool)
+    if rule.ticker:
+        mask &= (frame["ticker"] == rule.ticker).to_numpy(dtype=bool)
+    if rule.transaction_type:
+        mask &= (frame["transaction_type"] == rule.transaction_type).to_numpy(dtype=bool)
+    values = frame["trade_value"].to_numpy()
+    mask &= (values >= rule.min_value) & (values <= rule.max_value)
+    if rule.insider_roles:
+        mask &= _role_mask(frame, rule.insider_roles)
+    return mask
+
+
+class AlertBacktestService:
+    """Service for previewing draft alerts against stored trades."""
+
+    @staticmethod
+    async def get_snapshot(db: AsyncSession, since: date) -> TradeSnapshot:
+        """Get the shared trade snapshot covering filings since a date, rebuilding if needed."""
+        global _snapshot
+        version = (await DataVersionService.get_versions(db, [TRADES_SCOPE]))[TRADES_SCOPE][0]
+
+        def usable(snapshot: Optional[TradeSnapshot]) -> bool:
+            if snapshot is None or snapshot.since > since or snapshot.age > SNAPSHOT_MAX_AGE_SECONDS:
+                return False
+            return snapshot.version == version or snapshot.age < SNAPSHOT_REFRESH_SECONDS
+
+        if usable(_snapshot):
+            return _snapshot
+        async with _snapshot_lock:
+            if usable(_snapshot):
+                return _snapshot
+            # Keep covering a longer window an earlier preview asked for
+            if _snapshot is not None and _snapshot.since < since:
+                since = _snapshot.since
+            _snapshot = await AlertBacktestService._build_snapshot(db, since, version)
+            return _snapshot
+
+    @staticmethod
+    async def _build_snapshot(db: AsyncSession, since: date, version: int) -> TradeSnapshot:
+        start = time.perf_counter()
+        result = await db.execute(
+            select(
+                Trade.id,
+                Company.ticker,
+                Company.name,
+                Trade.total_value,
+                Trade.shares,
+                Trade.transaction_type,
+                Insider.name,
+                Insider.title,
+                Insider.relationship,
+                Insider.is_officer,
+                Insider.is_director,
+                Insider.is_ten_percent_owner,
+                Insider.is_other,
+                Trade.filing_date,
+            )
+            .join(Company, Trade.company_id == Company.id)
+            .join(Insider, Trade.insider_id == Insider.id)
+            .where(Trade.filing_date >= since)
+            .order_by(Trade.filing_date, Trade.id)
+        )
+        rows = result.all()
+
+        role_keys: Dict[Tuple, str] = {}
+        columns: Dict[str, List[Any]] = {
+            "trade_id": [],
+            "ticker": [],
+            "company_name": [],
+            "trade_value": [],
+            "shares": [],
+            "transaction_type": [],
+            "insider_name": [],
+            "insider_role": [],
+            "insider_roles": [],
+            "filing_date": [],
+        }
+        for (
+            trade_id, ticker, company_name, total_value, shares, transaction_type, insider_name,
+            title, relationship, is_officer, is_director, is_ten_percent_owner, is_other, filing_date,
+        ) in rows:
+            flags = (is_officer, is_director, is_ten_percent_owner, is_other, title)
+            key = role_keys.get(flags)
+            if key is None:
+                key = role_keys[flags] = _role_key(*flags)
+            columns["trade_id"].append(trade_id)
+            columns["ticker"].append(ticker.upper() if ticker else ticker)
+            columns["company_name"].append(company_name)
+            columns["trade_value"].append(float(total_value) if total_value else 0.0)
+            columns["shares"].append(float(shares) if shares else 0.0)
+            columns["transaction_type"].append(transaction_type)
+            columns["insider_name"].append(insider_name)
+            columns["insider_role"].append(title or relationship)
+            columns["insider_roles"].append(key)
+            columns["filing_date"].append(filing_date)
+
+        frame = pd.DataFrame(columns)
+        frame["trade_id"] = frame["trade_id"].astype("int64")
+        frame["trade_value"] = frame["trade_value"].astype("float64")
+        frame["shares"] = frame["shares"].astype("float64")
+        for name in _CATEGORY_COLUMNS:
+            frame[name] = frame[name].astype("category")
+        frame["filing_date"] = pd.to_datetime(frame["filing_date"])
+        dates = frame["filing_date"].to_numpy().astype("datetime64[D]")
+
+        logger.info(
+            f"Built alert backtest snapshot: {len(frame)} trades since {since} "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        return TradeSnapshot(frame, dates, since, version, time.time())
+
+    @staticmethod
+    async def preview(
+        db: AsyncSession,
+        years: int = 1,
+        sample_size: int = 10,
+        ticker: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        insider_roles: Optional[List[str]] = None,
+        query_structure: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Count how often a draft alert would have fired over past trades.
+
+        Pass query_structure for an advanced rule; otherwise the simple alert
+        filters are used, with the same semantics as live alert matching.
+
+        Args:
+            db: Database session
+            years: Look-back window in years (1-10)
+            sample_size: Most recent matches to return
+            ticker, transaction_type, min_value, max_value, insider_roles:
+                Simple alert filters
+            query_structure: Advanced rule query (AND/OR/NOT tree)
+
+        Returns:
+            Dict with trades_scanned, total_matches, per-month counts (every
+            month of the window, oldest first) and sample matches
+        """
+        started = time.perf_counter()
+        years = max(1, min(years, MAX_YEARS))
+        today = date.today()
+        since = _years_ago(today, years)
+
+        snapshot = await AlertBacktestService.get_snapshot(db, since)
+        frame = snapshot.window(since)
+
+        compiled = None
+        masks: List[np.ndarray] = []
+        if query_structure is not None:
+            compiled = CompiledRule(0, query_structure)
+            hits, masks = compiled.evaluate_frame(frame)
+        else:
+            rule = AlertRule.from_values(0, ticker, transaction_type, min_value, max_value, insider_roles)
+            hits = alert_mask(frame, rule)
+
+        positions = np.flatnonzero(hits)
+
+        # Hits per calendar month, including months without any
+        first_month = np.datetime64(since, "M")
+        month_index = (
+            frame["filing_date"].to_numpy()[positions].astype("datetime64[M]") - first_month
+        ).astype(np.int64)
+        month_count = int((np.datetime64(today, "M") - first_month).astype(np.int64)) + 1
+        counts = np.bincount(month_index[month_index < month_count], minlength=month_count)
+        months = [
+            {"month": str(first_month + offset), "matches": int(count)}
+            for offset, count in enumerate(counts)
+        ]
+
+        samples = []
+        for position in positions[::-1][:sample_size]:
+            row = frame.iloc[position]
+            samples.append(
+                {
+                    "trade_id": int(row["trade_id"]),
+                    "ticker": row["ticker"],
+                    "company_name": row["company_name"],
+                    "insider_name": row["insider_name"],
+                    "insider_role": None if pd.isna(row["insider_role"]) else row["insider_role"],
+                    "transaction_type": row["transaction_type"],
+                    "total_value": float(row["trade_value"]),
+                    "filing_date": row["filing_date"].date(),
+                    "matched_conditions": compiled.matched_at(masks, position) if compiled else None,
+                }
+            )
+
+        return {
+            "from_date": since,
+            "to_date": today,
+            "trades_scanned": len(frame),
+            "total_matches": int(len(positions)),
+            "months": months,
+            "samples": samples,
+            "snapshot_age_seconds": round(snapshot.age, 1),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the snapshot so the next preview rebuilds it."""
+        global _snapshot
+        _snapshot = None
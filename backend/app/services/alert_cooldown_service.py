@@ -0,0 +1,178 @@
+"""
+Alert cooldown store.
+
+An alert notifies at most once per trade within ALERT_COOLDOWN_MINUTES. The
+check runs for every match, so it is kept out of the database:
+- The in-process store is a TTL set; keys are kept in expiry order, so
+  expired keys are dropped from the front in O(1) each.
+- The Redis store claims each key with SET NX EX, so every worker shares one
+  cooldown. If Redis errors, the in-process store is used until it recovers.
+
+claim() checks and sets in one step: it marks and returns only the keys
+that were free, so two workers (or two overlapping batches) never both
+dispatch the same (alert, trade). alert_history remains the append-only
+delivery log written by the notification dispatcher.
+
+ALERT_COOLDOWN_BACKEND selects memory, redis, or auto (Redis when REDIS_URL
+is set and the redis package is installed).
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Sequence, Set, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+KEY_PREFIX = "alert_cooldown"
+
+
+def cooldown_key(alert_id: int, trade_id: int) -> str:
+    return f"{KEY_PREFIX}:{alert_id}:{trade_id}"
+
+
+class MemoryCooldownStore:
+    """In-process TTL set."""
+
+    def __init__(self):
+        # key -> expiry (monotonic); insertion order is expiry order
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        self._purge(time.monotonic())
+        return len(self._expiry)
+
+    def _purge(self, now: float) -> None:
+        while self._expiry:
+            key = next(iter(self._expiry))
+            if self._expiry[key] > now:
+                break
+            self._expiry.popitem(last=False)
+
+    async def claim(self, keys: Sequence[str], ttl: int) -> Set[str]:
+        # No awaits: the check-and-set is atomic within the event loop
+        now = time.monotonic()
+        self._purge(now)
+        claimed = set()
+        for key in keys:
+            if key in self._expiry:
+                continue
+            self._expiry[key] = now + ttl
+            claimed.add(key)
+        return claimed
+
+    async def release(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._expiry.pop(key, None)
+
+
+class RedisCooldownStore:
+    """Cooldown shared across workers through Redis SET NX EX."""
+
+    def __init__(self, url: str, fallback: MemoryCooldownStore):
+        self._url = url
+        self._client = None
+        self._fallback = fallback
+
+    async def _redis(self):
+        if self._client is None:
+            self._client = aioredis.from_url(self._url)
+        return self._client
+
+    async def claim(self, keys: Sequence[str], ttl: int) -> Set[str]:
+        try:
+            client = await self._redis()
+            async with client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(key, 1, nx=True, ex=ttl)
+                results = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis cooldown store unavailable, using in-process store: {e}")
+            return await self._fallback.claim(keys, ttl)
+        return {key for key, was_set in zip(keys, results) if was_set}
+
+    async def release(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        await self._fallback.release(keys)
+        if not keys:
+            return
+        try:
+            client = await self._redis()
+            await client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Failed to release alert cooldowns in Redis: {e}")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            try:
+                await self._client.close()
+            finally:
+                self._client = None
+
+
+_store = None
+
+
+def get_store():
+    """The configured cooldown store (created on first use)."""
+    global _store
+    if _store is None:
+        backend = settings.alert_cooldown_backend.lower()
+        use_redis = backend == "redis" or (backend == "auto" and bool(settings.redis_url))
+        if use_redis and REDIS_AVAILABLE and settings.redis_url:
+            _store = RedisCooldownStore(settings.redis_url, MemoryCooldownStore())
+            logger.info("Alert cooldowns stored in Redis")
+        else:
+            if use_redis:
+                logger.warning("Redis cooldown store requested but unavailable, using in-process store")
+            _store = MemoryCooldownStore()
+    return _store
+
+
+class AlertCooldownService:
+    """Claims (alert, trade) pairs for notification."""
+
+    @staticmethod
+    async def claim(pairs: Sequence[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """
+        Claim pairs that are not cooling down.
+
+        Args:
+            pairs: (alert_id, trade_id) pairs about to be notified
+
+        Returns:
+            The pairs claimed; the rest were notified within the cooldown
+        """
+        ttl = settings.alert_cooldown_minutes * 60
+        if not pairs or ttl <= 0:
+            return set(pairs)
+        keys: List[str] = [cooldown_key(alert_id, trade_id) for alert_id, trade_id in pairs]
+        claimed = await get_store().claim(keys, ttl)
+        return {pair for pair, key in zip(pairs, keys) if key in claimed}
+
+    @staticmethod
+    async def release(pairs: Iterable[Tuple[int, int]]) -> None:
+        """Give back claims whose notifications were never queued."""
+        await get_store().release(cooldown_key(alert_id, trade_id) for alert_id, trade_id in pairs)
+
+    @staticmethod
+    async def close() -> None:
+        global _store
+        store, _store = _store, None
+        if isinstance(store, RedisCooldownStore):
+            await store.close()
+
+    @staticmethod
+    def reset() -> None:
+        """Forget all cooldowns and re-read the backend setting."""
+        global _store
+        _store = None
@@ -0,0 +1,335 @@
+"""
+Alert matching service.
+
+Keeps every active alert rule in an in-process index so a trade can be
+matched without loading alerts or re-reading companies and insiders:
+- Rules are bucketed by (ticker, transaction_type); a rule without a ticker
+  or type lives in the wildcard bucket for that field, so a trade only looks
+  at four buckets.
+- Within a bucket, value ranges sit in a centered interval tree, so finding
+  the rules whose [min_value, max_value] contains the trade value is
+  O(log n + matches).
+- Insider role filters are checked on the remaining candidates.
+
+The index is kept current from the ORM: alert inserts, updates, toggles and
+deletes are applied after their transaction commits. It is also rebuilt every
+ALERT_INDEX_TTL_SECONDS to pick up writes made by other processes.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Flushed, pending_after_commit
+from app.models.alert import Alert
+from app.models.insider import Insider
+
+logger = logging.getLogger(__name__)
+
+# (ticker, transaction_type); None is the wildcard for that field
+BucketKey = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Matching criteria of one active alert."""
+
+    id: int
+    ticker: Optional[str]
+    transaction_type: Optional[str]
+    min_value: float
+    max_value: float
+    insider_roles: FrozenSet[str]
+
+    @classmethod
+    def from_values(
+        cls,
+        alert_id: int,
+        ticker: Optional[str],
+        transaction_type: Optional[str],
+        min_value,
+        max_value,
+        insider_roles: Optional[Iterable[str]],
+    ) -> "AlertRule":
+        # An unset (or zero) bound does not filter, as in the original matcher
+        return cls(
+            id=alert_id,
+            ticker=ticker.upper() if ticker else None,
+            transaction_type=transaction_type or None,
+            min_value=float(min_value) if min_value else -math.inf,
+            max_value=float(max_value) if max_value else math.inf,
+            insider_roles=frozenset(role.casefold() for role in insider_roles or ()),
+        )
+
+    @classmethod
+    def from_alert(cls, alert: Alert) -> "AlertRule":
+        return cls.from_values(
+            alert.id,
+            alert.ticker,
+            alert.transaction_type,
+            alert.min_value,
+            alert.max_value,
+            alert.insider_roles,
+        )
+
+    @property
+    def bucket(self) -> BucketKey:
+        return (self.ticker, self.transaction_type)
+
+    def matches(
+        self,
+        ticker: str,
+        transaction_type: Optional[str],
+        value: float,
+        insider_roles: FrozenSet[str],
+    ) -> bool:
+        """Evaluate the rule directly (reference for the index)."""
+        if self.ticker and self.ticker != ticker.upper():
+            return False
+        if self.transaction_type and self.transaction_type != transaction_type:
+            return False
+        if not self.min_value <= value <= self.max_value:
+            return False
+        if self.insider_roles and not self.insider_roles & insider_roles:
+            return False
+        return True
+
+
+class IntervalTree:
+    """Static centered interval tree answering "which intervals contain x"."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self, intervals: Iterable[Tuple[float, float, int]]):
+        self._root = self._build(list(intervals))
+
+    @classmethod
+    def _build(cls, intervals: List[Tuple[float, float, int]]):
+        if not intervals:
+            return None
+
+        # The median finite endpoint belongs to some interval, so every node
+        # keeps at least one interval and the recursion always shrinks
+        endpoints = sorted(
+            bound
+            for low, high, _ in intervals
+            for bound in (low, high)
+            if math.isfinite(bound)
+        )
+        center = endpoints[len(endpoints) // 2] if endpoints else 0.0
+
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        by_low = sorted((low, item_id) for low, _, item_id in here)
+        by_high = sorted(((high, item_id) for _, high, item_id in here), reverse=True)
+        return (center, by_low, by_high, cls._build(left), cls._build(right))
+
+    def stab(self, value: float) -> List[int]:
+        """Ids of the intervals with low <= value <= high."""
+        found = []
+        node = self._root
+        while node is not None:
+            center, by_low, by_high, left, right = node
+            if value < center:
+                # Every interval here reaches center > value; keep those starting early enough
+                for low, item_id in by_low:
+                    if low > value:
+                        break
+                    found.append(item_id)
+                node = left
+            elif value > center:
+                for high, item_id in by_high:
+                    if high < value:
+                        break
+                    found.append(item_id)
+                node = right
+            else:
+                found.extend(item_id for _, item_id in by_low)
+                break
+        return found
+
+
+class AlertIndex:
+    """Active alert rules bucketed by ticker and type, with value interval trees."""
+
+    def __init__(self, rules: Iterable[AlertRule] = ()):
+        self._rules: Dict[int, AlertRule] = {}
+        self._buckets: Dict[BucketKey, Set[int]] = {}
+        # Trees are built on first use and dropped when their bucket changes
+        self._trees: Dict[BucketKey, IntervalTree] = {}
+        self.built_at = time.time()
+        for rule in rules:
+            self.upsert(rule)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, alert_id: int) -> bool:
+        return alert_id in self._rules
+
+    def upsert(self, rule: AlertRule) -> None:
+        """Add a rule, replacing any previous version of it."""
+        self.remove(rule.id)
+        self._rules[rule.id] = rule
+        self._buckets.setdefault(rule.bucket, set()).add(rule.id)
+        self._trees.pop(rule.bucket, None)
+
+    def remove(self, alert_id: int) -> None:
+        """Drop a rule (no-op if it is not indexed)."""
+        rule = self._rules.pop(alert_id, None)
+        if rule is None:
+            return
+        bucket = self._buckets.get(rule.bucket)
+        if bucket is not None:
+            bucket.discard(alert_id)
+            if not bucket:
+                del self._buckets[rule.bucket]
+        self._trees.pop(rule.bucket, None)
+
+    def _tree(self, key: BucketKey) -> Optional[IntervalTree]:
+        tree = self._trees.get(key)
+        if tree is None:
+            ids = self._buckets.get(key)
+            if not ids:
+                return None
+            rules = (self._rules[i] for i in ids)
+            # A rule with min_value > max_value can never match
+            tree = IntervalTree(
+                (rule.min_value, rule.max_value, rule.id)
+                for rule in rules
+                if rule.min_value <= rule.max_value
+            )
+            self._trees[key] = tree
+        return tree
+
+    def match(
+        self,
+        ticker: Optional[str],
+        transaction_type: Optional[str],
+        value: float,
+        insider_roles: Iterable[str] = (),
+    ) -> List[int]:
+        """
+        Find the alerts a trade triggers.
+
+        Args:
+            ticker: Trade's company ticker
+            transaction_type: BUY or SELL
+            value: Trade total value (0 when unknown)
+            insider_roles: Role names of the trade's insider
+
+        Returns:
+            Matching alert ids, ascending
+        """
+        ticker = ticker.upper() if ticker else None
+        roles = frozenset(role.casefold() for role in insider_roles)
+
+        keys = {(None, None), (None, transaction_type)}
+        if ticker:
+            keys.update({(ticker, None), (ticker, transaction_type)})
+
+        matched = []
+        for key in keys:
+            tree = self._tree(key)
+            if tree is None:
+                continue
+            for alert_id in tree.stab(value):
+                rule_roles = self._rules[alert_id].insider_roles
+                if rule_roles and not rule_roles & roles:
+                    continue
+                matched.append(alert_id)
+        matched.sort()
+        return matched
+
+
+def insider_role_names(insider: Optional[Insider]) -> List[str]:
+    """Role names an alert's insider_roles filter is compared with."""
+    if insider is None:
+        return []
+    roles = list(insider.roles_list)
+    if insider.title:
+        roles.append(insider.title)
+    return roles
+
+
+_index: Optional[AlertIndex] = None
+_index_lock = asyncio.Lock()
+
+
+class AlertMatchingService:
+    """Service owning the process-wide alert index."""
+
+    @staticmethod
+    async def get_index(db: AsyncSession) -> AlertIndex:
+        """Get the alert index, (re)building it from active alerts if stale."""
+        global _index
+        index = _index
+        if index is not None and time.time() - index.built_at < settings.alert_index_ttl_seconds:
+            return index
+
+        async with _index_lock:
+            index = _index
+            if index is not None and time.time() - index.built_at < settings.alert_index_ttl_seconds:
+                return index
+
+            result = await db.execute(
+                select(
+                    Alert.id,
+                    Alert.ticker,
+                    Alert.transaction_type,
+                    Alert.min_value,
+                    Alert.max_value,
+                    Alert.insider_roles,
+                ).where(Alert.is_active.is_(True))
+            )
+            index = AlertIndex(AlertRule.from_values(*row) for row in result.all())
+            _index = index
+            logger.info(f"Built alert index: {len(index)} active alerts")
+            return index
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the index so it is rebuilt on next use."""
+        global _index
+        _index = None
+
+
+def _collect_alert_changes(session: Session, flushed: Flushed) -> List[Tuple[int, Optional[AlertRule]]]:
+    """Record flushed alert writes; they reach the index after commit."""
+    changes = [
+        (obj.id, AlertRule.from_alert(obj) if obj.is_active else None)
+        for obj in (*flushed.new, *flushed.dirty)
+        if obj.id is not None
+    ]
+    changes.extend((obj.id, None) for obj in flushed.deleted if obj.id is not None)
+    return changes
+
+
+def _apply_alert_changes(session: Session, changes: List[Tuple[int, Optional[AlertRule]]]) -> None:
+    if _index is None:
+        return
+    for alert_id, rule in changes:
+        if rule is None:
+            _index.remove(alert_id)
+        else:
+            _index.upsert(rule)
+
+
+pending_after_commit(
+    "alert_index_changes", _apply_alert_changes, models=(Alert,), collect=_collect_alert_changes
+)
@@ -13,10 +13,12 @@ Filters based on:
 """
 
 import logging
-from typing import List, Dict, Any
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc
+from sqlalchemy import select, and_
 
 from app.models import Trade
 # REMOVED: from app.services.pattern_analysis_service import PatternAnalysisService (service was deleted)
@@ -24,6 +26,17 @@ from app.services.trade_value_estimation_service import TradeValueEstimationServ
 
 logger = logging.getLogger(__name__)
 
+# Look-back windows for the pattern and accuracy factors
+CLUSTER_WINDOW_DAYS = 7
+HISTORY_WINDOW_DAYS = 365
+
+
+class TradeContext(NamedTuple):
+    """Batch-loaded inputs of the pattern and accuracy factors."""
+
+    cluster_count: int
+    history_count: int
+
 
 class AlertPrioritizationService:
     """
@@ -43,6 +56,9 @@ class AlertPrioritizationService:
         """
         Filter trades to only the most significant ones.
 
+        Cluster and insider history counts for the whole batch come from one
+        query (see _load_trade_context), so scoring does not query per trade.
+
         Args:
             trades: List of trades to filter
             target_percentage: Target percentage to keep (default: 5%)
@@ -53,11 +69,22 @@ class AlertPrioritizationService:
         if not trades:
             return []
 
-        # Score each trade
+        # Resolve missing prices for the whole batch once (one price index per ticker)
+        price_lookup = await self.value_service.estimate_prices_batch(
+            [t for t in trades if not t.total_value]
+        )
+        contexts = await self._load_trade_context(trades)
+
+        # Score each trade (the role factor only depends on the insider)
         scored_trades = []
+        role_scores: Dict[Optional[int], float] = {}
 
-        for trade in trades:
-            score = await self._calculate_significance_score(trade)
+        for trade, context in zip(trades, contexts):
+            if trade.insider_id not in role_scores:
+                role_scores[trade.insider_id] = await self._calculate_role_score(trade)
+            score = await self._calculate_significance_score(
+                trade, price_lookup, context, role_scores[trade.insider_id]
+            )
             scored_trades.append(
                 {
                     "trade": trade,
@@ -90,7 +117,78 @@ class AlertPrioritizationService:
             for item in significant
         ]
 
-    async def _calculate_significance_score(self, trade: Trade) -> float:
+    async def _load_trade_context(self, trades: List[Trade]) -> List[TradeContext]:
+        """
+        Get cluster and insider history counts for a batch of trades.
+
+        Loads (company, insider, type, date) of every stored trade at the
+        batch's companies over the covering date range in one query, then
+        counts each trade's windows with bisect:
+        - cluster_count: same company and direction, transaction date within
+          the CLUSTER_WINDOW_DAYS up to and including the trade's date
+        - history_count: same insider and company, transaction date within
+          the HISTORY_WINDOW_DAYS before the trade's date
+
+        Args:
+            trades: Trades to score
+
+        Returns:
+            One TradeContext per trade, in order
+        """
+        dated = [t for t in trades if t.company_id and t.transaction_date]
+        if not dated:
+            return [TradeContext(0, 0) for _ in trades]
+
+        result = await self.db.execute(
+            select(
+                Trade.company_id,
+                Trade.insider_id,
+                Trade.transaction_type,
+                Trade.transaction_date,
+            ).where(
+                and_(
+                    Trade.company_id.in_({t.company_id for t in dated}),
+                    Trade.transaction_date
+                    >= min(t.transaction_date for t in dated) - timedelta(days=HISTORY_WINDOW_DAYS),
+                    Trade.transaction_date <= max(t.transaction_date for t in dated),
+                )
+            )
+        )
+        by_direction: Dict[Tuple[int, str], List] = defaultdict(list)
+        by_insider: Dict[Tuple[int, int], List] = defaultdict(list)
+        for company_id, insider_id, transaction_type, transaction_date in result.all():
+            if transaction_type is not None:
+                by_direction[(company_id, transaction_type)].append(transaction_date)
+            if insider_id is not None:
+                by_insider[(company_id, insider_id)].append(transaction_date)
+        for dates in (*by_direction.values(), *by_insider.values()):
+            dates.sort()
+
+        contexts = []
+        for trade in trades:
+            day = trade.transaction_date
+            if not trade.company_id or not day:
+                contexts.append(TradeContext(0, 0))
+                continue
+
+            dates = by_direction.get((trade.company_id, trade.transaction_type), [])
+            cluster_count = bisect_right(dates, day) - bisect_left(
+                dates, day - timedelta(days=CLUSTER_WINDOW_DAYS)
+            )
+            dates = by_insider.get((trade.company_id, trade.insider_id), [])
+            history_count = bisect_left(dates, day) - bisect_left(
+                dates, day - timedelta(days=HISTORY_WINDOW_DAYS)
+            )
+            contexts.append(TradeContext(cluster_count, history_count))
+        return contexts
+
+    async def _calculate_significance_score(
+        self,
+        trade: Trade,
+        price_lookup: Optional[Dict[int, Optional[float]]] = None,
+        context: Optional[TradeContext] = None,
+        role_score: Optional[float] = None,
+    ) -> float:
         """
         Calculate significance score (0-1) for a trade.
 
@@ -100,31 +198,41 @@ class AlertPrioritizationService:
         - Pattern context (clustered = more significant)
         - Historical accuracy (if insider has good track record)
         """
+        if context is None:
+            context = (await self._load_trade_context([trade]))[0]
+
         score = 0.0
 
         # Factor 1: Trade Value (40% weight)
-        value_score = await self._calculate_value_score(trade)
+        value_score = await self._calculate_value_score(trade, price_lookup)
         score += value_score * 0.4
 
         # Factor 2: Insider Role (25% weight)
-        role_score = await self._calculate_role_score(trade)
+        if role_score is None:
+            role_score = await self._calculate_role_score(trade)
         score += role_score * 0.25
 
         # Factor 3: Pattern Context (20% weight)
-        pattern_score = await self._calculate_pattern_score(trade)
+        pattern_score = self._calculate_pattern_score(trade, context)
         score += pattern_score * 0.2
 
         # Factor 4: Historical Accuracy (15% weight)
-        accuracy_score = await self._calculate_accuracy_score(trade)
+        accuracy_score = self._calculate_accuracy_score(trade, context)
         score += accuracy_score * 0.15
 
         return min(1.0, score)
 
-    async def _calculate_value_score(self, trade: Trade) -> float:
+    async def _calculate_value_score(
+        self,
+        trade: Trade,
+        price_lookup: Optional[Dict[int, Optional[float]]] = None,
+    ) -> float:
         """Calculate score based on trade value."""
         # Get or estimate trade value
         if not trade.total_value or trade.total_value == 0:
-            estimates = await self.value_service.estimate_missing_trade_value(trade)
+            estimates = await self.value_service.estimate_missing_trade_value(
+                trade, price_lookup
+            )
             trade_value = estimates.get("total_value", 0)
         else:
             trade_value = float(trade.total_value)
@@ -169,25 +277,14 @@ class AlertPrioritizationService:
         else:
             return 0.3
 
-    async def _calculate_pattern_score(self, trade: Trade) -> float:
+    @staticmethod
+    def _calculate_pattern_score(trade: Trade, context: TradeContext) -> float:
         """Calculate score based on pattern context (clustering, timing)."""
         if not trade.company_id:
             return 0.3
 
-        # Check for clustered activity (multiple insiders trading together)
-        cutoff_date = trade.transaction_date - timedelta(days=7)
-
-        result = await self.db.execute(
-            select(func.count(Trade.id)).where(
-                and_(
-                    Trade.company_id == trade.company_id,
-                    Trade.transaction_date >= cutoff_date,
-                    Trade.transaction_date <= trade.transaction_date,
-                    Trade.transaction_type == trade.transaction_type,
-                )
-            )
-        )
-        recent_count = result.scalar_one()
+        # Clustered activity (multiple insiders trading together in 7 days)
+        recent_count = context.cluster_count
 
         # More clustered = higher score
         if recent_count >= 5:
@@ -199,30 +296,14 @@ class AlertPrioritizationService:
         else:
             return 0.3
 
-    async def _calculate_accuracy_score(self, trade: Trade) -> float:
+    @staticmethod
+    def _calculate_accuracy_score(trade: Trade, context: TradeContext) -> float:
         """Calculate score based on insider's historical accuracy."""
         if not trade.insider_id or not trade.company_id:
             return 0.5
 
-        # Get historical trades from this insider for this company
-        cutoff_date = trade.transaction_date - timedelta(days=365)
-
-        result = await self.db.execute(
-            select(Trade)
-            .where(
-                and_(
-                    Trade.insider_id == trade.insider_id,
-                    Trade.company_id == trade.company_id,
-                    Trade.transaction_date >= cutoff_date,
-                    Trade.transaction_date < trade.transaction_date,
-                )
-            )
-            .order_by(desc(Trade.transaction_date))
-            .limit(10)
-        )
-        historical_trades = result.scalars().all()
-
-        if len(historical_trades) < 3:
+        # Historical trades from this insider for this company (past year)
+        if context.history_count < 3:
             return 0.5  # Not enough history
 
         # For now, return neutral score
@@ -0,0 +1,300 @@
+"""
+Advanced alert rule compiler.
+
+AdvancedAlertRule.query_structure is a JSON tree of AND/OR/NOT groups over
+field conditions. Rather than walking the tree and dispatching on operator
+names for every trade, each rule is compiled once into:
+- leaf predicates, closures over a field and an operand that was coerced to
+  the field's type at compile time, each with a vectorized form producing a
+  NumPy mask over a pandas frame of trades, and
+- a combinator over the leaf results, as a closure for one trade and as mask
+  algebra for a batch.
+
+Every leaf is evaluated exactly once per trade (or once per batch column),
+and both the rule outcome and the matched conditions are read from those
+results.
+
+Compiled rules are cached by rule id. A cached rule is reused only while its
+query_structure is unchanged, and rules updated or deleted in this process
+are evicted after commit.
+"""
+
+import copy
+import logging
+import operator
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.database import Flushed, pending_after_commit
+from app.models.advanced_alert import AdvancedAlertRule
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade import Trade
+
+logger = logging.getLogger(__name__)
+
+FIELD_GETTERS: Dict[str, Callable[[Trade, Company, Insider], Any]] = {
+    "ticker": lambda trade, company, insider: company.ticker,
+    "company_name": lambda trade, company, insider: company.name,
+    "trade_value": lambda trade, company, insider: float(trade.total_value) if trade.total_value else 0.0,
+    "shares": lambda trade, company, insider: float(trade.shares) if trade.shares else 0.0,
+    "transaction_type": lambda trade, company, insider: trade.transaction_type,
+    "insider_name": lambda trade, company, insider: insider.name,
+    "insider_role": lambda trade, company, insider: insider.title or insider.relationship,
+    "filing_date": lambda trade, company, insider: trade.filing_date,
+}
+NUMERIC_FIELDS = frozenset({"trade_value", "shares"})
+DATE_FIELDS = frozenset({"filing_date"})
+GROUP_OPERATORS = frozenset({"AND", "OR", "NOT"})
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "equals": operator.eq,
+    "not_equals": operator.ne,
+    "greater_than": operator.gt,
+    "less_than": operator.lt,
+    "greater_than_or_equal": operator.ge,
+    "less_than_or_equal": operator.le,
+}
+
+ScalarFn = Callable[[Sequence[bool]], bool]
+MaskFn = Callable[[Sequence[np.ndarray], int], np.ndarray]
+
+
+def trade_fields(trade: Trade, company: Company, insider: Insider) -> Dict[str, Any]:
+    """Field values of one trade, as conditions see them."""
+    return {name: getter(trade, company, insider) for name, getter in FIELD_GETTERS.items()}
+
+
+def trade_frame(rows: Sequence[Tuple[Trade, Company, Insider]]) -> pd.DataFrame:
+    """One row per trade and one column per field, for batch evaluation."""
+    frame = pd.DataFrame(
+        [trade_fields(trade, company, insider) for trade, company, insider in rows],
+        columns=list(FIELD_GETTERS),
+    )
+    for name in DATE_FIELDS:
+        frame[name] = pd.to_datetime(frame[name], errors="coerce")
+    return frame
+
+
+def _coerce(field: Optional[str], value: Any) -> Any:
+    """Convert an operand to the field's type once, at compile time."""
+    if isinstance(value, list):
+        return [_coerce(field, item) for item in value]
+    try:
+        if field in NUMERIC_FIELDS and not isinstance(value, bool):
+            return float(value)
+        if field in DATE_FIELDS and isinstance(value, str):
+            return date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+@dataclass(frozen=True)
+class Leaf:
+    """One compiled field condition."""
+
+    spec: Any  # the condition as stored, reported in matched_conditions
+    field: Optional[str]
+    op: Optional[str]
+    value: Any
+    reported: bool
+
+    @classmethod
+    def compile(cls, spec: Any, reported: bool) -> "Leaf":
+        if not isinstance(spec, dict):
+            return cls(spec, None, None, None, False)
+        field = spec.get("field")
+        return cls(spec, field, spec.get("operator"), _coerce(field, spec.get("value")), reported)
+
+    def test_value(self, field_value: Any, value: Any = None) -> bool:
+        value = self.value if value is None else value
+        op = self.op
+        try:
+            if op in _COMPARISONS:
+                return bool(_COMPARISONS[op](field_value, value))
+            if op == "contains":
+                return field_value is not None and str(value).lower() in str(field_value).lower()
+            if op == "in":
+                return isinstance(value, list) and field_value in value
+            if op == "not_in":
+                return not isinstance(value, list) or field_value not in value
+        except TypeError:
+            # e.g. ordering a missing value against a number
+            return False
+        return False
+
+    def test(self, fields: Dict[str, Any]) -> bool:
+        return self.test_value(fields.get(self.field) if self.field else None)
+
+    def mask(self, frame: pd.DataFrame) -> np.ndarray:
+        size = len(frame)
+        if self.field not in frame.columns:
+            # Unknown fields read as None, as in the scalar path
+            return np.full(size, self.test_value(None), dtype=bool)
+
+        column = frame[self.field]
+        value = self.value
+        if self.field in DATE_FIELDS:
+            if isinstance(value, list):
+                value = [pd.Timestamp(item) if isinstance(item, date) else item for item in value]
+            elif isinstance(value, date):
+                value = pd.Timestamp(value)
+
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Evaluate once per category, then map the codes back to rows
+            per_category = self._column_mask(pd.Series(column.cat.categories, dtype=object), value)
+            lookup = np.append(per_category, self.test_value(None, value))
+            return lookup[column.cat.codes.to_numpy()]
+        return self._column_mask(column, value)
+
+    def _column_mask(self, column: pd.Series, value: Any) -> np.ndarray:
+        size = len(column)
+        try:
+            if self.op in _COMPARISONS:
+                return np.asarray(_COMPARISONS[self.op](column, value), dtype=bool)
+            if self.op == "contains":
+                return (
+                    column.astype("string")
+                    .str.lower()
+                    .str.contains(str(value).lower(), regex=False, na=False)
+                    .to_numpy(dtype=bool)
+                )
+            if self.op == "in":
+                if not isinstance(value, list):
+                    return np.zeros(size, dtype=bool)
+                return column.isin(value).to_numpy(dtype=bool)
+            if self.op == "not_in":
+                if not isinstance(value, list):
+                    return np.ones(size, dtype=bool)
+                return ~column.isin(value).to_numpy(dtype=bool)
+        except (TypeError, ValueError):
+            # Operand and column types do not vectorize: fall back to row-by-row
+            return np.fromiter(
+                (self.test_value(item, value) for item in column), dtype=bool, count=size
+            )
+        return np.zeros(size, dtype=bool)
+
+
+def _is_group(node: Any) -> bool:
+    return isinstance(node, dict) and "field" not in node and node.get("operator") in GROUP_OPERATORS
+
+
+def _compile_node(node: Any, leaves: List[Leaf], reported: bool, root: bool = False) -> Tuple[ScalarFn, MaskFn]:
+    if not (root or _is_group(node)):
+        position = len(leaves)
+        leaves.append(Leaf.compile(node, reported))
+        return (lambda results: results[position]), (lambda masks, size: masks[position])
+
+    group_operator = node.get("operator", "AND")
+    if group_operator == "NOT":
+        # Conditions under NOT are not reported as matched
+        scalar, mask = _compile_node(node.get("condition") or {}, leaves, False)
+        return (lambda results: not scalar(results)), (lambda masks, size: ~mask(masks, size))
+
+    children = [_compile_node(child, leaves, reported) for child in node.get("conditions", [])]
+    scalars = [scalar for scalar, _ in children]
+    masks_fns = [mask for _, mask in children]
+    if group_operator == "AND":
+        return (
+            lambda results: all(scalar(results) for scalar in scalars),
+            lambda masks, size: np.logical_and.reduce(
+                [fn(masks, size) for fn in masks_fns], initial=True
+            ) if masks_fns else np.ones(size, dtype=bool),
+        )
+    if group_operator == "OR":
+        return (
+            lambda results: any(scalar(results) for scalar in scalars),
+            lambda masks, size: np.logical_or.reduce(
+                [fn(masks, size) for fn in masks_fns], initial=False
+            ) if masks_fns else np.zeros(size, dtype=bool),
+        )
+    logger.warning(f"Unknown alert rule group operator: {group_operator}")
+    return (lambda results: False), (lambda masks, size: np.zeros(size, dtype=bool))
+
+
+class CompiledRule:
+    """A rule's query structure compiled into predicates."""
+
+    __slots__ = ("rule_id", "source", "leaves", "_scalar", "_mask")
+
+    def __init__(self, rule_id: int, query_structure: Dict[str, Any]):
+        self.rule_id = rule_id
+        # A copy, so in-place edits of the rule's JSON are seen as changes
+        self.source = copy.deepcopy(query_structure)
+        self.leaves: List[Leaf] = []
+        self._scalar, self._mask = _compile_node(query_structure or {}, self.leaves, True, root=True)
+
+    def evaluate(self, fields: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Evaluate one trade.
+
+        Returns:
+            (matches, matched_conditions) from a single pass over the leaves
+        """
+        results = [leaf.test(fields) for leaf in self.leaves]
+        return self._scalar(results), self._matched(results)
+
+    def evaluate_frame(self, frame: pd.DataFrame) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Evaluate a batch of trades.
+
+        Returns:
+            (row mask of matching trades, one mask per leaf); pass the leaf
+            masks to matched_at() for a row's matched conditions
+        """
+        masks = [leaf.mask(frame) for leaf in self.leaves]
+        return np.asarray(self._mask(masks, len(frame)), dtype=bool), masks
+
+    def matched_at(self, masks: Sequence[np.ndarray], row: int) -> List[Dict[str, Any]]:
+        return self._matched([bool(mask[row]) for mask in masks])
+
+    def _matched(self, results: Sequence[bool]) -> List[Dict[str, Any]]:
+        return [leaf.spec for leaf, hit in zip(self.leaves, results) if hit and leaf.reported]
+
+
+_compiled: Dict[int, CompiledRule] = {}
+
+
+def compile_rule(rule_id: int, query_structure: Dict[str, Any]) -> CompiledRule:
+    """Get the compiled form of a rule, compiling it if new or changed."""
+    compiled = _compiled.get(rule_id)
+    if compiled is None or compiled.source != query_structure:
+        compiled = CompiledRule(rule_id, query_structure)
+        _compiled[rule_id] = compiled
+    return compiled
+
+
+def invalidate(rule_id: Optional[int] = None) -> None:
+    """Drop one compiled rule, or all of them."""
+    if rule_id is None:
+        _compiled.clear()
+    else:
+        _compiled.pop(rule_id, None)
+
+
+def _collect_rule_changes(session: Session, flushed: Flushed) -> List[int]:
+    """Record rules whose query changed or that were deleted; evicted after commit."""
+    changed = [
+        obj.id
+        for obj in flushed.dirty
+        if inspect(obj).attrs.query_structure.history.has_changes()
+    ]
+    changed.extend(obj.id for obj in flushed.deleted)
+    return changed
+
+
+def _evict_changed_rules(session: Session, rule_ids: List[int]) -> None:
+    for rule_id in rule_ids:
+        invalidate(rule_id)
+
+
+pending_after_commit(
+    "compiled_rule_changes", _evict_changed_rules, models=(AdvancedAlertRule,), collect=_collect_rule_changes
+)
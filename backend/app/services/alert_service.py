@@ -5,19 +5,23 @@ Handles alert rule matching, trigger detection, and notification coordination.
 """
 
 import logging
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime, timedelta
 
+from app.database import defer_until_commit, pending_after_commit
 from app.models.alert import Alert
 from app.models.alert_history import AlertHistory
+from app.models.notification import Notification
 from app.models.trade import Trade
-from app.models.company import Company
-from app.models.insider import Insider
 from app.services.notification_service import NotificationService
 from app.services.alert_prioritization_service import AlertPrioritizationService
-from app.services.multi_channel_alert_service import MultiChannelAlertService
+from app.services.alert_matching_service import AlertMatchingService, insider_role_names
+from app.services.alert_cooldown_service import AlertCooldownService
+from app.services.event_backplane import ALERT_EVENTS, event_backplane
+from app.services.notification_dispatch_service import NotificationDispatcher
 from app.services.notification_storage_service import NotificationStorageService # New import
 from app.schemas.alert import AlertCreate, AlertUpdate
 from app.schemas.notification import NotificationCreate # New import
@@ -42,7 +46,6 @@ class AlertService:
         self.notification_service = NotificationService()
         self.prioritization_service = AlertPrioritizationService(db)
         self.notification_storage_service = NotificationStorageService(db) # Initialize new service
-        self.multi_channel_service = MultiChannelAlertService() # Celery tasks removed - alerts disabled
 
     async def create_alert(self, alert_data: AlertCreate, user_id: int) -> Alert:
         """Create a new alert."""
@@ -181,143 +184,107 @@ class AlertService:
 
         This is called when a new trade is created or updated.
         """
-        # Get all active alerts
-        alerts, _ = await self.get_alerts(is_active=True, limit=1000)
+        await self.check_trades_against_alerts([trade])
 
-        if not alerts:
-            return
+    async def check_trades_against_alerts(self, trades: Sequence[Trade]) -> int:
+        """
+        Check a batch of trades (a filing or scrape run) against active alerts.
+
+        Companies and insiders are loaded once for the batch, trades are scored
+        in one prioritization pass and matched against the in-process alert
+        index, and each alert fires at most once per batch, for its most
+        significant matching trade.
 
-        # Get company and insider info for notifications
-        company = await self.db.get(Company, trade.company_id)
-        insider = await self.db.get(Insider, trade.insider_id)
+        Args:
+            trades: Trades already flushed to the database
 
-        if not company or not insider:
-            logger.warning(f"Missing company or insider for trade {trade.id}")
-            return
+        Returns:
+            Number of alerts triggered
+        """
+        trade_ids = sorted({trade.id for trade in trades if trade.id is not None})
+        if not trade_ids:
+            return 0
 
-        company_name = company.name
-        company_ticker = company.ticker
-        insider_name = insider.name
+        index = await AlertMatchingService.get_index(self.db)
+        if not len(index):
+            return 0
 
-        # Check if trade is significant (noise filtering)
-        # Only process if trade meets significance threshold
-        significant_trades = (
-            await self.prioritization_service.filter_significant_trades(
-                [trade], target_percentage=0.05  # Top 5%
+        # Get company and insider info for matching and notifications
+        result = await self.db.execute(
+            select(Trade)
+            .options(selectinload(Trade.company), selectinload(Trade.insider))
+            .where(Trade.id.in_(trade_ids))
+        )
+        batch = []
+        for trade in result.scalars().all():
+            if not trade.company or not trade.insider:
+                logger.warning(f"Missing company or insider for trade {trade.id}")
+                continue
+            batch.append(trade)
+        if not batch:
+            return 0
+
+        # Score the whole batch once; the most significant trade wins per alert
+        scored = await self.prioritization_service.filter_significant_trades(
+            batch, target_percentage=1.0
+        )
+        scores = {item["trade_id"]: item["score"] for item in scored}
+        batch.sort(key=lambda trade: (-scores.get(trade.id, 0.0), trade.id))
+
+        best_trade: Dict[int, Trade] = {}
+        for trade in batch:
+            alert_ids = index.match(
+                trade.company.ticker,
+                trade.transaction_type,
+                float(trade.total_value) if trade.total_value else 0,
+                insider_role_names(trade.insider),
             )
+            logger.debug(f"Trade {trade.id} ({trade.company.ticker}) matched alerts {alert_ids}")
+            for alert_id in alert_ids:
+                best_trade.setdefault(alert_id, trade)
+        if not best_trade:
+            return 0
+
+        result = await self.db.execute(
+            select(Alert)
+            .where(Alert.id.in_(list(best_trade)), Alert.is_active.is_(True))
+            .order_by(Alert.id)
         )
+        alerts = list(result.scalars().all())
 
-        if not significant_trades or len(significant_trades) == 0:
-            logger.debug(
-                f"Trade {trade.id} filtered out by prioritization (not significant enough)"
-            )
-            return
-
-        # Check each alert
-        for alert in alerts:
-            logger.debug(f"Checking alert '{alert.name}' (ID: {alert.id}) against trade {trade.id} ({company_ticker})")
-            if await self._matches_alert(trade, alert):
-                logger.debug(f"Trade {trade.id} matched alert {alert.id}. Checking notification cooldown.")
-                # Check if we already notified for this trade/alert combo (cooldown)
-                if await self._recently_notified(alert.id, trade.id):
+        # Check-and-set the cooldown before dispatch (prevents duplicate notifications)
+        claimed = await AlertCooldownService.claim(
+            [(alert.id, best_trade[alert.id].id) for alert in alerts]
+        )
+        triggered = 0
+        try:
+            for alert in alerts:
+                trade = best_trade[alert.id]
+                if (alert.id, trade.id) not in claimed:
                     logger.debug(
                         f"Skipping alert {alert.name} for trade {trade.id} (recent notification)"
                     )
                     continue
 
                 # Trigger notifications
-                logger.info(f"Triggering alert '{alert.name}' (ID: {alert.id}) for trade {trade.id} ({company_ticker})")
-                await self._trigger_alert_notifications(
-                    alert, trade, company_name, insider_name, company_ticker
+                logger.info(
+                    f"Triggering alert '{alert.name}' (ID: {alert.id}) for trade {trade.id} "
+                    f"({trade.company.ticker})"
                 )
-            else:
-                logger.debug(f"Trade {trade.id} did NOT match alert '{alert.name}' (ID: {alert.id}).")
-
-    async def _matches_alert(self, trade: Trade, alert: Alert) -> bool:
-        """
-        Check if a trade matches an alert's criteria.
-
-        Returns True if the trade should trigger this alert.
-        """
-        logger.debug(f"Evaluating trade {trade.id} against alert '{alert.name}' (ID: {alert.id}).")
-
-        # Get company to check ticker
-        company = await self.db.get(Company, trade.company_id)
-        if not company:
-            logger.debug(f"No company found for trade {trade.id}. Skipping alert match.")
-            return False
-
-        # Check ticker filter
-        if alert.ticker:
-            if alert.ticker.upper() != company.ticker.upper():
-                logger.debug(f"Ticker mismatch: alert '{alert.ticker}' != trade '{company.ticker}'.")
-                return False
-            else:
-                logger.debug(f"Ticker match: alert '{alert.ticker}' == trade '{company.ticker}'.")
-
-        # Check transaction type filter
-        if alert.transaction_type:
-            if alert.transaction_type != trade.transaction_type:
-                logger.debug(f"Transaction type mismatch: alert '{alert.transaction_type}' != trade '{trade.transaction_type}'.")
-                return False
-            else:
-                logger.debug(f"Transaction type match: alert '{alert.transaction_type}' == trade '{trade.transaction_type}'.")
-
-        # Check value range
-        trade_value = float(trade.total_value) if trade.total_value else 0
-        if alert.min_value:
-            if trade_value < float(alert.min_value):
-                logger.debug(f"Value too low: trade value {trade_value} < alert min {alert.min_value}.")
-                return False
-            else:
-                logger.debug(f"Value meets min: trade value {trade_value} >= alert min {alert.min_value}.")
-        if alert.max_value:
-            if trade_value > float(alert.max_value):
-                logger.debug(f"Value too high: trade value {trade_value} > alert max {alert.max_value}.")
-                return False
-            else:
-                logger.debug(f"Value meets max: trade value {trade_value} <= alert max {alert.max_value}.")
-
-        # Check insider role filter
-        if alert.insider_roles:
-            insider = await self.db.get(Insider, trade.insider_id)
-            if not insider:
-                logger.debug(f"No insider found for trade {trade.id}. Skipping insider role check.")
-                return False
-            
-            insider_roles_set = set(insider.roles or [])
-            alert_roles_set = set(alert.insider_roles)
-            if not insider_roles_set.intersection(alert_roles_set):
-                logger.debug(f"Insider role mismatch: trade insider roles {insider_roles_set} have no overlap with alert roles {alert_roles_set}.")
-                return False
-            else:
-                logger.debug(f"Insider role match: trade insider roles {insider_roles_set} overlap with alert roles {alert_roles_set}.")
-
-        # All criteria matched
-        logger.debug(f"Trade {trade.id} successfully matched all criteria for alert '{alert.name}' (ID: {alert.id}).")
-        return True
-
-    async def _recently_notified(
-        self, alert_id: int, trade_id: int, cooldown_hours: int = 1
-    ) -> bool:
-        """
-        Check if we've already sent a notification for this alert/trade combo recently.
-
-        Prevents duplicate notifications.
-        """
-        cutoff_time = datetime.utcnow() - timedelta(hours=cooldown_hours)
-
-        result = await self.db.execute(
-            select(AlertHistory).where(
-                and_(
-                    AlertHistory.alert_id == alert_id,
-                    AlertHistory.trade_id == trade_id,
-                    AlertHistory.created_at > cutoff_time,
+                await self._trigger_alert_notifications(
+                    alert, trade, trade.company.name, trade.insider.name, trade.company.ticker
                 )
-            )
-        )
-
-        return result.scalar_one_or_none() is not None
+                triggered += 1
+
+            # One commit for the whole batch; queued deliveries are dispatched after it
+            if triggered:
+                await self.db.commit()
+        except Exception:
+            # Nothing was queued, so the pairs may notify on the next attempt
+            await AlertCooldownService.release(claimed)
+            raise
+        logger.info(f"Checked {len(batch)} trades against {len(index)} alerts: {triggered} triggered")
+        return triggered
 
     async def _trigger_alert_notifications(
         self,
@@ -328,136 +295,27 @@ class AlertService:
         company_ticker: str = None,
     ) -> None:
         """
-        Send notifications for a matched alert via all configured channels.
+        Queue notifications for a matched alert on all configured channels.
 
-        Logs success/failure in alert_history.
+        Webhook, email, push and multi-channel deliveries are staged in the
+        notification outbox and sent by the notification dispatcher once the
+        caller commits; outcomes are logged in alert_history. The in-app
+        notification is added to the same transaction.
         """
         logger.info(
             f"Alert triggered: {alert.name} (id={alert.id}) for trade {trade.id} "
             f"({company_ticker})"
         )
 
-        # Send in-app notification via WebSocket to all connected clients
-        try:
-            from app.routers.alerts import get_alert_manager
-            alert_manager = get_alert_manager()
-            # ...
-        except Exception as e:
-            logger.error(f"Failed to send in-app notification: {e}")
-
-        # Prepare alert data for multi-channel service
-        alert_data = {
-            "ticker": company_ticker,
-            "company_name": company_name,
-            "insider": insider_name,
-            "transaction_type": trade.transaction_type,
-            "total_value": float(trade.total_value) if trade.total_value else 0,
-            "transaction_date": trade.transaction_date.isoformat()
-            if trade.transaction_date
-            else None,
-            "shares": float(trade.shares) if trade.shares else 0,
-        }
-
-        # Send via multi-channel service (Discord, Slack, SMS)
-        try:
-            multi_channel_results = await self.multi_channel_service.send_alert(
-                alert_data,
-                alert.user_id, # Pass user_id
-                channels=[
-                    "discord",
-                    "slack",
-                    "sms",
-                ],  # Add email/push to existing channels
-            )
-            logger.info(f"Multi-channel alert results: {multi_channel_results}")
-        except Exception as e:
-            logger.error(f"Error sending multi-channel alerts: {e}")
-
-        # Send notifications for each configured channel
-        for channel in alert.notification_channels:
-            if channel == "webhook" and alert.webhook_url:
-                (
-                    success,
-                    error,
-                ) = await self.notification_service.send_webhook_notification(
-                    alert.webhook_url, alert, trade, company_name, insider_name
-                )
-
-                # Log to alert_history
-                history = AlertHistory(
-                    alert_id=alert.id,
-                    trade_id=trade.id,
-                    notification_channel="webhook",
-                    notification_status="sent" if success else "failed",
-                    error_message=error,
-                )
-                self.db.add(history)
-
-            elif channel == "email" and alert.email:
-                (
-                    success,
-                    error,
-                ) = await self.notification_service.send_email_notification(
-                    alert, trade, company_name, insider_name
-                )
-
-                # Log to alert_history
-                history = AlertHistory(
-                    alert_id=alert.id,
-                    trade_id=trade.id,
-                    notification_channel="email",
-                    notification_status="sent" if success else "failed",
-                    error_message=error,
-                )
-                self.db.add(history)
-
-            elif channel == "push":
-                # Send push notifications to all active subscriptions
-                from app.services.push_subscription_service import (
-                    PushSubscriptionService,
-                )
-
-                push_service = PushSubscriptionService(self.db)
-                subscriptions = await push_service.get_active_subscriptions()
-
-                if not subscriptions:
-                    logger.warning(
-                        f"No active push subscriptions for alert {alert.name}"
-                    )
-                    continue
-
-                for subscription in subscriptions:
-                    (
-                        success,
-                        error,
-                    ) = await self.notification_service.send_push_notification(
-                        subscription, alert, trade, company_name, insider_name
-                    )
+        NotificationDispatcher.stage(self.db, alert, trade)
 
-                    # Log to alert_history
-                    history = AlertHistory(
-                        alert_id=alert.id,
-                        trade_id=trade.id,
-                        notification_channel="push",
-                        notification_status="sent" if success else "failed",
-                        error_message=error,
-                    )
-                    self.db.add(history)
-
-                    # Deactivate expired subscriptions (410 Gone)
-                    if error and "410" in error:
-                        await push_service.mark_subscription_inactive(subscription.id)
-                        logger.info(
-                            f"Deactivated expired push subscription {subscription.id}"
-                        )
-                    elif success:
-                        await push_service.update_last_notified(subscription.id)
-        
-        # Create in-app notification
+        # Create in-app notification, and push it to the user's alert stream
+        # on every worker once the caller commits
         try:
             action = "bought" if trade.transaction_type == "BUY" else "sold"
             title = f"🔔 Alert: {alert.name} Triggered!"
             message = f"{insider_name} {action} ${trade.total_value:,.0f} of {company_ticker} stock."
+            link = f"/alerts/{alert.id}"
             notification_data = NotificationCreate(
                 user_id=alert.user_id,
                 alert_id=alert.id,
@@ -468,16 +326,28 @@ class AlertService:
                     "alert_id": alert.id,
                     "trade_id": trade.id,
                     "ticker": company_ticker,
-                    "link": f"/alerts/{alert.id}",
+                    "link": link,
+                },
+            )
+            self.db.add(Notification(**notification_data.model_dump()))
+            defer_until_commit(
+                self.db.sync_session,
+                "alert_stream_events",
+                {
+                    "user_id": alert.user_id,
+                    "message": {
+                        "id": f"alert-{alert.id}-{trade.id}",
+                        "title": title,
+                        "message": message,
+                        "kind": "info",
+                        "meta": {"alert_id": alert.id, "trade_id": trade.id, "link": link},
+                    },
                 },
             )
-            await self.notification_storage_service.create_notification(notification_data)
             logger.info(f"Created in-app notification for user {alert.user_id} (alert ID: {alert.id}, trade ID: {trade.id}).")
         except Exception as e:
             logger.error(f"Failed to create in-app notification: {e}", exc_info=True)
 
-        await self.db.commit()
-
     async def send_test_notification(self, alert_id: int) -> tuple[bool, Optional[str]]:
         """
         Send a test notification for an alert.
@@ -633,3 +503,10 @@ class AlertService:
             "notifications_last_24h": notifications_24h,
             "failed_notifications_last_24h": failed_24h,
         }
+
+
+def _publish_alert_stream_events(session: Session, events: List[Dict[str, Any]]) -> None:
+    event_backplane.publish_soon(ALERT_EVENTS, *events)
+
+
+pending_after_commit("alert_stream_events", _publish_alert_stream_events)
@@ -1,15 +1,40 @@
 """
-Cache service for managing Redis caching with TTL and invalidation.
+Cache service: a bounded in-process L1 in front of Redis (L2).
 
-NOTE: Redis is now optional. If redis module is not installed or Redis is not configured,
-all cache operations will gracefully return None/False without errors.
+Reads are served from this worker's L1 when possible and fall through to
+Redis otherwise; values are stored MessagePack-encoded (JSON when msgpack is
+missing) with the time they were computed in and their expiry, which
+get_or_set() uses for probabilistic early refresh. Concurrent misses for the
+same key in a worker share one fetch.
+
+Keys belonging to a company ("<prefix>:<TICKER>:...") are tagged with the
+company; a tag's generation number is part of the stored key, so
+invalidating a company is a single version bump rather than a keyspace
+scan. Deletes and invalidations are announced over Redis pub/sub (the event
+backplane), batched per event loop iteration, so other workers drop their
+L1 copies. Writes are not announced: other workers' copies expire within
+CACHE_L1_TTL_SECONDS. Without a Redis backplane nothing is announced.
+
+NOTE: Redis is optional. If redis module is not installed or Redis is not configured,
+the L1 still caches within the worker and the remaining operations gracefully return
+None/False without errors.
 """
 
-import logging
+import asyncio
+import fnmatch
 import json
-from typing import Any, Optional, Dict
+import logging
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
 from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
 from app.config import settings
+from app.core.serialization import MSGPACK_AVAILABLE, dumps, packb, unpackb
+from app.services.event_backplane import CACHE_EVENTS, event_backplane
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +44,154 @@ try:
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
-    logger.warning("Redis module not installed. Caching will be disabled.")
+    logger.warning("Redis module not installed. Caching will be in-process only.")
     aioredis = None
 
+# Key prefixes whose second segment is a ticker (see invalidate_company_cache)
+COMPANY_KEY_PREFIXES = frozenset({
+    "company",
+    "trades",
+    "ivt",
+    "risk",
+    "ts_score",
+    "management",
+    "competitive",
+    "competitive_strength",
+    "management_score",
+})
+GENERATION_KEY_PREFIX = "cache:gen:"
+
+# First byte of a stored entry; older plain-JSON values have neither
+_MSGPACK_ENTRY = b"\x01"
+_JSON_ENTRY = b"\x00"
+
+Entry = Tuple[Any, float, float]
+
+
+def company_tag(ticker: str) -> str:
+    """Tag shared by every cache key of a company."""
+    return f"company:{ticker.upper()}"
+
+
+def key_tags(key: str) -> Tuple[str, ...]:
+    """Tags derived from a key's name (its company, if any)."""
+    prefix, _, rest = key.partition(":")
+    if prefix in COMPANY_KEY_PREFIXES and rest:
+        return (company_tag(rest.split(":", 1)[0]),)
+    return ()
+
+
+def pack_entry(value: Any, delta: float = 0.0, expires_at: float = 0.0) -> bytes:
+    """
+    Encode a cache entry.
+
+    Args:
+        value: Cached value (JSON-compatible, plus Decimal, dates, models)
+        delta: Seconds it took to compute, for early refresh
+        expires_at: Unix time the entry expires at, 0 for never
+
+    Returns:
+        Bytes for L1 and Redis
+    """
+    entry = [value, delta, expires_at]
+    if MSGPACK_AVAILABLE:
+        return _MSGPACK_ENTRY + packb(entry)
+    return _JSON_ENTRY + dumps(entry)
+
+
+def unpack_entry(raw: Any) -> Entry:
+    """Decode a cache entry into (value, delta, expires_at)."""
+    if isinstance(raw, str):
+        raw = raw.encode()
+    marker = raw[:1]
+    if marker == _MSGPACK_ENTRY:
+        value, delta, expires_at = unpackb(raw[1:])
+    elif marker == _JSON_ENTRY:
+        value, delta, expires_at = json.loads(raw[1:])
+    else:
+        # Written before entries were enveloped
+        return json.loads(raw), 0.0, 0.0
+    return value, delta, expires_at
+
+
+def _ttl_seconds(ttl: Optional[int], ttl_delta: Optional[timedelta]) -> Optional[int]:
+    if ttl_delta:
+        return int(ttl_delta.total_seconds())
+    return ttl or None
+
+
+class LocalCache:
+    """Bounded LRU of encoded entries, each stamped with its tags' generations."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, stamp: str) -> Optional[bytes]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires, item_stamp, packed = item
+        if item_stamp != stamp or expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return packed
+
+    def set(self, key: str, stamp: str, packed: bytes, ttl: float) -> None:
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, stamp, packed)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def discard_pattern(self, pattern: str) -> None:
+        for key in [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SingleFlight:
+    """Concurrent calls for the same key in this worker share one fetch."""
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    async def run(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Wait for the fetch already running for key, or run fetch() for everyone."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            return await asyncio.shield(flight)
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting when the fetch fails
+        flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            value = await fetch()
+            flight.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            self._flights.pop(key, None)
+
 
 class CacheService:
     """Service for managing application caching."""
@@ -29,22 +199,30 @@ class CacheService:
     def __init__(self):
         self.redis_client: Optional[aioredis.Redis] = None
         self._connection_pool = None
+        self._local = LocalCache(settings.cache_l1_max_entries)
+        # tag -> (generation, monotonic time it was read)
+        self._generations: Dict[str, Tuple[int, float]] = {}
+        self._inflight = SingleFlight()
+        # Identifies this worker's own invalidation messages
+        self._origin = uuid.uuid4().hex
+        # Invalidations waiting to be published together
+        self._announcements: List[Dict[str, Any]] = []
 
     async def connect(self):
         """Connect to Redis."""
         if not REDIS_AVAILABLE:
-            logger.warning("Redis module not available. Caching disabled.")
+            logger.warning("Redis module not available. Using in-process cache only.")
             return
-            
+
         if not settings.redis_url:
-            logger.warning("Redis URL not configured. Caching disabled.")
+            logger.warning("Redis URL not configured. Using in-process cache only.")
             return
 
         try:
+            # Entries are binary; values are decoded by unpack_entry
             self.redis_client = await aioredis.from_url(
                 settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+                decode_responses=False,
             )
             await self.redis_client.ping()
             logger.info("Connected to Redis cache")
@@ -54,9 +232,10 @@ class CacheService:
 
     async def disconnect(self):
         """Disconnect from Redis."""
+        self.clear_local()
         if not REDIS_AVAILABLE:
             return
-            
+
         if self.redis_client:
             try:
                 await self.redis_client.close()
@@ -65,19 +244,115 @@ class CacheService:
             finally:
                 self.redis_client = None
 
-    async def get(self, key: str) -> Optional[Any]:
-        """Get a value from cache."""
-        if not self.redis_client:
+    def clear_local(self) -> None:
+        """Drop this worker's L1 entries and cached generations."""
+        self._local.clear()
+        self._generations.clear()
+
+    def forget(self, *keys: str) -> None:
+        """
+        Drop keys from every worker's in-process cache, leaving Redis as is.
+
+        Safe to call from synchronous code such as session hooks.
+        """
+        self._local.discard(keys)
+        self._announce(keys=keys)
+
+    async def _stamp(self, tags: Tuple[str, ...]) -> str:
+        """Current generations of a key's tags, appended to its Redis key."""
+        if not tags:
+            return ""
+        now = time.monotonic()
+        max_age = settings.cache_l1_ttl_seconds
+        stale = [tag for tag in tags if tag not in self._generations or now - self._generations[tag][1] > max_age]
+        if stale and self.redis_client:
+            try:
+                values = await self.redis_client.mget([GENERATION_KEY_PREFIX + tag for tag in stale])
+                for tag, value in zip(stale, values):
+                    self._generations[tag] = (int(value or 0), now)
+            except Exception as e:
+                logger.error(f"Error reading cache generations: {e}")
+        elif stale:
+            # Without Redis generations only change in this worker (or by message)
+            for tag in stale:
+                if tag not in self._generations:
+                    self._generations[tag] = (0, now)
+        return "#" + ".".join(str(self._generations.get(tag, (0, now))[0]) for tag in tags)
+
+    @staticmethod
+    def _tags(key: str, tags: Optional[Iterable[str]]) -> Tuple[str, ...]:
+        return tuple(sorted(set(key_tags(key)).union(tags or ())))
+
+    async def _lookup(self, key: str, tags: Optional[Iterable[str]] = None) -> Optional[Entry]:
+        stamp = await self._stamp(self._tags(key, tags))
+        packed = self._local.get(key, stamp)
+        if packed is None and self.redis_client:
+            try:
+                packed = await self.redis_client.get(key + stamp)
+            except Exception as e:
+                logger.error(f"Error getting cache key {key}: {e}")
+                return None
+            if packed is None:
+                return None
+            entry = unpack_entry(packed)
+            self._local.set(key, stamp, packed, self._local_ttl(entry[2]))
+            return entry
+        if packed is None:
             return None
+        return unpack_entry(packed)
+
+    @staticmethod
+    def _local_ttl(expires_at: float) -> float:
+        ttl = settings.cache_l1_ttl_seconds
+        if expires_at:
+            ttl = min(ttl, expires_at - time.time())
+        return ttl
+
+    def _announce(self, keys: Iterable[str] = (), tags: Optional[Dict[str, int]] = None, pattern: Optional[str] = None):
+        """Tell other workers to drop their L1 copies (Redis backplane only)."""
+        transport = event_backplane.transport
+        if transport is None or transport.name != "redis":
+            return
+        message: Dict[str, Any] = {"origin": self._origin}
+        if keys:
+            message["keys"] = list(keys)
+        if tags:
+            message["tags"] = tags
+        if pattern:
+            message["pattern"] = pattern
+        if not self._announcements:
+            try:
+                asyncio.get_running_loop().call_soon(self._flush_announcements)
+            except RuntimeError:
+                return
+        self._announcements.append(message)
 
+    def _flush_announcements(self) -> None:
+        """Publish the invalidations collected in this loop iteration in one round trip."""
+        messages, self._announcements = self._announcements, []
+        if messages:
+            event_backplane.publish_soon(CACHE_EVENTS, *messages)
+
+    async def apply_invalidation(self, message: dict) -> None:
+        """Backplane handler for invalidations announced by other workers."""
+        if message.get("origin") == self._origin:
+            return
+        self._local.discard(message.get("keys", ()))
+        if message.get("pattern"):
+            self._local.discard_pattern(message["pattern"])
+        now = time.monotonic()
+        for tag, generation in message.get("tags", {}).items():
+            current = self._generations.get(tag, (0, now))[0]
+            self._generations[tag] = (max(current, int(generation)), now)
+
+    async def get(self, key: str, tags: Optional[Iterable[str]] = None) -> Optional[Any]:
+        """Get a value from cache."""
         try:
-            value = await self.redis_client.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            entry = await self._lookup(key, tags)
         except Exception as e:
             logger.error(f"Error getting cache key {key}: {e}")
             return None
+        return None if entry is None else entry[0]
 
     async def set(
         self,
@@ -85,45 +360,65 @@ class CacheService:
         value: Any,
         ttl: Optional[int] = None,
         ttl_delta: Optional[timedelta] = None,
+        tags: Optional[Iterable[str]] = None,
+        delta: float = 0.0,
     ) -> bool:
-        """Set a value in cache with optional TTL."""
-        if not self.redis_client:
-            return False
+        """
+        Set a value in cache with optional TTL.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: TTL in seconds
+            ttl_delta: TTL as a timedelta (takes precedence over ttl)
+            tags: Extra tags to invalidate the key by (company keys are tagged automatically)
+            delta: Seconds the value took to compute, for early refresh
 
+        Returns:
+            True if the value was cached
+        """
         try:
-            serialized = json.dumps(value)
-            
-            if ttl_delta:
-                ttl_seconds = int(ttl_delta.total_seconds())
-            elif ttl:
-                ttl_seconds = ttl
-            else:
-                ttl_seconds = None
+            ttl_seconds = _ttl_seconds(ttl, ttl_delta)
+            expires_at = time.time() + ttl_seconds if ttl_seconds else 0.0
+            packed = pack_entry(value, delta, expires_at)
+            stamp = await self._stamp(self._tags(key, tags))
+            self._local.set(key, stamp, packed, self._local_ttl(expires_at))
 
+            if not self.redis_client:
+                return True
             if ttl_seconds:
-                await self.redis_client.setex(key, ttl_seconds, serialized)
+                await self.redis_client.setex(key + stamp, ttl_seconds, packed)
             else:
-                await self.redis_client.set(key, serialized)
-            
+                await self.redis_client.set(key + stamp, packed)
+
             return True
         except Exception as e:
             logger.error(f"Error setting cache key {key}: {e}")
             return False
 
-    async def delete(self, key: str) -> bool:
+    async def delete(self, key: str, tags: Optional[Iterable[str]] = None) -> bool:
         """Delete a key from cache."""
+        self._local.discard([key])
+        self._announce(keys=[key])
         if not self.redis_client:
             return False
 
         try:
-            await self.redis_client.delete(key)
+            stamp = await self._stamp(self._tags(key, tags))
+            await self.redis_client.delete(key + stamp)
             return True
         except Exception as e:
             logger.error(f"Error deleting cache key {key}: {e}")
             return False
 
     async def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching a pattern."""
+        """
+        Delete all keys matching a pattern.
+
+        Scans the whole keyspace; prefer invalidate_tag() for groups of keys.
+        """
+        self._local.discard_pattern(pattern)
+        self._announce(pattern=pattern)
         if not self.redis_client:
             return 0
 
@@ -131,28 +426,30 @@ class CacheService:
             keys = []
             async for key in self.redis_client.scan_iter(match=pattern):
                 keys.append(key)
-            
+
             if keys:
                 await self.redis_client.delete(*keys)
-            
+
             return len(keys)
         except Exception as e:
             logger.error(f"Error deleting cache pattern {pattern}: {e}")
             return 0
 
-    async def exists(self, key: str) -> bool:
+    async def exists(self, key: str, tags: Optional[Iterable[str]] = None) -> bool:
         """Check if a key exists in cache."""
-        if not self.redis_client:
-            return False
-
         try:
-            return await self.redis_client.exists(key) > 0
+            stamp = await self._stamp(self._tags(key, tags))
+            if self._local.get(key, stamp) is not None:
+                return True
+            if not self.redis_client:
+                return False
+            return await self.redis_client.exists(key + stamp) > 0
         except Exception as e:
             logger.error(f"Error checking cache key {key}: {e}")
             return False
 
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
-        """Increment a numeric value in cache."""
+        """Increment a numeric value in cache (Redis only, not cached in L1)."""
         if not self.redis_client:
             return None
 
@@ -162,50 +459,91 @@ class CacheService:
             logger.error(f"Error incrementing cache key {key}: {e}")
             return None
 
+    @staticmethod
+    def _refresh_early(delta: float, expires_at: float) -> bool:
+        """
+        Decide whether to recompute a still-valid entry (XFetch).
+
+        The chance rises as expiry approaches, and sooner for values that
+        are slow to compute, so one caller refreshes ahead of the herd.
+        """
+        if not delta or not expires_at:
+            return False
+        beta = settings.cache_early_refresh_beta
+        return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
     async def get_or_set(
         self,
         key: str,
         fetch_func,
         ttl: Optional[int] = None,
         ttl_delta: Optional[timedelta] = None,
+        tags: Optional[Iterable[str]] = None,
     ) -> Any:
-        """Get value from cache or fetch and cache it."""
-        # Try to get from cache
-        cached = await self.get(key)
-        if cached is not None:
-            return cached
+        """
+        Get value from cache or fetch and cache it.
+
+        Concurrent misses in this worker wait for a single fetch. An entry
+        close to expiry may be refreshed early by one caller; if that fetch
+        fails the cached value is returned.
+        """
+        try:
+            entry = await self._lookup(key, tags)
+        except Exception as e:
+            logger.error(f"Error getting cache key {key}: {e}")
+            entry = None
+        if entry is not None and not self._refresh_early(entry[1], entry[2]):
+            return entry[0]
+
+        if entry is not None and key in self._inflight:
+            # Someone is already refreshing it
+            return entry[0]
+
+        async def fetch():
+            started = time.perf_counter()
+            value = await fetch_func()
+            await self.set(
+                key, value, ttl=ttl, ttl_delta=ttl_delta, tags=tags, delta=time.perf_counter() - started
+            )
+            return value
 
-        # Fetch value
-        value = await fetch_func()
+        try:
+            return await self._inflight.run(key, fetch)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Early refresh of cache key {key} failed, serving cached value: {e}")
+            return entry[0]
 
-        # Cache it
-        await self.set(key, value, ttl=ttl, ttl_delta=ttl_delta)
+    async def invalidate_tag(self, tag: str) -> int:
+        """
+        Invalidate every key carrying a tag by bumping its generation.
 
-        return value
+        Entries written under the old generation are no longer read and
+        expire on their own TTL.
+
+        Returns:
+            The tag's new generation
+        """
+        generation = None
+        if self.redis_client:
+            try:
+                generation = await self.redis_client.incr(GENERATION_KEY_PREFIX + tag)
+            except Exception as e:
+                logger.error(f"Error invalidating cache tag {tag}: {e}")
+        if generation is None:
+            generation = self._generations.get(tag, (0, 0.0))[0] + 1
+        self._generations[tag] = (generation, time.monotonic())
+        self._announce(tags={tag: generation})
+        return generation
 
     async def invalidate_company_cache(self, ticker: str):
         """Invalidate all cache entries for a company."""
-        patterns = [
-            f"company:{ticker}:*",
-            f"trades:{ticker}:*",
-            f"ivt:{ticker}:*",
-            f"risk:{ticker}:*",
-            f"ts_score:{ticker}:*",
-            f"management:{ticker}:*",
-            f"competitive:{ticker}:*",
-            f"competitive_strength:{ticker}:*",  # Explicit pattern for competitive strength
-            f"management_score:{ticker}:*",  # Explicit pattern for management score
-        ]
-        
-        total_deleted = 0
-        for pattern in patterns:
-            deleted = await self.delete_pattern(pattern)
-            total_deleted += deleted
-        
-        logger.info(f"Invalidated {total_deleted} cache entries for {ticker}")
-        return total_deleted
+        generation = await self.invalidate_tag(company_tag(ticker))
+        logger.info(f"Invalidated cache entries for {ticker} (generation {generation})")
+        return generation
 
 
 # Global cache service instance
 cache_service = CacheService()
-
+event_backplane.subscribe(CACHE_EVENTS, cache_service.apply_invalidation)
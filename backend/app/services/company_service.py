@@ -7,10 +7,11 @@ Business logic for company operations.
 import logging
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func
 
 from app.models import Company
 from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyWithStats
+from app.services.search_service import SearchService
 
 logger = logging.getLogger(__name__)
 
@@ -103,9 +104,9 @@ class CompanyService:
     @staticmethod
     async def search(
         db: AsyncSession, query: str, skip: int = 0, limit: int = 20
-    ) -> tuple[List[Company], int]:
+    ) -> tuple[List[Company], int, bool]:
         """
-        Search companies by ticker or name.
+        Search companies by ticker or name, best matches first (see SearchService).
 
         Args:
             db: Database session
@@ -114,29 +115,12 @@ class CompanyService:
             limit: Maximum number of records to return
 
         Returns:
-            Tuple of (companies list, total count)
+            Tuple of (companies list, total, whether total is a lower bound)
         """
-        # Search by ticker or name (case-insensitive)
-        search_filter = or_(
-            func.upper(Company.ticker).contains(query.upper()),
-            func.upper(Company.name).contains(query.upper()),
+        return await SearchService.search(
+            db, "companies", query, skip=skip, limit=limit
         )
 
-        # Build query
-        search_query = select(Company).where(search_filter)
-
-        # Get total count
-        count_query = select(func.count()).select_from(search_query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar_one()
-
-        # Get paginated results
-        search_query = search_query.offset(skip).limit(limit).order_by(Company.ticker)
-        result = await db.execute(search_query)
-        companies = result.scalars().all()
-
-        return list(companies), total
-
     @staticmethod
     async def create(db: AsyncSession, company_data: CompanyCreate) -> Company:
         """
@@ -243,54 +227,34 @@ class CompanyService:
         Returns:
             CompanyWithStats instance or None
         """
-        from app.models import Trade, Insider
+        from app.models import Trade
+        from app.services.trade_rollup_service import TradeRollupService
 
         # Get company
         company = await CompanyService.get_by_id(db, company_id)
         if not company:
             return None
 
-        # Get statistics
-        # Total trades
-        total_trades_result = await db.execute(
-            select(func.count()).where(Trade.company_id == company_id)
-        )
-        total_trades = total_trades_result.scalar_one()
-
-        # Total insiders
-        total_insiders_result = await db.execute(
-            select(func.count(func.distinct(Insider.id)))
-            .join(Trade, Trade.insider_id == Insider.id)
-            .where(Trade.company_id == company_id)
-        )
-        total_insiders = total_insiders_result.scalar_one()
-
-        # Recent buys/sells (last 30 days)
+        # Trade counts come from the daily rollup (recent = last 30 filing days)
         from datetime import date, timedelta
 
         thirty_days_ago = date.today() - timedelta(days=30)
-
-        recent_buys_result = await db.execute(
-            select(func.count())
-            .where(Trade.company_id == company_id)
-            .where(Trade.transaction_date >= thirty_days_ago)
-            .where(Trade.transaction_type == "BUY")
+        activity = await TradeRollupService.get_company_activity(
+            db, company_id, thirty_days_ago
         )
-        recent_buy_count = recent_buys_result.scalar_one()
 
-        recent_sells_result = await db.execute(
-            select(func.count())
+        # Total insiders (distinct across all days, so not rolled up)
+        total_insiders_result = await db.execute(
+            select(func.count(func.distinct(Trade.insider_id)))
             .where(Trade.company_id == company_id)
-            .where(Trade.transaction_date >= thirty_days_ago)
-            .where(Trade.transaction_type == "SELL")
         )
-        recent_sell_count = recent_sells_result.scalar_one()
+        total_insiders = total_insiders_result.scalar_one()
 
         # Create response with stats
         return CompanyWithStats(
             **company.to_dict(),
-            total_trades=total_trades,
+            total_trades=activity["total_trades"],
             total_insiders=total_insiders,
-            recent_buy_count=recent_buy_count,
-            recent_sell_count=recent_sell_count,
+            recent_buy_count=activity["recent_buy_count"],
+            recent_sell_count=activity["recent_sell_count"],
         )
@@ -0,0 +1,450 @@
+"""
+Company snapshot service.
+
+Builds and serves one precomputed document per company with everything the
+company page needs: profile and trade stats, live quote, research scores,
+recent trades and top insiders. Each section carries an as_of stamp so the
+page can show how fresh it is.
+
+Reads are one cache lookup (falling back to one primary-key read of
+company_snapshots). Writes never rebuild inline:
+- Trade, company and research score flushes mark affected snapshots stale in
+  the same transaction; after commit a debounced background task rebuilds
+  them (a stale row is also rebuilt on the next read).
+- The quote section is refreshed in the background once it is older than
+  QUOTE_MAX_AGE_SECONDS, while the current document is served.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import desc, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.serialization import dumps
+from app.database import Flushed, pending_after_commit
+from app.models import (
+    Company,
+    CompanySnapshot,
+    IntrinsicValueTarget,
+    RiskLevelAssessment,
+    Trade,
+    TradeListing,
+    TradeSignalScore,
+)
+from app.schemas.trade import TradeFilter
+from app.services.cache_service import cache_service
+from app.services.data_version_service import RESEARCH_MODELS
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SECTIONS = ("profile", "quote", "scores", "recent_trades", "insiders")
+# Sections built from the database (the quote comes from market data providers)
+STORED_SECTIONS = ("profile", "scores", "recent_trades", "insiders")
+
+# Bounds how long a cached copy can outlive a write made in a process that
+# could not schedule the rebuild itself (e.g. a worker without a running loop)
+SNAPSHOT_CACHE_TTL = 300  # seconds
+QUOTE_MAX_AGE_SECONDS = 60
+REBUILD_DELAY_SECONDS = 2.0
+RECENT_TRADES_LIMIT = 10
+TOP_INSIDERS_LIMIT = 20
+
+# Latest research row per model -> fields copied into the scores section
+_SCORE_SOURCES = {
+    "intrinsic_value": (
+        IntrinsicValueTarget,
+        ("intrinsic_value", "current_price", "discount_premium_pct"),
+    ),
+    "tradesignal_score": (
+        TradeSignalScore,
+        ("score", "rating", "p_ivt_ratio", "discount_premium_pct", "risk_level"),
+    ),
+    "risk_level": (RiskLevelAssessment, ("risk_level", "score")),
+}
+
+# Tickers waiting for a background rebuild -> sections to rebuild
+_pending: Dict[str, Set[str]] = {}
+_drain_task: Optional[asyncio.Task] = None
+
+
+def snapshot_cache_key(ticker: str) -> str:
+    """Cache key for a company snapshot (covered by invalidate_company_cache)."""
+    return f"company:{ticker.upper()}:snapshot"
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert Decimals, dates and models to plain JSON values."""
+    return json.loads(dumps(value))
+
+
+def _section(data: Any) -> Dict[str, Any]:
+    return {"as_of": datetime.utcnow().isoformat(), "data": _jsonable(data)}
+
+
+class CompanySnapshotService:
+    """Service for precomputed company page documents."""
+
+    @staticmethod
+    async def _build_profile(db: AsyncSession, company: Company) -> Dict[str, Any]:
+        from app.services.company_service import CompanyService
+
+        stats = await CompanyService.get_with_stats(db, company.id)
+        return stats.model_dump(mode="json") if stats else company.to_dict()
+
+    @staticmethod
+    async def _build_quote(ticker: str) -> Optional[Dict[str, Any]]:
+        from app.services.stock_price_service import StockPriceService
+
+        # Quote providers are synchronous HTTP clients
+        return await asyncio.to_thread(StockPriceService.get_stock_quote, ticker, True)
+
+    @staticmethod
+    async def _build_scores(db: AsyncSession, ticker: str) -> Dict[str, Any]:
+        scores: Dict[str, Any] = {}
+        for name, (model, fields) in _SCORE_SOURCES.items():
+            result = await db.execute(
+                select(model)
+                .where(model.ticker == ticker)
+                .order_by(desc(model.calculated_at))
+                .limit(1)
+            )
+            row = result.scalar_one_or_none()
+            scores[name] = (
+                {
+                    **{field: getattr(row, field) for field in fields},
+                    "calculated_at": row.calculated_at,
+                }
+                if row
+                else None
+            )
+        return scores
+
+    @staticmethod
+    async def _build_recent_trades(db: AsyncSession, company_id: int) -> list:
+        from app.services.trade_listing_service import TradeListingService
+
+        page = await TradeListingService.get_page(
+            db,
+            limit=RECENT_TRADES_LIMIT,
+            filters=TradeFilter(company_id=company_id),
+            sort_by="filing_date",
+            order="desc",
+            count_mode="none",
+        )
+        return TradeListingService.to_items(page.items)
+
+    @staticmethod
+    async def _build_insiders(db: AsyncSession, company_id: int) -> list:
+        result = await db.execute(
+            select(
+                TradeListing.insider_id,
+                TradeListing.insider_name,
+                TradeListing.insider_title,
+                func.count().label("trade_count"),
+                func.max(TradeListing.filing_date).label("last_filing_date"),
+            )
+            .where(
+                TradeListing.company_id == company_id,
+                TradeListing.insider_id.is_not(None),
+            )
+            .group_by(
+                TradeListing.insider_id,
+                TradeListing.insider_name,
+                TradeListing.insider_title,
+            )
+            .order_by(desc("trade_count"), TradeListing.insider_name)
+            .limit(TOP_INSIDERS_LIMIT)
+        )
+        return [
+            {
+                "id": row.insider_id,
+                "name": row.insider_name,
+                "title": row.insider_title,
+                "trade_count": row.trade_count,
+                "last_filing_date": row.last_filing_date,
+            }
+            for row in result.all()
+        ]
+
+    @staticmethod
+    async def build_document(
+        db: AsyncSession,
+        company: Company,
+        sections: Optional[Iterable[str]] = None,
+        document: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build (or partially rebuild) a snapshot document.
+
+        Args:
+            db: Database session
+            company: Company the snapshot is for
+            sections: Sections to (re)build; all when None
+            document: Existing document whose other sections are kept
+
+        Returns:
+            {"ticker", "company_id", "built_at", "sections": {name: {"as_of", "data"}}}
+        """
+        ticker = company.ticker.upper()
+        wanted = set(sections or SNAPSHOT_SECTIONS)
+        built = dict((document or {}).get("sections", {}))
+
+        if "profile" in wanted:
+            built["profile"] = _section(
+                await CompanySnapshotService._build_profile(db, company)
+            )
+        if "quote" in wanted:
+            try:
+                built["quote"] = _section(await CompanySnapshotService._build_quote(ticker))
+            except Exception as e:
+                # Keep the previous quote (with its old as_of) if providers fail
+                logger.warning(f"Snapshot quote refresh failed for {ticker}: {e}")
+                built.setdefault("quote", _section(None))
+        if "scores" in wanted:
+            built["scores"] = _section(
+                await CompanySnapshotService._build_scores(db, ticker)
+            )
+        if "recent_trades" in wanted:
+            built["recent_trades"] = _section(
+                await CompanySnapshotService._build_recent_trades(db, company.id)
+            )
+        if "insiders" in wanted:
+            built["insiders"] = _section(
+                await CompanySnapshotService._build_insiders(db, company.id)
+            )
+
+        return {
+            "ticker": ticker,
+            "company_id": company.id,
+            "built_at": datetime.utcnow().isoformat(),
+            "sections": {name: built[name] for name in SNAPSHOT_SECTIONS if name in built},
+        }
+
+    @staticmethod
+    async def _save(
+        db: AsyncSession, company: Company, document: Dict[str, Any], complete: bool
+    ) -> None:
+        """
+        Upsert the snapshot row, commit, and refresh the cached copy.
+
+        Args:
+            db: Database session
+            company: Company the snapshot is for
+            document: Snapshot document
+            complete: Whether every stored section was rebuilt. Only then is
+                the row marked fresh; a partial rebuild keeps its stale flag
+                (and a stale document is not cached).
+        """
+        dialect = db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        values = {
+            "company_id": company.id,
+            "ticker": document["ticker"],
+            "document": document,
+            "stale": not complete,
+            "built_at": datetime.utcnow(),
+        }
+        updated = [key for key in values if key != "company_id" and (complete or key != "stale")]
+        stmt = insert(CompanySnapshot).values(**values)
+        result = await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["company_id"],
+                set_={key: stmt.excluded[key] for key in updated},
+            ).returning(CompanySnapshot.stale)
+        )
+        stale = result.scalar_one()
+        await db.commit()
+        if not stale:
+            await cache_service.set(
+                snapshot_cache_key(document["ticker"]), document, ttl=SNAPSHOT_CACHE_TTL
+            )
+
+    @staticmethod
+    async def rebuild(
+        db: AsyncSession, ticker: str, sections: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild a company's snapshot (all sections, or only the given ones).
+
+        Args:
+            db: Database session
+            ticker: Company ticker
+            sections: Sections to rebuild; all when None
+
+        Returns:
+            The new document, or None if the company does not exist
+        """
+        result = await db.execute(
+            select(Company).where(func.upper(Company.ticker) == ticker.upper())
+        )
+        company = result.scalar_one_or_none()
+        if not company:
+            return None
+
+        existing = None
+        if sections is not None:
+            row = await db.get(CompanySnapshot, company.id)
+            existing = row.document if row else None
+
+        document = await CompanySnapshotService.build_document(
+            db, company, sections, existing
+        )
+        complete = sections is None or set(STORED_SECTIONS) <= set(sections)
+        await CompanySnapshotService._save(db, company, document, complete)
+        logger.info(f"Rebuilt company snapshot for {company.ticker}")
+        return document
+
+    @staticmethod
+    async def get(db: AsyncSession, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a company's snapshot document.
+
+        Served from the cache, else from company_snapshots; built on first
+        request or when the stored row is stale. A quote older than
+        QUOTE_MAX_AGE_SECONDS is refreshed in the background.
+
+        Args:
+            db: Database session (primary; a miss writes the snapshot)
+            ticker: Company ticker
+
+        Returns:
+            Snapshot document, or None if the company does not exist
+        """
+        ticker = ticker.upper()
+        document = await cache_service.get(snapshot_cache_key(ticker))
+
+        if document is None:
+            result = await db.execute(
+                select(CompanySnapshot.document, CompanySnapshot.stale).where(
+                    CompanySnapshot.ticker == ticker
+                )
+            )
+            row = result.one_or_none()
+            if row is not None and not row.stale:
+                document = row.document
+                await cache_service.set(
+                    snapshot_cache_key(ticker), document, ttl=SNAPSHOT_CACHE_TTL
+                )
+            else:
+                # Build the stored sections now; the quote follows in the background
+                document = await CompanySnapshotService.rebuild(db, ticker, STORED_SECTIONS)
+                if document is None:
+                    return None
+
+        quote = document.get("sections", {}).get("quote")
+        if quote is None or CompanySnapshotService._age_seconds(quote) > QUOTE_MAX_AGE_SECONDS:
+            schedule_rebuild([ticker], ["quote"])
+        return document
+
+    @staticmethod
+    def _age_seconds(section: Dict[str, Any]) -> float:
+        try:
+            as_of = datetime.fromisoformat(section["as_of"])
+        except (KeyError, TypeError, ValueError):
+            return float("inf")
+        return (datetime.utcnow() - as_of).total_seconds()
+
+    @staticmethod
+    async def rebuild_pending() -> int:
+        """
+        Rebuild every snapshot queued by schedule_rebuild.
+
+        Returns:
+            Number of snapshots rebuilt
+        """
+        from app.database import db_manager
+
+        batch = dict(_pending)
+        _pending.clear()
+        rebuilt = 0
+        for ticker, sections in batch.items():
+            try:
+                async with db_manager.get_session() as session:
+                    if await CompanySnapshotService.rebuild(session, ticker, sections):
+                        rebuilt += 1
+            except Exception as e:
+                logger.warning(f"Company snapshot rebuild failed for {ticker}: {e}")
+        return rebuilt
+
+
+async def _drain() -> None:
+    """Debounce queued rebuilds, then run them."""
+    global _drain_task
+    try:
+        while _pending:
+            await asyncio.sleep(REBUILD_DELAY_SECONDS)
+            await CompanySnapshotService.rebuild_pending()
+    finally:
+        _drain_task = None
+
+
+def schedule_rebuild(
+    tickers: Iterable[str], sections: Iterable[str] = STORED_SECTIONS
+) -> None:
+    """
+    Queue background snapshot rebuilds (coalesced per ticker).
+
+    Outside a running event loop this is a no-op; stale rows are still
+    rebuilt on their next read.
+    """
+    global _drain_task
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    for ticker in tickers:
+        _pending.setdefault(ticker.upper(), set()).update(sections)
+    if _pending and _drain_task is None:
+        _drain_task = loop.create_task(_drain())
+
+
+def _mark_stale_after_flush(session: Session, flushed: Flushed) -> Set[str]:
+    """Flag snapshots whose trades, company row or research scores changed."""
+    company_ids = set()
+    tickers = set()
+    for obj in (*flushed.new, *flushed.dirty, *flushed.deleted):
+        if isinstance(obj, Trade):
+            if obj.company_id is not None:
+                company_ids.add(obj.company_id)
+        elif isinstance(obj, Company):
+            if obj.id is not None:
+                company_ids.add(obj.id)
+        elif obj.ticker:
+            tickers.add(obj.ticker.upper())
+    if not (company_ids or tickers):
+        return set()
+
+    conditions = []
+    if company_ids:
+        conditions.append(CompanySnapshot.company_id.in_(sorted(company_ids)))
+    if tickers:
+        conditions.append(CompanySnapshot.ticker.in_(sorted(tickers)))
+    result = session.connection().execute(
+        update(CompanySnapshot)
+        .where(or_(*conditions))
+        .values(stale=True)
+        .returning(CompanySnapshot.ticker)
+    )
+    return set(result.scalars().all())
+
+
+def _rebuild_after_commit(session: Session, tickers: List[str]) -> None:
+    stale = set(tickers)
+    # Drop in-process copies; a Redis copy is served until the rebuild replaces it
+    cache_service.forget(*(snapshot_cache_key(ticker) for ticker in stale))
+    schedule_rebuild(stale)
+
+
+pending_after_commit(
+    "stale_company_snapshots",
+    _rebuild_after_commit,
+    models=(Trade, Company, *RESEARCH_MODELS),
+    collect=_mark_stale_after_flush,
+)
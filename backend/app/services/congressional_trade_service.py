@@ -9,10 +9,12 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import and_, case, func, or_, select, desc
 from sqlalchemy.orm import selectinload
 
 from app.models import CongressionalTrade, Congressperson
+from app.models.congressional_trade import TransactionType
+from app.utils.pagination import KeysetPage, make_count_cache_key, paginate_keyset
 from app.schemas.congressional_trade import (
     CongressionalTradeFilter,
     CongressionalTradeStats,
@@ -45,8 +47,38 @@ class CongressionalTradeService:
         filters: Optional[CongressionalTradeFilter] = None,
         sort_by: str = "transaction_date",
         order: str = "desc",
-    ) -> tuple[List[CongressionalTrade], int]:
+        count_mode: str = "exact",
+    ) -> tuple[List[CongressionalTrade], Optional[int]]:
         """Get all congressional trades with filtering and pagination."""
+        page = await CongressionalTradeService.get_page(
+            db,
+            skip=skip,
+            limit=limit,
+            filters=filters,
+            sort_by=sort_by,
+            order=order,
+            count_mode=count_mode,
+        )
+        return page.items, page.total
+
+    @staticmethod
+    async def get_page(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 50,
+        filters: Optional[CongressionalTradeFilter] = None,
+        sort_by: str = "transaction_date",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        page: int = 1,
+        count_mode: str = "cached",
+    ) -> KeysetPage[CongressionalTrade]:
+        """
+        Get one page of congressional trades using keyset (cursor) pagination.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or for another sort
+        """
         # Build base query
         query = select(CongressionalTrade).options(
             selectinload(CongressionalTrade.company),
@@ -57,28 +89,20 @@ class CongressionalTradeService:
         if filters:
             query = CongressionalTradeService._apply_filters(query, filters)
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar_one()
-
-        # Apply sorting
-        sort_column = getattr(
-            CongressionalTrade, sort_by, CongressionalTrade.transaction_date
+        return await paginate_keyset(
+            db,
+            query,
+            CongressionalTrade,
+            sort_by=sort_by,
+            default_sort="transaction_date",
+            order=order,
+            limit=limit,
+            skip=skip,
+            page=page,
+            cursor=cursor,
+            count_mode=count_mode,
+            count_cache_key=make_count_cache_key("congressional_trades", filters),
         )
-        if order == "desc":
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(sort_column)
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-
-        # Execute query
-        result = await db.execute(query)
-        trades = result.scalars().all()
-
-        return list(trades), total
 
     @staticmethod
     def _apply_filters(query, filters: CongressionalTradeFilter):
@@ -164,122 +188,143 @@ class CongressionalTradeService:
         return list(result.scalars().all())
 
     @staticmethod
-    async def get_trade_stats(
-        db: AsyncSession, filters: Optional[CongressionalTradeFilter] = None
-    ) -> CongressionalTradeStats:
-        """Calculate aggregate statistics for congressional trades."""
-        # Build base query with eager loading
-        query = select(CongressionalTrade).options(
-            selectinload(CongressionalTrade.congressperson)
+    def _estimated_value():
+        """SQL form of CongressionalTrade.estimated_value (NULL when unknown)."""
+        return case(
+            (
+                and_(
+                    CongressionalTrade.amount_estimated.is_not(None),
+                    CongressionalTrade.amount_estimated != 0,
+                ),
+                CongressionalTrade.amount_estimated,
+            ),
+            else_=(CongressionalTrade.amount_min + CongressionalTrade.amount_max) / 2,
         )
 
-        # Apply filters
+    @staticmethod
+    def build_stats_query(filters: Optional[CongressionalTradeFilter] = None):
+        """
+        Build the single-pass statistics query.
+
+        Conditional aggregates over the filtered trades (joined once to the
+        congressperson for chamber/party) compute every count and value;
+        ranking windows pick the most active congressperson and ticker.
+
+        Args:
+            filters: Optional filters
+
+        Returns:
+            SQLAlchemy select producing one statistics row
+        """
+        query = select(
+            CongressionalTrade.id,
+            CongressionalTrade.congressperson_id,
+            CongressionalTrade.ticker,
+            CongressionalTrade.transaction_type,
+            CongressionalTradeService._estimated_value().label("value"),
+        )
         if filters:
             query = CongressionalTradeService._apply_filters(query, filters)
-
-        # Execute query
-        result = await db.execute(query)
-        trades = result.scalars().all()
-
-        if not trades:
-            return CongressionalTradeStats()
-
-        # Calculate statistics
-        total_trades = len(trades)
-        buys = [t for t in trades if t.is_buy]
-        sells = [t for t in trades if t.is_sell]
-
-        # Calculate values
-        buy_values = [float(t.estimated_value) for t in buys if t.estimated_value]
-        sell_values = [float(t.estimated_value) for t in sells if t.estimated_value]
-
-        total_buy_value = sum(buy_values) if buy_values else 0.0
-        total_sell_value = sum(sell_values) if sell_values else 0.0
-
-        all_values = buy_values + sell_values
-        average_trade_size = sum(all_values) / len(all_values) if all_values else 0.0
-        largest_trade = max(all_values) if all_values else None
-
-        # Most active congressperson
-        most_active = None
-        if trades:
-            from collections import Counter
-
-            congressperson_counts = Counter([t.congressperson_id for t in trades])
-            if congressperson_counts:
-                most_active_id = congressperson_counts.most_common(1)[0][0]
-                most_active_trade = next(
-                    (t for t in trades if t.congressperson_id == most_active_id), None
-                )
-                if most_active_trade and most_active_trade.congressperson:
-                    most_active = most_active_trade.congressperson.name
-
-        # Most active company
-        most_active_company = None
-        if trades:
-            from collections import Counter
-
-            company_counts = Counter([t.ticker for t in trades if t.ticker])
-            if company_counts:
-                most_active_company = company_counts.most_common(1)[0][0]
-
-        # Chamber breakdown
-        house_trades = [
-            t
-            for t in trades
-            if t.congressperson and t.congressperson.chamber == "HOUSE"
-        ]
-        senate_trades = [
-            t
-            for t in trades
-            if t.congressperson and t.congressperson.chamber == "SENATE"
-        ]
-
-        # Party breakdown
-        democrat_buys = len(
-            [
-                t
-                for t in buys
-                if t.congressperson and t.congressperson.party == "DEMOCRAT"
-            ]
+        filtered = query.cte("filtered_congressional_trades")
+
+        is_buy = filtered.c.transaction_type == TransactionType.BUY.value
+        is_sell = filtered.c.transaction_type == TransactionType.SELL.value
+        # Python truthiness of estimated_value: NULL and 0 are skipped
+        valued = and_(or_(is_buy, is_sell), filtered.c.value != 0)
+        democrat = Congressperson.party == "DEMOCRAT"
+        republican = Congressperson.party == "REPUBLICAN"
+
+        totals = (
+            select(
+                func.count().label("total_trades"),
+                func.count().filter(is_buy).label("total_buys"),
+                func.count().filter(is_sell).label("total_sells"),
+                func.sum(filtered.c.value).filter(is_buy, valued).label("buy_value"),
+                func.sum(filtered.c.value).filter(is_sell, valued).label("sell_value"),
+                func.avg(filtered.c.value).filter(valued).label("average_value"),
+                func.max(filtered.c.value).filter(valued).label("largest_value"),
+                func.count().filter(Congressperson.chamber == "HOUSE").label("house_count"),
+                func.count().filter(Congressperson.chamber == "SENATE").label("senate_count"),
+                func.count().filter(is_buy, democrat).label("democrat_buys"),
+                func.count().filter(is_sell, democrat).label("democrat_sells"),
+                func.count().filter(is_buy, republican).label("republican_buys"),
+                func.count().filter(is_sell, republican).label("republican_sells"),
+            )
+            .select_from(filtered)
+            .outerjoin(Congressperson, Congressperson.id == filtered.c.congressperson_id)
+            .cte("totals")
         )
-        democrat_sells = len(
-            [
-                t
-                for t in sells
-                if t.congressperson and t.congressperson.party == "DEMOCRAT"
-            ]
+
+        member_counts = (
+            select(
+                Congressperson.name.label("name"),
+                func.row_number()
+                .over(order_by=(desc(func.count()), Congressperson.name))
+                .label("rank"),
+            )
+            .select_from(filtered)
+            .join(Congressperson, Congressperson.id == filtered.c.congressperson_id)
+            .group_by(Congressperson.id, Congressperson.name)
+            .subquery("member_counts")
         )
-        republican_buys = len(
-            [
-                t
-                for t in buys
-                if t.congressperson and t.congressperson.party == "REPUBLICAN"
-            ]
+        ticker_counts = (
+            select(
+                filtered.c.ticker.label("ticker"),
+                func.row_number()
+                .over(order_by=(desc(func.count()), filtered.c.ticker))
+                .label("rank"),
+            )
+            .where(filtered.c.ticker.is_not(None))
+            .group_by(filtered.c.ticker)
+            .subquery("ticker_counts")
         )
-        republican_sells = len(
-            [
-                t
-                for t in sells
-                if t.congressperson and t.congressperson.party == "REPUBLICAN"
-            ]
+
+        return select(
+            totals,
+            select(member_counts.c.name)
+            .where(member_counts.c.rank == 1)
+            .scalar_subquery()
+            .label("most_active_congressperson"),
+            select(ticker_counts.c.ticker)
+            .where(ticker_counts.c.rank == 1)
+            .scalar_subquery()
+            .label("most_active_company"),
         )
 
+    @staticmethod
+    async def get_trade_stats(
+        db: AsyncSession, filters: Optional[CongressionalTradeFilter] = None
+    ) -> CongressionalTradeStats:
+        """
+        Calculate aggregate statistics for congressional trades.
+
+        Runs a single aggregate query (see build_stats_query); no trade rows
+        are loaded.
+        """
+        result = await db.execute(CongressionalTradeService.build_stats_query(filters))
+        row = result.one()
+
+        if not row.total_trades:
+            return CongressionalTradeStats()
+
+        total_buy_value = float(row.buy_value or 0.0)
+        total_sell_value = float(row.sell_value or 0.0)
+
         return CongressionalTradeStats(
-            total_trades=total_trades,
-            total_buys=len(buys),
-            total_sells=len(sells),
+            total_trades=row.total_trades,
+            total_buys=row.total_buys,
+            total_sells=row.total_sells,
             total_value=total_buy_value - total_sell_value,
             total_buy_value=total_buy_value,
             total_sell_value=total_sell_value,
-            average_trade_size=average_trade_size,
-            largest_trade=largest_trade,
-            most_active_congressperson=most_active,
-            most_active_company=most_active_company,
-            house_trade_count=len(house_trades),
-            senate_trade_count=len(senate_trades),
-            democrat_buy_count=democrat_buys,
-            democrat_sell_count=democrat_sells,
-            republican_buy_count=republican_buys,
-            republican_sell_count=republican_sells,
+            average_trade_size=float(row.average_value) if row.average_value else 0.0,
+            largest_trade=float(row.largest_value) if row.largest_value else None,
+            most_active_congressperson=row.most_active_congressperson,
+            most_active_company=row.most_active_company,
+            house_trade_count=row.house_count,
+            senate_trade_count=row.senate_count,
+            democrat_buy_count=row.democrat_buys,
+            democrat_sell_count=row.democrat_sells,
+            republican_buy_count=row.republican_buys,
+            republican_sell_count=row.republican_sells,
         )
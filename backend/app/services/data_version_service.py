@@ -0,0 +1,173 @@
+"""
+Data version service.
+
+Tracks a monotonic version per data scope (all trades, one company's trades)
+and reads the version stamps that HTTP validators are built from. Writers bump
+scopes inside the same transaction as the change, so a committed change always
+comes with a new version.
+
+Trade scopes are bumped by session hooks: flushes that touch trades collect
+their scopes, and one bump runs just before the transaction commits. Every
+trade write is covered, and the row locks on data_versions (the "trades"
+row is shared by all writers) are held only for the commit itself.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import Flushed, pending_after_commit
+from app.models import DataVersion, Trade
+from app.models.intrinsic_value import IntrinsicValueTarget
+from app.models.tradesignal_score import TradeSignalScore
+from app.models.risk_level import RiskLevelAssessment
+from app.models.competitive_strength import CompetitiveStrengthRating
+from app.models.management_score import ManagementScore
+
+logger = logging.getLogger(__name__)
+
+TRADES_SCOPE = "trades"
+
+# Research tables whose latest calculated_at versions a ticker's research data
+RESEARCH_MODELS = (
+    IntrinsicValueTarget,
+    TradeSignalScore,
+    RiskLevelAssessment,
+    CompetitiveStrengthRating,
+    ManagementScore,
+)
+
+# (version, updated_at)
+VersionStamp = Tuple[int, Optional[datetime]]
+
+
+def company_trades_scope(company_id: int) -> str:
+    """Scope name for one company's trades."""
+    return f"{TRADES_SCOPE}:company:{company_id}"
+
+
+def _bump_statement(dialect: str, scope_list: Sequence[str]):
+    """Upsert that increments each scope (sorted, so concurrent bumps lock rows in one order)."""
+    now = datetime.utcnow()
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(DataVersion).values(
+        [{"scope": scope, "version": 1, "updated_at": now} for scope in scope_list]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["scope"],
+        set_={
+            "version": DataVersion.version + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+
+class DataVersionService:
+    """Service for per-scope data versions."""
+
+    @staticmethod
+    async def bump(db: AsyncSession, scopes: Iterable[str]) -> None:
+        """
+        Increment the version of each scope (creating it on first use).
+
+        Does not commit; call inside the transaction that changed the data.
+
+        Args:
+            db: Database session
+            scopes: Scope names to bump
+        """
+        scope_list = sorted(set(scopes))
+        if not scope_list:
+            return
+        await db.execute(_bump_statement(db.get_bind().dialect.name, scope_list))
+
+    @staticmethod
+    async def get_versions(
+        db: AsyncSession, scopes: Sequence[str]
+    ) -> Dict[str, VersionStamp]:
+        """
+        Get the current version of each scope in one query.
+
+        Args:
+            db: Database session
+            scopes: Scope names
+
+        Returns:
+            Dict of scope -> (version, updated_at); unknown scopes are (0, None)
+        """
+        result = await db.execute(
+            select(DataVersion.scope, DataVersion.version, DataVersion.updated_at)
+            .where(DataVersion.scope.in_(list(scopes)))
+        )
+        versions: Dict[str, VersionStamp] = {scope: (0, None) for scope in scopes}
+        for scope, version, updated_at in result.all():
+            versions[scope] = (version, updated_at)
+        return versions
+
+    @staticmethod
+    async def get_research_versions(
+        db: AsyncSession, tickers: Sequence[str]
+    ) -> Dict[str, Tuple[Optional[datetime], ...]]:
+        """
+        Get the latest calculated_at per research table for each ticker.
+
+        Every research table has a (ticker, calculated_at) index, so each
+        lookup is an index-only max. All lookups run as one statement.
+
+        Args:
+            db: Database session
+            tickers: Upper-case tickers
+
+        Returns:
+            Dict of ticker -> tuple of datetimes (None where no data)
+        """
+        if not tickers:
+            return {}
+
+        columns = []
+        for ticker in tickers:
+            for model in RESEARCH_MODELS:
+                columns.append(
+                    select(func.max(model.calculated_at))
+                    .where(model.ticker == ticker)
+                    .scalar_subquery()
+                )
+        result = await db.execute(select(*columns))
+        row = result.one()
+
+        width = len(RESEARCH_MODELS)
+        return {
+            ticker: tuple(row[i * width:(i + 1) * width])
+            for i, ticker in enumerate(tickers)
+        }
+
+
+def _collect_trade_scopes_after_flush(session: Session, flushed: Flushed) -> Set[str]:
+    """Remember the trade scopes changed by this flush (bumped before commit)."""
+    scopes = {TRADES_SCOPE}
+    for obj in (*flushed.new, *flushed.dirty, *flushed.deleted):
+        # A trade moved to another company changes both companies' trades
+        history = inspect(obj).attrs.company_id.history
+        for company_id in (obj.company_id, *history.deleted):
+            if company_id is not None:
+                scopes.add(company_trades_scope(company_id))
+    return scopes
+
+
+def _bump_before_commit(session: Session, scopes: List[str]) -> None:
+    connection = session.connection()
+    connection.execute(_bump_statement(connection.dialect.name, sorted(set(scopes))))
+
+
+pending_after_commit(
+    "data_version_scopes",
+    _bump_before_commit,
+    models=(Trade,),
+    collect=_collect_trade_scopes_after_flush,
+    before_commit=True,
+)
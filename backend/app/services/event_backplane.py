@@ -0,0 +1,438 @@
+"""
+Event backplane for the WebSocket streams.
+
+Trade and alert events are published once to a channel and every API worker
+fans them out to its own sockets, so an event raised in one worker (or in a
+scraper process with no sockets at all) reaches clients connected anywhere.
+
+Transports:
+- memory: handlers in this process only (single worker, tests)
+- redis: Redis pub/sub on REDIS_URL
+- postgres: LISTEN/NOTIFY on the application database
+
+EVENT_BACKPLANE selects one of these, or auto: redis when REDIS_URL is set
+and the redis package is installed, else memory. postgres is never picked
+automatically: LISTEN needs a session-level connection, and through a
+transaction-mode pooler (e.g. the Supabase pooler) notifications are never
+delivered, so set EVENT_BACKPLANE=postgres only with a direct connection.
+
+Publishing only needs the transport. start() opens the listener that
+delivers events, this process's own included, to the handlers registered
+with subscribe(); it reconnects with backoff if the transport drops. When a
+publish fails the event is delivered locally, so this worker's clients still
+see it.
+
+Events can carry a sequence number shared by all workers, so a client can
+resume a stream on any worker (see TradeEventManager). Published with
+retain=N, the last N sequenced events are also kept in the transport (a
+Redis sorted set or the event_replay table, keyed by seq) for replay(), so
+resuming survives restarts and does not depend on which worker a client
+reconnects to. The memory backplane has no shared buffer; replay() returns
+None and callers keep their own.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+TRADE_EVENTS = "trade_events"
+ALERT_EVENTS = "alert_events"
+CACHE_EVENTS = "cache_events"
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7999
+KEEPALIVE_SECONDS = 30
+MAX_RECONNECT_DELAY = 30
+
+Handler = Callable[[dict], Awaitable[Any]]
+Deliver = Callable[[str, Union[str, bytes]], Awaitable[None]]
+
+
+class Replay(NamedTuple):
+    """Retained events newer than a sequence number."""
+
+    complete: bool  # False if some of them were already dropped from the buffer
+    payloads: List[str]
+    latest_seq: Optional[int]
+
+
+def _text(value: Union[str, bytes]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisTransport:
+    """Redis pub/sub."""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        self._url = url
+        self._client = None
+
+    async def _redis(self):
+        if self._client is None:
+            self._client = aioredis.from_url(self._url)
+        return self._client
+
+    async def next_sequence(self, channel: str, count: int) -> List[int]:
+        client = await self._redis()
+        last = await client.incrby(f"{channel}:seq", count)
+        return list(range(last - count + 1, last + 1))
+
+    async def send(self, channel: str, payloads: Sequence[str]) -> None:
+        client = await self._redis()
+        async with client.pipeline(transaction=False) as pipe:
+            for payload in payloads:
+                pipe.publish(channel, payload)
+            await pipe.execute()
+
+    async def retain(self, channel: str, entries: Sequence[Tuple[int, str]], size: int) -> None:
+        client = await self._redis()
+        key = f"{channel}:replay"
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {payload: seq for seq, payload in entries})
+            pipe.zremrangebyrank(key, 0, -size - 1)
+            await pipe.execute()
+
+    async def replay(self, channel: str, since: Optional[int]) -> Replay:
+        client = await self._redis()
+        key = f"{channel}:replay"
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.zrange(key, 0, 0, withscores=True)
+            pipe.zrange(key, -1, -1, withscores=True)
+            if since is not None:
+                pipe.zrangebyscore(key, f"({since}", "+inf")
+            oldest, newest, *payloads = await pipe.execute()
+        if not newest:
+            return Replay(False, [], None)
+        if since is None or since < int(oldest[0][1]) - 1:
+            return Replay(False, [], int(newest[0][1]))
+        return Replay(True, [_text(payload) for payload in payloads[0]], int(newest[0][1]))
+
+    async def listen(self, channels: Iterable[str], deliver: Deliver) -> None:
+        client = await self._redis()
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(*channels)
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    await deliver(_text(item["channel"]), item["data"])
+        finally:
+            await pubsub.close()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            try:
+                await self._client.close()
+            finally:
+                self._client = None
+
+
+_NOTIFY = text("SELECT pg_notify(:channel, :payload)")
+_CREATE_REPLAY_TABLE = text(
+    "CREATE TABLE IF NOT EXISTS event_replay ("
+    "channel TEXT NOT NULL, seq BIGINT NOT NULL, payload TEXT NOT NULL, "
+    "PRIMARY KEY (channel, seq))"
+)
+_RETAIN = text(
+    "INSERT INTO event_replay (channel, seq, payload) VALUES (:channel, :seq, :payload) "
+    "ON CONFLICT DO NOTHING"
+)
+_TRIM = text(
+    "DELETE FROM event_replay WHERE channel = :channel AND seq <= ("
+    "SELECT seq FROM event_replay WHERE channel = :channel ORDER BY seq DESC OFFSET :size LIMIT 1)"
+)
+_REPLAY_BOUNDS = text("SELECT min(seq), max(seq) FROM event_replay WHERE channel = :channel")
+_REPLAY = text("SELECT payload FROM event_replay WHERE channel = :channel AND seq > :since ORDER BY seq")
+
+
+class PostgresTransport:
+    """LISTEN/NOTIFY on the application database."""
+
+    name = "postgres"
+
+    def __init__(self):
+        self._sequences: Set[str] = set()
+        self._replay_table = False
+
+    async def next_sequence(self, channel: str, count: int) -> List[int]:
+        from app.database import db_manager
+
+        # Channel names are module constants, safe to use as identifiers
+        async with db_manager.get_engine().begin() as conn:
+            if channel not in self._sequences:
+                await conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {channel}_seq"))
+                self._sequences.add(channel)
+            result = await conn.execute(
+                text(f"SELECT nextval('{channel}_seq') FROM generate_series(1, :count)"), {"count": count}
+            )
+            return sorted(row[0] for row in result)
+
+    async def send(self, channel: str, payloads: Sequence[str]) -> None:
+        for payload in payloads:
+            size = len(payload.encode())
+            if size > NOTIFY_MAX_BYTES:
+                raise ValueError(f"payload of {size} bytes is over the NOTIFY limit")
+        from app.database import db_manager
+
+        # One connection for the batch; notifications are delivered on commit
+        async with db_manager.get_engine().begin() as conn:
+            for payload in payloads:
+                await conn.execute(_NOTIFY, {"channel": channel, "payload": payload})
+
+    async def _ensure_replay_table(self, conn) -> None:
+        if not self._replay_table:
+            await conn.execute(_CREATE_REPLAY_TABLE)
+            self._replay_table = True
+
+    async def retain(self, channel: str, entries: Sequence[Tuple[int, str]], size: int) -> None:
+        from app.database import db_manager
+
+        async with db_manager.get_engine().begin() as conn:
+            await self._ensure_replay_table(conn)
+            await conn.execute(
+                _RETAIN, [{"channel": channel, "seq": seq, "payload": payload} for seq, payload in entries]
+            )
+            await conn.execute(_TRIM, {"channel": channel, "size": size})
+
+    async def replay(self, channel: str, since: Optional[int]) -> Replay:
+        from app.database import db_manager
+
+        async with db_manager.get_engine().begin() as conn:
+            await self._ensure_replay_table(conn)
+            oldest, newest = (await conn.execute(_REPLAY_BOUNDS, {"channel": channel})).one()
+            if newest is None:
+                return Replay(False, [], None)
+            if since is None or since < oldest - 1:
+                return Replay(False, [], newest)
+            result = await conn.execute(_REPLAY, {"channel": channel, "since": since})
+            return Replay(True, list(result.scalars().all()), newest)
+
+    async def listen(self, channels: Iterable[str], deliver: Deliver) -> None:
+        from app.database import db_manager
+
+        received: asyncio.Queue = asyncio.Queue()
+
+        def on_notify(connection, pid, channel, payload):
+            received.put_nowait((channel, payload))
+
+        # One pooled connection is held for the life of the listener
+        async with db_manager.get_engine().connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            for channel in channels:
+                await driver.add_listener(channel, on_notify)
+            while True:
+                try:
+                    async with asyncio.timeout(KEEPALIVE_SECONDS):
+                        channel, payload = await received.get()
+                except TimeoutError:
+                    # Idle: make sure the connection is still alive
+                    await driver.execute("SELECT 1")
+                    continue
+                await deliver(channel, payload)
+
+    async def close(self) -> None:
+        return None
+
+
+def _create_transport():
+    backend = settings.event_backplane.lower()
+    if backend == "auto":
+        backend = "redis" if settings.redis_url and REDIS_AVAILABLE else "memory"
+
+    if backend == "redis":
+        if REDIS_AVAILABLE and settings.redis_url:
+            return RedisTransport(settings.redis_url)
+        logger.warning("Redis event backplane requested but unavailable, using in-process delivery")
+    elif backend == "postgres":
+        return PostgresTransport()
+    return None
+
+
+class EventBackplane:
+    """Publishes events to every worker and delivers them to local handlers."""
+
+    def __init__(self, transport=None):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        # Without an explicit transport, EVENT_BACKPLANE picks one on first use
+        self._transport = transport
+        self._transport_ready = transport is not None
+        self._listener: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self._counters: Dict[str, itertools.count] = {}
+
+    @property
+    def transport(self):
+        """The configured transport, or None for in-process delivery (created on first use)."""
+        if not self._transport_ready:
+            self._transport = _create_transport()
+            self._transport_ready = True
+        return self._transport
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        """
+        Deliver events on a channel to handler (an async callable taking the event).
+
+        Register handlers before start(); the listener subscribes to the
+        channels known at that point.
+        """
+        if handler not in self._handlers[channel]:
+            self._handlers[channel].append(handler)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        """Publish an event to every worker's handlers."""
+        await self.publish_many(channel, [message])
+
+    async def publish_many(
+        self, channel: str, messages: Sequence[dict], sequenced: bool = False, retain: int = 0
+    ) -> None:
+        """
+        Publish several events in one round trip to the transport.
+
+        With sequenced=True each message gets a "seq": numbers shared by all
+        workers (from Redis or a PostgreSQL sequence) that increase with
+        publish order. If numbering fails the events go out without one.
+        With retain=N the transport also keeps the last N numbered events of
+        the channel for replay().
+        """
+        if not messages:
+            return
+        transport = self.transport
+        if sequenced:
+            await self._number(channel, messages)
+        if transport is not None:
+            payloads = [dumps(message, lenient=True).decode() for message in messages]
+            entries = [
+                (message["seq"], payload)
+                for message, payload in zip(messages, payloads)
+                if isinstance(message.get("seq"), int)
+            ]
+            if retain > 0 and entries:
+                # Retained before sending, so a resuming client never misses a delivered event
+                try:
+                    await transport.retain(channel, entries, retain)
+                except Exception as e:
+                    logger.warning(f"Could not retain {channel} events for replay: {e}")
+            try:
+                await transport.send(channel, payloads)
+                return
+            except Exception as e:
+                logger.warning(f"Event backplane publish on {channel} failed, delivering locally only: {e}")
+        for message in messages:
+            await self.dispatch(channel, message)
+
+    async def _number(self, channel: str, messages: Sequence[dict]) -> None:
+        transport = self.transport
+        if transport is None:
+            counter = self._counters.get(channel)
+            if counter is None:
+                # Start from the clock so numbers keep increasing across restarts
+                counter = self._counters[channel] = itertools.count(int(time.time() * 1000))
+            numbers = [next(counter) for _ in messages]
+        else:
+            try:
+                numbers = await transport.next_sequence(channel, len(messages))
+            except Exception as e:
+                logger.warning(f"Event sequence for {channel} unavailable: {e}")
+                return
+        for message, number in zip(messages, numbers):
+            message["seq"] = number
+
+    async def replay(self, channel: str, since: Optional[int]) -> Optional[Replay]:
+        """
+        Events retained by the transport after since (since=None: just the latest seq).
+
+        Returns:
+            Replay, or None for in-process delivery, which has no shared buffer
+        """
+        transport = self.transport
+        if transport is None:
+            return None
+        try:
+            return await transport.replay(channel, since)
+        except Exception as e:
+            logger.warning(f"Event replay for {channel} unavailable: {e}")
+            return Replay(False, [], None)
+
+    def publish_soon(self, channel: str, *messages: dict) -> None:
+        """Publish from synchronous code (e.g. session hooks) without waiting."""
+        try:
+            task = asyncio.get_running_loop().create_task(self.publish_many(channel, messages))
+        except RuntimeError:
+            logger.debug(f"No event loop, dropping {channel} event")
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def dispatch(self, channel: str, message: Union[dict, str, bytes]) -> None:
+        """Hand an event to this process's handlers."""
+        if not isinstance(message, dict):
+            try:
+                message = json.loads(message)
+            except ValueError:
+                logger.warning(f"Ignoring malformed {channel} event")
+                return
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"Event handler for {channel} failed: {e}")
+
+    async def start(self) -> None:
+        """Start receiving events from other workers (no-op for in-process delivery)."""
+        if self._listener is not None or self.transport is None:
+            return
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"Event backplane listening via {self.transport.name}")
+
+    async def stop(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._transport is not None:
+            await self._transport.close()
+
+    def reset(self) -> None:
+        """Re-read the backend setting on next use (tests)."""
+        self._transport = None
+        self._transport_ready = False
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        delay = 1
+        while True:
+            started = loop.time()
+            try:
+                await self.transport.listen(list(self._handlers), self.dispatch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event backplane listener lost ({e}), reconnecting")
+            # Back off only while reconnects keep failing
+            delay = 1 if loop.time() - started > MAX_RECONNECT_DELAY else min(delay * 2, MAX_RECONNECT_DELAY)
+            await asyncio.sleep(delay)
+
+
+event_backplane = EventBackplane()
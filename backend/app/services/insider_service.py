@@ -12,6 +12,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models import Insider
 from app.schemas.insider import InsiderCreate, InsiderUpdate
+from app.services.search_service import SearchService
 
 logger = logging.getLogger(__name__)
 
@@ -101,9 +102,9 @@ class InsiderService:
     @staticmethod
     async def search(
         db: AsyncSession, query: str, skip: int = 0, limit: int = 20
-    ) -> tuple[List[Insider], int]:
+    ) -> tuple[List[Insider], int, bool]:
         """
-        Search insiders by name.
+        Search insiders by name, best matches first (see SearchService).
 
         Args:
             db: Database session
@@ -112,28 +113,17 @@ class InsiderService:
             limit: Maximum number of records to return
 
         Returns:
-            Tuple of (insiders list, total count)
-        """
-        # Search by name (case-insensitive)
-        search_filter = func.upper(Insider.name).contains(query.upper())
-
-        # Build query
-        search_query = (
-            select(Insider).options(selectinload(Insider.company)).where(search_filter)
+            Tuple of (insiders list, total, whether total is a lower bound)
+        """
+        return await SearchService.search(
+            db,
+            "insiders",
+            query,
+            skip=skip,
+            limit=limit,
+            options=[selectinload(Insider.company)],
         )
 
-        # Get total count
-        count_query = select(func.count()).select_from(search_query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar_one()
-
-        # Get paginated results
-        search_query = search_query.offset(skip).limit(limit).order_by(Insider.name)
-        result = await db.execute(search_query)
-        insiders = result.scalars().all()
-
-        return list(insiders), total
-
     @staticmethod
     async def create(db: AsyncSession, insider_data: InsiderCreate) -> Insider:
         """
@@ -0,0 +1,487 @@
+"""
+Notification dispatch service.
+
+Alert notifications are not sent on the write path. When an alert fires,
+AlertService stages one notification_outbox row per channel in the same
+transaction; after commit the rows are handed to an in-process dispatcher:
+- Each channel has its own queue and worker pool, sized by the channel's
+  concurrency limit (at most NOTIFICATION_WORKERS), so a slow channel cannot
+  hold up the others. A worker only claims a row (with a lease) once it is
+  free to deliver it, so waiting never eats into the lease.
+- Failed deliveries are retried with exponential backoff and jitter, up to
+  NOTIFICATION_MAX_ATTEMPTS, then marked failed.
+- A poller re-enqueues due rows every POLL_INTERVAL_SECONDS, which picks up
+  retries, rows written by other processes, and rows left behind by a
+  restart (an expired lease releases a row a dead worker had claimed).
+- A push row without a subscription fans out into one row per active
+  subscription, so each device is retried on its own.
+
+Webhook, email and push outcomes are logged to alert_history as before.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.database import Flushed, pending_after_commit
+from app.models.alert import Alert
+from app.models.alert_history import AlertHistory
+from app.models.notification_outbox import NotificationOutbox
+from app.models.push_subscription import PushSubscription
+from app.models.trade import Trade
+from app.services.multi_channel_alert_service import MultiChannelAlertService
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+# Concurrent deliveries per channel (worker tasks per channel queue, capped
+# at NOTIFICATION_WORKERS)
+CHANNEL_CONCURRENCY = {"webhook": 4, "email": 2, "push": 4, "multi_channel": 2}
+DEFAULT_CHANNEL_CONCURRENCY = 1
+
+# Channels whose outcomes are logged to alert_history
+HISTORY_CHANNELS = ("webhook", "email", "push")
+
+LEASE_SECONDS = 120  # a claimed row is released if its worker dies
+POLL_INTERVAL_SECONDS = 15.0
+POLL_BATCH_SIZE = 500
+RETRY_MAX_SECONDS = 3600
+SENT_RETENTION_DAYS = 7
+
+
+class PermanentDeliveryError(Exception):
+    """Delivery cannot succeed on retry (the row is marked failed at once)."""
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt: doubling from the base, +/-50% jitter."""
+    delay = min(
+        RETRY_MAX_SECONDS,
+        settings.notification_retry_base_seconds * 2 ** max(attempts - 1, 0),
+    )
+    return delay * random.uniform(0.5, 1.5)
+
+
+def _outcome(result: Any) -> Tuple[bool, Optional[str]]:
+    """Normalize channel results: (success, error) tuples or status dicts."""
+    if isinstance(result, tuple):
+        success, error = result
+        return bool(success), error
+    if isinstance(result, dict):
+        status = result.get("status")
+        if status in ("error", "failed"):
+            return False, result.get("error") or result.get("message") or status
+        return True, None
+    return bool(result), None
+
+
+def _alert_data(trade: Trade, company_name: str, insider_name: str) -> Dict[str, Any]:
+    """Trade summary passed to the multi-channel (Discord, Slack, SMS) service."""
+    return {
+        "ticker": trade.company.ticker if trade.company else None,
+        "company_name": company_name,
+        "insider": insider_name,
+        "transaction_type": trade.transaction_type,
+        "total_value": float(trade.total_value) if trade.total_value else 0,
+        "transaction_date": trade.transaction_date.isoformat()
+        if trade.transaction_date
+        else None,
+        "shares": float(trade.shares) if trade.shares else 0,
+    }
+
+
+class NotificationDispatcher:
+    """In-process per-channel worker pools delivering notification_outbox rows."""
+
+    def __init__(self):
+        self.notification_service = NotificationService()
+        self.multi_channel_service = MultiChannelAlertService()
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._queued: Set[int] = set()
+        self._workers: List[asyncio.Task] = []
+        self._poller: Optional[asyncio.Task] = None
+        self._max_workers = 0
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @staticmethod
+    def stage(db: AsyncSession, alert: Alert, trade: Trade) -> List[NotificationOutbox]:
+        """
+        Add outbox rows for a fired alert to the session.
+
+        The rows commit with the caller's transaction and are dispatched
+        after it.
+
+        Args:
+            db: Database session
+            alert: Alert that fired
+            trade: Trade that matched
+
+        Returns:
+            The staged rows
+        """
+        channels = ["multi_channel"]
+        for channel in alert.notification_channels or []:
+            if (
+                (channel == "webhook" and alert.webhook_url)
+                or (channel == "email" and alert.email)
+                or channel == "push"
+            ):
+                channels.append(channel)
+
+        rows = [
+            NotificationOutbox(
+                alert_id=alert.id,
+                trade_id=trade.id,
+                user_id=alert.user_id,
+                channel=channel,
+                status=OUTBOX_PENDING,
+                attempts=0,
+                next_attempt_at=datetime.utcnow(),
+            )
+            for channel in dict.fromkeys(channels)
+        ]
+        db.add_all(rows)
+        return rows
+
+    async def start(self, workers: Optional[int] = None) -> None:
+        """
+        Start the channel worker pools and the poller (no-op if already running).
+
+        Args:
+            workers: Maximum workers per channel (NOTIFICATION_WORKERS by default)
+        """
+        if self.running:
+            return
+        self._running = True
+        self._queued.clear()
+        self._max_workers = max(1, workers or settings.notification_workers)
+        for channel in CHANNEL_CONCURRENCY:
+            self._channel_queue(channel)
+        self._poller = asyncio.create_task(self._poll(), name="notification-poller")
+        logger.info(
+            f"Notification dispatcher started with {len(self._workers)} workers "
+            f"across {len(self._queues)} channels"
+        )
+
+    def _channel_queue(self, channel: str) -> asyncio.Queue:
+        """A channel's queue, starting its worker pool on first use."""
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = asyncio.Queue()
+            count = min(
+                CHANNEL_CONCURRENCY.get(channel, DEFAULT_CHANNEL_CONCURRENCY),
+                self._max_workers,
+            )
+            self._workers.extend(
+                asyncio.create_task(self._worker(queue), name=f"notification-{channel}-{i}")
+                for i in range(count)
+            )
+        return queue
+
+    async def join(self) -> None:
+        """Wait until every queued row has been handled."""
+        for queue in list(self._queues.values()):
+            await queue.join()
+
+    async def stop(self) -> None:
+        """
+        Stop the workers and poller.
+
+        Rows still queued stay pending in the outbox; rows mid-delivery are
+        released when their lease expires.
+        """
+        self._running = False
+        tasks = [*self._workers, *([self._poller] if self._poller else [])]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._poller = None
+        self._queues = {}
+        self._queued.clear()
+        logger.info("Notification dispatcher stopped")
+
+    def submit(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Queue committed outbox rows for delivery (the poller covers a stopped dispatcher).
+
+        Args:
+            rows: (outbox id, channel) pairs
+        """
+        if not self.running:
+            return
+        for outbox_id, channel in rows:
+            if outbox_id not in self._queued:
+                self._queued.add(outbox_id)
+                self._channel_queue(channel).put_nowait(outbox_id)
+
+    async def enqueue_due(self) -> int:
+        """
+        Queue pending rows that are due and not leased, and prune old sent rows.
+
+        Returns:
+            Number of rows found due
+        """
+        from app.database import db_manager
+
+        now = datetime.utcnow()
+        async with db_manager.get_session() as db:
+            result = await db.execute(
+                select(NotificationOutbox.id, NotificationOutbox.channel)
+                .where(
+                    NotificationOutbox.status == OUTBOX_PENDING,
+                    NotificationOutbox.next_attempt_at <= now,
+                    or_(
+                        NotificationOutbox.locked_until.is_(None),
+                        NotificationOutbox.locked_until < now,
+                    ),
+                )
+                .order_by(NotificationOutbox.next_attempt_at)
+                .limit(POLL_BATCH_SIZE)
+            )
+            due = [tuple(row) for row in result.all()]
+
+            await db.execute(
+                delete(NotificationOutbox).where(
+                    NotificationOutbox.status == OUTBOX_SENT,
+                    NotificationOutbox.created_at < now - timedelta(days=SENT_RETENTION_DAYS),
+                )
+            )
+            await db.commit()
+
+        self.submit(due)
+        return len(due)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                found = await self.enqueue_due()
+                if found:
+                    logger.debug(f"Queued {found} due notifications from the outbox")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification outbox poll failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        from app.database import db_manager
+
+        while True:
+            outbox_id = await queue.get()
+            self._queued.discard(outbox_id)
+            try:
+                async with db_manager.get_session() as db:
+                    await self.deliver(db, outbox_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification {outbox_id} delivery crashed: {e}", exc_info=True)
+            finally:
+                queue.task_done()
+
+    async def deliver(self, db: AsyncSession, outbox_id: int) -> Optional[str]:
+        """
+        Claim and deliver one outbox row.
+
+        Args:
+            db: Database session
+            outbox_id: Row to deliver
+
+        Returns:
+            The row's new status, or None if it was not claimable (already
+            delivered, not yet due, or leased by another worker)
+        """
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(NotificationOutbox)
+            .where(
+                NotificationOutbox.id == outbox_id,
+                NotificationOutbox.status == OUTBOX_PENDING,
+                NotificationOutbox.next_attempt_at <= now,
+                or_(
+                    NotificationOutbox.locked_until.is_(None),
+                    NotificationOutbox.locked_until < now,
+                ),
+            )
+            .values(
+                locked_until=now + timedelta(seconds=LEASE_SECONDS),
+                attempts=NotificationOutbox.attempts + 1,
+            )
+            .returning(NotificationOutbox.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            await db.rollback()
+            return None
+        await db.commit()
+
+        row = (
+            await db.execute(
+                select(NotificationOutbox)
+                .where(NotificationOutbox.id == outbox_id)
+                .execution_options(populate_existing=True)
+            )
+        ).scalar_one()
+
+        permanent = False
+        try:
+            success, error = await self._send(db, row)
+        except PermanentDeliveryError as e:
+            success, error, permanent = False, str(e), True
+        except Exception as e:
+            success, error = False, str(e)
+
+        if success:
+            row.status = OUTBOX_SENT
+            row.last_error = None
+        elif permanent or row.attempts >= settings.notification_max_attempts:
+            row.status = OUTBOX_FAILED
+            row.last_error = error
+            logger.warning(
+                f"Notification {row.id} ({row.channel}, alert {row.alert_id}) failed "
+                f"after {row.attempts} attempts: {error}"
+            )
+        else:
+            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(row.attempts))
+            row.last_error = error
+        row.locked_until = None
+
+        if row.channel in HISTORY_CHANNELS and not (row.channel == "push" and row.subscription_id is None):
+            db.add(
+                AlertHistory(
+                    alert_id=row.alert_id,
+                    trade_id=row.trade_id,
+                    notification_channel=row.channel,
+                    notification_status={
+                        OUTBOX_SENT: "sent",
+                        OUTBOX_FAILED: "failed",
+                    }.get(row.status, "retrying"),
+                    error_message=error,
+                )
+            )
+        await db.commit()
+        return row.status
+
+    async def _send(self, db: AsyncSession, row: NotificationOutbox) -> Tuple[bool, Optional[str]]:
+        """Deliver one row on its channel."""
+        alert = await db.get(Alert, row.alert_id)
+        trade = (
+            await db.execute(
+                select(Trade)
+                .options(selectinload(Trade.company), selectinload(Trade.insider))
+                .where(Trade.id == row.trade_id)
+            )
+        ).scalar_one_or_none()
+        if alert is None or trade is None:
+            raise PermanentDeliveryError("Alert or trade no longer exists")
+
+        company_name = trade.company.name if trade.company else ""
+        insider_name = trade.insider.name if trade.insider else ""
+
+        if row.channel == "webhook":
+            return _outcome(
+                await self.notification_service.send_webhook_notification(
+                    alert.webhook_url, alert, trade, company_name, insider_name
+                )
+            )
+
+        if row.channel == "email":
+            return _outcome(
+                await self.notification_service.send_email_notification(
+                    alert, trade, company_name, insider_name
+                )
+            )
+
+        if row.channel == "multi_channel":
+            # Send via multi-channel service (Discord, Slack, SMS)
+            results = await self.multi_channel_service.send_alert(
+                _alert_data(trade, company_name, insider_name),
+                alert.user_id,
+                channels=["discord", "slack", "sms"],
+            )
+            logger.info(f"Multi-channel alert results: {results}")
+            return True, None
+
+        if row.channel == "push":
+            if row.subscription_id is None:
+                return await self._fan_out_push(db, row)
+
+            subscription = await db.get(PushSubscription, row.subscription_id)
+            if subscription is None or not subscription.is_active:
+                return True, None
+            success, error = _outcome(
+                await self.notification_service.send_push_notification(
+                    subscription, alert, trade, company_name, insider_name
+                )
+            )
+            # Deactivate expired subscriptions (410 Gone)
+            if error and "410" in error:
+                subscription.is_active = False
+                logger.info(f"Deactivated expired push subscription {subscription.id}")
+                raise PermanentDeliveryError(error)
+            if success:
+                subscription.last_notified_at = datetime.utcnow()
+            return success, error
+
+        raise PermanentDeliveryError(f"Unknown notification channel: {row.channel}")
+
+    async def _fan_out_push(
+        self, db: AsyncSession, row: NotificationOutbox
+    ) -> Tuple[bool, Optional[str]]:
+        """Replace a push row with one row per active subscription."""
+        result = await db.execute(
+            select(PushSubscription.id).where(PushSubscription.is_active.is_(True))
+        )
+        subscription_ids = list(result.scalars().all())
+        if not subscription_ids:
+            logger.warning(f"No active push subscriptions for alert {row.alert_id}")
+            return True, None
+
+        db.add_all(
+            NotificationOutbox(
+                alert_id=row.alert_id,
+                trade_id=row.trade_id,
+                user_id=row.user_id,
+                channel="push",
+                subscription_id=subscription_id,
+                status=OUTBOX_PENDING,
+                attempts=0,
+                next_attempt_at=datetime.utcnow(),
+            )
+            for subscription_id in subscription_ids
+        )
+        return True, None
+
+
+notification_dispatcher = NotificationDispatcher()
+
+
+def _collect_outbox_rows(session: Session, flushed: Flushed) -> List[Tuple[int, str]]:
+    """Remember outbox rows inserted in this flush; they are dispatched after commit."""
+    return [(obj.id, obj.channel) for obj in flushed.new]
+
+
+def _dispatch_after_commit(session: Session, rows: List[Tuple[int, str]]) -> None:
+    notification_dispatcher.submit(rows)
+
+
+pending_after_commit(
+    "notification_outbox_rows", _dispatch_after_commit, models=(NotificationOutbox,), collect=_collect_outbox_rows
+)
@@ -12,9 +12,11 @@ from typing import Dict, Any, Optional
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.company import Company
 from app.models.insider import Insider
 from app.models.trade import Trade
+from app.services.trade_rollup_service import TradeRollupService
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +117,7 @@ class ScraperService:
 
             trades_created = 0
             filings_processed = 0
+            created_trades = []
 
             for filing in filings:
                 try:
@@ -132,17 +135,25 @@ class ScraperService:
                     parsed = Form4Parser.parse(xml_content)
 
                     # Process transactions
+                    rollup_keys = []
+                    filing_trades = []
                     for txn in parsed.get("transactions", []):
                         trade = await self._create_trade(
                             db, company, parsed, txn, filing
                         )
                         if trade:
                             trades_created += 1
+                            filing_trades.append(trade)
+                            rollup_keys.append(TradeRollupService.rollup_key(trade))
 
                     filings_processed += 1
 
+                    # Keep daily rollups in the same transaction as the trades
+                    await TradeRollupService.refresh_buckets(db, rollup_keys)
+
                     # Commit after each filing to free memory
                     await db.commit()
+                    created_trades.extend(filing_trades)
 
                 except Exception as e:
                     logger.error(f"Error processing filing {filing.get('accession_number')}: {e}")
@@ -154,10 +165,54 @@ class ScraperService:
                 f"{trades_created} trades created"
             )
 
+            # Stream the new trades to WebSocket clients on every API worker
+            if created_trades:
+                try:
+                    from app.services.trade_service import TradeService
+
+                    await TradeService.publish_created(db, created_trades)
+                except Exception as e:
+                    logger.warning(f"Failed to publish trade events for {company.ticker}: {e}")
+
+            # A failed alert pass rolls back, which expires the loaded objects
+            company_ticker = company.ticker
+            trade_ids = [trade.id for trade in created_trades]
+
+            # Evaluate alerts once for the whole run
+            alerts_triggered = 0
+            if settings.alerts_enabled and created_trades:
+                try:
+                    from app.services.alert_service import AlertService
+
+                    alerts_triggered = await AlertService(db).check_trades_against_alerts(
+                        created_trades
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to check alerts for {company_ticker} scrape: {e}")
+                    await db.rollback()
+                    result = await db.execute(select(Trade).where(Trade.id.in_(trade_ids)))
+                    created_trades = list(result.scalars().all())
+
+            # Advanced (query builder) rules, also in one pass over the batch
+            advanced_alerts_triggered = 0
+            if settings.alerts_enabled and created_trades:
+                try:
+                    from app.services.advanced_alert_service import AdvancedAlertService
+
+                    triggered = await AdvancedAlertService(db).evaluate_rules_for_trades(
+                        created_trades
+                    )
+                    advanced_alerts_triggered = len(triggered)
+                except Exception as e:
+                    logger.error(f"Failed to evaluate advanced alert rules for {company_ticker} scrape: {e}")
+                    await db.rollback()
+
             return {
                 "success": True,
                 "filings_processed": filings_processed,
-                "trades_created": trades_created
+                "trades_created": trades_created,
+                "alerts_triggered": alerts_triggered,
+                "advanced_alerts_triggered": advanced_alerts_triggered,
             }
 
         except Exception as e:
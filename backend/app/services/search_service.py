@@ -0,0 +1,433 @@
+"""
+Name search service.
+
+Ranked typeahead search over insider names, company tickers/names and admin
+user lookups. Results are ordered by match quality (exact, prefix, word
+prefix, substring, fuzzy) and fetched limit-first: one query for limit + 1
+rows and no separate COUNT, so the cost of a search does not grow with the
+number of matches.
+
+Two backends:
+- pg_trgm: GIN trigram indexes on lower(column), used on PostgreSQL when the
+  extension is installed (see ensure_indexes).
+- memory: an in-process trigram index per scope, built lazily, updated in
+  place with the rows written by each committed transaction and rebuilt every
+  SEARCH_INDEX_TTL_SECONDS (to pick up other workers' writes). Meant for
+  SQLite and small deployments.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case, func, inspect, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import Flushed, pending_after_commit
+from app.models import Company, Insider, User
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Match tiers, best first
+TIER_EXACT = 0
+TIER_PREFIX = 1
+TIER_WORD_PREFIX = 2
+TIER_SUBSTRING = 3
+TIER_FUZZY = 4
+
+# Queries shorter than this only match prefixes (no usable inner trigrams)
+MIN_FUZZY_QUERY_LENGTH = 3
+
+# Word similarity needed for a fuzzy match in the in-process index
+# (pg_trgm uses pg_trgm.word_similarity_threshold, default 0.6)
+MEMORY_FUZZY_THRESHOLD = 0.5
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    """A searchable model and the columns matched against the query."""
+
+    model: Any
+    fields: Tuple[str, ...]
+
+
+SEARCH_TARGETS: Dict[str, SearchTarget] = {
+    "insiders": SearchTarget(Insider, ("name",)),
+    "companies": SearchTarget(Company, ("ticker", "name")),
+    "users": SearchTarget(User, ("email", "username", "full_name")),
+}
+
+
+def _trigram_index_name(table: str, field: str) -> str:
+    return f"ix_{table}_{field}_trgm"
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards in user input."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lower-case and collapse whitespace."""
+    return " ".join((value or "").lower().split())
+
+
+def trigrams(value: str) -> Set[str]:
+    """
+    Extract pg_trgm style trigrams (each word padded with two leading and one
+    trailing space).
+    """
+    grams: Set[str] = set()
+    for word in value.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def word_similarity(query_grams: Set[str], value: str) -> float:
+    """Best trigram similarity between the query and any single word of value."""
+    if not query_grams:
+        return 0.0
+    best = 0.0
+    for word in value.split():
+        word_grams = trigrams(word)
+        shared = len(query_grams & word_grams)
+        if shared:
+            best = max(best, shared / len(query_grams | word_grams))
+    return best
+
+
+def match_tier(query: str, value: str, query_grams: Set[str]) -> Optional[int]:
+    """
+    Classify how a normalized value matches a normalized query.
+
+    Returns:
+        Tier constant, or None if the value does not match
+    """
+    if not value:
+        return None
+    if value == query:
+        return TIER_EXACT
+    if value.startswith(query):
+        return TIER_PREFIX
+    if f" {query}" in f" {value}":
+        return TIER_WORD_PREFIX
+    if len(query) < MIN_FUZZY_QUERY_LENGTH:
+        return None
+    if query in value:
+        return TIER_SUBSTRING
+    if word_similarity(query_grams, value) >= MEMORY_FUZZY_THRESHOLD:
+        return TIER_FUZZY
+    return None
+
+
+class TrigramIndex:
+    """In-process trigram index over a few text fields per document."""
+
+    def __init__(self, documents: Iterable[Tuple[int, Sequence[Optional[str]]]] = ()):
+        self._postings: Dict[str, Set[int]] = {}
+        self._values: Dict[int, Tuple[str, ...]] = {}
+        self.built_at = time.time()
+        for doc_id, values in documents:
+            self.add(doc_id, values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, doc_id: int, values: Sequence[Optional[str]]) -> None:
+        """Index a document (values in SearchTarget.fields order), replacing any previous version."""
+        self.remove(doc_id)
+        normalized = tuple(normalize(value) for value in values)
+        self._values[doc_id] = normalized
+        for value in normalized:
+            for gram in trigrams(value):
+                self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id: int) -> None:
+        """Drop a document from the index, if present."""
+        values = self._values.pop(doc_id, None)
+        if values is None:
+            return
+        for value in values:
+            for gram in trigrams(value):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    continue
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def _candidates(self, query: str, query_grams: Set[str]) -> Set[int]:
+        if len(query) < MIN_FUZZY_QUERY_LENGTH:
+            # Prefix-only: documents with a word starting with the query
+            first_word = query.split()[0]
+            return set(self._postings.get(f"  {first_word}"[-3:], ()))
+        candidates: Set[int] = set()
+        for gram in query_grams:
+            candidates.update(self._postings.get(gram, ()))
+        return candidates
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[Tuple[int, int, float]]:
+        """
+        Rank matching documents.
+
+        Args:
+            query: Raw query text
+            limit: Maximum number of results
+            offset: Number of ranked results to skip
+
+        Returns:
+            List of (doc_id, tier, similarity), best first
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+
+        ranked = []
+        for doc_id in self._candidates(query, query_grams):
+            values = self._values[doc_id]
+            tiers = [
+                tier
+                for tier in (match_tier(query, value, query_grams) for value in values)
+                if tier is not None
+            ]
+            if not tiers:
+                continue
+            similarity = max(word_similarity(query_grams, value) for value in values)
+            ranked.append((min(tiers), -similarity, values[0], doc_id))
+
+        ranked.sort()
+        return [
+            (doc_id, tier, -neg_similarity)
+            for tier, neg_similarity, _, doc_id in ranked[offset:offset + limit]
+        ]
+
+
+# scope -> in-process index (memory backend)
+_memory_indexes: Dict[str, TrigramIndex] = {}
+_index_locks: Dict[str, asyncio.Lock] = {}
+
+# Whether pg_trgm is installed (None = not checked yet)
+_pg_trgm_available: Optional[bool] = None
+
+
+class SearchService:
+    """Service for ranked, limit-first name search."""
+
+    @staticmethod
+    async def ensure_indexes(engine: AsyncEngine) -> bool:
+        """
+        Install pg_trgm and build GIN trigram indexes for every search target.
+
+        Indexes are built CONCURRENTLY so writes are not blocked; statements
+        are no-ops once the indexes exist. Only runs on PostgreSQL.
+
+        Returns:
+            True if the indexes are in place
+        """
+        global _pg_trgm_available
+        if engine.dialect.name != "postgresql":
+            return False
+
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for target in SEARCH_TARGETS.values():
+                table = target.model.__tablename__
+                for field in target.fields:
+                    await conn.execute(
+                        text(
+                            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                            f"{_trigram_index_name(table, field)} ON {table} "
+                            f"USING gin (lower({field}) gin_trgm_ops)"
+                        )
+                    )
+        _pg_trgm_available = True
+        return True
+
+    @staticmethod
+    async def _backend(db: AsyncSession) -> str:
+        """Resolve the configured backend for this database."""
+        global _pg_trgm_available
+        backend = settings.search_backend.lower()
+        if backend in ("pg_trgm", "memory"):
+            return backend
+        if db.get_bind().dialect.name != "postgresql":
+            return "memory"
+        if _pg_trgm_available is None:
+            result = await db.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            )
+            _pg_trgm_available = bool(result.scalar())
+            if not _pg_trgm_available:
+                logger.warning("pg_trgm is not installed; using the in-process search index")
+        return "pg_trgm" if _pg_trgm_available else "memory"
+
+    @staticmethod
+    def _ranked_query(target: SearchTarget, query: str):
+        """pg_trgm query: matching rows ordered by tier, similarity, first field."""
+        q = normalize(query)
+        escaped = _escape_like(q)
+        columns = [func.lower(getattr(target.model, field)) for field in target.fields]
+
+        conditions = []
+        tiers = []
+        for column in columns:
+            matches = [column.like(f"{escaped}%", escape="\\"), column.like(f"% {escaped}%", escape="\\")]
+            tier_cases = [
+                (column == q, TIER_EXACT),
+                (matches[0], TIER_PREFIX),
+                (matches[1], TIER_WORD_PREFIX),
+            ]
+            if len(q) >= MIN_FUZZY_QUERY_LENGTH:
+                substring = column.like(f"%{escaped}%", escape="\\")
+                # lower(col) %> q: q is word-similar to some part of col
+                fuzzy = column.op("%>")(q)
+                matches.extend([substring, fuzzy])
+                tier_cases.append((substring, TIER_SUBSTRING))
+            conditions.extend(matches)
+            tiers.append(case(*tier_cases, else_=TIER_FUZZY))
+
+        tier = func.least(*tiers) if len(tiers) > 1 else tiers[0]
+        similarity = func.greatest(*[func.word_similarity(q, column) for column in columns])
+        return (
+            select(target.model)
+            .where(or_(*conditions))
+            .order_by(tier, similarity.desc(), getattr(target.model, target.fields[0]))
+        )
+
+    @staticmethod
+    async def _get_memory_index(db: AsyncSession, scope: str) -> TrigramIndex:
+        """Get the in-process index for a scope, (re)building it if stale."""
+        index = _memory_indexes.get(scope)
+        if index is not None and time.time() - index.built_at < settings.search_index_ttl_seconds:
+            return index
+
+        lock = _index_locks.setdefault(scope, asyncio.Lock())
+        async with lock:
+            index = _memory_indexes.get(scope)
+            if index is not None and time.time() - index.built_at < settings.search_index_ttl_seconds:
+                return index
+
+            target = SEARCH_TARGETS[scope]
+            result = await db.execute(
+                select(
+                    target.model.id,
+                    *[getattr(target.model, field) for field in target.fields],
+                )
+            )
+            index = TrigramIndex((row[0], row[1:]) for row in result.all())
+            _memory_indexes[scope] = index
+            logger.info(f"Built {scope} search index: {len(index)} entries")
+            return index
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        scope: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        options: Sequence[Any] = (),
+    ) -> Tuple[List[Any], int, bool]:
+        """
+        Ranked search over one target.
+
+        Fetches limit + 1 rows instead of counting every match. The total is
+        exact when the last page is reached; otherwise it is a lower bound
+        (enough to signal a next page) and flagged as an estimate.
+
+        Args:
+            db: Database session
+            scope: Key of SEARCH_TARGETS
+            query: Search text
+            skip: Number of ranked results to skip
+            limit: Maximum number of results
+            options: Loader options for the returned objects
+
+        Returns:
+            Tuple of (objects, total, total_is_estimate)
+        """
+        target = SEARCH_TARGETS[scope]
+        if not normalize(query):
+            return [], 0, False
+
+        if await SearchService._backend(db) == "pg_trgm":
+            result = await db.execute(
+                SearchService._ranked_query(target, query)
+                .options(*options)
+                .offset(skip)
+                .limit(limit + 1)
+            )
+            rows = list(result.scalars().all())
+        else:
+            index = await SearchService._get_memory_index(db, scope)
+            ids = [doc_id for doc_id, _, _ in index.search(query, limit + 1, skip)]
+            rows = []
+            if ids:
+                result = await db.execute(
+                    select(target.model).options(*options).where(target.model.id.in_(ids))
+                )
+                by_id = {row.id: row for row in result.scalars().all()}
+                rows = [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+        has_more = len(rows) > limit
+        return rows[:limit], skip + len(rows), has_more
+
+    @staticmethod
+    def invalidate(scope: Optional[str] = None) -> None:
+        """Drop in-process indexes (one scope, or all) so they rebuild on next use."""
+        if scope is None:
+            _memory_indexes.clear()
+        else:
+            _memory_indexes.pop(scope, None)
+
+
+def _collect_index_changes_after_flush(session: Session, flushed: Flushed) -> List[Tuple[str, int, Optional[tuple]]]:
+    """Record the search-target rows written in this flush (applied on commit)."""
+    changes: List[Tuple[str, int, Optional[tuple]]] = []
+    if not _memory_indexes:
+        return changes
+    deleted = set(flushed.deleted)
+    dirty = set(flushed.dirty)
+    for scope, target in SEARCH_TARGETS.items():
+        if scope not in _memory_indexes:
+            continue
+        for obj in flushed.deleted:
+            if isinstance(obj, target.model):
+                changes.append((scope, obj.id, None))
+        for obj in (*flushed.new, *flushed.dirty):
+            if not isinstance(obj, target.model) or obj in deleted:
+                continue
+            if obj in dirty and not any(
+                inspect(obj).attrs[field].history.has_changes()
+                for field in target.fields
+            ):
+                continue
+            changes.append((scope, obj.id, tuple(getattr(obj, field) for field in target.fields)))
+    return changes
+
+
+def _apply_index_changes_after_commit(session: Session, changes: List[Tuple[str, int, Optional[tuple]]]) -> None:
+    """Upsert/remove committed rows in the in-process indexes."""
+    for scope, doc_id, values in changes:
+        index = _memory_indexes.get(scope)
+        if index is None:
+            continue
+        if values is None:
+            index.remove(doc_id)
+        else:
+            index.add(doc_id, values)
+
+
+pending_after_commit(
+    "search_index_changes",
+    _apply_index_changes_after_commit,
+    models=tuple(target.model for target in SEARCH_TARGETS.values()),
+    collect=_collect_index_changes_after_flush,
+)
@@ -673,11 +673,11 @@ class StockPriceService:
         """
         # Check cache first
         cache_key = f"{ticker}_{days}"
-        cached_data = StockPriceService._price_history_cache.get(cache_key)
+        cached_data = _price_history_cache.get(cache_key)
         if cached_data:
             cached_history, cache_time = cached_data
             current_time = time.time()
-            if (current_time - cache_time) < StockPriceService._price_history_cache_ttl:
+            if (current_time - cache_time) < _price_history_cache_ttl:
                 logger.debug(f"Using cached price history for {ticker} ({days} days)")
                 return cached_history
         
@@ -709,7 +709,7 @@ class StockPriceService:
             logger.info(f"Fetched {len(history)} days of history for {ticker}")
             
             # Cache the results
-            StockPriceService._price_history_cache[cache_key] = (history, time.time())
+            _price_history_cache[cache_key] = (history, time.time())
             
             return history
 
@@ -3,20 +3,39 @@ Supabase Cache Service
 
 Generic caching service using Supabase PostgreSQL instead of Redis.
 Replaces Redis-based caching for on-demand data fetching with TTL support.
+
+The supabase client is synchronous, so its requests run in the default
+executor rather than on the event loop. Each worker keeps recent entries in
+a short-lived in-process cache (never past the row's own expiry), so hits do
+not reach Supabase at all. get_many/set_many batch several keys into one
+request, and a background task prunes expired rows from api_cache.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from postgrest.types import CountMethod, ReturnMethod
+
 from app.config import settings
+from app.services.cache_service import LocalCache, SingleFlight, pack_entry, unpack_entry
 
 logger = logging.getLogger(__name__)
 
 
+def _unix_time(value: Any) -> float:
+    """Row expires_at (ISO 8601) as a Unix timestamp, 0 if it cannot be read."""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
 class SupabaseCacheService:
     """
     Generic Supabase-based caching service (replaces Redis).
-    
+
     Uses Supabase PostgreSQL table for caching with TTL support.
     """
 
@@ -24,7 +43,10 @@ class SupabaseCacheService:
         """Initialize Supabase cache service."""
         self.enabled = False
         self.client = None
-        
+        self._local = LocalCache(settings.cache_l1_max_entries)
+        self._inflight = SingleFlight()
+        self._prune_task: Optional[asyncio.Task] = None
+
         # Check if Supabase is configured
         if hasattr(settings, 'supabase_url') and hasattr(settings, 'supabase_service_role_key'):
             if settings.supabase_url and settings.supabase_service_role_key:
@@ -44,97 +66,172 @@ class SupabaseCacheService:
         else:
             logger.warning("Supabase settings not found. Cache disabled.")
 
+    async def _execute(self, build: Callable[[], Any]) -> Any:
+        """Build and execute a (blocking) Supabase request in the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: build().execute())
+
+    def _remember(self, cache_key: str, data: Any, expires_at: float) -> None:
+        now = datetime.now(timezone.utc).timestamp()
+        ttl = min(settings.supabase_cache_l1_ttl_seconds, expires_at - now)
+        # Stored encoded so callers never share (and mutate) one cached object
+        self._local.set(cache_key, "", pack_entry(data, 0.0, expires_at), ttl)
+
+    def _recall(self, cache_key: str) -> Optional[Any]:
+        packed = self._local.get(cache_key, "")
+        return None if packed is None else unpack_entry(packed)[0]
+
+    def clear_local(self) -> None:
+        """Drop this worker's in-process entries."""
+        self._local.clear()
+
     async def get(self, cache_key: str) -> Optional[Any]:
         """
         Get cached data if not expired.
-        
+
         Args:
             cache_key: Unique cache key
-            
+
         Returns:
             Cached data if found and not expired, None otherwise
         """
-        if not self.enabled or not self.client:
-            return None
+        return (await self.get_many([cache_key])).get(cache_key)
+
+    async def get_many(self, cache_keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several cached values in at most one request.
+
+        Args:
+            cache_keys: Cache keys
+
+        Returns:
+            Dict of key -> data for the keys found and not expired
+        """
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        for cache_key in dict.fromkeys(cache_keys):
+            data = self._recall(cache_key)
+            if data is not None:
+                found[cache_key] = data
+            else:
+                missing.append(cache_key)
+
+        if not missing or not self.enabled or not self.client:
+            return found
 
         try:
             now = datetime.now(timezone.utc).isoformat()
-            
-            # Query for non-expired cache entry
-            response = self.client.table("api_cache") \
-                .select("data") \
-                .eq("cache_key", cache_key) \
-                .gt("expires_at", now) \
-                .limit(1) \
-                .execute()
-            
-            if response.data and len(response.data) > 0:
-                return response.data[0].get("data")
-            
-            return None
+
+            # Query for non-expired cache entries
+            response = await self._execute(
+                lambda: self.client.table("api_cache")
+                .select("cache_key, data, expires_at")
+                .in_("cache_key", missing)
+                .gt("expires_at", now)
+            )
+
+            for row in response.data or []:
+                if row.get("data") is None:
+                    continue
+                found[row["cache_key"]] = row["data"]
+                self._remember(row["cache_key"], row["data"], _unix_time(row.get("expires_at")))
         except Exception as e:
-            logger.error(f"Error getting cache key {cache_key}: {e}")
-            return None
+            logger.error(f"Error getting cache keys {missing}: {e}")
+        return found
 
     async def set(
-        self, 
-        cache_key: str, 
-        data: Any, 
-        ttl_minutes: int = 15, 
+        self,
+        cache_key: str,
+        data: Any,
+        ttl_minutes: int = 15,
         cache_type: str = "general"
     ) -> bool:
         """
         Store data in cache with TTL.
-        
+
         Args:
             cache_key: Unique cache key
             data: Data to cache (will be stored as JSONB)
             ttl_minutes: Time to live in minutes (default: 15)
             cache_type: Type of cache (e.g., 'news', 'sec', 'research')
-            
+
         Returns:
-            True if successful, False otherwise
+            True if stored in Supabase, False otherwise
+        """
+        return await self.set_many({cache_key: data}, ttl_minutes=ttl_minutes, cache_type=cache_type)
+
+    async def set_many(
+        self,
+        entries: Dict[str, Any],
+        ttl_minutes: int = 15,
+        cache_type: str = "general"
+    ) -> bool:
+        """
+        Store several values with one upsert.
+
+        Args:
+            entries: Dict of cache key -> data
+            ttl_minutes: Time to live in minutes (default: 15)
+            cache_type: Type of cache (e.g., 'news', 'sec', 'research')
+
+        Returns:
+            True if stored in Supabase, False otherwise (still cached in-process)
         """
+        if not entries:
+            return False
+
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(minutes=ttl_minutes)
+        for cache_key, data in entries.items():
+            self._remember(cache_key, data, expires_at.timestamp())
         if not self.enabled or not self.client:
             return False
 
-        try:
-            now = datetime.now(timezone.utc)
-            expires_at = now + timedelta(minutes=ttl_minutes)
-            
-            # Upsert cache entry (update if exists, insert if not)
-            self.client.table("api_cache").upsert({
+        rows = [
+            {
                 "cache_key": cache_key,
                 "data": data,
                 "fetched_at": now.isoformat(),
                 "expires_at": expires_at.isoformat(),
                 "cache_type": cache_type
-            }, on_conflict="cache_key").execute()
-            
+            }
+            for cache_key, data in entries.items()
+        ]
+
+        try:
+            # Upsert cache entries (update if exists, insert if not)
+            await self._execute(
+                lambda: self.client.table("api_cache").upsert(
+                    rows, on_conflict="cache_key", returning=ReturnMethod.minimal
+                )
+            )
+
             return True
         except Exception as e:
-            logger.error(f"Error setting cache key {cache_key}: {e}")
+            logger.error(f"Error setting cache keys {list(entries)}: {e}")
             return False
 
     async def delete(self, cache_key: str) -> bool:
         """
         Delete cached data.
-        
+
         Args:
             cache_key: Cache key to delete
-            
+
         Returns:
             True if successful, False otherwise
         """
+        self._local.discard([cache_key])
         if not self.enabled or not self.client:
             return False
 
         try:
-            self.client.table("api_cache") \
-                .delete() \
-                .eq("cache_key", cache_key) \
-                .execute()
-            
+            await self._execute(
+                lambda: self.client.table("api_cache")
+                .delete(returning=ReturnMethod.minimal)
+                .eq("cache_key", cache_key)
+            )
+
             return True
         except Exception as e:
             logger.error(f"Error deleting cache key {cache_key}: {e}")
@@ -143,7 +240,7 @@ class SupabaseCacheService:
     async def clear_expired(self) -> int:
         """
         Clean up expired cache entries.
-        
+
         Returns:
             Number of entries deleted
         """
@@ -152,22 +249,40 @@ class SupabaseCacheService:
 
         try:
             now = datetime.now(timezone.utc).isoformat()
-            
-            # Delete expired entries
-            response = self.client.table("api_cache") \
-                .delete() \
-                .lt("expires_at", now) \
-                .execute()
-            
-            # Count deleted (response structure may vary)
-            deleted_count = len(response.data) if hasattr(response, 'data') else 0
+
+            # Delete expired entries, counting them instead of returning the rows
+            response = await self._execute(
+                lambda: self.client.table("api_cache")
+                .delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+                .lt("expires_at", now)
+            )
+
+            deleted_count = response.count or 0
             logger.info(f"Cleared {deleted_count} expired cache entries")
-            
+
             return deleted_count
         except Exception as e:
             logger.error(f"Error clearing expired cache: {e}")
             return 0
 
+    async def start(self) -> None:
+        """Start pruning expired rows in the background."""
+        if self._prune_task is not None or not self.enabled:
+            return
+        self._prune_task = asyncio.create_task(self._prune_loop())
+
+    async def stop(self) -> None:
+        """Stop the pruning task."""
+        task, self._prune_task = self._prune_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _prune_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.supabase_cache_prune_interval_seconds)
+            await self.clear_expired()
+
     async def get_or_set(
         self,
         cache_key: str,
@@ -177,13 +292,15 @@ class SupabaseCacheService:
     ) -> Any:
         """
         Get value from cache or fetch and cache it.
-        
+
+        Concurrent misses for the same key in this worker share one fetch.
+
         Args:
             cache_key: Unique cache key
             fetch_func: Async function to fetch data if cache miss
             ttl_minutes: Time to live in minutes
             cache_type: Type of cache
-            
+
         Returns:
             Cached or freshly fetched data
         """
@@ -193,14 +310,15 @@ class SupabaseCacheService:
             logger.debug(f"Cache hit for key: {cache_key}")
             return cached
 
-        # Cache miss - fetch data
-        logger.debug(f"Cache miss for key: {cache_key}, fetching...")
-        value = await fetch_func()
-
-        # Cache it
-        await self.set(cache_key, value, ttl_minutes=ttl_minutes, cache_type=cache_type)
+        async def fetch():
+            # Cache miss - fetch data
+            logger.debug(f"Cache miss for key: {cache_key}, fetching...")
+            value = await fetch_func()
+            # Cache it
+            await self.set(cache_key, value, ttl_minutes=ttl_minutes, cache_type=cache_type)
+            return value
 
-        return value
+        return await self._inflight.run(cache_key, fetch)
 
 
 # Singleton instance
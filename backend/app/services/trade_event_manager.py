@@ -1,62 +1,436 @@
 """
 WebSocket broadcasting for trade events.
 
-Provides a lightweight in-memory pub/sub so connected clients receive
-real-time trade notifications. Intended for development/demo use and not
-backed by an external message broker.
+Connected clients receive real-time trade notifications. Events are
+published through the event backplane, so every worker (and any process
+that creates trades, such as the scrapers) reaches clients on every worker;
+each worker fans events out to its own connections with broadcast().
+
+Broadcasting never waits on a client:
+- Each connection has a bounded send queue drained by its own writer task,
+  so a slow socket only delays itself. When a queue is full the
+  WEBSOCKET_SLOW_CONSUMER_POLICY applies: drop_oldest discards the oldest
+  queued message, disconnect closes the connection.
+- Clients subscribe by ticker, transaction type and minimum value. Filtering
+  happens here, through an index of connections by ticker, so a trade is
+  only serialized once and only queued for interested connections.
+
+Streams are resumable. Published events carry a sequence number shared by
+all workers, and the last WEBSOCKET_REPLAY_BUFFER_SIZE events are kept in
+the backplane transport (Redis or PostgreSQL), so a client can resume on any
+worker, including after a restart; with the memory backplane this process
+keeps them. A client reconnecting with since=<last seq it saw> gets a
+"resumed" message followed by the events it missed, or "resync" if they are
+no longer buffered, in which case it should reload from the REST API.
 """
 
 import asyncio
+import bisect
+import itertools
 import json
 import logging
-from typing import Set
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
 
 from fastapi import WebSocket
 
+from app.config import settings
+from app.core.observability import (
+    websocket_connections,
+    websocket_messages_dropped_total,
+    websocket_send_queue_depth,
+)
+from app.core.serialization import dumps
+from app.services.event_backplane import TRADE_EVENTS, EventBackplane, event_backplane
+
 
 logger = logging.getLogger(__name__)
 
+TRANSACTION_TYPES = frozenset({"BUY", "SELL"})
+SLOW_CONSUMER_POLICIES = frozenset({"drop_oldest", "disconnect"})
+# WebSocket close code 1013: try again later
+CLOSE_SLOW_CONSUMER = 1013
+
+
+def _split(values: Any) -> list:
+    if values is None:
+        return []
+    if isinstance(values, str):
+        values = values.split(",")
+    return [str(value).strip() for value in values if value is not None and str(value).strip()]
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Server-side filter for one connection; empty fields match everything."""
+
+    tickers: frozenset = frozenset()
+    transaction_types: frozenset = frozenset()
+    min_value: float = 0.0
+
+    @classmethod
+    def parse(
+        cls,
+        tickers: Any = None,
+        transaction_types: Any = None,
+        min_value: Any = None,
+    ) -> "Subscription":
+        """
+        Build a subscription from query parameters or a subscribe message.
+
+        Raises:
+            ValueError: If a transaction type or the minimum value is invalid
+        """
+        types = frozenset(value.upper() for value in _split(transaction_types))
+        if types - TRANSACTION_TYPES:
+            raise ValueError("transaction_types must be BUY and/or SELL")
+        try:
+            minimum = float(min_value) if min_value not in (None, "") else 0.0
+        except (TypeError, ValueError):
+            raise ValueError("min_value must be a number")
+        if minimum < 0:
+            raise ValueError("min_value must be >= 0")
+        return cls(frozenset(value.upper() for value in _split(tickers)), types, minimum)
+
+    def matches(self, ticker: Optional[str], transaction_type: Optional[str], value: float) -> bool:
+        """Check all filters; events without a trade match everything."""
+        if ticker is None and transaction_type is None:
+            return True
+        if self.tickers and ticker not in self.tickers:
+            return False
+        return self.accepts(transaction_type, value)
+
+    def accepts(self, transaction_type: Optional[str], value: float) -> bool:
+        """Check the filters not covered by the ticker index."""
+        if self.transaction_types and transaction_type not in self.transaction_types:
+            return False
+        return value >= self.min_value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tickers": sorted(self.tickers),
+            "transaction_types": sorted(self.transaction_types),
+            "min_value": self.min_value,
+        }
+
+
+class _Buffered(NamedTuple):
+    seq: int
+    topic: Tuple[Optional[str], Optional[str], float]
+    payload: str
+
+
+@dataclass(eq=False)
+class _Connection:
+    websocket: WebSocket
+    subscription: Subscription
+    queue: asyncio.Queue
+    writer: Optional[asyncio.Task] = None
+    closed: bool = False
+    # Live events held while a resume backlog is fetched, and the seqs it replayed
+    held: Optional[List[Tuple[Optional[int], str]]] = None
+    replayed: FrozenSet[int] = frozenset()
+
+
+def _topic(message: dict) -> tuple:
+    """(ticker, transaction_type, value) of a trade event; None ticker for other events."""
+    trade = message.get("trade")
+    if not isinstance(trade, dict):
+        return None, None, 0.0
+    company = trade.get("company") or {}
+    ticker = trade.get("ticker") or company.get("ticker")
+    try:
+        value = float(trade.get("total_value") or 0)
+    except (TypeError, ValueError):
+        value = 0.0
+    return (ticker.upper() if ticker else None), trade.get("transaction_type"), value
+
 
 class TradeEventManager:
     """Manage WebSocket connections for trade events."""
 
-    def __init__(self) -> None:
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+    def __init__(self, backplane: Optional[EventBackplane] = None) -> None:
+        self._backplane = backplane or event_backplane
+        # All mutations happen without awaiting, so no lock is needed
+        self._connections: Dict[WebSocket, _Connection] = {}
+        self._by_ticker: Dict[str, Set[_Connection]] = defaultdict(set)
+        self._all_tickers: Set[_Connection] = set()
+        # Writer and close tasks still running, awaited on shutdown
+        self._tasks: Set[asyncio.Task] = set()
+        # Memory backplane only: recent sequenced events, oldest first, and
+        # the lowest "since" they can resume from
+        self._recent: Deque[_Buffered] = deque()
+        self._resume_floor: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    @property
+    def last_seq(self) -> Optional[int]:
+        """Sequence number of the newest event buffered in this process (memory backplane)."""
+        return self._recent[-1].seq if self._recent else None
+
+    async def latest_seq(self) -> Optional[int]:
+        """Sequence number of the newest event a client can resume from."""
+        replay = await self._backplane.replay(TRADE_EVENTS, None)
+        return self.last_seq if replay is None else replay.latest_seq
 
-    async def connect(self, websocket: WebSocket) -> None:
-        """Accept and track a WebSocket connection."""
-        await websocket.accept()
-        async with self._lock:
-            self._connections.add(websocket)
+    async def connect(
+        self,
+        websocket: WebSocket,
+        subscription: Optional[Subscription] = None,
+        since: Optional[int] = None,
+    ) -> None:
+        """
+        Track a WebSocket connection (accepting it if not yet accepted) and start its writer.
+
+        Args:
+            websocket: The client connection
+            subscription: Server-side filters (default: everything)
+            since: Last sequence number the client saw, to resume a stream
+        """
+        if websocket.client_state.name == "CONNECTING":
+            await websocket.accept()
+        await self.disconnect(websocket)
+
+        subscription = subscription or Subscription()
+        connection = _Connection(websocket, subscription, asyncio.Queue())
+        if since is not None and self._backplane.transport is not None:
+            # Hold live events while the shared backlog is fetched, so none fall in between
+            connection.held = []
+            self._register(connection)
+            backlog = await self._resume_shared(connection, since)
+            if connection.closed:
+                return
+        else:
+            backlog = [] if since is None else self._resume(since, subscription)
+            self._register(connection)
+
+        # Room for the resume backlog on top of the usual queue
+        connection.queue = asyncio.Queue(maxsize=max(1, settings.websocket_send_queue_size) + len(backlog))
+        for payload in backlog:
+            connection.queue.put_nowait(payload)
+        websocket_send_queue_depth.inc(len(backlog))
+        connection.writer = self._spawn(self._write(connection))
+        websocket_connections.set(len(self._connections))
         logger.info("WebSocket connected. active=%s", len(self._connections))
 
     async def disconnect(self, websocket: WebSocket) -> None:
         """Remove a WebSocket connection."""
-        async with self._lock:
-            self._connections.discard(websocket)
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return
+        self._remove(connection)
         logger.info("WebSocket disconnected. active=%s", len(self._connections))
 
-    async def broadcast(self, message: dict) -> None:
-        """Broadcast a message to all connected clients."""
-        async with self._lock:
-            connections = list(self._connections)
+    def subscribe(self, websocket: WebSocket, subscription: Subscription) -> bool:
+        """Replace a connection's subscription; False if it is not connected."""
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return False
+        self._unindex(connection)
+        connection.subscription = subscription
+        self._index(connection)
+        return True
 
-        if not connections:
-            return
+    def send(self, websocket: WebSocket, message: dict) -> bool:
+        """Queue a message for one connection (e.g. a reply to a client request)."""
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return False
+        return self._enqueue(connection, dumps(message, lenient=True).decode())
+
+    async def publish(self, *messages: dict) -> None:
+        """Publish trade events, numbered and retained for resuming, to the connections of every worker."""
+        await self._backplane.publish_many(
+            TRADE_EVENTS, list(messages), sequenced=True, retain=max(0, settings.websocket_replay_buffer_size)
+        )
+
+    async def broadcast(self, message: dict) -> int:
+        """
+        Queue a message for every local connection subscribed to it.
+
+        Returns:
+            Number of connections the message was queued for
+        """
+        seq = message.get("seq")
+        if not isinstance(seq, int):
+            seq = None
+        buffer_here = seq is not None and self._backplane.transport is None
+        if not self._connections and not buffer_here:
+            return 0
+
+        ticker, transaction_type, value = _topic(message)
+        payload = None
+        if buffer_here:
+            # Serialize once for the buffer and all connections
+            payload = dumps(message, lenient=True).decode()
+            self._remember(_Buffered(seq, (ticker, transaction_type, value), payload))
+
+        if ticker is None and transaction_type is None:
+            recipients: Iterable[_Connection] = list(self._connections.values())
+        else:
+            candidates = self._all_tickers | self._by_ticker.get(ticker, set())
+            recipients = [
+                connection
+                for connection in candidates
+                if connection.subscription.accepts(transaction_type, value)
+            ]
+        if not recipients:
+            return 0
+
+        if payload is None:
+            payload = dumps(message, lenient=True).decode()
+        return sum(self._enqueue(connection, payload, seq) for connection in recipients)
+
+    async def close(self) -> None:
+        """Close every connection and stop the writers (application shutdown)."""
+        for connection in list(self._connections.values()):
+            self._remove(connection, close_code=1001)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
-        payload = json.dumps(message, default=str)
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _remember(self, event: _Buffered) -> None:
+        recent = self._recent
+        if self._resume_floor is None:
+            self._resume_floor = event.seq - 1
+        if not recent or event.seq > recent[-1].seq:
+            recent.append(event)
+        else:
+            # Arrived out of order (concurrent publishers); keep the buffer sorted
+            position = bisect.bisect_left([buffered.seq for buffered in recent], event.seq)
+            if position < len(recent) and recent[position].seq == event.seq:
+                return
+            recent.insert(position, event)
+        while len(recent) > max(0, settings.websocket_replay_buffer_size):
+            self._resume_floor = recent.popleft().seq
+
+    def _resume(self, since: int, subscription: Subscription) -> List[str]:
+        """Status message plus the buffered events after since that match the subscription."""
+        if self._resume_floor is None or since < self._resume_floor:
+            status = {"type": "resync", "since": since, "latest_seq": self.last_seq}
+            return [dumps(status).decode()]
+        start = bisect.bisect_right([buffered.seq for buffered in self._recent], since)
+        missed = [
+            buffered.payload
+            for buffered in itertools.islice(self._recent, start, None)
+            if subscription.matches(*buffered.topic)
+        ]
+        status = {"type": "resumed", "since": since, "replayed": len(missed), "latest_seq": self.last_seq}
+        return [dumps(status).decode(), *missed]
+
+    async def _resume_shared(self, connection: _Connection, since: int) -> List[str]:
+        """Like _resume, from the transport's buffer, followed by the live events held meanwhile."""
+        replay = await self._backplane.replay(TRADE_EVENTS, since)
+        if replay.complete:
+            missed = []
+            replayed = set()
+            for payload in replay.payloads:
+                event = json.loads(payload)
+                replayed.add(event.get("seq"))
+                if connection.subscription.matches(*_topic(event)):
+                    missed.append(payload)
+            connection.replayed = frozenset(replayed)
+            status = {"type": "resumed", "since": since, "replayed": len(missed), "latest_seq": replay.latest_seq}
+        else:
+            missed = []
+            status = {"type": "resync", "since": since, "latest_seq": replay.latest_seq}
+
+        held, connection.held = connection.held or [], None
+        live = [payload for seq, payload in held if seq is None or seq not in connection.replayed]
+        return [dumps(status).decode(), *missed, *live]
+
+    def _register(self, connection: _Connection) -> None:
+        self._connections[connection.websocket] = connection
+        self._index(connection)
+
+    def _index(self, connection: _Connection) -> None:
+        if connection.subscription.tickers:
+            for ticker in connection.subscription.tickers:
+                self._by_ticker[ticker].add(connection)
+        else:
+            self._all_tickers.add(connection)
+
+    def _unindex(self, connection: _Connection) -> None:
+        self._all_tickers.discard(connection)
+        for ticker in connection.subscription.tickers:
+            subscribers = self._by_ticker.get(ticker)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self._by_ticker[ticker]
+
+    def _enqueue(self, connection: _Connection, payload: str, seq: Optional[int] = None) -> bool:
+        if connection.held is not None:
+            connection.held.append((seq, payload))
+            return True
+        if seq is not None and seq in connection.replayed:
+            return False  # already sent as part of the resume backlog
+        queue = connection.queue
+        if queue.full():
+            policy = settings.websocket_slow_consumer_policy
+            if policy not in SLOW_CONSUMER_POLICIES:
+                policy = "drop_oldest"
+            websocket_messages_dropped_total.labels(policy=policy).inc()
+            if policy == "disconnect":
+                logger.warning("Disconnecting slow WebSocket consumer (%s queued)", queue.qsize())
+                self._remove(connection, close_code=CLOSE_SLOW_CONSUMER)
+                return False
+            queue.get_nowait()
+            websocket_send_queue_depth.dec()
+        queue.put_nowait(payload)
+        websocket_send_queue_depth.inc()
+        return True
+
+    async def _write(self, connection: _Connection) -> None:
+        """Drain one connection's queue; a failed or stalled send drops the connection."""
+        timeout = settings.websocket_send_timeout_seconds
+        try:
+            while not connection.closed:
+                payload = await connection.queue.get()
+                websocket_send_queue_depth.dec()
+                async with asyncio.timeout(timeout):
+                    await connection.websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning("WebSocket send timed out after %ss, disconnecting", timeout)
+            self._remove(connection, close_code=CLOSE_SLOW_CONSUMER)
+        except Exception as exc:
+            logger.warning("WebSocket send failed: %s", exc)
+            self._remove(connection)
+
+    def _remove(self, connection: _Connection, close_code: Optional[int] = None) -> None:
+        if connection.closed:
+            return
+        connection.closed = True
+        if self._connections.get(connection.websocket) is connection:
+            del self._connections[connection.websocket]
+        self._unindex(connection)
+        websocket_send_queue_depth.dec(connection.queue.qsize())
+        websocket_connections.set(len(self._connections))
 
-        disconnects = []
-        for websocket in connections:
-            try:
-                await websocket.send_text(payload)
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.warning("WebSocket send failed: %s", exc)
-                disconnects.append(websocket)
+        writer = connection.writer
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+        if close_code is not None:
+            # Closing may itself wait on the client, so it runs in the background
+            self._spawn(self._close_socket(connection.websocket, close_code))
 
-        for websocket in disconnects:
-            await self.disconnect(websocket)
+    @staticmethod
+    async def _close_socket(websocket: WebSocket, code: int) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=5)
+        except Exception:
+            pass
 
 
 trade_event_manager = TradeEventManager()
+event_backplane.subscribe(TRADE_EVENTS, trade_event_manager.broadcast)
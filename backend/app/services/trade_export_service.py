@@ -0,0 +1,261 @@
+"""
+Trade export service.
+
+Streams filtered trades as NDJSON, CSV or Parquet. Rows are read through a
+server-side cursor in fixed-size batches and encoded batch by batch, so
+memory stays flat no matter how many trades match.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Optional imports with fallbacks
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from app.models import Trade, Company, Insider
+from app.schemas.trade import TradeFilter
+from app.services.trade_service import TradeService
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = [
+    "id",
+    "ticker",
+    "company_name",
+    "insider_name",
+    "insider_role",
+    "transaction_date",
+    "filing_date",
+    "transaction_type",
+    "transaction_code",
+    "shares",
+    "price_per_share",
+    "total_value",
+    "shares_owned_after",
+    "ownership_type",
+    "derivative_transaction",
+    "sec_filing_url",
+]
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a column value to a JSON/CSV friendly scalar."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back in chunks."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class TradeExportService:
+    """Service for streaming bulk trade exports."""
+
+    @staticmethod
+    def build_query(filters: Optional[TradeFilter] = None):
+        """
+        Build the flat export query (row tuples, no ORM objects).
+
+        Args:
+            filters: Optional filter parameters (same as /trades)
+
+        Returns:
+            SQLAlchemy select ordered by trade id
+        """
+        query = (
+            select(
+                Trade.id,
+                Company.ticker,
+                Company.name,
+                Insider.name,
+                Insider.title,
+                Trade.transaction_date,
+                Trade.filing_date,
+                Trade.transaction_type,
+                Trade.transaction_code,
+                Trade.shares,
+                Trade.price_per_share,
+                Trade.total_value,
+                Trade.shares_owned_after,
+                Trade.ownership_type,
+                Trade.derivative_transaction,
+                Trade.sec_filing_url,
+            )
+            .select_from(Trade)
+            .outerjoin(Company, Trade.company_id == Company.id)
+            .outerjoin(Insider, Trade.insider_id == Insider.id)
+        )
+
+        if filters:
+            # Company is already joined; apply the ticker filter on that join
+            query = TradeService._apply_filters(
+                query, filters.model_copy(update={"ticker": None})
+            )
+            if filters.ticker:
+                query = query.where(func.upper(Company.ticker) == filters.ticker.upper())
+
+        return query.order_by(Trade.id)
+
+    @staticmethod
+    async def stream_batches(
+        db: AsyncSession,
+        filters: Optional[TradeFilter] = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[Any]]:
+        """
+        Yield matching rows in batches using a server-side cursor.
+
+        Args:
+            db: Database session
+            filters: Optional filter parameters
+            batch_size: Rows fetched per round-trip
+
+        Yields:
+            Lists of row tuples in EXPORT_COLUMNS order
+        """
+        query = TradeExportService.build_query(filters).execution_options(
+            yield_per=batch_size
+        )
+        result = await db.stream(query)
+        try:
+            async for partition in result.partitions(batch_size):
+                yield partition
+        finally:
+            await result.close()
+
+    @staticmethod
+    async def iter_ndjson(batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+        """Encode row batches as newline-delimited JSON."""
+        async for rows in batches:
+            lines = [
+                json.dumps(
+                    {col: _json_value(val) for col, val in zip(EXPORT_COLUMNS, row)},
+                    separators=(",", ":"),
+                )
+                for row in rows
+            ]
+            yield ("\n".join(lines) + "\n").encode()
+
+    @staticmethod
+    async def iter_csv(batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+        """Encode row batches as CSV with a header row."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        async for rows in batches:
+            writer.writerows([_json_value(val) for val in row] for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    def _parquet_schema():
+        """Arrow schema for exported trades."""
+        return pa.schema(
+            [
+                ("id", pa.int64()),
+                ("ticker", pa.string()),
+                ("company_name", pa.string()),
+                ("insider_name", pa.string()),
+                ("insider_role", pa.string()),
+                ("transaction_date", pa.date32()),
+                ("filing_date", pa.date32()),
+                ("transaction_type", pa.string()),
+                ("transaction_code", pa.string()),
+                ("shares", pa.float64()),
+                ("price_per_share", pa.float64()),
+                ("total_value", pa.float64()),
+                ("shares_owned_after", pa.float64()),
+                ("ownership_type", pa.string()),
+                ("derivative_transaction", pa.bool_()),
+                ("sec_filing_url", pa.string()),
+            ]
+        )
+
+    @staticmethod
+    async def iter_parquet(batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+        """Encode row batches as Parquet, one row group per batch."""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet export requires pyarrow")
+
+        schema = TradeExportService._parquet_schema()
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+        try:
+            async for rows in batches:
+                columns = list(zip(*rows))
+                arrays = [
+                    pa.array(
+                        [float(v) if isinstance(v, Decimal) else v for v in column],
+                        type=field.type,
+                    )
+                    for column, field in zip(columns, schema)
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+        # Footer is written on close
+        tail = sink.drain()
+        if tail:
+            yield tail
+
+    @staticmethod
+    def encode(
+        export_format: str, batches: AsyncIterator[Sequence[Any]]
+    ) -> AsyncIterator[bytes]:
+        """Pick the encoder for a format (ndjson, csv or parquet)."""
+        if export_format == "csv":
+            return TradeExportService.iter_csv(batches)
+        if export_format == "parquet":
+            return TradeExportService.iter_parquet(batches)
+        return TradeExportService.iter_ndjson(batches)
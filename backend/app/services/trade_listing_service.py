@@ -0,0 +1,407 @@
+"""
+Trade listing service.
+
+Maintains the trade_listings read model (one flat row per trade with company
+and insider columns inline) and serves the listing endpoints from it with
+column-projected queries, so a listing page is one query with no joins and
+no relationship loads.
+
+The read model is kept in sync from an after_flush hook: any flush that
+inserts, updates or deletes a Trade, or renames a Company or Insider,
+refreshes the affected rows inside the same transaction. Bulk Core UPDATEs
+bypass the hook; run scripts/rebuild_trade_listings.py after those.
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import delete, event, exists, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Trade, Company, Insider, TradeListing
+from app.schemas.trade import TradeFilter
+from app.services.trade_service import TradeService
+from app.utils.pagination import KeysetPage, make_count_cache_key, paginate_keyset
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Source columns, in TradeListing column order
+_LISTING_COLUMNS = [column.name for column in TradeListing.__table__.columns]
+
+# Company / insider attributes copied into the read model
+_COMPANY_FIELDS = ("ticker", "name")
+_INSIDER_FIELDS = (
+    "name",
+    "title",
+    "is_director",
+    "is_officer",
+    "is_ten_percent_owner",
+    "is_other",
+)
+
+
+def _source_query():
+    """Project trades joined to company and insider into read model rows."""
+    return (
+        select(
+            Trade.id,
+            Trade.company_id,
+            Trade.insider_id,
+            func.upper(Company.ticker),
+            Company.name,
+            Insider.name,
+            Insider.title,
+            Insider.is_director,
+            Insider.is_officer,
+            Insider.is_ten_percent_owner,
+            Insider.is_other,
+            Trade.transaction_date,
+            Trade.filing_date,
+            Trade.transaction_type,
+            Trade.transaction_code,
+            Trade.shares,
+            Trade.price_per_share,
+            Trade.total_value,
+            Trade.shares_owned_after,
+            Trade.ownership_type,
+            Trade.derivative_transaction,
+            Trade.sec_filing_url,
+            Trade.form_type,
+            Trade.notes,
+            Trade.created_at,
+            Trade.updated_at,
+        )
+        .select_from(Trade)
+        .outerjoin(Company, Trade.company_id == Company.id)
+        .outerjoin(Insider, Trade.insider_id == Insider.id)
+    )
+
+
+def _upsert(dialect: str, source):
+    """INSERT ... SELECT that overwrites existing read model rows."""
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(TradeListing).from_select(_LISTING_COLUMNS, source)
+    return stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={column: stmt.excluded[column] for column in _LISTING_COLUMNS[1:]},
+    )
+
+
+def _insider_roles(row: Row) -> Dict[str, Any]:
+    """Primary role and role list (same rules as the Insider model)."""
+    roles = []
+    if row.is_officer:
+        roles.append("Officer")
+    if row.is_director:
+        roles.append("Director")
+    if row.is_ten_percent_owner:
+        roles.append("10% Owner")
+    if row.is_other:
+        roles.append("Other")
+
+    if row.is_officer and row.insider_title:
+        primary_role = row.insider_title
+    elif row.is_director:
+        primary_role = "Director"
+    elif row.is_ten_percent_owner:
+        primary_role = "10% Owner"
+    elif row.is_other:
+        primary_role = "Other"
+    else:
+        primary_role = "Unknown"
+    return {"primary_role": primary_role, "roles": roles}
+
+
+class TradeListingService:
+    """Service for the denormalized trade listing read model."""
+
+    @staticmethod
+    def sync_statements(
+        dialect: str,
+        trade_ids: Iterable[int] = (),
+        company_ids: Iterable[int] = (),
+        insider_ids: Iterable[int] = (),
+        deleted_trade_ids: Iterable[int] = (),
+    ) -> List[Any]:
+        """
+        Build the statements that bring the read model up to date.
+
+        Args:
+            dialect: Database dialect name
+            trade_ids: Trades inserted or updated
+            company_ids: Companies whose listed columns changed
+            insider_ids: Insiders whose listed columns changed
+            deleted_trade_ids: Trades deleted
+
+        Returns:
+            Statements to execute in order
+        """
+        statements = []
+        deleted = sorted(set(deleted_trade_ids))
+        if deleted:
+            statements.append(delete(TradeListing).where(TradeListing.id.in_(deleted)))
+
+        conditions = []
+        if trade_ids:
+            conditions.append(Trade.id.in_(sorted(set(trade_ids))))
+        if company_ids:
+            conditions.append(Trade.company_id.in_(sorted(set(company_ids))))
+        if insider_ids:
+            conditions.append(Trade.insider_id.in_(sorted(set(insider_ids))))
+        for condition in conditions:
+            statements.append(_upsert(dialect, _source_query().where(condition)))
+        return statements
+
+    @staticmethod
+    async def refresh(
+        db: AsyncSession,
+        trade_ids: Iterable[int] = (),
+        company_ids: Iterable[int] = (),
+        insider_ids: Iterable[int] = (),
+    ) -> None:
+        """
+        Recompute read model rows for the given trades, companies or insiders.
+
+        Only needed after Core bulk statements; ORM writes are synced by the
+        flush hook.
+        """
+        dialect = db.get_bind().dialect.name
+        for statement in TradeListingService.sync_statements(
+            dialect, trade_ids, company_ids, insider_ids
+        ):
+            await db.execute(statement)
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> int:
+        """
+        Rebuild the whole read model from trades.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of rows written
+        """
+        await db.execute(delete(TradeListing))
+        await db.execute(_upsert(db.get_bind().dialect.name, _source_query()))
+        await db.commit()
+
+        result = await db.execute(select(func.count()).select_from(TradeListing))
+        rows = result.scalar_one()
+        logger.info(f"Rebuilt trade listings: {rows} rows")
+        return rows
+
+    @staticmethod
+    async def ensure_built(db: AsyncSession) -> bool:
+        """
+        Backfill the read model if it is empty but trades exist.
+
+        Returns:
+            True if a rebuild ran
+        """
+        has_listings = await db.execute(select(exists().select_from(TradeListing)))
+        if has_listings.scalar():
+            return False
+        has_trades = await db.execute(select(exists().select_from(Trade)))
+        if not has_trades.scalar():
+            return False
+        await TradeListingService.rebuild(db)
+        return True
+
+    @staticmethod
+    def _listing_query():
+        """Column-projected select of read model rows."""
+        return select(*TradeListing.__table__.columns)
+
+    @staticmethod
+    async def get_page(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        filters: Optional[TradeFilter] = None,
+        sort_by: str = "filing_date",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        page: int = 1,
+        count_mode: str = "cached",
+    ) -> KeysetPage[Row]:
+        """
+        Get one page of listing rows (same filters and paging as TradeService.get_page).
+
+        Returns:
+            KeysetPage whose items are read model rows (see to_item)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or for another sort
+        """
+        query = TradeService._apply_filters(
+            TradeListingService._listing_query(), filters or TradeFilter(), TradeListing
+        )
+        return await paginate_keyset(
+            db,
+            query,
+            TradeListing,
+            sort_by=sort_by,
+            default_sort="filing_date",
+            order=order,
+            limit=limit,
+            skip=skip,
+            page=page,
+            cursor=cursor,
+            count_mode=count_mode,
+            count_cache_key=make_count_cache_key("trade_listings", filters),
+            scalars=False,
+        )
+
+    @staticmethod
+    async def get_recent(db: AsyncSession, days: int = 7, limit: int = 100) -> List[Row]:
+        """
+        Get recent listing rows, excluding $0 and undisclosed values.
+
+        Args:
+            db: Database session
+            days: Number of days to look back
+            limit: Maximum number of rows
+
+        Returns:
+            Read model rows, newest filing first
+        """
+        cutoff_date = date.today() - timedelta(days=days)
+        query = TradeService._apply_filters(
+            TradeListingService._listing_query(), TradeFilter(), TradeListing
+        )
+        result = await db.execute(
+            query.where(TradeListing.filing_date >= cutoff_date)
+            .order_by(TradeListing.filing_date.desc(), TradeListing.id.desc())
+            .limit(limit)
+        )
+        return list(result.all())
+
+    @staticmethod
+    def to_item(row: Row) -> Dict[str, Any]:
+        """
+        Map a read model row to a TradeListItem-shaped dict.
+
+        The dict has every TradeListItem field, so listing routes can serialize
+        it directly (app.core.serialization.render_bulk).
+
+        Args:
+            row: Row from get_page/get_recent
+
+        Returns:
+            Dict ready for the TradeListItem response model
+        """
+        total_value = row.total_value
+        if total_value:
+            significant = float(total_value) > settings.significant_trade_threshold
+        elif row.shares and row.price_per_share:
+            significant = (
+                float(row.shares * row.price_per_share)
+                > settings.significant_trade_threshold
+            )
+        else:
+            significant = False
+
+        company = None
+        if row.company_id is not None and row.ticker is not None:
+            company = {"id": row.company_id, "ticker": row.ticker, "name": row.company_name}
+
+        insider = None
+        if row.insider_id is not None and row.insider_name is not None:
+            insider = {
+                "id": row.insider_id,
+                "name": row.insider_name,
+                "title": row.insider_title,
+                "is_director": bool(row.is_director),
+                "is_officer": bool(row.is_officer),
+                "is_ten_percent_owner": bool(row.is_ten_percent_owner),
+                "is_other": bool(row.is_other),
+                **_insider_roles(row),
+            }
+
+        return {
+            "id": row.id,
+            "insider_id": row.insider_id,
+            "company_id": row.company_id,
+            "transaction_date": row.transaction_date,
+            "filing_date": row.filing_date,
+            "transaction_type": row.transaction_type,
+            "transaction_code": row.transaction_code,
+            "shares": row.shares,
+            "price_per_share": row.price_per_share,
+            "total_value": total_value,
+            "shares_owned_after": row.shares_owned_after,
+            "ownership_type": row.ownership_type,
+            "derivative_transaction": row.derivative_transaction,
+            "sec_filing_url": row.sec_filing_url,
+            "form_type": row.form_type,
+            "notes": row.notes,
+            "is_buy": row.transaction_type == "BUY",
+            "is_sell": row.transaction_type == "SELL",
+            "is_significant": significant,
+            "filing_delay_days": (row.filing_date - row.transaction_date).days,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "company": company,
+            "insider": insider,
+            "current_stock_price": None,
+            "price_change_percent": None,
+            "profit_loss": None,
+        }
+
+    @staticmethod
+    def to_items(rows: Sequence[Row]) -> List[Dict[str, Any]]:
+        """Map read model rows to TradeListItem-shaped dicts."""
+        return [TradeListingService.to_item(row) for row in rows]
+
+
+def _changed(obj, fields: Sequence[str]) -> bool:
+    """Check whether any of the given attributes changed in this flush."""
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _sync_after_flush(session: Session, flush_context) -> None:
+    """Propagate flushed Trade/Company/Insider changes to the read model."""
+    trade_ids = set()
+    company_ids = set()
+    insider_ids = set()
+    deleted_trade_ids = set()
+
+    for obj in session.new:
+        if isinstance(obj, Trade):
+            trade_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Trade):
+            if session.is_modified(obj):
+                trade_ids.add(obj.id)
+        elif isinstance(obj, Company):
+            if _changed(obj, _COMPANY_FIELDS):
+                company_ids.add(obj.id)
+        elif isinstance(obj, Insider):
+            if _changed(obj, _INSIDER_FIELDS):
+                insider_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Trade):
+            deleted_trade_ids.add(obj.id)
+
+    if not (trade_ids or company_ids or insider_ids or deleted_trade_ids):
+        return
+
+    connection = session.connection()
+    for statement in TradeListingService.sync_statements(
+        connection.dialect.name,
+        trade_ids - deleted_trade_ids,
+        company_ids,
+        insider_ids,
+        deleted_trade_ids,
+    ):
+        connection.execute(statement)
+
+
+event.listen(Session, "after_flush", _sync_after_flush)
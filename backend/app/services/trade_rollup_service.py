@@ -0,0 +1,330 @@
+"""
+Trade rollup service.
+
+Maintains the trade_daily_rollups table (company x filing day x transaction
+type) and serves the aggregate reads built on it. Writers call
+refresh_buckets() inside the same transaction as the trade change, so the
+rollup commits (or rolls back) together with the trade. The trade data
+versions used for HTTP validators are bumped on commit by the session hooks
+in data_version_service.
+
+On PostgreSQL a refresh takes a transaction-scoped advisory lock per bucket
+before recomputing it, so concurrent writers to one bucket take turns and
+the later one counts the earlier one's committed trades.
+"""
+
+import logging
+import zlib
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, delete, exists, func, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Trade, TradeDailyRollup
+from app.services.data_version_service import (
+    TRADES_SCOPE,
+    DataVersionService,
+    company_trades_scope,
+)
+
+logger = logging.getLogger(__name__)
+
+# (company_id, filing_date, transaction_type)
+RollupKey = Tuple[int, date, str]
+
+# First key of the two-int advisory locks taken on rollup buckets
+ROLLUP_LOCK_NAMESPACE = 29001
+_LOCK_BUCKET = text("SELECT pg_advisory_xact_lock(:namespace, :lock_id)")
+
+_ROLLUP_COLUMNS = [
+    "company_id",
+    "day",
+    "transaction_type",
+    "trade_count",
+    "total_shares",
+    "total_value",
+    "price_sum",
+    "price_count",
+    "priced_count",
+    "priced_shares",
+    "priced_value",
+    "max_value",
+    "insider_count",
+]
+
+
+def _bucket_lock_id(key: RollupKey) -> int:
+    """Stable signed 32-bit lock id for a bucket."""
+    company_id, day, transaction_type = key
+    return zlib.crc32(f"{company_id}:{day.isoformat()}:{transaction_type}".encode()) - 2**31
+
+
+class TradeRollupService:
+    """Service for the incrementally maintained daily trade rollup."""
+
+    @staticmethod
+    def rollup_key(trade: Trade) -> Optional[RollupKey]:
+        """Get the rollup bucket a trade belongs to (None if unattributed)."""
+        if trade.company_id is None or trade.filing_date is None:
+            return None
+        return (trade.company_id, trade.filing_date, trade.transaction_type)
+
+    @staticmethod
+    def _aggregate_query():
+        """Aggregate raw trades into rollup rows (one per bucket)."""
+        priced = and_(
+            Trade.total_value.is_not(None),
+            Trade.total_value > 0,
+            Trade.price_per_share.is_not(None),
+            Trade.price_per_share > 0,
+        )
+        return (
+            select(
+                Trade.company_id,
+                Trade.filing_date,
+                Trade.transaction_type,
+                func.count(Trade.id),
+                func.coalesce(func.sum(Trade.shares), 0),
+                func.coalesce(func.sum(Trade.total_value), 0),
+                func.coalesce(func.sum(Trade.price_per_share), 0),
+                func.count(Trade.price_per_share),
+                func.count(Trade.id).filter(priced),
+                func.coalesce(func.sum(case((priced, Trade.shares))), 0),
+                func.coalesce(func.sum(case((priced, Trade.total_value))), 0),
+                func.max(case((priced, Trade.total_value))),
+                func.count(func.distinct(Trade.insider_id)),
+            )
+            .where(Trade.company_id.is_not(None))
+            .group_by(Trade.company_id, Trade.filing_date, Trade.transaction_type)
+        )
+
+    @staticmethod
+    async def refresh_buckets(
+        db: AsyncSession, keys: Iterable[Optional[RollupKey]]
+    ) -> None:
+        """
+        Recompute the given rollup buckets from raw trades.
+
+        Must be called before the transaction that changed the trades is
+        committed. Pending ORM changes are flushed first so they are counted.
+
+        Args:
+            db: Database session
+            keys: Buckets touched by the change (None entries are ignored)
+        """
+        buckets: Set[RollupKey] = {key for key in keys if key is not None}
+        if not buckets:
+            return
+
+        await db.flush()
+
+        bucket_list = sorted(buckets)
+        await TradeRollupService._lock_buckets(db, bucket_list)
+        rollup_key = tuple_(
+            TradeDailyRollup.company_id,
+            TradeDailyRollup.day,
+            TradeDailyRollup.transaction_type,
+        )
+
+        # Drop buckets whose last trade went away
+        await db.execute(
+            delete(TradeDailyRollup).where(
+                rollup_key.in_(bucket_list),
+                ~exists().where(
+                    Trade.company_id == TradeDailyRollup.company_id,
+                    Trade.filing_date == TradeDailyRollup.day,
+                    Trade.transaction_type == TradeDailyRollup.transaction_type,
+                ),
+            )
+        )
+
+        aggregate = TradeRollupService._aggregate_query().where(
+            tuple_(Trade.company_id, Trade.filing_date, Trade.transaction_type).in_(
+                bucket_list
+            )
+        )
+        await db.execute(TradeRollupService._upsert(db, aggregate))
+
+    @staticmethod
+    async def _lock_buckets(db: AsyncSession, buckets: List[RollupKey]) -> None:
+        """
+        Hold each bucket's advisory lock until the transaction ends (PostgreSQL).
+
+        Without it two writers each recompute a bucket without the other's
+        uncommitted trades, and whichever commits last overwrites the other.
+        A writer that waits here recomputes after the first one committed.
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            # SQLite allows one writer at a time
+            return
+        # One global order, so writers with overlapping buckets cannot deadlock
+        for lock_id in sorted({_bucket_lock_id(key) for key in buckets}):
+            await db.execute(
+                _LOCK_BUCKET, {"namespace": ROLLUP_LOCK_NAMESPACE, "lock_id": lock_id}
+            )
+
+    @staticmethod
+    def _upsert(db: AsyncSession, aggregate):
+        """INSERT ... SELECT that overwrites existing bucket rows."""
+        dialect = db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(TradeDailyRollup).from_select(_ROLLUP_COLUMNS, aggregate)
+        return stmt.on_conflict_do_update(
+            index_elements=["company_id", "day", "transaction_type"],
+            set_={
+                column: stmt.excluded[column]
+                for column in _ROLLUP_COLUMNS[3:]
+            },
+        )
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> int:
+        """
+        Rebuild the whole rollup table from raw trades.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of rollup rows written
+        """
+        await db.execute(delete(TradeDailyRollup))
+        await db.execute(
+            TradeRollupService._upsert(db, TradeRollupService._aggregate_query())
+        )
+        # Per-company versions are not known here; bump every company scope
+        company_ids = await db.execute(
+            select(TradeDailyRollup.company_id).distinct()
+        )
+        await DataVersionService.bump(
+            db,
+            [TRADES_SCOPE]
+            + [company_trades_scope(company_id) for company_id in company_ids.scalars()],
+        )
+        await db.commit()
+
+        result = await db.execute(select(func.count()).select_from(TradeDailyRollup))
+        rows = result.scalar_one()
+        logger.info(f"Rebuilt trade daily rollups: {rows} rows")
+        return rows
+
+    @staticmethod
+    async def ensure_built(db: AsyncSession) -> bool:
+        """
+        Backfill the rollup if it is empty but trades exist.
+
+        Returns:
+            True if a rebuild ran
+        """
+        has_rollups = await db.execute(select(exists().select_from(TradeDailyRollup)))
+        if has_rollups.scalar():
+            return False
+        has_trades = await db.execute(
+            select(exists().where(Trade.company_id.is_not(None)))
+        )
+        if not has_trades.scalar():
+            return False
+        await TradeRollupService.rebuild(db)
+        return True
+
+    @staticmethod
+    async def get_daily_timeline(
+        db: AsyncSession, company_id: int, start_day: date
+    ) -> List[Dict[str, Any]]:
+        """
+        Get per-day trade count, value and average price for a company.
+
+        Args:
+            db: Database session
+            company_id: Company ID
+            start_day: First filing day to include
+
+        Returns:
+            List of {date, count, total_value, avg_price} ordered by date
+        """
+        result = await db.execute(
+            select(
+                TradeDailyRollup.day,
+                func.sum(TradeDailyRollup.trade_count).label("count"),
+                func.sum(TradeDailyRollup.total_value).label("total_value"),
+                func.sum(TradeDailyRollup.price_sum).label("price_sum"),
+                func.sum(TradeDailyRollup.price_count).label("price_count"),
+            )
+            .where(
+                TradeDailyRollup.company_id == company_id,
+                TradeDailyRollup.day >= start_day,
+            )
+            .group_by(TradeDailyRollup.day)
+            .order_by(TradeDailyRollup.day)
+        )
+        return [
+            {
+                "date": row.day.isoformat(),
+                "count": int(row.count),
+                "total_value": float(row.total_value or 0),
+                "avg_price": (
+                    float(row.price_sum) / row.price_count if row.price_count else 0.0
+                ),
+            }
+            for row in result.all()
+        ]
+
+    @staticmethod
+    async def get_value_by_type(
+        db: AsyncSession, company_id: int, start_day: date
+    ) -> Dict[str, float]:
+        """
+        Get total trade value per transaction type since a filing day.
+
+        Returns:
+            Dict like {"BUY": 1000.0, "SELL": 250.0}
+        """
+        result = await db.execute(
+            select(
+                TradeDailyRollup.transaction_type,
+                func.sum(TradeDailyRollup.total_value),
+            )
+            .where(
+                TradeDailyRollup.company_id == company_id,
+                TradeDailyRollup.day >= start_day,
+            )
+            .group_by(TradeDailyRollup.transaction_type)
+        )
+        return {tx_type: float(value or 0) for tx_type, value in result.all()}
+
+    @staticmethod
+    async def get_company_activity(
+        db: AsyncSession, company_id: int, recent_since: date
+    ) -> Dict[str, int]:
+        """
+        Get all-time trade count and recent buy/sell counts for a company.
+
+        Returns:
+            Dict with total_trades, recent_buy_count and recent_sell_count
+        """
+        recent = TradeDailyRollup.day >= recent_since
+        result = await db.execute(
+            select(
+                func.coalesce(func.sum(TradeDailyRollup.trade_count), 0),
+                func.coalesce(
+                    func.sum(TradeDailyRollup.trade_count).filter(
+                        recent, TradeDailyRollup.transaction_type == "BUY"
+                    ),
+                    0,
+                ),
+                func.coalesce(
+                    func.sum(TradeDailyRollup.trade_count).filter(
+                        recent, TradeDailyRollup.transaction_type == "SELL"
+                    ),
+                    0,
+                ),
+            ).where(TradeDailyRollup.company_id == company_id)
+        )
+        total, buys, sells = result.one()
+        return {
+            "total_trades": int(total),
+            "recent_buy_count": int(buys),
+            "recent_sell_count": int(sells),
+        }
@@ -5,14 +5,15 @@ Business logic for trade operations.
 """
 
 import logging
-from typing import Optional, List
+import time
+from typing import Dict, Optional, List, Tuple
 from datetime import date, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc
 from sqlalchemy.orm import selectinload
 
-from app.models import Trade, Company, Insider
+from app.models import Trade, Company, Insider, TradeDailyRollup
 from app.schemas.trade import (
     TradeCreate,
     TradeUpdate,
@@ -21,10 +22,17 @@ from app.schemas.trade import (
     TradeWithDetails,
 )
 from app.services.trade_event_manager import trade_event_manager
+from app.services.trade_rollup_service import TradeRollupService
+from app.utils.pagination import KeysetPage, make_count_cache_key, paginate_keyset
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Short-lived statistics cache (normalized filters -> (stats, stored_at))
+_stats_cache: Dict[str, Tuple[TradeStats, float]] = {}
+_STATS_CACHE_TTL = 30  # seconds
+_STATS_CACHE_MAX_ENTRIES = 256
+
 
 class TradeService:
     """Service for trade-related operations."""
@@ -57,7 +65,8 @@ class TradeService:
         filters: Optional[TradeFilter] = None,
         sort_by: str = "filing_date",
         order: str = "desc",
-    ) -> tuple[List[Trade], int]:
+        count_mode: str = "exact",
+    ) -> tuple[List[Trade], Optional[int]]:
         """
         Get all trades with filtering and pagination.
 
@@ -68,10 +77,54 @@ class TradeService:
             filters: Optional filter parameters
             sort_by: Field to sort by
             order: Sort order (asc or desc)
+            count_mode: exact, cached, estimated or none
 
         Returns:
             Tuple of (trades list, total count)
         """
+        page = await TradeService.get_page(
+            db,
+            skip=skip,
+            limit=limit,
+            filters=filters,
+            sort_by=sort_by,
+            order=order,
+            count_mode=count_mode,
+        )
+        return page.items, page.total
+
+    @staticmethod
+    async def get_page(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        filters: Optional[TradeFilter] = None,
+        sort_by: str = "filing_date",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        page: int = 1,
+        count_mode: str = "cached",
+    ) -> KeysetPage[Trade]:
+        """
+        Get one page of trades using keyset (cursor) pagination.
+
+        Args:
+            db: Database session
+            skip: Number of records to skip (ignored when cursor is given)
+            limit: Maximum number of records to return
+            filters: Optional filter parameters
+            sort_by: Field to sort by
+            order: Sort order (asc or desc)
+            cursor: Opaque cursor from a previous page
+            page: Page number reported when no cursor is given
+            count_mode: exact, cached, estimated or none
+
+        Returns:
+            KeysetPage with trades, total and next_cursor
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or for another sort
+        """
         # Build base query
         query = select(Trade).options(
             selectinload(Trade.company), selectinload(Trade.insider)
@@ -81,85 +134,83 @@ class TradeService:
         if filters:
             query = TradeService._apply_filters(query, filters)
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar_one()
-
-        # Apply sorting
-        # Default to filing_date if sort_by field doesn't exist
-        sort_column = getattr(Trade, sort_by, Trade.filing_date)
-        if order == "desc":
-            # Add secondary sort by id (desc) to ensure consistent ordering when dates are equal
-            query = query.order_by(desc(sort_column), desc(Trade.id))
-        else:
-            # Add secondary sort by id (asc) to ensure consistent ordering when dates are equal
-            query = query.order_by(sort_column, Trade.id)
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-
-        # Execute query
-        result = await db.execute(query)
-        trades = result.scalars().all()
-
-        return list(trades), total
+        # Default to filing_date if sort_by field doesn't exist; ties are
+        # broken by id so the (sort, id) keyset is unique
+        return await paginate_keyset(
+            db,
+            query,
+            Trade,
+            sort_by=sort_by,
+            default_sort="filing_date",
+            order=order,
+            limit=limit,
+            skip=skip,
+            page=page,
+            cursor=cursor,
+            count_mode=count_mode,
+            count_cache_key=make_count_cache_key("trades", filters),
+        )
 
     @staticmethod
-    def _apply_filters(query, filters: TradeFilter):
+    def _apply_filters(query, filters: TradeFilter, model=Trade):
         """
         Apply filters to trade query.
 
         Args:
             query: SQLAlchemy query
             filters: Filter parameters
+            model: Trade, or the TradeListing read model (same column names)
 
         Returns:
             Filtered query
         """
         # Base filters: Always exclude $0 and NULL value trades
-        query = query.where(Trade.total_value.is_not(None))
-        query = query.where(Trade.total_value > 0)
-        query = query.where(Trade.price_per_share.is_not(None))
-        query = query.where(Trade.price_per_share > 0)
+        query = query.where(model.total_value.is_not(None))
+        query = query.where(model.total_value > 0)
+        query = query.where(model.price_per_share.is_not(None))
+        query = query.where(model.price_per_share > 0)
 
         if filters.company_id:
-            query = query.where(Trade.company_id == filters.company_id)
+            query = query.where(model.company_id == filters.company_id)
 
         if filters.insider_id:
-            query = query.where(Trade.insider_id == filters.insider_id)
+            query = query.where(model.insider_id == filters.insider_id)
 
         if filters.ticker:
-            query = query.join(Company).where(
-                func.upper(Company.ticker) == filters.ticker.upper()
-            )
+            if model is Trade:
+                query = query.join(Company).where(
+                    func.upper(Company.ticker) == filters.ticker.upper()
+                )
+            else:
+                # Stored inline and upper-cased on the read model (indexable)
+                query = query.where(model.ticker == filters.ticker.upper())
 
         if filters.transaction_type:
             query = query.where(
-                Trade.transaction_type == filters.transaction_type.upper()
+                model.transaction_type == filters.transaction_type.upper()
             )
 
         if filters.transaction_date_from:
-            query = query.where(Trade.transaction_date >= filters.transaction_date_from)
+            query = query.where(model.transaction_date >= filters.transaction_date_from)
 
         if filters.transaction_date_to:
-            query = query.where(Trade.transaction_date <= filters.transaction_date_to)
+            query = query.where(model.transaction_date <= filters.transaction_date_to)
 
         if filters.min_value is not None:
-            query = query.where(Trade.total_value >= filters.min_value)
+            query = query.where(model.total_value >= filters.min_value)
 
         if filters.max_value is not None:
-            query = query.where(Trade.total_value <= filters.max_value)
+            query = query.where(model.total_value <= filters.max_value)
 
         if filters.min_shares is not None:
-            query = query.where(Trade.shares >= filters.min_shares)
+            query = query.where(model.shares >= filters.min_shares)
 
         if filters.derivative_only:
-            query = query.where(Trade.derivative_transaction.is_(True))
+            query = query.where(model.derivative_transaction.is_(True))
 
         if filters.significant_only:
             query = query.where(
-                Trade.total_value > settings.significant_trade_threshold
+                model.total_value > settings.significant_trade_threshold
             )
 
         return query
@@ -221,7 +272,11 @@ class TradeService:
 
         trade = Trade(**trade_dict)
         db.add(trade)
+        await TradeRollupService.refresh_buckets(
+            db, [TradeRollupService.rollup_key(trade)]
+        )
         await db.commit()
+        TradeService.clear_statistics_cache()
         await db.refresh(trade)
         # Ensure relationships are loaded for broadcasting
         await db.refresh(trade, attribute_names=["company", "insider"])
@@ -246,7 +301,7 @@ class TradeService:
             trade_payload = TradeWithDetails.model_validate(trade).model_dump(
                 mode="json"
             )
-            await trade_event_manager.broadcast(
+            await trade_event_manager.publish(
                 {
                     "type": "trade_created",
                     "trade": trade_payload,
@@ -279,10 +334,15 @@ class TradeService:
             if shares and price:
                 update_dict["total_value"] = Decimal(shares) * Decimal(price)
 
+        previous_key = TradeRollupService.rollup_key(trade)
         for field, value in update_dict.items():
             setattr(trade, field, value)
 
+        await TradeRollupService.refresh_buckets(
+            db, [previous_key, TradeRollupService.rollup_key(trade)]
+        )
         await db.commit()
+        TradeService.clear_statistics_cache()
         await db.refresh(trade)
         await db.refresh(trade, attribute_names=["company", "insider"])
 
@@ -306,7 +366,7 @@ class TradeService:
             trade_payload = TradeWithDetails.model_validate(trade).model_dump(
                 mode="json"
             )
-            await trade_event_manager.broadcast(
+            await trade_event_manager.publish(
                 {
                     "type": "trade_updated",
                     "trade": trade_payload,
@@ -326,129 +386,280 @@ class TradeService:
             db: Database session
             trade: Trade instance to delete
         """
+        rollup_key = TradeRollupService.rollup_key(trade)
         await db.delete(trade)
+        await TradeRollupService.refresh_buckets(db, [rollup_key])
         await db.commit()
+        TradeService.clear_statistics_cache()
         logger.info(f"Deleted trade: ID {trade.id}")
 
     @staticmethod
-    async def get_statistics(
-        db: AsyncSession, filters: Optional[TradeFilter] = None
-    ) -> TradeStats:
+    async def publish_created(db: AsyncSession, trades: List[Trade]) -> None:
         """
-        Calculate trade statistics.
+        Publish trade_created stream events for trades committed in bulk.
+
+        Loads the trades' company and insider details in one query.
 
         Args:
             db: Database session
-            filters: Optional filters
+            trades: Committed Trade instances
+        """
+        trade_ids = [trade.id for trade in trades]
+        if not trade_ids:
+            return
+        result = await db.execute(
+            select(Trade)
+            .options(selectinload(Trade.company), selectinload(Trade.insider))
+            .where(Trade.id.in_(trade_ids))
+            .order_by(Trade.id)
+        )
+        await trade_event_manager.publish(
+            *[
+                {
+                    "type": "trade_created",
+                    "trade": TradeWithDetails.model_validate(trade).model_dump(mode="json"),
+                }
+                for trade in result.scalars()
+            ]
+        )
 
-        Returns:
-            TradeStats instance
+    @staticmethod
+    def clear_statistics_cache() -> None:
+        """Drop cached statistics (called after trade writes)."""
+        _stats_cache.clear()
+
+    @staticmethod
+    def _rollup_can_serve(filters: Optional[TradeFilter]) -> bool:
         """
-        # Build base query
-        query = select(Trade)
-        if filters:
-            query = TradeService._apply_filters(query, filters)
+        Check whether statistics for these filters can come from the daily rollup.
 
-        # Total buys
-        buy_query = query.where(Trade.transaction_type == "BUY")
-        total_buys_result = await db.execute(
-            select(func.count()).select_from(buy_query.subquery())
+        The rollup covers the same priced trades as the base filters; without
+        filters the raw query counts every trade, so it is not served here.
+        """
+        if filters is None:
+            return False
+        return not (
+            filters.insider_id
+            or filters.transaction_date_from
+            or filters.transaction_date_to
+            or filters.min_value is not None
+            or filters.max_value is not None
+            or filters.min_shares is not None
+            or filters.derivative_only
+            or filters.significant_only
         )
-        total_buys = total_buys_result.scalar_one()
 
-        # Total sells
-        sell_query = query.where(Trade.transaction_type == "SELL")
-        total_sells_result = await db.execute(
-            select(func.count()).select_from(sell_query.subquery())
+    @staticmethod
+    def _most_active_insider(filters: Optional[TradeFilter], filtered=None):
+        """Scalar subquery for the most active insider name."""
+        if filtered is None:
+            query = select(Trade.insider_id)
+            if filters:
+                query = TradeService._apply_filters(query, filters)
+            filtered = query.subquery("insider_trades")
+
+        insider_counts = (
+            select(
+                Insider.name.label("name"),
+                func.row_number()
+                .over(order_by=(desc(func.count()), Insider.name))
+                .label("rank"),
+            )
+            .select_from(filtered)
+            .join(Insider, Insider.id == filtered.c.insider_id)
+            .group_by(Insider.name)
+            .subquery("insider_counts")
+        )
+        return (
+            select(insider_counts.c.name)
+            .where(insider_counts.c.rank == 1)
+            .scalar_subquery()
+            .label("most_active_insider")
         )
-        total_sells = total_sells_result.scalar_one()
-
-        # Total trades = buys + sells (only count BUY and SELL transactions)
-        # This ensures the math is always correct: total_trades = total_buys + total_sells
-        total_trades = total_buys + total_sells
 
-        # Sum of shares and value
-        # Use subquery columns to avoid cartesian product
-        subq = query.subquery()
-        sums_result = await db.execute(
+    @staticmethod
+    def _most_active_company(filtered, count_column):
+        """Scalar subquery for the most active company ticker."""
+        company_counts = (
             select(
-                func.sum(subq.c.shares),
-                func.sum(subq.c.total_value),
-                func.avg(subq.c.total_value),
-                func.max(subq.c.total_value),
+                Company.ticker.label("ticker"),
+                func.row_number()
+                .over(order_by=(desc(count_column), Company.ticker))
+                .label("rank"),
             )
+            .select_from(filtered)
+            .join(Company, Company.id == filtered.c.company_id)
+            .group_by(Company.ticker)
+            .subquery("company_counts")
+        )
+        return (
+            select(company_counts.c.ticker)
+            .where(company_counts.c.rank == 1)
+            .scalar_subquery()
+            .label("most_active_company")
         )
-        sums = sums_result.one()
-
-        total_shares_traded = float(sums[0]) if sums[0] else 0.0
-        average_trade_size = float(sums[2]) if sums[2] else 0.0
-        largest_trade = float(sums[3]) if sums[3] else None
 
-        # Total buy value
-        buy_subq = buy_query.subquery()
-        buy_value_result = await db.execute(select(func.sum(buy_subq.c.total_value)))
-        total_buy_value = float(buy_value_result.scalar_one() or 0.0)
+    @staticmethod
+    def build_statistics_query(filters: Optional[TradeFilter] = None):
+        """
+        Build the single-pass statistics query.
 
-        # Total sell value
-        sell_subq = sell_query.subquery()
-        sell_value_result = await db.execute(select(func.sum(sell_subq.c.total_value)))
-        total_sell_value = float(sell_value_result.scalar_one() or 0.0)
+        Conditional aggregates compute the buy/sell counts and values in one
+        pass; ranking windows pick the most active company and insider.
+        Company/ticker/type-only filters read the daily rollup (cost grows
+        with days, not trades); other filters scan the filtered trades.
 
-        # Net volume = BUY value - SELL value (positive = net buying, negative = net selling)
-        total_value = total_buy_value - total_sell_value
+        Args:
+            filters: Optional filters
 
-        # Most active company
-        company_query = select(Trade)
+        Returns:
+            SQLAlchemy select producing one statistics row
+        """
+        if TradeService._rollup_can_serve(filters):
+            return TradeService._build_rollup_statistics_query(filters)
+
+        query = select(
+            Trade.id,
+            Trade.company_id,
+            Trade.insider_id,
+            Trade.transaction_type,
+            Trade.shares,
+            Trade.total_value,
+        )
         if filters:
-            company_query = TradeService._apply_filters(company_query, filters)
-
-        most_active_company_result = await db.execute(
-            select(Company.ticker, func.count(Trade.id).label("trade_count"))
-            .select_from(Trade)
-            .join(Company, Company.id == Trade.company_id)
-            .where(Trade.id.in_(select(company_query.subquery().c.id)))
-            .group_by(Company.ticker)
-            .order_by(desc("trade_count"))
-            .limit(1)
+            query = TradeService._apply_filters(query, filters)
+        filtered = query.cte("filtered_trades")
+
+        is_buy = filtered.c.transaction_type == "BUY"
+        is_sell = filtered.c.transaction_type == "SELL"
+        totals = select(
+            func.count().filter(is_buy).label("total_buys"),
+            func.count().filter(is_sell).label("total_sells"),
+            func.sum(filtered.c.shares).label("total_shares"),
+            func.avg(filtered.c.total_value).label("average_value"),
+            func.max(filtered.c.total_value).label("largest_value"),
+            func.sum(filtered.c.total_value).filter(is_buy).label("buy_value"),
+            func.sum(filtered.c.total_value).filter(is_sell).label("sell_value"),
+        ).cte("totals")
+
+        return select(
+            totals,
+            TradeService._most_active_company(filtered, func.count()),
+            TradeService._most_active_insider(filters, filtered),
         )
-        most_active_company_row = most_active_company_result.first()
-        most_active_company = (
-            most_active_company_row[0] if most_active_company_row else None
+
+    @staticmethod
+    def _build_rollup_statistics_query(filters: Optional[TradeFilter] = None):
+        """Statistics query over trade_daily_rollups (priced trades, as the base filters)."""
+        query = select(
+            TradeDailyRollup.company_id,
+            TradeDailyRollup.transaction_type,
+            TradeDailyRollup.priced_count,
+            TradeDailyRollup.priced_shares,
+            TradeDailyRollup.priced_value,
+            TradeDailyRollup.max_value,
+        ).where(TradeDailyRollup.priced_count > 0)
+        if filters and filters.company_id:
+            query = query.where(TradeDailyRollup.company_id == filters.company_id)
+        if filters and filters.ticker:
+            query = query.join(Company, Company.id == TradeDailyRollup.company_id).where(
+                func.upper(Company.ticker) == filters.ticker.upper()
+            )
+        if filters and filters.transaction_type:
+            query = query.where(
+                TradeDailyRollup.transaction_type == filters.transaction_type.upper()
+            )
+        if not (filters and (filters.company_id or filters.ticker)):
+            # Trades without a company are not rolled up; aggregate them directly
+            unattributed = select(
+                Trade.company_id,
+                Trade.transaction_type,
+                func.count(Trade.id),
+                func.sum(Trade.shares),
+                func.sum(Trade.total_value),
+                func.max(Trade.total_value),
+            ).where(Trade.company_id.is_(None))
+            if filters:
+                unattributed = TradeService._apply_filters(unattributed, filters)
+            query = query.union_all(unattributed.group_by(Trade.company_id, Trade.transaction_type))
+        filtered = query.cte("filtered_rollups")
+
+        is_buy = filtered.c.transaction_type == "BUY"
+        is_sell = filtered.c.transaction_type == "SELL"
+        totals = select(
+            func.sum(filtered.c.priced_count).filter(is_buy).label("total_buys"),
+            func.sum(filtered.c.priced_count).filter(is_sell).label("total_sells"),
+            func.sum(filtered.c.priced_shares).label("total_shares"),
+            (
+                func.sum(filtered.c.priced_value)
+                / func.nullif(func.sum(filtered.c.priced_count), 0)
+            ).label("average_value"),
+            func.max(filtered.c.max_value).label("largest_value"),
+            func.sum(filtered.c.priced_value).filter(is_buy).label("buy_value"),
+            func.sum(filtered.c.priced_value).filter(is_sell).label("sell_value"),
+        ).cte("totals")
+
+        return select(
+            totals,
+            TradeService._most_active_company(
+                filtered, func.sum(filtered.c.priced_count)
+            ),
+            # Insider activity is not rolled up; rank it from the trades
+            TradeService._most_active_insider(filters),
         )
 
-        # Most active insider
-        insider_query = select(Trade)
-        if filters:
-            insider_query = TradeService._apply_filters(insider_query, filters)
+    @staticmethod
+    async def get_statistics(
+        db: AsyncSession, filters: Optional[TradeFilter] = None
+    ) -> TradeStats:
+        """
+        Calculate trade statistics.
 
-        most_active_insider_result = await db.execute(
-            select(Insider.name, func.count(Trade.id).label("trade_count"))
-            .select_from(Trade)
-            .join(Insider, Insider.id == Trade.insider_id)
-            .where(Trade.id.in_(select(insider_query.subquery().c.id)))
-            .group_by(Insider.name)
-            .order_by(desc("trade_count"))
-            .limit(1)
-        )
-        most_active_insider_row = most_active_insider_result.first()
-        most_active_insider = (
-            most_active_insider_row[0] if most_active_insider_row else None
-        )
+        Runs a single query (see build_statistics_query) and caches the
+        result briefly per normalized filter set.
 
-        return TradeStats(
-            total_trades=total_trades,
+        Args:
+            db: Database session
+            filters: Optional filters
+
+        Returns:
+            TradeStats instance
+        """
+        cache_key = make_count_cache_key("trade_stats", filters)
+        cached = _stats_cache.get(cache_key)
+        if cached and time.time() - cached[1] < _STATS_CACHE_TTL:
+            return cached[0]
+
+        result = await db.execute(TradeService.build_statistics_query(filters))
+        row = result.one()
+
+        # Total trades = buys + sells (only count BUY and SELL transactions)
+        # This ensures the math is always correct: total_trades = total_buys + total_sells
+        total_buys = int(row.total_buys or 0)
+        total_sells = int(row.total_sells or 0)
+        total_buy_value = float(row.buy_value or 0.0)
+        total_sell_value = float(row.sell_value or 0.0)
+
+        stats = TradeStats(
+            total_trades=total_buys + total_sells,
             total_buys=total_buys,
             total_sells=total_sells,
-            total_shares_traded=total_shares_traded,
-            total_value=total_value,
+            total_shares_traded=float(row.total_shares) if row.total_shares else 0.0,
+            # Net volume = BUY value - SELL value (positive = net buying, negative = net selling)
+            total_value=total_buy_value - total_sell_value,
             total_buy_value=total_buy_value,
             total_sell_value=total_sell_value,
-            average_trade_size=average_trade_size,
-            largest_trade=largest_trade,
-            most_active_company=most_active_company,
-            most_active_insider=most_active_insider,
+            average_trade_size=float(row.average_value) if row.average_value else 0.0,
+            largest_trade=float(row.largest_value) if row.largest_value else None,
+            most_active_company=row.most_active_company,
+            most_active_insider=row.most_active_insider,
         )
 
+        if len(_stats_cache) >= _STATS_CACHE_MAX_ENTRIES:
+            _stats_cache.pop(next(iter(_stats_cache)))
+        _stats_cache[cache_key] = (stats, time.time())
+        return stats
+
     @staticmethod
     async def check_duplicate(
         db: AsyncSession,
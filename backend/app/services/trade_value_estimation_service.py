@@ -8,22 +8,32 @@ Solves the problem of undisclosed trade values by using intelligent estimation:
 4. Provides confidence scores for estimates
 """
 
+import asyncio
 import logging
+from collections import defaultdict
 from typing import Optional, Dict, Any, List, Tuple
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_
 
 from app.models import Trade
 from app.services.stock_price_service import StockPriceService
+from app.utils.price_index import PriceIndex
 
 logger = logging.getLogger(__name__)
 
+# Maximum distance (days) between a trade and the price bar used to value it
+MAX_PRICE_GAP_DAYS = 5
+
+# Bounds for the history window fetched when building a ticker's price index
+MIN_HISTORY_DAYS = 30
+MAX_HISTORY_DAYS = 400
+
 
 class TradeValueEstimationService:
-    # Class-level cache for price history to avoid repeated fetches across all instances
-    _price_history_cache: Dict[str, Tuple[List[Dict], datetime]] = {}
+    # Class-level cache of per-ticker price indexes (ticker -> (index, history_days, built_at))
+    _price_index_cache: Dict[str, Tuple[PriceIndex, int, datetime]] = {}
     _cache_ttl = timedelta(minutes=10)  # Cache for 10 minutes
     
     # Class-level cache for similar trades queries to reduce database load
@@ -43,10 +53,20 @@ class TradeValueEstimationService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def estimate_missing_trade_value(self, trade: Trade) -> Dict[str, Any]:
+    async def estimate_missing_trade_value(
+        self,
+        trade: Trade,
+        price_lookup: Optional[Dict[int, Optional[float]]] = None,
+    ) -> Dict[str, Any]:
         """
         Estimate missing trade value using multiple methods.
 
+        Args:
+            trade: Trade to estimate
+            price_lookup: Optional precomputed prices from estimate_prices_batch
+                (trade id -> price). Trades present in the lookup skip the
+                per-trade price estimation.
+
         Returns:
             Dict with estimated values and confidence scores
         """
@@ -75,7 +95,10 @@ class TradeValueEstimationService:
 
         # If we have shares but no price, estimate price
         if trade.shares and not trade.price_per_share:
-            estimated_price = await self._estimate_price_per_share(trade)
+            if price_lookup is not None and trade.id in price_lookup:
+                estimated_price = price_lookup[trade.id]
+            else:
+                estimated_price = await self._estimate_price_per_share(trade)
             if estimated_price:
                 estimated_value = float(trade.shares * Decimal(str(estimated_price)))
                 return {
@@ -112,85 +135,83 @@ class TradeValueEstimationService:
             "estimation_method": "market_context",
         }
 
+    @staticmethod
+    def _get_ticker(trade: Trade) -> Optional[str]:
+        """Get the trade's ticker without triggering a lazy load failure."""
+        try:
+            company = trade.company
+        except Exception:
+            return None
+        return company.ticker if company and company.ticker else None
+
+    async def _get_price_index(
+        self, ticker: str, oldest_date: Optional[date] = None
+    ) -> Optional[PriceIndex]:
+        """
+        Get (or build) the cached price index for a ticker.
+
+        The history window is widened to cover oldest_date when needed. The
+        blocking price fetch runs in a worker thread so the event loop is not
+        held up by Yahoo Finance.
+        """
+        days_needed = MIN_HISTORY_DAYS
+        if oldest_date:
+            age_days = (datetime.utcnow().date() - oldest_date).days
+            days_needed = age_days + MAX_PRICE_GAP_DAYS + 1
+            days_needed = min(max(days_needed, MIN_HISTORY_DAYS), MAX_HISTORY_DAYS)
+
+        cached = TradeValueEstimationService._price_index_cache.get(ticker)
+        if cached:
+            index, cached_days, built_at = cached
+            if (
+                datetime.utcnow() - built_at < TradeValueEstimationService._cache_ttl
+                and cached_days >= days_needed
+            ):
+                logger.debug(f"Using cached price index for {ticker}")
+                return index
+
+        try:
+            history = await asyncio.to_thread(
+                StockPriceService.get_price_history, ticker, days_needed
+            )
+        except Exception as e:
+            logger.debug(f"Could not get historical prices for {ticker}: {e}")
+            return None
+
+        if not history:
+            return None
+
+        index = PriceIndex.from_history(ticker, history)
+        TradeValueEstimationService._price_index_cache[ticker] = (
+            index,
+            days_needed,
+            datetime.utcnow(),
+        )
+        logger.debug(f"Cached price index for {ticker} ({len(index)} bars)")
+        return index
+
     async def _estimate_price_per_share(self, trade: Trade) -> Optional[float]:
         """Estimate price per share using multiple methods."""
         # Method 1: Get stock price on transaction date
-        if trade.company and trade.transaction_date:
-            try:
-                ticker = trade.company.ticker
-                transaction_date = trade.transaction_date
-
-                # Check cache first (class-level cache)
-                cache_key = f"{ticker}_history"
-                cached_data = TradeValueEstimationService._price_history_cache.get(
-                    cache_key
+        ticker = self._get_ticker(trade)
+        if ticker and trade.transaction_date:
+            index = await self._get_price_index(ticker, trade.transaction_date)
+            if index:
+                closest_price = index.closest_close(
+                    trade.transaction_date, max_gap_days=MAX_PRICE_GAP_DAYS
                 )
-
-                history = None
-                if cached_data:
-                    cached_history, cache_time = cached_data
-                    if (
-                        datetime.utcnow() - cache_time
-                        < TradeValueEstimationService._cache_ttl
-                    ):
-                        history = cached_history
-                        logger.debug(f"Using cached price history for {ticker}")
-
-                # Fetch if not cached
-                if not history:
-                    history = StockPriceService.get_price_history(ticker, days=30)
-                    if history:
-                        # Update cache (class-level)
-                        TradeValueEstimationService._price_history_cache[cache_key] = (
-                            history,
-                            datetime.utcnow(),
-                        )
-                        logger.debug(f"Cached price history for {ticker}")
-
-                if history:
-                    # Find closest date to transaction
-                    closest_price = None
-                    min_diff = float("inf")
-
-                    for point in history:
-                        try:
-                            point_date = datetime.fromisoformat(
-                                point["date"].replace("Z", "+00:00")
-                            ).date()
-                        except Exception:
-                            # Try alternative date format
-                            try:
-                                point_date = datetime.strptime(
-                                    point["date"], "%Y-%m-%d"
-                                ).date()
-                            except Exception:
-                                continue
-                        diff = abs((point_date - transaction_date).days)
-                        if diff < min_diff:
-                            min_diff = diff
-                            closest_price = point["close"]
-
-                    if closest_price and min_diff <= 5:  # Within 5 days
-                        return float(closest_price)
-            except Exception as e:
-                logger.debug(f"Could not get historical price: {e}")
+                if closest_price:
+                    return float(closest_price)
 
         # Method 2: Use average price from similar trades
-        if trade.company_id and trade.insider_id:
-            similar_trades = await self._get_similar_trades(trade)
-            if similar_trades:
-                prices = [
-                    float(t.price_per_share)
-                    for t in similar_trades
-                    if t.price_per_share and t.price_per_share > 0
-                ]
-                if prices:
-                    return sum(prices) / len(prices)
+        similar_price = await self._estimate_price_from_similar_trades(trade)
+        if similar_price:
+            return similar_price
 
         # Method 3: Use current stock price as fallback
-        if trade.company:
+        if ticker:
             try:
-                quote = StockPriceService.get_stock_quote(trade.company.ticker)
+                quote = await asyncio.to_thread(StockPriceService.get_stock_quote, ticker)
                 if quote and quote.get("current_price"):
                     return float(quote["current_price"])
             except Exception as e:
@@ -198,6 +219,156 @@ class TradeValueEstimationService:
 
         return None
 
+    async def _estimate_price_from_similar_trades(
+        self, trade: Trade
+    ) -> Optional[float]:
+        """Average disclosed price of similar trades from the same insider/company."""
+        if not (trade.company_id and trade.insider_id):
+            return None
+
+        similar_trades = await self._get_similar_trades(trade)
+        prices = [
+            float(t.price_per_share)
+            for t in similar_trades
+            if t.price_per_share and t.price_per_share > 0
+        ]
+        if prices:
+            return sum(prices) / len(prices)
+        return None
+
+    async def estimate_prices_batch(
+        self, trades: List[Trade]
+    ) -> Dict[int, Optional[float]]:
+        """
+        Estimate price per share for many trades in one pass.
+
+        Trades are grouped by ticker so each ticker's price index is built
+        (or pulled from cache) once, then every trade is resolved with a
+        bisect lookup. Trades the index cannot price fall back to similar
+        trades (one query per ticker for all of them) and a single current
+        quote per ticker.
+
+        Only trades with shares but no disclosed price are estimated.
+
+        Args:
+            trades: Trades to estimate
+
+        Returns:
+            Dict mapping trade id to estimated price (None if unavailable)
+        """
+        by_ticker: Dict[Optional[str], List[Trade]] = defaultdict(list)
+        for trade in trades:
+            if trade.id is None or not trade.shares or trade.price_per_share:
+                continue
+            by_ticker[self._get_ticker(trade)].append(trade)
+
+        prices: Dict[int, Optional[float]] = {}
+        for ticker, ticker_trades in by_ticker.items():
+            index = None
+            dated = [t.transaction_date for t in ticker_trades if t.transaction_date]
+            if ticker and dated:
+                index = await self._get_price_index(ticker, min(dated))
+
+            unresolved: List[Trade] = []
+            for trade in ticker_trades:
+                price = None
+                if index and trade.transaction_date:
+                    price = index.closest_close(
+                        trade.transaction_date, max_gap_days=MAX_PRICE_GAP_DAYS
+                    )
+                if price:
+                    prices[trade.id] = float(price)
+                else:
+                    unresolved.append(trade)
+
+            if not unresolved:
+                continue
+
+            similar_prices = await self._similar_prices_batch(unresolved)
+            current_price: Optional[float] = None
+            quote_fetched = False
+            for trade in unresolved:
+                price = similar_prices.get(trade.id)
+                if not price and ticker:
+                    if not quote_fetched:
+                        quote_fetched = True
+                        try:
+                            quote = await asyncio.to_thread(
+                                StockPriceService.get_stock_quote, ticker
+                            )
+                            if quote and quote.get("current_price"):
+                                current_price = float(quote["current_price"])
+                        except Exception as e:
+                            logger.debug(f"Could not get current price for {ticker}: {e}")
+                    price = current_price
+                prices[trade.id] = price
+
+        logger.debug(
+            f"Estimated prices for {len(prices)} trades across {len(by_ticker)} tickers"
+        )
+        return prices
+
+    async def _similar_prices_batch(
+        self, trades: List[Trade], days_back: int = 90, limit: int = 10
+    ) -> Dict[int, Optional[float]]:
+        """
+        Similar-trade price estimates for many trades with one query.
+
+        Same result per trade as _estimate_price_from_similar_trades: the
+        average disclosed price of the `limit` most recent trades by the same
+        insider, company and transaction type in the `days_back` days before.
+        """
+        groups: Dict[Tuple[int, int, str], List[Trade]] = defaultdict(list)
+        for trade in trades:
+            if trade.company_id and trade.insider_id and trade.transaction_date:
+                groups[(trade.company_id, trade.insider_id, trade.transaction_type)].append(trade)
+        if not groups:
+            return {}
+
+        conditions = []
+        for (company_id, insider_id, transaction_type), group in groups.items():
+            dates = [t.transaction_date for t in group]
+            conditions.append(
+                and_(
+                    Trade.company_id == company_id,
+                    Trade.insider_id == insider_id,
+                    Trade.transaction_type == transaction_type,
+                    Trade.transaction_date >= min(dates) - timedelta(days=days_back),
+                    Trade.transaction_date < max(dates),
+                )
+            )
+        result = await self.db.execute(
+            select(
+                Trade.company_id,
+                Trade.insider_id,
+                Trade.transaction_type,
+                Trade.transaction_date,
+                Trade.price_per_share,
+            )
+            .where(
+                Trade.price_per_share.isnot(None),
+                Trade.price_per_share > 0,
+                or_(*conditions),
+            )
+            .order_by(Trade.transaction_date.desc())
+        )
+        history: Dict[Tuple[int, int, str], List[Tuple[date, float]]] = defaultdict(list)
+        for row in result:
+            history[(row.company_id, row.insider_id, row.transaction_type)].append(
+                (row.transaction_date, float(row.price_per_share))
+            )
+
+        prices: Dict[int, Optional[float]] = {}
+        for key, group in groups.items():
+            for trade in group:
+                cutoff = trade.transaction_date - timedelta(days=days_back)
+                window = [
+                    price for day, price in history.get(key, ())
+                    if cutoff <= day < trade.transaction_date
+                ][:limit]
+                prices[trade.id] = sum(window) / len(window) if window else None
+        return prices
+
     async def _get_similar_trades(
         self, trade: Trade, days_back: int = 90
     ) -> list[Trade]:
@@ -275,7 +446,9 @@ class TradeValueEstimationService:
 
         # Get current stock price
         try:
-            quote = StockPriceService.get_stock_quote(trade.company.ticker)
+            quote = await asyncio.to_thread(
+                StockPriceService.get_stock_quote, trade.company.ticker
+            )
             if quote and quote.get("current_price"):
                 price = float(quote["current_price"])
                 return float(trade.shares * Decimal(str(price)))
@@ -285,7 +458,11 @@ class TradeValueEstimationService:
         # Fallback: use $50/share as default (rough market average)
         return float(trade.shares * Decimal("50.0"))
 
-    async def enrich_trade_with_estimates(self, trade: Trade) -> Trade:
+    async def enrich_trade_with_estimates(
+        self,
+        trade: Trade,
+        price_lookup: Optional[Dict[int, Optional[float]]] = None,
+    ) -> Trade:
         """
         Enrich a trade with estimated values if missing.
 
@@ -294,7 +471,7 @@ class TradeValueEstimationService:
         if trade.total_value and trade.total_value > 0:
             return trade  # Already has value
 
-        estimates = await self.estimate_missing_trade_value(trade)
+        estimates = await self.estimate_missing_trade_value(trade, price_lookup)
 
         # Update trade with estimates (don't save to DB, just for display)
         if not trade.total_value or trade.total_value == 0:
@@ -313,9 +490,21 @@ class TradeValueEstimationService:
         return trade
 
     async def enrich_trades_batch(self, trades: list[Trade]) -> list[Trade]:
-        """Enrich multiple trades with estimates."""
+        """
+        Enrich multiple trades with estimates.
+
+        Prices are resolved for the whole batch up front (one price index per
+        ticker) instead of fetching history per trade.
+        """
+        needs_estimate = [
+            t for t in trades if not (t.total_value and t.total_value > 0)
+        ]
+        price_lookup = await self.estimate_prices_batch(needs_estimate)
+
         enriched = []
         for trade in trades:
-            enriched_trade = await self.enrich_trade_with_estimates(trade)
+            enriched_trade = await self.enrich_trade_with_estimates(
+                trade, price_lookup
+            )
             enriched.append(enriched_trade)
         return enriched
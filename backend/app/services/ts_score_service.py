@@ -12,11 +12,11 @@ from sqlalchemy import select, func, and_
 
 from app.models.tradesignal_score import TradeSignalScore
 from app.models.company import Company
-from app.models.trade import Trade
 from app.models.risk_level import RiskLevelAssessment
 from app.models.intrinsic_value import IntrinsicValueTarget
 from app.services.risk_level_service import RiskLevelService
 from app.services.dcf_service import DCFService
+from app.services.trade_rollup_service import TradeRollupService
 
 logger = logging.getLogger(__name__)
 
@@ -60,28 +60,14 @@ class TSScoreService:
         ivt_value = ivt_result.intrinsic_value if ivt_result else None
         discount_premium = ivt_result.discount_premium_pct if ivt_result else 0.0
 
-        # Get recent insider activity (last 90 days)
+        # Get recent insider activity (last 90 days) from the daily rollup
         cutoff_date = datetime.utcnow() - timedelta(days=90)
-        result = await self.db.execute(
-            select(
-                func.count(Trade.id).label("trade_count"),
-                func.sum(
-                    func.case((Trade.transaction_type == "BUY", Trade.total_value), else_=0)
-                ).label("buy_value"),
-                func.sum(
-                    func.case((Trade.transaction_type == "SELL", Trade.total_value), else_=0)
-                ).label("sell_value"),
-            )
-            .join(Company, Trade.company_id == Company.id)
-            .where(
-                Company.ticker == ticker.upper(),
-                Trade.filing_date >= cutoff_date,
-            )
+        value_by_type = await TradeRollupService.get_value_by_type(
+            self.db, company.id, cutoff_date.date()
         )
-        trade_stats = result.first()
 
-        buy_value = float(trade_stats.buy_value or 0)
-        sell_value = float(trade_stats.sell_value or 0)
+        buy_value = value_by_type.get("BUY", 0.0)
+        sell_value = value_by_type.get("SELL", 0.0)
         total_value = buy_value + sell_value
         buy_ratio = (buy_value / total_value * 100) if total_value > 0 else 50.0
 
@@ -1,22 +1,191 @@
 """
 Webhook service for delivering events to external endpoints.
+
+All deliveries go through one engine:
+- Endpoints subscribed to an event are selected in SQL, and the event body is
+  serialized once; each distinct secret signs those same bytes once.
+- Requests share a pooled HTTP client and fan out concurrently, with at most
+  WEBHOOK_MAX_CONCURRENCY requests in flight.
+- A delivery that fails on a network error, timeout, 408, 429 or 5xx is
+  marked retrying with an exponential, jittered next_attempt_at; the retry
+  worker resends the stored body when it is due, up to WEBHOOK_RETRY_COUNT
+  retries. Other 4xx responses fail at once.
+- Rows are written before sending with a lease on next_attempt_at, so a
+  delivery interrupted by a crash is picked up by the retry worker.
+- Each attempt records its latency and outcome on the delivery row and in
+  per-endpoint Prometheus metrics.
 """
 
+import asyncio
 import logging
 import hmac
 import hashlib
 import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy import String, cast, or_, select, text, update
+from sqlalchemy.orm import selectinload
 import httpx
 
 from app.models.webhook import WebhookEndpoint, WebhookDelivery, WebhookEventType, WebhookStatus
 from app.config import settings
+from app.core.observability import webhook_deliveries_total, webhook_delivery_duration_seconds
 
 logger = logging.getLogger(__name__)
 
+RESPONSE_BODY_LIMIT = 1000
+LEASE_SECONDS = 120  # an unfinished delivery becomes due again after this
+RETRY_MAX_SECONDS = 3600
+RETRY_POLL_SECONDS = 15.0
+RETRY_BATCH_SIZE = 200
+STATS_LATENCY_SAMPLE = 1000
+
+# Statuses the retry worker picks up once next_attempt_at has passed
+_DUE_STATUSES = (WebhookStatus.PENDING, WebhookStatus.RETRYING)
+
+_client: Optional[httpx.AsyncClient] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared webhook HTTP client (connections are pooled and kept alive)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=float(settings.webhook_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=settings.webhook_max_concurrency,
+                max_keepalive_connections=settings.webhook_max_concurrency,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _delivery_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.webhook_max_concurrency)
+    return _slots
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff after a failed attempt: doubling from the base, +/-50% jitter."""
+    delay = min(
+        RETRY_MAX_SECONDS,
+        settings.webhook_retry_base_seconds * 2 ** max(attempts - 1, 0),
+    )
+    return delay * random.uniform(0.5, 1.5)
+
+
+def _subscribed_to(event_type: str):
+    """
+    SQL filter for endpoints subscribed to an event type.
+
+    event_types is a JSON array (NULL or empty means every event), matched
+    on its text form so the filter works on PostgreSQL and SQLite.
+    """
+    as_text = cast(WebhookEndpoint.event_types, String)
+    escaped = event_type.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return or_(
+        WebhookEndpoint.event_types.is_(None),
+        as_text.in_(("null", "[]")),
+        as_text.like(f'%"{escaped}"%', escape="\\"),
+    )
+
+
+def _sign(content: bytes, secret: str) -> str:
+    """HMAC-SHA256 signature of the exact bytes sent."""
+    return hmac.new(secret.encode("utf-8"), content, hashlib.sha256).hexdigest()
+
+
+@dataclass
+class PreparedEvent:
+    """An event body serialized once and shared by every endpoint it goes to."""
+
+    event_type: str
+    body: Dict[str, Any]
+    content: bytes
+    _signatures: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, event_type: str, payload: Dict[str, Any]) -> "PreparedEvent":
+        body = {
+            **payload,
+            "timestamp": datetime.utcnow().isoformat(),
+            "event_type": event_type,
+        }
+        return cls.from_body(event_type, body)
+
+    @classmethod
+    def from_body(cls, event_type: str, body: Dict[str, Any]) -> "PreparedEvent":
+        """Rebuild from a stored delivery body (retries resend identical bytes)."""
+        return cls(event_type, body, json.dumps(body, default=str).encode("utf-8"))
+
+    def headers(self, secret: Optional[str], delivery_id: int) -> Dict[str, str]:
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Event": self.event_type,
+            "X-Webhook-Delivery": str(delivery_id),
+        }
+        if secret:
+            signature = self._signatures.get(secret)
+            if signature is None:
+                signature = _sign(self.content, secret)
+                self._signatures[secret] = signature
+            headers["X-Webhook-Signature"] = signature
+        return headers
+
+
+class AttemptResult(NamedTuple):
+    """Outcome of one HTTP attempt."""
+
+    success: bool
+    retryable: bool
+    status_code: Optional[int]
+    response_body: Optional[str]
+    error: Optional[str]
+    duration: float
+
+
+async def _post(endpoint: WebhookEndpoint, content: bytes, headers: Dict[str, str]) -> AttemptResult:
+    """Send one request over the shared client; never raises."""
+    async with _delivery_slots():
+        start = time.perf_counter()
+        try:
+            response = await get_http_client().post(endpoint.url, content=content, headers=headers)
+        except Exception as e:
+            result = AttemptResult(False, True, None, None, f"{type(e).__name__}: {e}", time.perf_counter() - start)
+        else:
+            code = response.status_code
+            success = response.is_success
+            result = AttemptResult(
+                success,
+                not success and (code in (408, 429) or code >= 500),
+                code,
+                response.text[:RESPONSE_BODY_LIMIT],
+                None if success else f"HTTP {code}",
+                time.perf_counter() - start,
+            )
+
+    label = str(endpoint.id)
+    webhook_deliveries_total.labels(
+        webhook_id=label,
+        outcome="success" if result.success else ("retryable" if result.retryable else "failed"),
+    ).inc()
+    webhook_delivery_duration_seconds.labels(webhook_id=label).observe(result.duration)
+    return result
+
 
 class WebhookService:
     """Service for managing webhook deliveries."""
@@ -72,66 +241,8 @@ class WebhookService:
             logger.debug(f"Webhook {webhook_id} does not subscribe to {event_type}")
             raise ValueError(f"Webhook does not subscribe to {event_type}")
 
-        # Create delivery record
-        delivery = WebhookDelivery(
-            webhook_id=webhook_id,
-            event_type=event_type,
-            payload=payload,
-            status=WebhookStatus.PENDING.value,
-        )
-        self.db.add(delivery)
-        await self.db.commit()
-        await self.db.refresh(delivery)
-
-        # Deliver webhook
-        try:
-            # Add timestamp to payload
-            payload_with_timestamp = {
-                **payload,
-                "timestamp": datetime.utcnow().isoformat(),
-                "event_type": event_type,
-            }
-
-            # Generate signature if secret is set
-            headers = {"Content-Type": "application/json"}
-            if webhook.secret:
-                signature = self._generate_signature(
-                    json.dumps(payload_with_timestamp), webhook.secret
-                )
-                headers["X-Webhook-Signature"] = signature
-
-            # Send webhook
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    webhook.url,
-                    json=payload_with_timestamp,
-                    headers=headers,
-                )
-                response.raise_for_status()
-
-            # Update delivery record
-            delivery.status = WebhookStatus.SUCCESS.value
-            delivery.response_code = response.status_code
-            delivery.response_body = response.text[:1000]  # Limit response body size
-            delivery.delivered_at = datetime.utcnow()
-            await self.db.commit()
-
-            logger.info(f"Webhook {webhook_id} delivered successfully (delivery {delivery.id})")
-            return delivery
-
-        except httpx.HTTPStatusError as e:
-            delivery.status = WebhookStatus.FAILED.value
-            delivery.response_code = e.response.status_code
-            delivery.response_body = e.response.text[:1000]
-            await self.db.commit()
-            logger.error(f"Webhook {webhook_id} delivery failed: {e.response.status_code}")
-            return delivery
-
-        except Exception as e:
-            delivery.status = WebhookStatus.FAILED.value
-            await self.db.commit()
-            logger.error(f"Webhook {webhook_id} delivery error: {e}", exc_info=True)
-            return delivery
+        deliveries = await self._fan_out([webhook], PreparedEvent.build(event_type, payload))
+        return deliveries[0]
 
     async def deliver_event_to_all(
         self,
@@ -139,46 +250,148 @@ class WebhookService:
         payload: Dict[str, Any],
         user_id: Optional[int] = None,
     ) -> List[WebhookDelivery]:
-        """Deliver an event to all matching webhooks."""
+        """Deliver an event to all matching webhooks concurrently."""
         query = select(WebhookEndpoint).where(
-            and_(
-                WebhookEndpoint.is_active == True,
-                # Check if webhook subscribes to this event type
-                # (event_types is NULL or contains event_type)
-            )
+            WebhookEndpoint.is_active.is_(True),
+            _subscribed_to(event_type),
         )
 
         if user_id:
             query = query.where(WebhookEndpoint.user_id == user_id)
 
-        result = await self.db.execute(query)
+        result = await self.db.execute(query.order_by(WebhookEndpoint.id))
         webhooks = list(result.scalars().all())
+        if not webhooks:
+            return []
 
-        # Filter webhooks that subscribe to this event type
-        matching_webhooks = [
-            w for w in webhooks
-            if not w.event_types or event_type in w.event_types
-        ]
+        return await self._fan_out(webhooks, PreparedEvent.build(event_type, payload))
 
-        deliveries = []
-        for webhook in matching_webhooks:
-            try:
-                delivery = await self.deliver_webhook(
-                    webhook.id, event_type, payload
-                )
-                deliveries.append(delivery)
-            except Exception as e:
-                logger.error(f"Error delivering webhook {webhook.id}: {e}")
+    async def _fan_out(
+        self, webhooks: List[WebhookEndpoint], event: PreparedEvent
+    ) -> List[WebhookDelivery]:
+        """Record one delivery per endpoint, send them all, and store the outcomes."""
+        # Leased up front: if the process dies mid-send the retry worker resends
+        lease = datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)
+        deliveries = [
+            WebhookDelivery(
+                webhook_id=webhook.id,
+                event_type=event.event_type,
+                payload=event.body,
+                status=WebhookStatus.PENDING.value,
+                attempts=1,
+                next_attempt_at=lease,
+            )
+            for webhook in webhooks
+        ]
+        self.db.add_all(deliveries)
+        await self.db.commit()
 
+        await self._send_all([(delivery, webhook, event) for delivery, webhook in zip(deliveries, webhooks)])
+        await self.db.commit()
         return deliveries
 
+    async def _send_all(
+        self, batch: List[Tuple[WebhookDelivery, WebhookEndpoint, PreparedEvent]]
+    ) -> None:
+        """Send a batch concurrently and apply each result to its delivery row."""
+        results = await asyncio.gather(
+            *(
+                _post(webhook, event.content, event.headers(webhook.secret, delivery.id))
+                for delivery, webhook, event in batch
+            )
+        )
+        for (delivery, webhook, _), result in zip(batch, results):
+            self._record_attempt(delivery, result)
+
+    @staticmethod
+    def _record_attempt(delivery: WebhookDelivery, result: AttemptResult) -> None:
+        now = datetime.utcnow()
+        delivery.response_code = result.status_code
+        delivery.response_body = result.response_body
+        delivery.duration_ms = round(result.duration * 1000)
+        delivery.error = result.error
+
+        if result.success:
+            delivery.status = WebhookStatus.SUCCESS.value
+            delivery.delivered_at = now
+            delivery.next_attempt_at = None
+            logger.info(f"Webhook {delivery.webhook_id} delivered successfully (delivery {delivery.id})")
+        elif result.retryable and delivery.attempts <= settings.webhook_retry_count:
+            delivery.status = WebhookStatus.RETRYING.value
+            delivery.next_attempt_at = now + timedelta(seconds=retry_delay(delivery.attempts))
+            logger.warning(
+                f"Webhook {delivery.webhook_id} delivery {delivery.id} failed "
+                f"(attempt {delivery.attempts}), retrying: {result.error}"
+            )
+        else:
+            delivery.status = WebhookStatus.FAILED.value
+            delivery.next_attempt_at = None
+            logger.error(
+                f"Webhook {delivery.webhook_id} delivery {delivery.id} failed "
+                f"after {delivery.attempts} attempts: {result.error}"
+            )
+
+    async def retry_due(self, limit: int = RETRY_BATCH_SIZE) -> int:
+        """
+        Claim and resend deliveries whose next attempt is due.
+
+        Claiming moves next_attempt_at a lease ahead and counts the attempt,
+        so concurrent workers never send the same delivery twice.
+
+        Returns:
+            Number of deliveries attempted
+        """
+        now = datetime.utcnow()
+        due = (
+            select(WebhookDelivery.id)
+            .where(
+                WebhookDelivery.status.in_(_DUE_STATUSES),
+                WebhookDelivery.next_attempt_at <= now,
+            )
+            .order_by(WebhookDelivery.next_attempt_at)
+            .limit(limit)
+        )
+        result = await self.db.execute(
+            update(WebhookDelivery)
+            .where(
+                WebhookDelivery.id.in_(due.scalar_subquery()),
+                WebhookDelivery.status.in_(_DUE_STATUSES),
+                WebhookDelivery.next_attempt_at <= now,
+            )
+            .values(
+                next_attempt_at=now + timedelta(seconds=LEASE_SECONDS),
+                attempts=WebhookDelivery.attempts + 1,
+            )
+            .returning(WebhookDelivery.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = list(result.scalars().all())
+        await self.db.commit()
+        if not claimed:
+            return 0
+
+        rows = await self.db.execute(
+            select(WebhookDelivery)
+            .options(selectinload(WebhookDelivery.webhook))
+            .where(WebhookDelivery.id.in_(claimed))
+            .execution_options(populate_existing=True)
+        )
+        batch = []
+        for delivery in rows.scalars().all():
+            if delivery.webhook is None or not delivery.webhook.is_active:
+                delivery.status = WebhookStatus.FAILED.value
+                delivery.next_attempt_at = None
+                delivery.error = "Webhook endpoint inactive"
+                continue
+            batch.append((delivery, delivery.webhook, PreparedEvent.from_body(delivery.event_type, delivery.payload)))
+
+        await self._send_all(batch)
+        await self.db.commit()
+        return len(claimed)
+
     def _generate_signature(self, payload: str, secret: str) -> str:
         """Generate HMAC signature for webhook payload."""
-        return hmac.new(
-            secret.encode("utf-8"),
-            payload.encode("utf-8"),
-            hashlib.sha256,
-        ).hexdigest()
+        return _sign(payload.encode("utf-8"), secret)
 
     async def get_delivery_history(
         self,
@@ -199,3 +412,120 @@ class WebhookService:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def get_endpoint_stats(self, webhook_id: int, hours: int = 24) -> Dict[str, Any]:
+        """
+        Delivery success and latency for one endpoint over a recent window.
+
+        Args:
+            webhook_id: Endpoint to report on
+            hours: Window size
+
+        Returns:
+            Counts by status, success rate and latency percentiles (ms) of
+            the most recent attempts
+        """
+        since = datetime.utcnow() - timedelta(hours=hours)
+        result = await self.db.execute(
+            select(WebhookDelivery.status, WebhookDelivery.duration_ms)
+            .where(
+                WebhookDelivery.webhook_id == webhook_id,
+                WebhookDelivery.created_at >= since,
+            )
+            .order_by(WebhookDelivery.created_at.desc())
+        )
+        rows = result.all()
+
+        counts = {status.value: 0 for status in WebhookStatus}
+        for status, _ in rows:
+            counts[WebhookStatus(status).value] += 1
+        finished = counts[WebhookStatus.SUCCESS.value] + counts[WebhookStatus.FAILED.value]
+        latencies = sorted(
+            duration for _, duration in rows[:STATS_LATENCY_SAMPLE] if duration is not None
+        )
+
+        def percentile(q: float) -> Optional[int]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        return {
+            "webhook_id": webhook_id,
+            "window_hours": hours,
+            "deliveries": len(rows),
+            **counts,
+            "success_rate": counts[WebhookStatus.SUCCESS.value] / finished if finished else None,
+            "latency_ms": {
+                "avg": round(sum(latencies) / len(latencies)) if latencies else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": latencies[-1] if latencies else None,
+            },
+        }
+
+    @staticmethod
+    async def ensure_schema(engine: AsyncEngine) -> bool:
+        """
+        Add the retry and latency columns to an existing webhook_deliveries table.
+
+        create_all does not alter existing tables; statements are no-ops once
+        the columns exist. Only runs on PostgreSQL.
+        """
+        if engine.dialect.name != "postgresql":
+            return False
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "ALTER TABLE webhook_deliveries "
+                    "ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP, "
+                    "ADD COLUMN IF NOT EXISTS duration_ms INTEGER, "
+                    "ADD COLUMN IF NOT EXISTS error TEXT"
+                )
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_webhook_deliveries_next_attempt_at "
+                    "ON webhook_deliveries (next_attempt_at)"
+                )
+            )
+        return True
+
+
+class WebhookRetryWorker:
+    """Background task resending due webhook deliveries."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="webhook-retry-worker")
+
+    async def stop(self) -> None:
+        """Stop polling and close the shared HTTP client (due rows stay queued)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await close_http_client()
+
+    async def _run(self) -> None:
+        from app.database import db_manager
+
+        while True:
+            try:
+                async with db_manager.get_session() as db:
+                    retried = await WebhookService(db).retry_due()
+                if retried:
+                    logger.info(f"Retried {retried} webhook deliveries")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Webhook retry poll failed: {e}")
+            await asyncio.sleep(RETRY_POLL_SECONDS)
+
+
+webhook_retry_worker = WebhookRetryWorker()
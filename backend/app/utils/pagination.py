@@ -0,0 +1,295 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Listings are paged on (sort column, id) instead of OFFSET so that every page
+costs the same index range scan regardless of depth. Cursors are opaque,
+URL-safe tokens that carry the last row's sort key, the sort it belongs to
+and the page number. Nullable sort columns put NULLs last in either
+direction, and the seek steps from the non-NULL rows into the NULL ones.
+
+Total counts are optional: "exact" runs count(*), "cached" reuses an exact
+count for a short TTL per normalized filter set, "estimated" asks the
+Postgres planner for a row estimate, and "none" skips counting entirely.
+"""
+
+import base64
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import Select, and_, desc, func, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+COUNT_MODES = ("exact", "cached", "estimated", "none")
+
+# Cached exact counts (cache_key -> (count, stored_at))
+_count_cache: Dict[str, Tuple[int, float]] = {}
+_COUNT_CACHE_TTL = 60  # seconds
+_COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or does not match the sort."""
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    """One page of a keyset-paginated listing."""
+
+    items: List[T]
+    page: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+def _encode_value(value: Any) -> Any:
+    """Make a sort key value JSON-safe."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(column, raw: Any) -> Any:
+    """Convert a JSON sort key value back to the column's Python type."""
+    if raw is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return raw
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw)
+    if python_type is Decimal:
+        return Decimal(str(raw))
+    if python_type in (int, float, str, bool):
+        return python_type(raw)
+    return raw
+
+
+def encode_cursor(sort_by: str, order: str, sort_value: Any, row_id: int, page: int) -> str:
+    """Build an opaque cursor pointing just after the given row."""
+    payload = {
+        "s": sort_by,
+        "o": order,
+        "v": _encode_value(sort_value),
+        "id": row_id,
+        "p": page,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, dict) or not {"s", "o", "v", "id", "p"} <= payload.keys():
+            raise ValueError("missing cursor fields")
+        return payload
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {e}") from e
+
+
+def resolve_sort_column(model, sort_by: str, default: str):
+    """Resolve a sort field to a real column, falling back to the default."""
+    columns = model.__table__.columns
+    if sort_by in columns:
+        return sort_by, getattr(model, sort_by)
+    return default, getattr(model, default)
+
+
+def _seek_after(sort_column, id_column, nullable: bool, last_value: Any, last_id: int, descending: bool):
+    """Condition for rows after (last_value, last_id) in (sort, id) order, NULLs last."""
+    after_id = id_column < last_id if descending else id_column > last_id
+    if last_value is None:
+        # Already among the NULLs, which are ordered by id alone
+        return and_(sort_column.is_(None), after_id)
+    key = tuple_(sort_column, id_column)
+    bound = tuple_(last_value, last_id)
+    seek = key < bound if descending else key > bound
+    if nullable:
+        # A row comparison with NULL is NULL, so the NULL rows need their own branch
+        seek = or_(seek, sort_column.is_(None))
+    return seek
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    query: Select,
+    model,
+    *,
+    sort_by: str,
+    default_sort: str,
+    order: str = "desc",
+    limit: int = 20,
+    skip: int = 0,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    count_mode: str = "exact",
+    count_cache_key: Optional[str] = None,
+    scalars: bool = True,
+) -> KeysetPage:
+    """
+    Fetch one page of a filtered ORM query ordered by (sort column, id).
+
+    With a cursor the page starts right after the cursor row (keyset seek).
+    Without one, OFFSET skip is used so classic page numbers keep working;
+    the returned next_cursor lets clients switch to keyset paging from there.
+
+    Args:
+        db: Database session
+        query: Filtered select() of the model (no ordering/limit applied)
+        model: ORM model class with an ``id`` primary key
+        sort_by: Requested sort field
+        default_sort: Column used when sort_by is not a column
+        order: "asc" or "desc"
+        limit: Page size
+        skip: OFFSET used when no cursor is given
+        page: Page number reported when no cursor is given
+        cursor: Opaque cursor from a previous page
+        count_mode: exact, cached, estimated or none
+        count_cache_key: Normalized filter key for cached counts
+        scalars: Return ORM objects (True) or the raw rows of a
+            column-projected query (False); rows must include the sort
+            column and ``id``
+
+    Returns:
+        KeysetPage with items, optional total and next_cursor
+    """
+    sort_by, sort_column = resolve_sort_column(model, sort_by, default_sort)
+    nullable = model.__table__.columns[sort_by].nullable
+    id_column = model.id
+    descending = order == "desc"
+
+    total, total_is_estimate = await count_rows(
+        db, query, count_mode, cache_key=count_cache_key
+    )
+
+    page_query = query
+    if cursor:
+        state = decode_cursor(cursor)
+        if state["s"] != sort_by or state["o"] != order:
+            raise InvalidCursorError(
+                "Pagination cursor does not match the requested sort order"
+            )
+        last_value = _decode_value(sort_column, state["v"])
+        page_query = page_query.where(
+            _seek_after(sort_column, id_column, nullable, last_value, state["id"], descending)
+        )
+        page = int(state["p"]) + 1
+    elif skip:
+        page_query = page_query.offset(skip)
+
+    sort_key = desc(sort_column) if descending else sort_column
+    if nullable:
+        sort_key = sort_key.nulls_last()
+    if descending:
+        page_query = page_query.order_by(sort_key, desc(id_column))
+    else:
+        page_query = page_query.order_by(sort_key, id_column)
+
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(page_query.limit(limit + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            sort_by, order, getattr(last, sort_by), last.id, page
+        )
+
+    return KeysetPage(
+        items=rows,
+        page=page,
+        total=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
+    )
+
+
+async def count_rows(
+    db: AsyncSession,
+    query: Select,
+    count_mode: str = "exact",
+    cache_key: Optional[str] = None,
+) -> Tuple[Optional[int], bool]:
+    """
+    Count rows of a filtered query according to count_mode.
+
+    Returns:
+        Tuple of (count or None, whether the count is an estimate)
+    """
+    if count_mode == "none":
+        return None, False
+
+    if count_mode == "estimated":
+        estimate = await _planner_estimate(db, query)
+        if estimate is not None:
+            return estimate, True
+        count_mode = "cached"
+
+    if count_mode == "cached" and cache_key:
+        cached = _count_cache.get(cache_key)
+        if cached and time.time() - cached[1] < _COUNT_CACHE_TTL:
+            return cached[0], False
+
+    count_query = select(func.count()).select_from(
+        query.order_by(None).subquery()
+    )
+    total = (await db.execute(count_query)).scalar_one()
+
+    if count_mode == "cached" and cache_key:
+        if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+            # Drop the oldest entry (dicts keep insertion order)
+            _count_cache.pop(next(iter(_count_cache)))
+        _count_cache[cache_key] = (total, time.time())
+
+    return total, False
+
+
+async def _planner_estimate(db: AsyncSession, query: Select) -> Optional[int]:
+    """Ask the Postgres planner for the estimated row count of a query."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    try:
+        compiled = query.order_by(None).compile(
+            dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.debug(f"Planner row estimate unavailable, falling back to count: {e}")
+        return None
+
+
+def make_count_cache_key(prefix: str, filters: Any = None) -> str:
+    """Build a stable cache key from a filter schema."""
+    if filters is None:
+        return f"{prefix}:all"
+    data = filters.model_dump(exclude_none=True, mode="json")
+    return f"{prefix}:{json.dumps(data, sort_keys=True, default=str)}"
+
+
+def clear_count_cache() -> None:
+    """Drop all cached counts (e.g. after bulk ingest)."""
+    _count_cache.clear()
@@ -0,0 +1,115 @@
+"""
+Compact date-indexed price lookup.
+
+Stores daily closes for a single ticker as two parallel, sorted arrays
+(epoch day -> close) so the closest bar to any date can be found with a
+bisect instead of scanning and re-parsing the raw history list.
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_epoch_day(value: date | datetime) -> int:
+    """Convert a date/datetime to days since 1970-01-01."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _parse_point_date(raw: Any) -> Optional[date]:
+    """Parse a history point date ("YYYY-MM-DD" or ISO timestamp)."""
+    if isinstance(raw, datetime):
+        return raw.date()
+    if isinstance(raw, date):
+        return raw
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(str(raw)[:10])
+    except ValueError:
+        return None
+
+
+class PriceIndex:
+    """
+    Sorted epoch-day -> close index for one ticker.
+
+    Built once from a price history list (as returned by
+    StockPriceService.get_price_history) and queried with bisect.
+    """
+
+    __slots__ = ("ticker", "_days", "_closes")
+
+    def __init__(self, ticker: str, days: array, closes: array) -> None:
+        self.ticker = ticker
+        self._days = days
+        self._closes = closes
+
+    @classmethod
+    def from_history(
+        cls, ticker: str, history: Iterable[Dict[str, Any]]
+    ) -> "PriceIndex":
+        """Build an index from history points with "date" and "close" keys."""
+        points = {}
+        for point in history or []:
+            point_date = _parse_point_date(point.get("date"))
+            close = point.get("close")
+            if point_date is None or close is None:
+                continue
+            points[to_epoch_day(point_date)] = float(close)
+
+        days = array("l")
+        closes = array("d")
+        for day in sorted(points):
+            days.append(day)
+            closes.append(points[day])
+        return cls(ticker, days, closes)
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    @property
+    def first_day(self) -> Optional[int]:
+        """Earliest epoch day covered by the index."""
+        return self._days[0] if self._days else None
+
+    @property
+    def last_day(self) -> Optional[int]:
+        """Latest epoch day covered by the index."""
+        return self._days[-1] if self._days else None
+
+    def closest_close(
+        self, target: date, max_gap_days: int = 5
+    ) -> Optional[float]:
+        """
+        Get the close of the bar nearest to target.
+
+        Ties resolve to the earlier bar. Returns None if the nearest bar is
+        more than max_gap_days away.
+        """
+        days = self._days
+        if not days:
+            return None
+
+        day = to_epoch_day(target)
+        pos = bisect_left(days, day)
+
+        best = None
+        best_diff = max_gap_days + 1
+        if pos > 0:
+            diff = day - days[pos - 1]
+            if diff < best_diff:
+                best, best_diff = pos - 1, diff
+        if pos < len(days):
+            diff = days[pos] - day
+            if diff < best_diff:
+                best, best_diff = pos, diff
+
+        if best is None:
+            return None
+        return self._closes[best]
@@ -0,0 +1,86 @@
+"""
+Alert backtest benchmark.
+
+Times previewing a simple alert and an advanced rule over a synthetic
+columnar trade snapshot (default 2M trades over 10 years). No database is
+needed; the frame has the same columns and dtypes as the real snapshot.
+
+    python scripts/benchmark_alert_backtest.py
+    python scripts/benchmark_alert_backtest.py --trades 5000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.alert_backtest_service import alert_mask
+from app.services.alert_matching_service import AlertRule
+from app.services.alert_rule_compiler import CompiledRule
+
+ROLE_KEYS = ["officer|ceo", "officer|cfo", "director", "10% owner", "officer|president", "other"]
+ADVANCED_QUERY = {
+    "operator": "AND",
+    "conditions": [
+        {"field": "transaction_type", "operator": "equals", "value": "BUY"},
+        {"field": "insider_role", "operator": "contains", "value": "ceo"},
+        {"field": "trade_value", "operator": "greater_than", "value": 1000000},
+        {"operator": "NOT", "condition": {"field": "ticker", "operator": "in", "value": ["T0001", "T0002"]}},
+    ],
+}
+
+
+def make_frame(count: int, tickers: int, rng: np.random.Generator) -> pd.DataFrame:
+    ticker_names = np.array([f"T{i:04d}" for i in range(tickers)])
+    roles = rng.integers(0, len(ROLE_KEYS), count)
+    days = np.sort(rng.integers(0, 3650, count))
+    return pd.DataFrame(
+        {
+            "trade_id": np.arange(1, count + 1, dtype=np.int64),
+            "ticker": pd.Categorical(ticker_names[rng.integers(0, tickers, count)]),
+            "company_name": pd.Categorical(ticker_names[rng.integers(0, tickers, count)]),
+            "trade_value": rng.lognormal(11, 2, count),
+            "shares": rng.integers(1, 100_000, count).astype(np.float64),
+            "transaction_type": pd.Categorical(rng.choice(["BUY", "SELL"], count)),
+            "insider_name": pd.Categorical(rng.choice([f"Insider {i}" for i in range(5000)], count)),
+            "insider_role": pd.Categorical(np.array(["CEO", "CFO", None, None, "President", None])[roles]),
+            "insider_roles": pd.Categorical(np.array(ROLE_KEYS)[roles]),
+            "filing_date": pd.Timestamp("2016-01-01") + pd.to_timedelta(days, unit="D"),
+        }
+    )
+
+
+def timed(label: str, fn, repeat: int = 5) -> np.ndarray:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<28} {elapsed * 1000:10.1f} ms  ({int(np.count_nonzero(result))} matches)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trades", type=int, default=2_000_000)
+    parser.add_argument("--tickers", type=int, default=5000)
+    args = parser.parse_args()
+
+    frame = make_frame(args.trades, args.tickers, np.random.default_rng(42))
+    print(f"{len(frame)} trades, {args.tickers} tickers")
+
+    rule = AlertRule.from_values(0, None, "BUY", 500_000, None, ["director"])
+    timed("simple alert", lambda: alert_mask(frame, rule))
+    ticker_rule = AlertRule.from_values(0, "T0042", None, 100_000, 5_000_000, [])
+    timed("simple alert (ticker)", lambda: alert_mask(frame, ticker_rule))
+    compiled = CompiledRule(0, ADVANCED_QUERY)
+    timed("advanced rule", lambda: compiled.evaluate_frame(frame)[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Alert matching benchmark.
+
+Times matching trades against N active alerts (default 100k) with the alert
+index against a linear scan that evaluates every rule, as the previous
+matcher did (minus its per-alert database reads, so the scan figure is a
+lower bound). No database is needed; alerts and trades are synthetic.
+
+    python scripts/benchmark_alert_matching.py
+    python scripts/benchmark_alert_matching.py --alerts 100000 --trades 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.alert_matching_service import AlertIndex, AlertRule
+
+ROLES = ["CEO", "CFO", "Director", "Officer", "10% Owner"]
+
+
+def make_rules(count: int, tickers: list, rng: random.Random) -> list:
+    """Synthetic alerts: mostly per-ticker watches, 1% market-wide."""
+    rules = []
+    for alert_id in range(1, count + 1):
+        low = rng.choice([None, 10_000, 50_000, 100_000, 500_000, 1_000_000])
+        high = rng.choice([None, None, 5_000_000, 10_000_000])
+        rules.append(
+            AlertRule.from_values(
+                alert_id,
+                rng.choice(tickers) if rng.random() < 0.99 else None,
+                rng.choice([None, "BUY", "SELL"]),
+                low,
+                high,
+                rng.sample(ROLES, 1) if rng.random() < 0.2 else [],
+            )
+        )
+    return rules
+
+
+def make_trades(count: int, tickers: list, rng: random.Random) -> list:
+    return [
+        (
+            rng.choice(tickers),
+            rng.choice(["BUY", "SELL"]),
+            rng.lognormvariate(11, 2),
+            frozenset(role.casefold() for role in rng.sample(ROLES, 2)),
+        )
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--trades", type=int, default=1000)
+    parser.add_argument("--tickers", type=int, default=3000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    rules = make_rules(args.alerts, tickers, rng)
+    trades = make_trades(args.trades, tickers, rng)
+
+    start = time.perf_counter()
+    index = AlertIndex(rules)
+    build = time.perf_counter() - start
+    # Interval trees are built per bucket on first use; warm them all
+    start = time.perf_counter()
+    for ticker, tx_type, value, roles in trades:
+        index.match(ticker, tx_type, value, roles)
+    warm = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.match(ticker, tx_type, value, roles) for ticker, tx_type, value, roles in trades]
+    indexed_time = time.perf_counter() - start
+
+    scan_trades = trades[: max(1, min(len(trades), 200))]
+    start = time.perf_counter()
+    scanned = [
+        [rule.id for rule in rules if rule.matches(ticker, tx_type, value, roles)]
+        for ticker, tx_type, value, roles in scan_trades
+    ]
+    scan_time = time.perf_counter() - start
+
+    # Both matchers must agree
+    assert indexed[: len(scanned)] == scanned
+
+    matches = sum(len(ids) for ids in indexed) / len(indexed)
+    per_index = indexed_time / len(trades) * 1e6
+    per_scan = scan_time / len(scan_trades) * 1e6
+    print(f"{args.alerts} active alerts, {args.tickers} tickers, {matches:.1f} matches per trade")
+    print(f"{'index build':<28} {build * 1000:10.1f} ms")
+    print(f"{'first pass (builds trees)':<28} {warm * 1000:10.1f} ms")
+    print(f"{'indexed match':<28} {per_index:10.1f} us / trade")
+    print(f"{'linear scan':<28} {per_scan:10.1f} us / trade")
+    print(f"{'speedup':<28} {per_scan / per_index:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Serialization benchmark for trade listing responses.
+
+Times, per 1000 trades, the previous path (validate each row dict into a
+TradeListItem through the route's response_model, dump it in JSON mode and
+json.dumps it, as FastAPI does) against the fast path (row tuple -> dict ->
+orjson or msgpack). No database is needed; rows are synthetic TradeListing
+tuples.
+
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --rows 500 --repeat 50
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+
+from app.core.serialization import MSGPACK_AVAILABLE, ORJSON_AVAILABLE, dumps, packb
+from app.models import TradeListing
+from app.schemas.trade import TradeListItem
+from app.services.trade_listing_service import TradeListingService
+
+ListingRow = namedtuple("ListingRow", [column.name for column in TradeListing.__table__.columns])
+
+
+def make_rows(count: int) -> List[ListingRow]:
+    """Build synthetic read model rows."""
+    now = datetime(2025, 11, 3, 14, 30, 5, 123456)
+    rows = []
+    for i in range(count):
+        values = {
+            "id": i + 1,
+            "company_id": i % 100 + 1,
+            "insider_id": i % 700 + 1,
+            "ticker": f"T{i % 100:03d}",
+            "company_name": f"Company {i % 100} Inc.",
+            "insider_name": f"Insider Number {i % 700}",
+            "insider_title": "Chief Executive Officer" if i % 3 == 0 else None,
+            "is_director": i % 2 == 0,
+            "is_officer": i % 3 == 0,
+            "is_ten_percent_owner": False,
+            "is_other": False,
+            "transaction_date": date(2025, 11, 1) - timedelta(days=i % 60),
+            "filing_date": date(2025, 11, 3) - timedelta(days=i % 60),
+            "transaction_type": "BUY" if i % 2 else "SELL",
+            "transaction_code": "P" if i % 2 else "S",
+            "shares": Decimal("1250.0000"),
+            "price_per_share": Decimal("187.2500"),
+            "total_value": Decimal("234062.50"),
+            "shares_owned_after": Decimal("50000.0000"),
+            "ownership_type": "Direct",
+            "derivative_transaction": False,
+            "sec_filing_url": f"https://www.sec.gov/Archives/edgar/data/{i}/form4.xml",
+            "form_type": "Form 4",
+            "notes": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        rows.append(ListingRow(**values))
+    return rows
+
+
+def pydantic_path(rows, adapter: TypeAdapter) -> bytes:
+    """response_model validation + JSON-mode dump + json.dumps (previous path)."""
+    items = TradeListingService.to_items(rows)
+    validated = adapter.validate_python(items)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_json_path(rows) -> bytes:
+    return dumps(TradeListingService.to_items(rows))
+
+
+def msgpack_path(rows) -> bytes:
+    return packb(TradeListingService.to_items(rows))
+
+
+def bench(label: str, func, rows, repeat: int) -> float:
+    func(rows)  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(rows)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    per_1000 = best * 1000 / len(rows) * 1000
+    print(f"{label:<32} {per_1000:8.2f} ms / 1000 trades  ({len(body) / 1024:.0f} KiB)")
+    return per_1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(List[TradeListItem])
+
+    # The fast path must produce the same document
+    assert json.loads(fast_json_path(rows)) == json.loads(pydantic_path(rows, adapter))
+
+    print(f"{args.rows} rows, best of {args.repeat} (orjson={ORJSON_AVAILABLE}, msgpack={MSGPACK_AVAILABLE})")
+    baseline = bench("pydantic + json.dumps", lambda r: pydantic_path(r, adapter), rows, args.repeat)
+    fast = bench("row tuples + orjson", fast_json_path, rows, args.repeat)
+    print(f"{'speedup':<32} {baseline / fast:8.1f}x")
+    if MSGPACK_AVAILABLE:
+        bench("row tuples + msgpack", msgpack_path, rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Explain-plan benchmark for TradeService.get_statistics.
+
+Compares the previous multi-query implementation (separate COUNT/SUM queries
+plus two "most active" queries joined through Trade.id IN (...)) against the
+single-pass conditional-aggregate query, using EXPLAIN (ANALYZE, BUFFERS).
+
+Seeds a throwaway schema so production tables are never touched:
+
+    python scripts/benchmark_trade_stats.py --rows 10000000 --seed
+    python scripts/benchmark_trade_stats.py --ticker AAPL
+
+Requires PostgreSQL (DATABASE_URL).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import desc, func, select, text
+
+from app.database import db_manager, Base
+from app.models import Company, Insider, Trade
+from app.schemas.trade import TradeFilter
+from app.services.trade_service import TradeService
+
+SCHEMA = "stats_bench"
+
+
+def legacy_statistics_queries(filters: TradeFilter):
+    """The queries issued by the multi-query get_statistics, in order."""
+    query = TradeService._apply_filters(select(Trade), filters)
+    buy_query = query.where(Trade.transaction_type == "BUY")
+    sell_query = query.where(Trade.transaction_type == "SELL")
+    subq = query.subquery()
+
+    def most_active(column, join_model, join_on):
+        ids = select(TradeService._apply_filters(select(Trade), filters).subquery().c.id)
+        return (
+            select(column, func.count(Trade.id).label("trade_count"))
+            .select_from(Trade)
+            .join(join_model, join_on)
+            .where(Trade.id.in_(ids))
+            .group_by(column)
+            .order_by(desc("trade_count"))
+            .limit(1)
+        )
+
+    return [
+        select(func.count()).select_from(buy_query.subquery()),
+        select(func.count()).select_from(sell_query.subquery()),
+        select(
+            func.sum(subq.c.shares),
+            func.sum(subq.c.total_value),
+            func.avg(subq.c.total_value),
+            func.max(subq.c.total_value),
+        ),
+        select(func.sum(buy_query.subquery().c.total_value)),
+        select(func.sum(sell_query.subquery().c.total_value)),
+        most_active(Company.ticker, Company, Company.id == Trade.company_id),
+        most_active(Insider.name, Insider, Insider.id == Trade.insider_id),
+    ]
+
+
+async def explain(session, statement):
+    """Run EXPLAIN ANALYZE and return (execution ms, shared buffers read+hit)."""
+    compiled = statement.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}")
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]
+    buffers = root["Plan"].get("Shared Hit Blocks", 0) + root["Plan"].get(
+        "Shared Read Blocks", 0
+    )
+    return root["Execution Time"], buffers
+
+
+async def seed(session, rows: int):
+    """Create the benchmark schema and fill it with synthetic trades."""
+    print(f"Seeding {rows:,} trades into schema {SCHEMA}...")
+    await session.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await session.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await session.execute(text(f"SET search_path TO {SCHEMA}"))
+    await session.run_sync(
+        lambda s: Base.metadata.create_all(
+            s.connection(),
+            tables=[Company.__table__, Insider.__table__, Trade.__table__],
+        )
+    )
+    await session.execute(text(
+        "INSERT INTO companies (ticker, name, cik, created_at, updated_at) "
+        "SELECT 'T' || g, 'Company ' || g, lpad(g::text, 10, '0'), now(), now() "
+        "FROM generate_series(1, 2000) g"
+    ))
+    await session.execute(text(
+        "INSERT INTO insiders (name, company_id, is_director, is_officer, "
+        "is_ten_percent_owner, is_other, created_at, updated_at) "
+        "SELECT 'Insider ' || g, 1 + g % 2000, false, true, false, false, now(), now() "
+        "FROM generate_series(1, 50000) g"
+    ))
+    await session.execute(text(
+        "INSERT INTO trades (insider_id, company_id, transaction_date, filing_date, "
+        "transaction_type, shares, price_per_share, total_value, derivative_transaction, form_type, "
+        "created_at, updated_at) "
+        "SELECT 1 + g % 50000, 1 + g % 2000, "
+        "current_date - (g % 3650), current_date - (g % 3650) + 2, "
+        "CASE WHEN g % 3 = 0 THEN 'SELL' ELSE 'BUY' END, "
+        "100 + g % 1000, 10 + g % 90, (100 + g % 1000) * (10 + g % 90), false, 'Form 4', now(), now() "
+        "FROM generate_series(1, :rows) g"
+    ), {"rows": rows})
+    await session.commit()
+    await session.execute(text(f"SET search_path TO {SCHEMA}"))
+    await session.execute(text("ANALYZE companies, insiders, trades"))
+
+
+async def main(rows: int, do_seed: bool, ticker: str | None):
+    filters = TradeFilter(ticker=ticker) if ticker else TradeFilter()
+
+    async with db_manager.get_session() as session:
+        if session.bind.dialect.name != "postgresql":
+            print("This benchmark requires PostgreSQL.")
+            return
+        if do_seed:
+            await seed(session, rows)
+        await session.execute(text(f"SET search_path TO {SCHEMA}"))
+
+        legacy_ms = legacy_buffers = 0.0
+        for statement in legacy_statistics_queries(filters):
+            ms, buffers = await explain(session, statement)
+            legacy_ms += ms
+            legacy_buffers += buffers
+
+        single_ms, single_buffers = await explain(
+            session, TradeService.build_statistics_query(filters)
+        )
+
+    print(f"{'':<14}{'queries':>8}{'exec ms':>12}{'buffers':>12}")
+    print(f"{'multi-query':<14}{7:>8}{legacy_ms:>12.1f}{legacy_buffers:>12,.0f}")
+    print(f"{'single-pass':<14}{1:>8}{single_ms:>12.1f}{single_buffers:>12,.0f}")
+    if single_ms:
+        print(f"Speedup: {legacy_ms / single_ms:.1f}x (plus 6 fewer round-trips)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--seed", action="store_true", help="(Re)create benchmark data")
+    parser.add_argument("--ticker", help="Benchmark with a ticker filter")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.seed, args.ticker))
@@ -0,0 +1,34 @@
+"""
+Rebuild the trade_listings read model from trades, companies and insiders.
+
+Run after bulk loads or Core UPDATE statements on trades, companies or
+insiders, which bypass the ORM flush hook that keeps listings in sync.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import db_manager, Base
+from app.services.trade_listing_service import TradeListingService
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_trade_listings():
+    """Create the read model table if needed and repopulate it."""
+    engine = db_manager.get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with db_manager.get_session() as session:
+        rows = await TradeListingService.rebuild(session)
+    logger.info(f"✅ Trade listings rebuilt ({rows} rows)")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_trade_listings())
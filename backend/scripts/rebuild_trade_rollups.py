@@ -0,0 +1,34 @@
+"""
+Rebuild the trade_daily_rollups table from raw trades.
+
+Run after bulk loads or manual SQL edits to trades, which bypass the
+incremental rollup maintenance in TradeService and ScraperService.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import db_manager, Base
+from app.services.trade_rollup_service import TradeRollupService
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_trade_rollups():
+    """Create the rollup table if needed and repopulate it."""
+    engine = db_manager.get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with db_manager.get_session() as session:
+        rows = await TradeRollupService.rebuild(session)
+    logger.info(f"✅ Trade daily rollups rebuilt ({rows} rows)")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_trade_rollups())
@@ -6,13 +6,16 @@ Phase 6: Testing infrastructure.
 import pytest
 import pytest_asyncio
 import asyncio
-from typing import AsyncGenerator
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import AsyncGenerator, Optional
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.config import settings
+from app.database import Base, get_db, get_read_db
 from app.core.security import get_current_active_user
 # Import all models to ensure they are registered with Base.metadata
 from app.models import *  # noqa: F401, F403
@@ -82,6 +85,77 @@ async def test_user(test_db: AsyncSession) -> User:
     return user
 
 
+# Ticker -> (CIK, name) of the companies tests build trades for
+COMPANIES = {
+    "AAPL": ("0000320193", "Apple Inc."),
+    "MSFT": ("0000789019", "Microsoft Corp."),
+    "TSLA": ("0001318605", "Tesla, Inc."),
+}
+
+
+class RecordFactory:
+    """Creates companies, insiders and trades in the test database."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def companies(self, *tickers: str) -> list:
+        """Create and commit companies (AAPL by default)."""
+        companies = [
+            Company(cik=COMPANIES[ticker][0], ticker=ticker, name=COMPANIES[ticker][1])
+            for ticker in tickers or ("AAPL",)
+        ]
+        self.db.add_all(companies)
+        await self.db.commit()
+        return companies
+
+    async def company(self, ticker: str = "AAPL") -> Company:
+        return (await self.companies(ticker))[0]
+
+    async def insider(self, company: Optional[Company], name: str = "Jane Doe", **fields) -> Insider:
+        """Create and commit an insider of a company."""
+        insider = Insider(name=name, company_id=company.id if company else None, **fields)
+        self.db.add(insider)
+        await self.db.commit()
+        return insider
+
+    def trade(
+        self,
+        company: Optional[Company] = None,
+        insider: Optional[Insider] = None,
+        shares=100,
+        price=10,
+        transaction_date: date = date(2025, 11, 3),
+        **fields,
+    ) -> Trade:
+        """
+        Add a trade to the session (not committed).
+
+        Filed a day after the transaction and valued at shares * price
+        unless given; price=None leaves both unset.
+        """
+        values = {
+            "company_id": company.id if company else None,
+            "insider_id": insider.id if insider else None,
+            "transaction_date": transaction_date,
+            "filing_date": transaction_date + timedelta(days=1),
+            "transaction_type": "BUY",
+            "shares": Decimal(shares),
+            "price_per_share": None if price is None else Decimal(price),
+            "total_value": None if price is None else Decimal(shares) * Decimal(price),
+        }
+        values.update(fields)
+        trade = Trade(**values)
+        self.db.add(trade)
+        return trade
+
+
+@pytest.fixture
+def factory(test_db: AsyncSession) -> RecordFactory:
+    """Builds companies, insiders and trades in test_db."""
+    return RecordFactory(test_db)
+
+
 @pytest.fixture
 def client(test_db: AsyncSession):
     """
@@ -108,6 +182,7 @@ def client(test_db: AsyncSession):
         return mock_user
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     app.dependency_overrides[get_current_active_user] = override_get_current_user
 
     with TestClient(app) as test_client:
@@ -184,3 +259,37 @@ def mock_redis_connection(monkeypatch):
         pass
 
     return mock_redis_instance
+
+
+@pytest.fixture(autouse=True)
+def reset_alert_cooldowns():
+    """Start every test with an empty in-process alert cooldown store."""
+    from app.services.alert_cooldown_service import AlertCooldownService
+
+    AlertCooldownService.reset()
+    yield
+    AlertCooldownService.reset()
+
+
+@pytest.fixture(autouse=True)
+def in_process_event_backplane(monkeypatch):
+    """Deliver stream events in-process; there is no Redis or PostgreSQL to publish through."""
+    from app.services.event_backplane import event_backplane
+
+    monkeypatch.setattr(settings, "event_backplane", "memory")
+    event_backplane.reset()
+    yield
+    event_backplane.reset()
+
+
+@pytest.fixture(autouse=True)
+def empty_local_cache():
+    """Start every test with empty in-process caches."""
+    from app.services.cache_service import cache_service
+    from app.services.supabase_cache_service import supabase_cache_service
+
+    cache_service.clear_local()
+    supabase_cache_service.clear_local()
+    yield
+    cache_service.clear_local()
+    supabase_cache_service.clear_local()
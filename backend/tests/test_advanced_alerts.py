@@ -0,0 +1,221 @@
+"""
+Tests for compiled advanced alert rules and batch evaluation.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models.advanced_alert import AdvancedAlertRule, AlertTrigger
+from app.models.notification import Notification
+from app.models.trade import Trade
+from app.services import alert_rule_compiler
+from app.services.advanced_alert_service import AdvancedAlertService
+from app.services.alert_rule_compiler import CompiledRule, compile_rule, trade_fields, trade_frame
+
+LARGE_CEO_BUYS = {
+    "operator": "AND",
+    "conditions": [
+        {"field": "transaction_type", "operator": "equals", "value": "BUY"},
+        {"field": "insider_role", "operator": "contains", "value": "CEO"},
+        {"field": "trade_value", "operator": "greater_than", "value": 1000000},
+    ],
+}
+
+NESTED = {
+    "operator": "OR",
+    "conditions": [
+        {
+            "operator": "AND",
+            "conditions": [
+                {"field": "ticker", "operator": "in", "value": ["AAPL", "MSFT"]},
+                {"field": "filing_date", "operator": "greater_than_or_equal", "value": "2025-11-02"},
+            ],
+        },
+        {
+            "operator": "AND",
+            "conditions": [
+                {"field": "shares", "operator": "less_than", "value": 10},
+                {"operator": "NOT", "condition": {"field": "insider_name", "operator": "equals", "value": "Tim Cook"}},
+            ],
+        },
+    ],
+}
+
+
+async def _seed(factory):
+    apple, tesla = await factory.companies("AAPL", "TSLA")
+    ceo = await factory.insider(apple, "Tim Cook", title="Chief Executive Officer (CEO)")
+    director = await factory.insider(tesla, "Kimbal Musk", title="Director")
+
+    specs = [
+        (apple, ceo, "BUY", 1000, 2000, date(2025, 11, 1)),
+        (apple, ceo, "SELL", 5, 900, date(2025, 11, 3)),
+        (tesla, director, "BUY", 5, 250, date(2025, 11, 3)),
+        (tesla, director, "SELL", 100, 250, date(2025, 10, 1)),
+    ]
+    trades = [
+        factory.trade(company, insider, shares, price, filed, filing_date=filed, transaction_type=tx_type)
+        for company, insider, tx_type, shares, price, filed in specs
+    ]
+    await factory.db.commit()
+    rows = [(trade, apple if trade.company_id == apple.id else tesla, ceo if trade.insider_id == ceo.id else director)
+            for trade in trades]
+    return trades, rows
+
+
+@pytest.mark.asyncio
+async def test_scalar_and_vectorized_forms_agree(test_db, factory):
+    _, rows = await _seed(factory)
+    frame = trade_frame(rows)
+
+    for query, expected in ((LARGE_CEO_BUYS, [True, False, False, False]), (NESTED, [False, True, True, False])):
+        compiled = CompiledRule(1, query)
+        hits, masks = compiled.evaluate_frame(frame)
+        assert hits.tolist() == expected
+        for position, row in enumerate(rows):
+            matches, matched = compiled.evaluate(trade_fields(*row))
+            assert matches == expected[position]
+            assert matched == compiled.matched_at(masks, position)
+
+    _, matched = CompiledRule(1, LARGE_CEO_BUYS).evaluate(trade_fields(*rows[0]))
+    assert matched == LARGE_CEO_BUYS["conditions"]
+    # Every true condition is reported, except those under NOT
+    _, matched = CompiledRule(1, NESTED).evaluate(trade_fields(*rows[2]))
+    assert matched == [
+        {"field": "filing_date", "operator": "greater_than_or_equal", "value": "2025-11-02"},
+        {"field": "shares", "operator": "less_than", "value": 10},
+    ]
+
+
+def test_compiled_rules_are_cached_until_the_query_changes():
+    alert_rule_compiler.invalidate()
+    query = {"operator": "AND", "conditions": [{"field": "ticker", "operator": "equals", "value": "AAPL"}]}
+    compiled = compile_rule(7, query)
+    assert compile_rule(7, query) is compiled
+
+    query["conditions"][0]["value"] = "MSFT"
+    recompiled = compile_rule(7, query)
+    assert recompiled is not compiled
+    assert recompiled.evaluate({"ticker": "MSFT"})[0]
+    alert_rule_compiler.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_batch_evaluation_records_triggers_from_one_pass(test_db, factory, test_user):
+    trades, _ = await _seed(factory)
+    ceo_rule = AdvancedAlertRule(
+        user_id=test_user.id, name="Large CEO buys", query_structure=LARGE_CEO_BUYS, notification_channels=["push"]
+    )
+    nested_rule = AdvancedAlertRule(
+        user_id=test_user.id, name="Nested", query_structure=NESTED, notification_channels=["push"], group_alerts=True
+    )
+    inactive = AdvancedAlertRule(
+        user_id=test_user.id, name="Off", query_structure={"operator": "AND", "conditions": []},
+        notification_channels=["push"], is_active=False,
+    )
+    test_db.add_all([ceo_rule, nested_rule, inactive])
+    await test_db.commit()
+
+    triggered = await AdvancedAlertService(test_db).evaluate_rules_for_trades(trades)
+
+    assert [(item["rule_id"], item["trade_id"]) for item in triggered] == [
+        (ceo_rule.id, trades[0].id),
+        (nested_rule.id, trades[1].id),
+        (nested_rule.id, trades[2].id),
+    ]
+    stored = (await test_db.execute(select(AlertTrigger).order_by(AlertTrigger.id))).scalars().all()
+    assert [(t.rule_id, t.trade_id) for t in stored] == [(i["rule_id"], i["trade_id"]) for i in triggered]
+    assert stored[0].matched_conditions == LARGE_CEO_BUYS["conditions"]
+    assert stored[0].notification_sent
+    assert stored[1].group_id is not None
+    assert ceo_rule.trigger_count == 1
+    assert nested_rule.trigger_count == 2
+
+
+class FakeSECClient:
+    """One Form 4 filing; the parser is patched to return its transactions."""
+
+    async def fetch_recent_form4_filings(self, cik, start_date, count):
+        return [{"filing_url": "https://www.sec.gov/form4-1.xml", "filing_date": "2025-11-04"}]
+
+    async def fetch_form4_document(self, url):
+        return "<ownershipDocument/>"
+
+
+async def _scrape_with_rule(factory, test_user, monkeypatch):
+    """Scrape one filing (a SELL and a BUY) with an "AAPL sells" rule in place."""
+    from app.config import settings
+    from app.services import form4_parser
+    from app.services.scraper_service import ScraperService
+
+    apple = await factory.company()
+    await factory.insider(apple, "Jeff Williams", title="COO", is_officer=True)
+    rule = AdvancedAlertRule(
+        user_id=test_user.id,
+        name="AAPL sells",
+        query_structure={
+            "operator": "AND",
+            "conditions": [
+                {"field": "ticker", "operator": "equals", "value": "AAPL"},
+                {"field": "transaction_type", "operator": "equals", "value": "SELL"},
+            ],
+        },
+        notification_channels=["push"],
+    )
+    factory.db.add(rule)
+    await factory.db.commit()
+
+    parsed = {
+        "reporting_owner": {"name": "Jeff Williams", "is_officer": True},
+        "transactions": [
+            {
+                "transaction_date": date(2025, 11, 3),
+                "transaction_type": transaction_type,
+                "shares": Decimal(shares),
+                "price_per_share": Decimal("200"),
+                "total_value": Decimal(shares * 200),
+            }
+            for transaction_type, shares in (("SELL", 100), ("BUY", 50))
+        ],
+    }
+    monkeypatch.setattr(form4_parser.Form4Parser, "parse", staticmethod(lambda xml: parsed))
+    monkeypatch.setattr(settings, "alerts_enabled", True)
+    scraper = ScraperService()
+    scraper._sec_client = FakeSECClient()
+
+    result = await scraper.scrape_company_trades(factory.db, ticker="AAPL")
+    return rule, result
+
+
+@pytest.mark.asyncio
+async def test_scraped_trades_are_evaluated_against_rules(test_db, factory, test_user, monkeypatch):
+    rule, result = await _scrape_with_rule(factory, test_user, monkeypatch)
+
+    assert result["trades_created"] == 2
+    assert result["advanced_alerts_triggered"] == 1
+    [trigger] = (await test_db.execute(select(AlertTrigger))).scalars().all()
+    trade = await test_db.get(Trade, trigger.trade_id)
+    assert (trigger.rule_id, trade.transaction_type) == (rule.id, "SELL")
+
+
+@pytest.mark.asyncio
+async def test_failed_simple_alerts_do_not_leak_into_advanced_rules(test_db, factory, test_user, monkeypatch):
+    """A failing simple-alert pass is rolled back; advanced rules still run."""
+    from app.services.alert_service import AlertService
+
+    async def failing_check(self, trades):
+        self.db.add(Notification(user_id=test_user.id, type="alert", title="staged", message="staged"))
+        await self.db.flush()
+        raise RuntimeError("alert check failed")
+
+    monkeypatch.setattr(AlertService, "check_trades_against_alerts", failing_check)
+
+    _, result = await _scrape_with_rule(factory, test_user, monkeypatch)
+
+    assert result["alerts_triggered"] == 0
+    assert result["advanced_alerts_triggered"] == 1
+    staged = await test_db.execute(select(Notification).where(Notification.title == "staged"))
+    assert staged.scalars().all() == []
@@ -0,0 +1,107 @@
+"""
+Tests for alert previews over the columnar trade snapshot.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.alert_backtest_service import AlertBacktestService
+from app.services.alert_matching_service import AlertRule, insider_role_names
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshot():
+    AlertBacktestService.invalidate()
+    yield
+    AlertBacktestService.invalidate()
+
+
+async def _seed(factory, count=120):
+    rng = random.Random(7)
+    companies = await factory.companies("AAPL", "TSLA")
+    insiders = [
+        await factory.insider(companies[0], "Tim Cook", title="CEO", is_officer=True),
+        await factory.insider(companies[0], "Art Levinson", is_director=True),
+        await factory.insider(companies[1], "Kimbal Musk", is_director=True),
+    ]
+    by_id = {company.id: company for company in companies}
+
+    today = date.today()
+    rows = []
+    for _ in range(count):
+        insider = rng.choice(insiders)
+        filed = today - timedelta(days=rng.randint(0, 700))
+        shares = rng.randint(1, 5000)
+        trade = factory.trade(
+            by_id[insider.company_id],
+            insider,
+            shares,
+            150,
+            filed,
+            filing_date=filed,
+            transaction_type=rng.choice(["BUY", "SELL"]),
+        )
+        rows.append((trade, by_id[insider.company_id], insider))
+    await factory.db.commit()
+    return rows
+
+
+@pytest.mark.asyncio
+async def test_simple_preview_matches_live_alert_semantics(test_db, factory):
+    rows = await _seed(factory)
+    since = date.today().replace(year=date.today().year - 1)
+
+    result = await AlertBacktestService.preview(
+        test_db, years=1, sample_size=5, ticker="aapl", min_value=100000, insider_roles=["director"]
+    )
+
+    rule = AlertRule.from_values(0, "aapl", None, 100000, None, ["director"])
+    expected = sorted(
+        (trade.filing_date, trade.id)
+        for trade, company, insider in rows
+        if trade.filing_date >= since
+        and rule.matches(company.ticker, trade.transaction_type, float(trade.total_value), frozenset(
+            role.casefold() for role in insider_role_names(insider)
+        ))
+    )
+    assert result["total_matches"] == len(expected) > 0
+    assert result["trades_scanned"] == sum(trade.filing_date >= since for trade, _, _ in rows)
+    assert sum(month["matches"] for month in result["months"]) == len(expected)
+    assert result["months"][-1]["month"] == date.today().strftime("%Y-%m")
+    assert len(result["months"]) == 13
+    # Most recent first
+    assert [sample["trade_id"] for sample in result["samples"]] == [trade_id for _, trade_id in reversed(expected)][:5]
+    assert all(sample["insider_name"] == "Art Levinson" for sample in result["samples"])
+
+
+@pytest.mark.asyncio
+async def test_advanced_preview_reports_matched_conditions(test_db, factory):
+    rows = await _seed(factory)
+    query = {
+        "operator": "AND",
+        "conditions": [
+            {"field": "transaction_type", "operator": "equals", "value": "BUY"},
+            {"field": "insider_role", "operator": "contains", "value": "ceo"},
+        ],
+    }
+
+    result = await AlertBacktestService.preview(test_db, years=2, sample_size=3, query_structure=query)
+
+    expected = [trade for trade, _, insider in rows if trade.transaction_type == "BUY" and insider.title == "CEO"]
+    assert result["total_matches"] == len(expected)
+    assert len(result["samples"]) == 3
+    assert all(sample["matched_conditions"] == query["conditions"] for sample in result["samples"])
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_reused_and_widened(test_db, factory):
+    await _seed(factory, count=20)
+
+    first = await AlertBacktestService.get_snapshot(test_db, date.today() - timedelta(days=365))
+    assert await AlertBacktestService.get_snapshot(test_db, date.today() - timedelta(days=100)) is first
+
+    wider = await AlertBacktestService.get_snapshot(test_db, date.today() - timedelta(days=730))
+    assert wider is not first
+    assert len(wider) == 20
@@ -0,0 +1,55 @@
+"""
+Tests for the alert cooldown store.
+"""
+
+import pytest
+
+from app.services import alert_cooldown_service
+from app.services.alert_cooldown_service import (
+    AlertCooldownService,
+    MemoryCooldownStore,
+    RedisCooldownStore,
+)
+
+
+@pytest.mark.asyncio
+async def test_memory_store_claims_each_key_once_until_expiry(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(alert_cooldown_service.time, "monotonic", lambda: clock[0])
+    store = MemoryCooldownStore()
+
+    assert await store.claim(["a", "b"], ttl=60) == {"a", "b"}
+    clock[0] += 30
+    assert await store.claim(["a", "c"], ttl=60) == {"c"}
+
+    # "a" and "b" expire; "c" is still cooling down
+    clock[0] += 31
+    assert await store.claim(["a", "b", "c"], ttl=60) == {"a", "b"}
+    assert len(store) == 3
+
+    await store.release(["c"])
+    assert await store.claim(["c"], ttl=60) == {"c"}
+
+
+@pytest.mark.asyncio
+async def test_service_claims_pairs_and_releases_them():
+    pairs = [(1, 10), (2, 10)]
+    assert await AlertCooldownService.claim(pairs) == set(pairs)
+    assert await AlertCooldownService.claim([(1, 10), (1, 11)]) == {(1, 11)}
+
+    await AlertCooldownService.release([(1, 10)])
+    assert await AlertCooldownService.claim(pairs) == {(1, 10)}
+
+
+@pytest.mark.asyncio
+async def test_redis_store_falls_back_to_memory_when_unavailable(monkeypatch):
+    fallback = MemoryCooldownStore()
+    store = RedisCooldownStore("redis://unreachable:6379/0", fallback)
+
+    async def _down():
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(store, "_redis", _down)
+    assert await store.claim(["k"], ttl=60) == {"k"}
+    assert await store.claim(["k"], ttl=60) == set()
+    assert "k" in fallback._expiry
@@ -0,0 +1,165 @@
+"""
+Tests for the indexed alert matcher.
+"""
+
+import random
+
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from app.models.alert import Alert
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade import Trade
+from app.services.alert_service import AlertService
+from app.services.alert_cooldown_service import AlertCooldownService
+from app.services.alert_matching_service import (
+    AlertIndex,
+    AlertMatchingService,
+    AlertRule,
+)
+
+
+def test_index_matches_linear_scan():
+    """Bucket + interval tree lookups return exactly what evaluating every rule does."""
+    rng = random.Random(7)
+    tickers = ["AAPL", "MSFT", "NVDA", "TSLA"]
+    rules = [
+        AlertRule.from_values(
+            alert_id,
+            rng.choice(tickers + [None]),
+            rng.choice(["BUY", "SELL", None]),
+            rng.choice([None, 0, 1000, 50000, 250000]),
+            rng.choice([None, 0, 10000, 100000, 1000000]),
+            rng.choice([[], ["CEO"], ["director", "CFO"]]),
+        )
+        for alert_id in range(1, 2001)
+    ]
+    index = AlertIndex(rules)
+
+    for _ in range(300):
+        ticker = rng.choice(tickers)
+        tx_type = rng.choice(["BUY", "SELL"])
+        value = rng.choice([0, 1000, 10000, 99999.5, 100000, 5e6])
+        roles = frozenset(rng.sample(["ceo", "cfo", "director", "officer"], 2))
+        expected = [rule.id for rule in rules if rule.matches(ticker, tx_type, value, roles)]
+        assert index.match(ticker.lower(), tx_type, value, roles) == expected
+
+    # Updates and removals take effect on the next match
+    rule = AlertRule.from_values(9999, "AAPL", "BUY", 1, 2, [])
+    index.upsert(rule)
+    assert 9999 in index.match("AAPL", "BUY", 1.5)
+    index.upsert(AlertRule.from_values(9999, "MSFT", "BUY", 1, 2, []))
+    assert 9999 not in index.match("AAPL", "BUY", 1.5)
+    assert 9999 in index.match("MSFT", "BUY", 1.5)
+    index.remove(9999)
+    assert 9999 not in index.match("MSFT", "BUY", 1.5)
+
+
+@pytest.mark.asyncio
+async def test_index_follows_committed_alert_writes(test_db):
+    """Creates, toggles and deletes reach the index after commit, not before."""
+    AlertMatchingService.invalidate()
+    index = await AlertMatchingService.get_index(test_db)
+    assert len(index) == 0
+
+    alert = Alert(
+        user_id=1,
+        name="Big NVDA buys",
+        alert_type="large_trade",
+        ticker="NVDA",
+        transaction_type="BUY",
+        min_value=Decimal("1000000"),
+        notification_channels=["push"],
+        is_active=True,
+    )
+    test_db.add(alert)
+    await test_db.flush()
+    assert alert.id not in index
+    alert_id = alert.id
+    await test_db.commit()
+    assert index.match("NVDA", "BUY", 2_000_000) == [alert_id]
+    assert index.match("NVDA", "BUY", 10) == []
+
+    alert.is_active = False
+    await test_db.flush()
+    await test_db.rollback()
+    assert alert_id in index
+
+    alert = await test_db.get(Alert, alert_id)
+    alert.is_active = False
+    await test_db.commit()
+    assert alert_id not in index
+
+    alert = await test_db.get(Alert, alert_id)
+    alert.is_active = True
+    alert.min_value = None
+    await test_db.commit()
+    assert index.match("NVDA", "BUY", 10) == [alert_id]
+
+    await test_db.delete(await test_db.get(Alert, alert_id))
+    await test_db.commit()
+    assert len(index) == 0
+    assert await AlertMatchingService.get_index(test_db) is index
+    AlertMatchingService.invalidate()
+
+
+def _alert(**kwargs):
+    return Alert(
+        user_id=1,
+        name=kwargs.pop("name", "Alert"),
+        alert_type="large_trade",
+        notification_channels=["push"],
+        is_active=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_fires_each_alert_once_for_most_significant_trade(test_db, monkeypatch):
+    """A scrape batch triggers every matching alert once, skipping pairs in cooldown."""
+    AlertMatchingService.invalidate()
+    company = Company(cik="0000320193", ticker="AAPL", name="Apple Inc.")
+    test_db.add(company)
+    await test_db.commit()
+    ceo = Insider(name="Tim Cook", title="CEO", is_officer=True, company_id=company.id)
+    director = Insider(name="Art Levinson", is_director=True, company_id=company.id)
+    test_db.add_all([ceo, director])
+    await test_db.commit()
+
+    trades = [
+        Trade(
+            company_id=company.id,
+            insider_id=insider.id,
+            transaction_date=date(2025, 11, 1),
+            filing_date=date(2025, 11, 3),
+            transaction_type="BUY",
+            shares=Decimal("100"),
+            price_per_share=price,
+            total_value=price * 100,
+        )
+        for insider, price in ((director, Decimal("50")), (ceo, Decimal("20000")), (director, Decimal("900")))
+    ]
+    any_buy = _alert(name="Any AAPL buy", ticker="AAPL", transaction_type="BUY")
+    directors = _alert(name="Director buys", insider_roles=["Director"])
+    sells = _alert(name="Sells", transaction_type="SELL")
+    cooled = _alert(name="Big buys", min_value=Decimal("1000000"))
+    test_db.add_all([*trades, any_buy, directors, sells, cooled])
+    await test_db.commit()
+    assert await AlertCooldownService.claim([(cooled.id, trades[1].id)])
+
+    fired = []
+
+    async def _record(self, alert, trade, company_name, insider_name, company_ticker=None):
+        fired.append((alert.id, trade.id, insider_name, company_ticker))
+
+    monkeypatch.setattr(AlertService, "_trigger_alert_notifications", _record)
+
+    triggered = await AlertService(test_db).check_trades_against_alerts(trades)
+    assert triggered == 2
+    assert fired == [
+        (any_buy.id, trades[1].id, "Tim Cook", "AAPL"),
+        (directors.id, trades[2].id, "Art Levinson", "AAPL"),
+    ]
+    AlertMatchingService.invalidate()
@@ -0,0 +1,98 @@
+"""
+Tests for batch significance scoring.
+"""
+
+import random
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, event, func, select
+
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade import Trade
+from app.services.alert_prioritization_service import AlertPrioritizationService
+
+
+async def _reference_counts(db, trade):
+    """The per-trade queries the scorer used to run."""
+    cluster = await db.execute(
+        select(func.count(Trade.id)).where(
+            and_(
+                Trade.company_id == trade.company_id,
+                Trade.transaction_date >= trade.transaction_date - timedelta(days=7),
+                Trade.transaction_date <= trade.transaction_date,
+                Trade.transaction_type == trade.transaction_type,
+            )
+        )
+    )
+    history = await db.execute(
+        select(func.count(Trade.id)).where(
+            and_(
+                Trade.insider_id == trade.insider_id,
+                Trade.company_id == trade.company_id,
+                Trade.transaction_date >= trade.transaction_date - timedelta(days=365),
+                Trade.transaction_date < trade.transaction_date,
+            )
+        )
+    )
+    return cluster.scalar_one(), history.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_batch_context_matches_per_trade_queries(test_db):
+    """One range query + bisect gives the counts the per-trade queries did."""
+    rng = random.Random(3)
+    companies = [Company(cik=f"000000000{i}", ticker=f"T{i}", name=f"T{i} Inc.") for i in range(3)]
+    test_db.add_all(companies)
+    await test_db.commit()
+    insiders = [
+        Insider(name=f"Insider {i}", title="CEO" if i == 0 else None, is_director=True, company_id=companies[i % 3].id)
+        for i in range(6)
+    ]
+    test_db.add_all(insiders)
+    await test_db.commit()
+
+    trades = []
+    for _ in range(300):
+        insider = rng.choice(insiders)
+        trades.append(
+            Trade(
+                company_id=rng.choice(companies).id,
+                insider_id=insider.id,
+                transaction_date=date(2025, 1, 1) + timedelta(days=rng.randrange(500)),
+                filing_date=date(2025, 1, 1),
+                transaction_type=rng.choice(["BUY", "SELL"]),
+                shares=Decimal("100"),
+                price_per_share=Decimal("10"),
+                total_value=Decimal(rng.choice([5000, 60000, 700000, 2000000])),
+            )
+        )
+    test_db.add_all(trades)
+    await test_db.commit()
+
+    service = AlertPrioritizationService(test_db)
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = test_db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        contexts = await service._load_trade_context(trades)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert len(statements) == 1
+
+    for trade, context in zip(trades, contexts):
+        assert tuple(context) == await _reference_counts(test_db, trade)
+
+    # Batch and one-at-a-time scoring agree
+    scored = await service.filter_significant_trades(trades[:40], target_percentage=1.0)
+    for item in scored:
+        trade = next(t for t in trades if t.id == item["trade_id"])
+        await test_db.refresh(trade, attribute_names=["company", "insider"])
+        assert item["score"] == await service._calculate_significance_score(trade)
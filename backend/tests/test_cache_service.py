@@ -0,0 +1,201 @@
+"""
+Tests for the two-level cache: in-process L1, Redis L2, generations and stampede protection.
+"""
+
+import asyncio
+import json
+import time
+from decimal import Decimal
+
+import pytest
+
+from app.services import cache_service as cache_module
+from app.services.cache_service import CacheService, company_tag, pack_entry, unpack_entry
+from app.services.event_backplane import CACHE_EVENTS, EventBackplane
+
+
+class FakeRedis:
+    """The handful of Redis commands the cache uses, with a command log."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+
+    async def get(self, key):
+        self.commands.append(("get", key))
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.commands.append(("mget", *keys))
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.commands.append(("incr", key))
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match=None):
+        raise AssertionError("keyspace scan")
+        yield
+
+
+class LoopbackTransport:
+    """Stands in for Redis pub/sub: published payloads go to this process's handlers."""
+
+    name = "redis"
+
+    def __init__(self):
+        self.backplane = None
+        self.sent = []
+
+    async def send(self, channel, payloads):
+        self.sent.append((channel, list(payloads)))
+        for payload in payloads:
+            await self.backplane.dispatch(channel, payload)
+
+
+@pytest.fixture
+def backplane(monkeypatch):
+    transport = LoopbackTransport()
+    backplane = EventBackplane(transport)
+    transport.backplane = backplane
+    monkeypatch.setattr(cache_module, "event_backplane", backplane)
+    return backplane
+
+
+async def _settle() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_entries_round_trip_through_both_levels(backplane):
+    redis = FakeRedis()
+    cache = CacheService()
+    cache.redis_client = redis
+    value = {"ticker": "AAPL", "price": Decimal("190.50"), "sections": [1, 2]}
+
+    assert await cache.set("company:AAPL:snapshot", value, ttl=60)
+    assert set(redis.data) == {"company:AAPL:snapshot#0"}
+    assert await cache.get("company:AAPL:snapshot") == {"ticker": "AAPL", "price": "190.50", "sections": [1, 2]}
+    # Served from L1: no read of the value itself
+    assert ("get", "company:AAPL:snapshot#0") not in redis.commands
+
+    # Another worker reads it from Redis
+    other = CacheService()
+    other.redis_client = redis
+    assert (await other.get("company:AAPL:snapshot"))["price"] == "190.50"
+
+    # Values written before entries were enveloped still decode
+    redis.data["legacy"] = json.dumps({"a": 1}).encode()
+    assert await cache.get("legacy") == {"a": 1}
+    assert unpack_entry(pack_entry([1], 0.5, 10.0)) == ([1], 0.5, 10.0)
+
+
+@pytest.mark.asyncio
+async def test_company_invalidation_is_one_generation_bump(backplane):
+    redis = FakeRedis()
+    cache, other = CacheService(), CacheService()
+    cache.redis_client = other.redis_client = redis
+    backplane.subscribe(CACHE_EVENTS, cache.apply_invalidation)
+    backplane.subscribe(CACHE_EVENTS, other.apply_invalidation)
+
+    for key in ("company:AAPL:snapshot", "competitive_strength:AAPL:latest", "company:MSFT:snapshot"):
+        await cache.set(key, {"key": key}, ttl=60)
+        assert await other.get(key) == {"key": key}
+
+    # Writes are not announced
+    await _settle()
+    assert backplane.transport.sent == []
+
+    redis.commands.clear()
+    assert await cache.invalidate_company_cache("aapl") == 1
+    assert redis.commands == [("incr", f"cache:gen:{company_tag('AAPL')}")]
+    await _settle()
+    assert len(backplane.transport.sent) == 1
+
+    for service in (cache, other):
+        assert await service.get("company:AAPL:snapshot") is None
+        assert await service.get("competitive_strength:AAPL:latest") is None
+        assert await service.get("company:MSFT:snapshot") == {"key": "company:MSFT:snapshot"}
+
+    await cache.set("company:AAPL:snapshot", {"fresh": True}, ttl=60)
+    assert "company:AAPL:snapshot#1" in redis.data
+    assert await other.get("company:AAPL:snapshot") == {"fresh": True}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(backplane):
+    cache = CacheService()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"value": calls}
+
+    waiting = [asyncio.create_task(cache.get_or_set("risk:TSLA:score", fetch, ttl=60)) for _ in range(10)]
+    await _settle()
+    release.set()
+
+    assert await asyncio.gather(*waiting) == [{"value": 1}] * 10
+    assert calls == 1
+    assert await cache.get_or_set("risk:TSLA:score", fetch, ttl=60) == {"value": 1}
+
+    async def broken():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_set("risk:NVDA:score", broken, ttl=60)
+    assert "risk:NVDA:score" not in cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_entries_near_expiry_are_refreshed_early(backplane):
+    cache = CacheService()
+    # Slow to compute and at its expiry (Redis would still hold it for a moment)
+    packed = pack_entry({"version": 1}, 60.0, time.time())
+    cache._local.set("ts_score:AAPL:latest", await cache._stamp(("company:AAPL",)), packed, 30)
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    assert await cache.get_or_set("ts_score:AAPL:latest", failing, ttl=60) == {"version": 1}
+
+    async def fetch():
+        return {"version": 2}
+
+    assert await cache.get_or_set("ts_score:AAPL:latest", fetch, ttl=60) == {"version": 2}
+
+    # The new entry was quick to compute and is far from expiry
+    assert await cache.get_or_set("ts_score:AAPL:latest", failing, ttl=60) == {"version": 2}
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_announced_without_redis(monkeypatch):
+    backplane = EventBackplane()
+    monkeypatch.setattr(cache_module, "event_backplane", backplane)
+    received = []
+
+    async def handler(message):
+        received.append(message)
+
+    backplane.subscribe(CACHE_EVENTS, handler)
+    cache = CacheService()
+    await cache.set("company:AAPL:snapshot", {"a": 1}, ttl=60)
+    await cache.delete("company:AAPL:snapshot")
+    cache.forget("company:MSFT:snapshot")
+    await _settle()
+    assert received == [] and not backplane._pending
@@ -0,0 +1,97 @@
+"""
+Tests for precomputed company snapshot documents.
+"""
+
+import pytest
+from datetime import date
+
+from app.models.company_snapshot import CompanySnapshot
+from app.services import company_snapshot_service
+from app.services.company_snapshot_service import (
+    STORED_SECTIONS,
+    CompanySnapshotService,
+)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    """Record background rebuilds instead of running them."""
+    calls = []
+    monkeypatch.setattr(
+        company_snapshot_service,
+        "schedule_rebuild",
+        lambda tickers, sections=STORED_SECTIONS: calls.append((set(tickers), set(sections))),
+    )
+    return calls
+
+
+async def _seed(factory):
+    company = await factory.company()
+    insider = await factory.insider(company, title="CEO", is_officer=True)
+    factory.trade(company, insider, transaction_date=date(2025, 11, 1))
+    await factory.db.commit()
+    return company, insider
+
+
+@pytest.mark.asyncio
+async def test_snapshot_built_on_first_read_and_rebuilt_when_stale(test_db, factory, scheduled, monkeypatch):
+    """The first read stores the document; trade writes mark it stale for rebuild."""
+    company, insider = await _seed(factory)
+
+    document = await CompanySnapshotService.get(test_db, "aapl")
+    assert document["ticker"] == "AAPL"
+    assert set(document["sections"]) == set(STORED_SECTIONS)
+    assert all(section["as_of"] for section in document["sections"].values())
+    assert len(document["sections"]["recent_trades"]["data"]) == 1
+    assert document["sections"]["insiders"]["data"][0]["name"] == "Jane Doe"
+    # No quote yet -> refreshed in the background
+    assert scheduled[-1] == ({"AAPL"}, {"quote"})
+
+    row = await test_db.get(CompanySnapshot, company.id)
+    assert row.stale is False
+
+    factory.trade(company, insider, transaction_date=date(2025, 11, 5))
+    await test_db.commit()
+    await test_db.refresh(row)
+    assert row.stale is True
+    assert scheduled[-1] == ({"AAPL"}, set(STORED_SECTIONS))
+
+    # A quote-only rebuild leaves the other sections (and the row) stale
+    async def quote(ticker):
+        return {"price": 1}
+
+    monkeypatch.setattr(CompanySnapshotService, "_build_quote", staticmethod(quote))
+    document = await CompanySnapshotService.rebuild(test_db, "AAPL", ["quote"])
+    assert document["sections"]["quote"]["data"] == {"price": 1}
+    await test_db.refresh(row)
+    assert row.stale is True
+
+    document = await CompanySnapshotService.get(test_db, "AAPL")
+    assert len(document["sections"]["recent_trades"]["data"]) == 2
+    assert document["sections"]["quote"]["data"] == {"price": 1}
+    await test_db.refresh(row)
+    assert row.stale is False
+
+
+@pytest.mark.asyncio
+async def test_partial_rebuild_keeps_other_sections(test_db, factory, scheduled):
+    """Rebuilding some sections keeps the others and their as_of stamps."""
+    company, _ = await _seed(factory)
+
+    document = await CompanySnapshotService.build_document(test_db, company, STORED_SECTIONS)
+    document["sections"]["quote"] = {"as_of": "2025-11-03T12:00:00", "data": {"price": 1}}
+    profile = document["sections"]["profile"]
+
+    rebuilt = await CompanySnapshotService.build_document(
+        test_db, company, ["scores"], document
+    )
+    assert list(rebuilt["sections"]) == ["profile", "quote", "scores", "recent_trades", "insiders"]
+    assert rebuilt["sections"]["profile"] == profile
+    assert rebuilt["sections"]["quote"]["data"] == {"price": 1}
+    assert rebuilt["sections"]["scores"]["data"] == {
+        "intrinsic_value": None,
+        "tradesignal_score": None,
+        "risk_level": None,
+    }
+
+    assert await CompanySnapshotService.get(test_db, "MSFT") is None
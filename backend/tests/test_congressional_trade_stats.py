@@ -0,0 +1,116 @@
+"""
+Tests for SQL-side congressional trade statistics.
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.models.congressional_trade import CongressionalTrade
+from app.models.congressperson import Congressperson
+from app.schemas.congressional_trade import CongressionalTradeFilter
+from app.services.congressional_trade_service import CongressionalTradeService
+
+
+async def _seed(test_db):
+    pelosi = Congressperson(
+        name="Nancy Pelosi", last_name="Pelosi", chamber="HOUSE", state="CA", party="DEMOCRAT"
+    )
+    tuberville = Congressperson(
+        name="Tommy Tuberville", last_name="Tuberville", chamber="SENATE", state="AL", party="REPUBLICAN"
+    )
+    test_db.add_all([pelosi, tuberville])
+    await test_db.commit()
+
+    rows = [
+        # member, ticker, type, estimated, min, max
+        (pelosi, "NVDA", "BUY", Decimal("500000"), None, None),
+        (pelosi, "NVDA", "BUY", None, Decimal("1001"), Decimal("15000")),
+        (pelosi, "AAPL", "SELL", Decimal("250000"), None, None),
+        (tuberville, "AAPL", "BUY", Decimal("0"), Decimal("15001"), Decimal("50000")),
+        (tuberville, "MSFT", "SELL", None, None, None),
+        (tuberville, None, "BUY", None, None, None),
+    ]
+    for member, ticker, tx_type, estimated, low, high in rows:
+        test_db.add(
+            CongressionalTrade(
+                congressperson_id=member.id,
+                ticker=ticker,
+                transaction_date=date(2025, 10, 1),
+                disclosure_date=date(2025, 10, 20),
+                transaction_type=tx_type,
+                asset_description=f"{ticker} common stock",
+                amount_estimated=estimated,
+                amount_min=low,
+                amount_max=high,
+                owner_type="Self",
+            )
+        )
+    await test_db.commit()
+
+
+@pytest.mark.asyncio
+async def test_trade_stats_single_query(test_db):
+    """Every statistic comes from one aggregate query over the filtered trades."""
+    await _seed(test_db)
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = test_db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        stats = await CongressionalTradeService.get_trade_stats(test_db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert len(statements) == 1
+    assert stats.total_trades == 6
+    assert stats.total_buys == 4
+    assert stats.total_sells == 2
+    # Range midpoints stand in when no estimate is recorded (0 counts as none)
+    assert stats.total_buy_value == 500000 + 8000.5 + 32500.5
+    assert stats.total_sell_value == 250000
+    assert stats.total_value == 500000 + 8000.5 + 32500.5 - 250000
+    assert stats.average_trade_size == pytest.approx((500000 + 8000.5 + 32500.5 + 250000) / 4)
+    assert stats.largest_trade == 500000
+    assert stats.most_active_congressperson == "Nancy Pelosi"
+    assert stats.most_active_company == "AAPL"
+    assert stats.house_trade_count == 3
+    assert stats.senate_trade_count == 3
+    assert stats.democrat_buy_count == 2
+    assert stats.democrat_sell_count == 1
+    assert stats.republican_buy_count == 2
+    assert stats.republican_sell_count == 1
+
+
+@pytest.mark.asyncio
+async def test_trade_stats_with_filters(test_db):
+    """Filters, including the congressperson join filters, apply to every aggregate."""
+    await _seed(test_db)
+
+    stats = await CongressionalTradeService.get_trade_stats(
+        test_db, CongressionalTradeFilter(chamber="senate")
+    )
+    assert stats.total_trades == 3
+    assert stats.most_active_congressperson == "Tommy Tuberville"
+    assert stats.house_trade_count == 0
+    assert stats.republican_sell_count == 1
+    assert stats.largest_trade == 32500.5
+
+    stats = await CongressionalTradeService.get_trade_stats(
+        test_db, CongressionalTradeFilter(ticker="nvda")
+    )
+    assert stats.total_trades == 2
+    assert stats.most_active_company == "NVDA"
+
+    stats = await CongressionalTradeService.get_trade_stats(
+        test_db, CongressionalTradeFilter(ticker="NONE")
+    )
+    assert stats.total_trades == 0
+    assert stats.largest_trade is None
+    assert stats.most_active_congressperson is None
@@ -7,7 +7,7 @@ from sqlalchemy.pool import StaticPool
 from datetime import datetime, date
 
 from app.main import app
-from app.database import get_db, Base
+from app.database import get_db, get_read_db, Base
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.models.company import Company
@@ -66,6 +66,7 @@ async def local_client(local_db):
         yield local_db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     async with AsyncClient(app=app, base_url="http://test", follow_redirects=True) as ac:
         yield ac
     app.dependency_overrides.clear()
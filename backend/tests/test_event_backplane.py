@@ -0,0 +1,230 @@
+"""
+Tests for the cross-worker event backplane behind the WebSocket streams.
+"""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+from starlette.websockets import WebSocketState
+
+from app.config import settings
+from app.database import defer_until_commit
+from app.routers.alerts import alert_manager
+from app.services.event_backplane import TRADE_EVENTS, EventBackplane, PostgresTransport, Replay
+from app.services.trade_event_manager import Subscription, TradeEventManager
+
+
+class FakeBroker:
+    """Stands in for Redis or PostgreSQL: every listener gets every published payload."""
+
+    def __init__(self):
+        self.listeners = []
+        self.fail = False
+        self.last_seq = 0
+        self.retained = {}
+        # When set, replay() waits for it (a slow round trip)
+        self.replay_gate = None
+
+    def transport(self):
+        broker = self
+
+        class Transport:
+            name = "fake"
+
+            async def next_sequence(self, channel, count):
+                broker.last_seq += count
+                return list(range(broker.last_seq - count + 1, broker.last_seq + 1))
+
+            async def retain(self, channel, entries, size):
+                buffer = broker.retained.setdefault(channel, {})
+                buffer.update(entries)
+                for seq in sorted(buffer)[:-size]:
+                    del buffer[seq]
+
+            async def replay(self, channel, since):
+                if broker.replay_gate is not None:
+                    await broker.replay_gate.wait()
+                buffer = broker.retained.get(channel, {})
+                if not buffer:
+                    return Replay(False, [], None)
+                if since is None or since < min(buffer) - 1:
+                    return Replay(False, [], max(buffer))
+                return Replay(True, [buffer[seq] for seq in sorted(buffer) if seq > since], max(buffer))
+
+            async def send(self, channel, payloads):
+                if broker.fail:
+                    raise ConnectionError("broker down")
+                for queue in broker.listeners:
+                    for payload in payloads:
+                        queue.put_nowait((channel, payload))
+
+            async def listen(self, channels, deliver):
+                queue = asyncio.Queue()
+                broker.listeners.append(queue)
+                try:
+                    while True:
+                        channel, payload = await queue.get()
+                        if channel in channels:
+                            await deliver(channel, payload)
+                finally:
+                    broker.listeners.remove(queue)
+
+            async def close(self):
+                return None
+
+        return Transport()
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+
+    async def send_text(self, payload: str) -> None:
+        self.sent.append(json.loads(payload))
+
+    async def send_json(self, message: dict) -> None:
+        self.sent.append(message)
+
+
+async def _settle() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def _trade_event(ticker: str, trade_id: int) -> dict:
+    return {"type": "trade_created", "trade": {"id": trade_id, "transaction_type": "BUY", "company": {"ticker": ticker}}}
+
+
+@pytest.mark.asyncio
+async def test_events_published_anywhere_reach_every_worker():
+    broker = FakeBroker()
+    workers = []
+    for _ in range(2):
+        backplane = EventBackplane(broker.transport())
+        manager = TradeEventManager(backplane)
+        backplane.subscribe(TRADE_EVENTS, manager.broadcast)
+        await backplane.start()
+        workers.append((backplane, manager))
+    await _settle()
+
+    sockets = [FakeWebSocket(), FakeWebSocket()]
+    await workers[0][1].connect(sockets[0])
+    await workers[1][1].connect(sockets[1], Subscription.parse("MSFT"))
+
+    # A scraper process publishes without listening
+    scraper = EventBackplane(broker.transport())
+    await scraper.publish_many(TRADE_EVENTS, [_trade_event("AAPL", 1), _trade_event("MSFT", 2)])
+    await _settle()
+
+    assert [m["trade"]["id"] for m in sockets[0].sent] == [1, 2]
+    assert [m["trade"]["id"] for m in sockets[1].sent] == [2]
+
+    for backplane, manager in workers:
+        await backplane.stop()
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_is_delivered_locally():
+    broker = FakeBroker()
+    backplane = EventBackplane(broker.transport())
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    backplane.subscribe(TRADE_EVENTS, handler)
+    broker.fail = True
+    await backplane.publish(TRADE_EVENTS, {"type": "trade_deleted", "trade_id": 7})
+
+    assert received == [{"type": "trade_deleted", "trade_id": 7}]
+
+
+def test_auto_never_picks_postgres(monkeypatch):
+    """LISTEN/NOTIFY through a transaction pooler delivers nothing, so it must be chosen explicitly."""
+    monkeypatch.setattr(settings, "database_url", "postgresql+asyncpg://app@pooler.example.com:6543/postgres")
+    monkeypatch.setattr(settings, "redis_url", None)
+    monkeypatch.setattr(settings, "event_backplane", "auto")
+    assert EventBackplane().transport is None
+
+    monkeypatch.setattr(settings, "event_backplane", "postgres")
+    assert isinstance(EventBackplane().transport, PostgresTransport)
+
+
+@pytest.mark.asyncio
+async def test_alert_stream_events_publish_after_commit(test_db):
+    own, other = FakeWebSocket(), FakeWebSocket()
+    await alert_manager.connect(own, user_id=1)
+    await alert_manager.connect(other, user_id=2)
+    try:
+        event = {"user_id": 1, "message": {"id": "alert-1-1", "title": "Alert", "message": "Tim Cook bought"}}
+        await test_db.execute(select(1))
+        defer_until_commit(test_db.sync_session, "alert_stream_events", event)
+        await test_db.rollback()
+        await _settle()
+        assert own.sent == []
+
+        await test_db.execute(select(1))
+        defer_until_commit(test_db.sync_session, "alert_stream_events", event)
+        await test_db.commit()
+        await _settle()
+        assert own.sent == [event["message"]]
+        assert other.sent == []
+    finally:
+        alert_manager.disconnect(own)
+        alert_manager.disconnect(other)
+
+
+@pytest.mark.asyncio
+async def test_sequenced_events_are_numbered_in_publish_order():
+    backplane = EventBackplane()
+    manager = TradeEventManager()
+    backplane.subscribe(TRADE_EVENTS, manager.broadcast)
+
+    await backplane.publish_many(TRADE_EVENTS, [_trade_event("AAPL", 1), _trade_event("AAPL", 2)], sequenced=True)
+    await backplane.publish(TRADE_EVENTS, _trade_event("AAPL", 3))
+
+    first = manager.last_seq
+    await backplane.publish_many(TRADE_EVENTS, [_trade_event("AAPL", 4)], sequenced=True)
+    assert manager.last_seq == first + 1
+
+
+@pytest.mark.asyncio
+async def test_streams_resume_from_the_shared_buffer_on_any_worker(monkeypatch):
+    """The replay buffer lives in the transport, so a restarted or different worker can resume."""
+    monkeypatch.setattr(settings, "websocket_replay_buffer_size", 4)
+    broker = FakeBroker()
+    publisher = TradeEventManager(EventBackplane(broker.transport()))
+    for trade_id, ticker in enumerate(("AAPL", "MSFT", "AAPL", "TSLA", "AAPL"), start=1):
+        await publisher.publish(_trade_event(ticker, trade_id))
+    assert sorted(broker.retained[TRADE_EVENTS]) == [2, 3, 4, 5]
+
+    # A worker started after the events were published
+    backplane = EventBackplane(broker.transport())
+    manager = TradeEventManager(backplane)
+    backplane.subscribe(TRADE_EVENTS, manager.broadcast)
+    assert manager.last_seq is None and await manager.latest_seq() == 5
+
+    resumed, stale = FakeWebSocket(), FakeWebSocket()
+    broker.replay_gate = asyncio.Event()
+    connecting = asyncio.create_task(manager.connect(resumed, Subscription.parse("AAPL"), since=2))
+    await _settle()
+    # Delivered while the backlog is being fetched: held, and sent once
+    await publisher.publish(_trade_event("AAPL", 6))
+    await manager.broadcast({**_trade_event("AAPL", 5), "seq": 5})
+    await manager.broadcast(json.loads(broker.retained[TRADE_EVENTS][6]))
+    await manager.broadcast({**_trade_event("AAPL", 7), "seq": 7})
+    broker.replay_gate.set()
+    await connecting
+    await manager.connect(stale, since=1)
+    await _settle()
+
+    assert resumed.sent[0] == {"type": "resumed", "since": 2, "replayed": 3, "latest_seq": 6}
+    assert [m["seq"] for m in resumed.sent[1:]] == [3, 5, 6, 7]
+    assert stale.sent == [{"type": "resync", "since": 1, "latest_seq": 6}]
+    # Nothing is buffered in the worker itself
+    assert manager.last_seq is None
+    await manager.close()
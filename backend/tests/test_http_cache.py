@@ -0,0 +1,160 @@
+"""
+Tests for HTTP conditional caching (ETag / 304).
+"""
+
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import Response
+from starlette.requests import Request
+
+from app.core.http_cache import conditional_get, etag_matches, make_etag
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade import Trade
+from app.schemas.trade import TradeCreate
+from app.services.data_version_service import (
+    TRADES_SCOPE,
+    DataVersionService,
+    company_trades_scope,
+)
+from app.services.trade_service import TradeService
+
+
+def _request(headers=None):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (key.lower().encode(), value.encode())
+                for key, value in (headers or {}).items()
+            ],
+        }
+    )
+
+
+def test_etag_matching():
+    """Weak comparison, lists and wildcards follow RFC 9110."""
+    etag = make_etag("trades", 3, 100)
+    assert etag.startswith('W/"')
+    assert etag == make_etag("trades", 3, 100)
+    assert etag != make_etag("trades", 4, 100)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"other"', etag)
+
+
+def test_conditional_get():
+    """Validators are set on the response; a matching request gets a bare 304."""
+    etag = make_etag("x", 1)
+    changed_at = datetime(2025, 11, 4, 12, 0, 0)
+
+    response = Response()
+    assert conditional_get(_request(), response, etag, changed_at, "private, no-cache") is None
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.headers["last-modified"] == "Tue, 04 Nov 2025 12:00:00 GMT"
+
+    not_modified = conditional_get(_request({"If-None-Match": etag}), Response(), etag)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == etag
+
+    # If-Modified-Since is only used without If-None-Match
+    since = {"If-Modified-Since": "Tue, 04 Nov 2025 12:00:00 GMT"}
+    assert conditional_get(_request(since), Response(), etag, changed_at).status_code == 304
+    assert conditional_get(
+        _request({**since, "If-None-Match": 'W/"stale"'}), Response(), etag, changed_at
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_trade_writes_bump_versions(test_db, monkeypatch):
+    """Trade writes bump the global and per-company trade versions."""
+    monkeypatch.setattr("app.services.trade_service.settings.alerts_enabled", False)
+    company = Company(cik="0000320193", ticker="AAPL", name="Apple Inc.")
+    test_db.add(company)
+    await test_db.commit()
+    insider = Insider(name="Jane Doe", company_id=company.id)
+    test_db.add(insider)
+    await test_db.commit()
+
+    scopes = [TRADES_SCOPE, company_trades_scope(company.id)]
+    before = await DataVersionService.get_versions(test_db, scopes)
+    assert before[TRADES_SCOPE] == (0, None)
+
+    trade = await TradeService.create(
+        test_db,
+        TradeCreate(
+            company_id=company.id,
+            insider_id=insider.id,
+            transaction_date=date(2025, 11, 3),
+            filing_date=date(2025, 11, 4),
+            transaction_type="BUY",
+            shares=Decimal("10"),
+            price_per_share=Decimal("5"),
+        ),
+    )
+    after_create = await DataVersionService.get_versions(test_db, scopes)
+    assert after_create[TRADES_SCOPE][0] == 1
+    assert after_create[company_trades_scope(company.id)][0] == 1
+    assert after_create[TRADES_SCOPE][1] is not None
+
+    await TradeService.delete(test_db, trade)
+    after_delete = await DataVersionService.get_versions(test_db, scopes)
+    assert after_delete[TRADES_SCOPE][0] == 2
+
+    # Trades without a company have no rollup bucket but still change listings;
+    # several flushes in one transaction bump once, on commit
+    for shares in (1, 2):
+        test_db.add(
+            Trade(
+                transaction_date=date(2025, 11, 3),
+                filing_date=date(2025, 11, 4),
+                transaction_type="SELL",
+                shares=Decimal(shares),
+            )
+        )
+        await test_db.flush()
+    await test_db.commit()
+    after_unattributed = await DataVersionService.get_versions(test_db, scopes)
+    assert after_unattributed[TRADES_SCOPE][0] == 3
+    assert after_unattributed[company_trades_scope(company.id)][0] == 2
+
+    # Rolled back writes do not bump
+    test_db.add(
+        Trade(
+            company_id=company.id,
+            transaction_date=date(2025, 11, 3),
+            filing_date=date(2025, 11, 4),
+            transaction_type="SELL",
+            shares=Decimal(3),
+        )
+    )
+    await test_db.flush()
+    await test_db.rollback()
+    assert (await DataVersionService.get_versions(test_db, scopes))[TRADES_SCOPE][0] == 3
+
+
+def test_trade_stats_not_modified(client):
+    """/trades/stats answers a repeat poll with 304 until data changes."""
+    first = client.get("/api/v1/trades/stats")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "max-age" in first.headers["cache-control"]
+
+    repeat = client.get("/api/v1/trades/stats", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+
+    filtered = client.get(
+        "/api/v1/trades/stats", params={"ticker": "AAPL"}, headers={"If-None-Match": etag}
+    )
+    assert filtered.status_code == 200
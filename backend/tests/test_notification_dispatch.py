@@ -0,0 +1,236 @@
+"""
+Tests for the notification outbox and dispatcher.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.database import db_manager
+from app.models.alert import Alert
+from app.models.alert_history import AlertHistory
+from app.models.notification import Notification
+from app.models.notification_outbox import NotificationOutbox
+from app.models.push_subscription import PushSubscription
+from app.services.alert_matching_service import AlertMatchingService
+from app.services.alert_service import AlertService
+from app.services.notification_dispatch_service import (
+    CHANNEL_CONCURRENCY,
+    OUTBOX_FAILED,
+    OUTBOX_PENDING,
+    OUTBOX_SENT,
+    NotificationDispatcher,
+    notification_dispatcher,
+)
+from app.services.notification_service import NotificationService
+
+
+async def _seed(factory, channels):
+    company = await factory.company()
+    insider = await factory.insider(company, "Tim Cook", title="CEO", is_officer=True)
+    trade = factory.trade(
+        company,
+        insider,
+        price=200,
+        transaction_date=date(2025, 11, 1),
+        filing_date=date(2025, 11, 3),
+    )
+    alert = Alert(
+        user_id=1,
+        name="AAPL buys",
+        alert_type="company_watch",
+        ticker="AAPL",
+        notification_channels=channels,
+        webhook_url="https://hooks.example.com/x",
+        is_active=True,
+    )
+    factory.db.add(alert)
+    await factory.db.commit()
+    return trade, alert
+
+
+async def _outbox(test_db, **filters):
+    result = await test_db.execute(
+        select(NotificationOutbox)
+        .filter_by(**filters)
+        .order_by(NotificationOutbox.id)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_fired_alert_is_queued_not_sent(test_db, factory, monkeypatch):
+    """Matching stages outbox rows and the in-app notification; nothing is sent inline."""
+    AlertMatchingService.invalidate()
+    trade, alert = await _seed(factory, ["webhook", "push", "email"])
+    submitted = []
+    monkeypatch.setattr(notification_dispatcher, "submit", lambda rows: submitted.extend(rows))
+
+    async def _fail(*args, **kwargs):
+        raise AssertionError("sent on the write path")
+
+    monkeypatch.setattr(NotificationService, "send_webhook_notification", _fail)
+
+    assert await AlertService(test_db).check_trades_against_alerts([trade]) == 1
+    rows = await _outbox(test_db)
+    # email has no address configured, so it is skipped as before
+    assert [row.channel for row in rows] == ["multi_channel", "webhook", "push"]
+    assert all(row.status == OUTBOX_PENDING and row.alert_id == alert.id for row in rows)
+    assert sorted(submitted) == [(row.id, row.channel) for row in rows]
+    notifications = (await test_db.execute(select(Notification))).scalars().all()
+    assert len(notifications) == 1
+
+    # The pair is now in cooldown
+    assert await AlertService(test_db).check_trades_against_alerts([trade]) == 0
+    AlertMatchingService.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_delivery_retries_then_succeeds(test_db, factory, monkeypatch):
+    """Failures back off with a growing delay; each attempt is logged to alert_history."""
+    trade, alert = await _seed(factory, ["webhook"])
+    rows = NotificationDispatcher.stage(test_db, alert, trade)
+    await test_db.commit()
+    webhook = next(row for row in rows if row.channel == "webhook")
+
+    outcomes = [(False, "HTTP 502"), (True, None)]
+
+    async def _send(self, *args):
+        return outcomes.pop(0)
+
+    monkeypatch.setattr(NotificationService, "send_webhook_notification", _send)
+    dispatcher = NotificationDispatcher()
+
+    assert await dispatcher.deliver(test_db, webhook.id) == OUTBOX_PENDING
+    [row] = await _outbox(test_db, id=webhook.id)
+    assert row.attempts == 1 and row.last_error == "HTTP 502"
+    assert row.next_attempt_at > datetime.utcnow()
+    # Not due yet: not claimable
+    assert await dispatcher.deliver(test_db, webhook.id) is None
+
+    row.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    await test_db.commit()
+    assert await dispatcher.deliver(test_db, webhook.id) == OUTBOX_SENT
+    assert await dispatcher.deliver(test_db, webhook.id) is None
+
+    history = (await test_db.execute(select(AlertHistory).order_by(AlertHistory.id))).scalars().all()
+    assert [(h.notification_channel, h.notification_status) for h in history] == [
+        ("webhook", "retrying"),
+        ("webhook", "sent"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_push_fans_out_per_subscription(test_db, factory, monkeypatch):
+    """A push row becomes one row per device; an expired device fails without retries."""
+    trade, alert = await _seed(factory, ["push"])
+    live = PushSubscription(endpoint="https://push.example.com/1", p256dh_key="k", auth_key="a")
+    gone = PushSubscription(endpoint="https://push.example.com/2", p256dh_key="k", auth_key="a")
+    test_db.add_all([live, gone])
+    rows = NotificationDispatcher.stage(test_db, alert, trade)
+    await test_db.commit()
+    push = next(row for row in rows if row.channel == "push")
+
+    async def _send(self, subscription, *args):
+        return (True, None) if subscription.id == live.id else (False, "HTTP 410 Gone")
+
+    monkeypatch.setattr(NotificationService, "send_push_notification", _send)
+    dispatcher = NotificationDispatcher()
+
+    assert await dispatcher.deliver(test_db, push.id) == OUTBOX_SENT
+    devices = [row for row in await _outbox(test_db, channel="push") if row.subscription_id]
+    assert sorted(row.subscription_id for row in devices) == sorted([live.id, gone.id])
+
+    statuses = {row.subscription_id: await dispatcher.deliver(test_db, row.id) for row in devices}
+    assert statuses == {live.id: OUTBOX_SENT, gone.id: OUTBOX_FAILED}
+    await test_db.refresh(gone)
+    assert gone.is_active is False
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_drains_committed_rows(test_db, factory, monkeypatch):
+    """Committed rows reach the workers; the poller re-finds rows left pending."""
+    trade, alert = await _seed(factory, ["webhook"])
+
+    @asynccontextmanager
+    async def _session(*args, **kwargs):
+        yield test_db
+
+    monkeypatch.setattr(db_manager, "get_session", _session)
+    delivered = []
+
+    async def _deliver(self, db, outbox_id):
+        delivered.append(outbox_id)
+        return OUTBOX_SENT
+
+    async def _no_poll(self):
+        return 0
+
+    monkeypatch.setattr(NotificationDispatcher, "deliver", _deliver)
+    monkeypatch.setattr(NotificationDispatcher, "enqueue_due", _no_poll)
+
+    await notification_dispatcher.start(workers=2)
+    try:
+        rows = NotificationDispatcher.stage(test_db, alert, trade)
+        await test_db.commit()
+        await asyncio.wait_for(notification_dispatcher.join(), timeout=5)
+        assert sorted(delivered) == [row.id for row in rows]
+    finally:
+        await notification_dispatcher.stop()
+
+    # Nothing was really delivered, so after a restart the poller finds both rows again
+    monkeypatch.undo()
+    monkeypatch.setattr(db_manager, "get_session", _session)
+    assert await notification_dispatcher.enqueue_due() == len(rows)
+
+
+@pytest.mark.asyncio
+async def test_channels_have_their_own_bounded_pools(monkeypatch):
+    """A stalled channel stays within its limit and does not hold up the others."""
+    release = asyncio.Event()
+    active = {"webhook": 0, "email": 0}
+    peak = dict(active)
+    delivered = []
+
+    async def _deliver(self, db, outbox_id):
+        # Rows are only claimed here, so nothing waits for a slot while leased
+        channel = "webhook" if outbox_id < 100 else "email"
+        active[channel] += 1
+        peak[channel] = max(peak[channel], active[channel])
+        if channel == "webhook":
+            await release.wait()
+        delivered.append(outbox_id)
+        active[channel] -= 1
+        return OUTBOX_SENT
+
+    async def _no_poll(self):
+        return 0
+
+    @asynccontextmanager
+    async def _session(*args, **kwargs):
+        yield None
+
+    monkeypatch.setattr(NotificationDispatcher, "deliver", _deliver)
+    monkeypatch.setattr(NotificationDispatcher, "enqueue_due", _no_poll)
+    monkeypatch.setattr(db_manager, "get_session", _session)
+
+    dispatcher = NotificationDispatcher()
+    await dispatcher.start(workers=3)
+    try:
+        dispatcher.submit([(outbox_id, "webhook") for outbox_id in range(1, 11)])
+        dispatcher.submit([(100, "email"), (101, "email")])
+        for _ in range(20):
+            await asyncio.sleep(0)
+        assert sorted(delivered) == [100, 101]
+        assert peak["webhook"] == min(CHANNEL_CONCURRENCY["webhook"], 3)
+
+        release.set()
+        await asyncio.wait_for(dispatcher.join(), timeout=5)
+        assert len(delivered) == 12
+        assert peak["webhook"] == 3
+    finally:
+        await dispatcher.stop()
@@ -0,0 +1,167 @@
+"""
+Tests for keyset (cursor) pagination of trade listings.
+"""
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.schemas.common import PaginatedResponse
+from app.schemas.trade import TradeFilter
+from app.services.trade_service import TradeService
+from app.utils.pagination import (
+    InvalidCursorError,
+    clear_count_cache,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class TestCursorEncoding:
+    """Test opaque cursor roundtrip."""
+
+    def test_roundtrip(self):
+        cursor = encode_cursor("filing_date", "desc", date(2025, 11, 5), 42, 3)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == {
+            "s": "filing_date",
+            "o": "desc",
+            "v": "2025-11-05",
+            "id": 42,
+            "p": 3,
+        }
+
+    def test_garbage_cursor_rejected(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+
+    def test_paginated_response_without_total(self):
+        response = PaginatedResponse.create(
+            items=[], total=None, page=2, limit=20, next_cursor="abc"
+        )
+        assert response.total is None
+        assert response.pages is None
+        assert response.has_next is True
+        assert response.has_prev is True
+
+
+async def _seed_trades(factory, count: int):
+    company = await factory.company()
+    insider = await factory.insider(company)
+
+    base = date(2025, 11, 1)
+    for i in range(count):
+        # Pairs share a filing date to exercise the id tiebreak
+        day = base + timedelta(days=i // 2)
+        factory.trade(
+            company,
+            insider,
+            transaction_date=day,
+            filing_date=day,
+            transaction_type="BUY" if i % 3 else "SELL",
+            total_value=Decimal("1000") + i,
+        )
+    await factory.db.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order", ["desc", "asc"])
+async def test_cursor_pages_match_offset_pages(test_db, factory, order):
+    """Walking next_cursor returns the same rows as OFFSET paging."""
+    clear_count_cache()
+    await _seed_trades(factory, 11)
+    filters = TradeFilter()
+
+    offset_ids = []
+    for skip in range(0, 11, 4):
+        trades, total = await TradeService.get_all(
+            test_db, skip=skip, limit=4, filters=filters, order=order
+        )
+        assert total == 11
+        offset_ids.extend(t.id for t in trades)
+
+    cursor_ids = []
+    cursor = None
+    pages = []
+    while True:
+        page = await TradeService.get_page(
+            test_db, limit=4, filters=filters, order=order, cursor=cursor
+        )
+        cursor_ids.extend(t.id for t in page.items)
+        pages.append(page.page)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert cursor_ids == offset_ids
+    assert len(set(cursor_ids)) == 11
+    assert pages == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order", ["desc", "asc"])
+async def test_cursor_pages_include_null_sort_values(test_db, factory, order):
+    """Rows with a NULL sort value come last and are not skipped by the seek."""
+    await _seed_trades(factory, 5)
+    trades, _ = await TradeService.get_all(test_db, limit=10, filters=TradeFilter(), order=order)
+    for trade in trades:
+        # Values out of id order; even ids stay NULL
+        trade.shares_owned_after = Decimal(10 - trade.id) if trade.id % 2 else None
+    await test_db.commit()
+
+    cursor_ids = []
+    cursor = None
+    while True:
+        page = await TradeService.get_page(
+            test_db, limit=2, filters=TradeFilter(), sort_by="shares_owned_after", order=order,
+            cursor=cursor, count_mode="none",
+        )
+        cursor_ids.extend(t.id for t in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    valued = sorted((t for t in trades if t.id % 2), key=lambda t: t.shares_owned_after, reverse=order == "desc")
+    nulls = sorted((t.id for t in trades if t.id % 2 == 0), reverse=order == "desc")
+    assert cursor_ids == [t.id for t in valued] + nulls
+
+
+@pytest.mark.asyncio
+async def test_count_modes(test_db, factory):
+    """Totals can be skipped or served from the short-lived count cache."""
+    clear_count_cache()
+    await _seed_trades(factory, 5)
+    filters = TradeFilter(transaction_type="BUY")
+
+    page = await TradeService.get_page(test_db, limit=2, filters=filters, count_mode="none")
+    assert page.total is None
+    assert page.next_cursor is not None
+
+    page = await TradeService.get_page(test_db, limit=2, filters=filters, count_mode="cached")
+    assert page.total == 3
+
+    # A new matching trade is not reflected until the cached count expires
+    day = date(2025, 12, 1)
+    factory.trade(shares=1, company_id=page.items[0].company_id, transaction_date=day, filing_date=day)
+    await test_db.commit()
+    page = await TradeService.get_page(test_db, limit=2, filters=filters, count_mode="cached")
+    assert page.total == 3
+    page = await TradeService.get_page(test_db, limit=2, filters=filters, count_mode="exact")
+    assert page.total == 4
+
+    # Planner estimates are Postgres-only; SQLite falls back to the cached count
+    page = await TradeService.get_page(test_db, limit=2, filters=filters, count_mode="estimated")
+    assert page.total == 3 and page.total_is_estimate is False
+    clear_count_cache()
+
+
+@pytest.mark.asyncio
+async def test_cursor_for_other_sort_is_rejected(test_db, factory):
+    """A cursor cannot be reused with a different sort order."""
+    await _seed_trades(factory, 3)
+    page = await TradeService.get_page(test_db, limit=1, filters=TradeFilter(), count_mode="none")
+
+    with pytest.raises(InvalidCursorError):
+        await TradeService.get_page(
+            test_db, limit=1, filters=TradeFilter(), order="asc", cursor=page.next_cursor
+        )
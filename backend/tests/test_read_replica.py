@@ -0,0 +1,103 @@
+"""
+Tests for read-replica routing in DatabaseManager.
+"""
+
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from starlette.requests import Request
+
+from app.database import DatabaseManager, PRIMARY_STICKY_COOKIE, _Replica
+
+
+class _FakeSession:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+def _manager(monkeypatch, replica_behaviour):
+    manager = DatabaseManager()
+    manager._replicas = [_Replica("postgresql+asyncpg://user:pw@replica-1:5432/db")]
+
+    @asynccontextmanager
+    async def _primary_session(*args, **kwargs):
+        yield _FakeSession("primary")
+
+    async def _open(replica, connection_timeout):
+        return replica_behaviour(replica)
+
+    monkeypatch.setattr(manager, "get_session", _primary_session)
+    monkeypatch.setattr(manager, "_open_replica_session", _open)
+    return manager
+
+
+async def _route(manager, **kwargs):
+    async with manager.get_read_session(**kwargs) as session:
+        return session.name
+
+
+def _request(headers=None, cookies=None):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if cookies:
+        raw.append((b"cookie", "; ".join(f"{k}={v}" for k, v in cookies.items()).encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.mark.asyncio
+async def test_reads_route_to_replica_and_fall_back(monkeypatch):
+    """Healthy replicas serve reads; failures and read-your-writes use the primary."""
+    manager = _manager(monkeypatch, lambda replica: _FakeSession("replica"))
+    assert await _route(manager) == "replica"
+    assert await _route(manager, prefer_primary=True) == "primary"
+
+    def _fail(replica):
+        raise OSError("connection refused")
+
+    failing = _manager(monkeypatch, _fail)
+    assert await _route(failing) == "primary"
+    # The failed replica is skipped until the retry window passes
+    assert failing._pick_replica() is None
+    failing._replicas[0].down_until = time.time() - 1
+    assert failing._pick_replica() is failing._replicas[0]
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_is_skipped(monkeypatch):
+    """A replica over the lag limit is skipped until its next lag check."""
+    def _lagging(replica):
+        replica.lag_seconds = 120.0
+        replica.lag_checked_at = time.time()
+        return None
+
+    manager = _manager(monkeypatch, _lagging)
+    assert await _route(manager) == "primary"
+    replica = manager._replicas[0]
+    assert not replica.is_eligible(time.time())
+    # Once a new measurement is due the replica is tried again
+    replica.lag_checked_at = time.time() - 60
+    assert replica.is_eligible(time.time())
+    assert manager.get_replica_status()[0]["replica"] == "replica-1"
+
+
+def test_read_your_writes_window():
+    """A write keeps the same client (token or cookie) on the primary."""
+    manager = DatabaseManager()
+    auth = {"Authorization": "Bearer abc"}
+    assert not manager.should_read_primary(_request(auth))
+
+    until = manager.mark_write(_request(auth))
+    assert manager.should_read_primary(_request(auth))
+    assert not manager.should_read_primary(_request({"Authorization": "Bearer other"}))
+
+    assert manager.should_read_primary(_request(cookies={PRIMARY_STICKY_COOKIE: f"{until:.3f}"}))
+    assert not manager.should_read_primary(
+        _request(cookies={PRIMARY_STICKY_COOKIE: f"{time.time() - 1:.3f}"})
+    )
@@ -0,0 +1,128 @@
+"""
+Tests for ranked name search.
+"""
+
+import pytest
+
+from app.models.company import Company
+from app.models.insider import Insider
+from app.services.company_service import CompanyService
+from app.services.insider_service import InsiderService
+from app.services.search_service import (
+    TIER_EXACT,
+    TIER_FUZZY,
+    TIER_PREFIX,
+    TIER_SUBSTRING,
+    TIER_WORD_PREFIX,
+    SearchService,
+    TrigramIndex,
+    _memory_indexes,
+)
+
+
+def test_trigram_index_ranks_by_match_tier():
+    """Exact beats prefix beats word prefix beats substring beats fuzzy."""
+    index = TrigramIndex(
+        [
+            (1, ["Timothy Apple"]),
+            (2, ["Tim"]),
+            (3, ["Cook Tim"]),
+            (4, ["Maxim Tims"]),
+            (5, ["Jane Doe"]),
+        ]
+    )
+    results = index.search("tim", limit=10)
+    assert [(doc_id, tier) for doc_id, tier, _ in results] == [
+        (2, TIER_EXACT),
+        (1, TIER_PREFIX),
+        (3, TIER_WORD_PREFIX),
+        (4, TIER_WORD_PREFIX),
+    ]
+    assert index.search("xim", limit=10)[0][:2] == (4, TIER_SUBSTRING)
+
+    # Paging is over the ranked list
+    assert [doc_id for doc_id, _, _ in index.search("tim", limit=2, offset=1)] == [1, 3]
+
+
+def test_trigram_index_fuzzy_and_short_queries():
+    """Typos match fuzzily; one- and two-letter queries only match prefixes."""
+    index = TrigramIndex(
+        [(1, ["Jonathan Smith"]), (2, ["Ann Smyth"]), (3, ["Dana Lee"])]
+    )
+    assert [(doc_id, tier) for doc_id, tier, _ in index.search("jonathon", limit=10)] == [
+        (1, TIER_FUZZY)
+    ]
+
+    assert [doc_id for doc_id, _, _ in index.search("an", limit=10)] == [2]
+    assert index.search("na", limit=10) == []
+
+    # Any indexed field can match; None fields are skipped
+    multi = TrigramIndex([(1, ["AAPL", "Apple Inc."]), (2, ["MSFT", None])])
+    assert [doc_id for doc_id, _, _ in multi.search("apple", limit=10)] == [1]
+    assert [doc_id for doc_id, _, _ in multi.search("ms", limit=10)] == [2]
+
+    # Re-adding replaces a document; removed documents stop matching
+    multi.add(1, ["AAPL", "Apple Computer"])
+    multi.remove(2)
+    assert [doc_id for doc_id, _, _ in multi.search("computer", limit=10)] == [1]
+    assert multi.search("inc", limit=10) == [] and multi.search("ms", limit=10) == []
+    assert len(multi) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_services_limit_first(test_db):
+    """Service searches rank results and report a lower-bound total when more exist."""
+    SearchService.invalidate()
+    companies = [
+        Company(cik=f"000000000{i}", ticker=ticker, name=name)
+        for i, (ticker, name) in enumerate(
+            [
+                ("AAPL", "Apple Inc."),
+                ("APLE", "Apple Hospitality REIT"),
+                ("PINE", "Pineapple Holdings"),
+                ("MSFT", "Microsoft Corp."),
+            ]
+        )
+    ]
+    test_db.add_all(companies)
+    await test_db.commit()
+
+    found, total, is_estimate = await CompanyService.search(test_db, "apple", limit=2)
+    assert [c.ticker for c in found] == ["AAPL", "APLE"]
+    assert total == 3 and is_estimate
+
+    found, total, is_estimate = await CompanyService.search(
+        test_db, "apple", skip=2, limit=2
+    )
+    assert [c.ticker for c in found] == ["PINE"]
+    assert total == 3 and not is_estimate
+
+    # Writes invalidate the in-process index
+    test_db.add(Insider(name="Tim Cook", company_id=companies[0].id))
+    await test_db.commit()
+    found, total, is_estimate = await InsiderService.search(test_db, "cook")
+    assert [i.name for i in found] == ["Tim Cook"]
+    assert found[0].company.ticker == "AAPL"
+
+    test_db.add(Insider(name="Timothy Cooke", company_id=companies[0].id))
+    await test_db.commit()
+    found, total, _ = await InsiderService.search(test_db, "tim")
+    assert [i.name for i in found] == ["Tim Cook", "Timothy Cooke"]
+    assert total == 2
+
+    # Writes are applied to the existing index on commit, without a rebuild
+    index = _memory_indexes["insiders"]
+    cooke = found[1]
+    cooke.name = "Timothy Baker"
+    await test_db.commit()
+    await test_db.delete(found[0])
+    await test_db.flush()
+    await test_db.rollback()
+    found, _, _ = await InsiderService.search(test_db, "tim")
+    assert [i.name for i in found] == ["Tim Cook", "Timothy Baker"]
+    await test_db.delete(found[0])
+    await test_db.commit()
+    found, _, _ = await InsiderService.search(test_db, "tim")
+    assert [i.name for i in found] == ["Timothy Baker"]
+    assert _memory_indexes["insiders"] is index
+    SearchService.invalidate()
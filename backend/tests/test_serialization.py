@@ -0,0 +1,117 @@
+"""
+Tests for the fast serialization path.
+"""
+
+import json
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import PurePosixPath
+from typing import List
+
+import msgpack
+from fastapi import Response
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+from app.core.http_cache import conditional_get, make_etag
+from app.core.serialization import MSGPACK_MEDIA_TYPE, dumps, render_bulk
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade import Trade
+from app.schemas.trade import TradeListItem
+from app.services.trade_listing_service import TradeListingService
+
+
+def _request(headers=None):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (key.lower().encode(), value.encode())
+                for key, value in (headers or {}).items()
+            ],
+        }
+    )
+
+
+def test_dumps_matches_pydantic_encoding():
+    """Decimals stay exact strings; datetimes are ISO 8601 with Z for UTC."""
+    body = json.loads(
+        dumps(
+            {
+                "value": Decimal("25.10"),
+                "day": date(2025, 11, 3),
+                "at": datetime(2025, 11, 3, 12, 0, tzinfo=timezone.utc),
+                "naive": datetime(2025, 11, 3, 12, 0, 0, 5),
+            }
+        )
+    )
+    assert body == {
+        "value": "25.10",
+        "day": "2025-11-03",
+        "at": "2025-11-03T12:00:00Z",
+        "naive": "2025-11-03T12:00:00.000005",
+    }
+
+    # Unknown types raise, unless the caller asks for the lenient str() fallback
+    with pytest.raises(TypeError):
+        dumps({"path": PurePosixPath("a/b")})
+    assert json.loads(dumps({"path": PurePosixPath("a/b")}, lenient=True)) == {"path": "a/b"}
+
+
+@pytest.mark.asyncio
+async def test_listing_fast_path_matches_response_model(test_db):
+    """Row tuple dicts serialize to the same document as the response_model path."""
+    company = Company(cik="0000320193", ticker="AAPL", name="Apple Inc.")
+    test_db.add(company)
+    await test_db.commit()
+    insider = Insider(name="Jane Doe", title="CEO", is_officer=True, company_id=company.id)
+    test_db.add(insider)
+    await test_db.commit()
+    test_db.add(
+        Trade(
+            company_id=company.id,
+            insider_id=insider.id,
+            transaction_date=date(2025, 11, 1),
+            filing_date=date(2025, 11, 3),
+            transaction_type="BUY",
+            shares=Decimal("10"),
+            price_per_share=Decimal("2.50"),
+            total_value=Decimal("25.00"),
+        )
+    )
+    await test_db.commit()
+
+    page = await TradeListingService.get_page(test_db, count_mode="none")
+    items = TradeListingService.to_items(page.items)
+
+    adapter = TypeAdapter(List[TradeListItem])
+    expected = adapter.dump_json(adapter.validate_python(items))
+    assert json.loads(dumps(items)) == json.loads(expected)
+
+
+def test_render_bulk_negotiates_msgpack_and_keeps_headers():
+    """Accept picks the encoding; validators set on the route's Response carry over."""
+    content = [{"id": 1, "total_value": Decimal("25.00"), "filing_date": date(2025, 11, 3)}]
+    response = Response()
+    assert conditional_get(_request(), response, make_etag("x", 1)) is None
+
+    rendered = render_bulk(_request(), content, response)
+    assert rendered.media_type == "application/json"
+    assert json.loads(rendered.body) == [
+        {"id": 1, "total_value": "25.00", "filing_date": "2025-11-03"}
+    ]
+    assert rendered.headers["etag"] == make_etag("x", 1)
+    assert rendered.headers["vary"] == "Authorization, Accept"
+
+    rendered = render_bulk(
+        _request({"Accept": "application/msgpack, application/json;q=0.5"}), content
+    )
+    assert rendered.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert rendered.headers["vary"] == "Accept"
+    assert msgpack.unpackb(rendered.body) == [
+        {"id": 1, "total_value": "25.00", "filing_date": "2025-11-03"}
+    ]
@@ -0,0 +1,104 @@
+"""
+Tests for the Supabase api_cache service: executor offload, batching and the in-process cache.
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.supabase_cache_service import SupabaseCacheService
+
+
+class FakeQuery:
+    """Records a PostgREST query chain; execute() answers from the fake table."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return record
+
+    def execute(self):
+        self.client.threads.add(threading.get_ident())
+        self.client.requests.append(self.calls)
+        method = self.calls[0][0]
+        if method == "select":
+            keys = next(args[1] for name, args, _ in self.calls if name == "in_")
+            return type("Response", (), {"data": [self.client.rows[key] for key in keys if key in self.client.rows]})
+        if method == "upsert":
+            for row in self.calls[0][1][0]:
+                self.client.rows[row["cache_key"]] = row
+        if method == "delete":
+            return type("Response", (), {"data": [], "count": 3})
+        return type("Response", (), {"data": []})
+
+
+class FakeClient:
+    def __init__(self):
+        self.rows = {}
+        self.requests = []
+        self.threads = set()
+
+    def table(self, name):
+        assert name == "api_cache"
+        return FakeQuery(self)
+
+
+@pytest.fixture
+def cache():
+    cache = SupabaseCacheService()
+    cache.client = FakeClient()
+    cache.enabled = True
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_batched_reads_and_writes_run_off_the_event_loop(cache):
+    client = cache.client
+    expires = (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat()
+    client.rows["news:general"] = {"cache_key": "news:general", "data": [{"id": 1}], "expires_at": expires}
+
+    assert await cache.set_many({"finnhub:quote:AAPL": {"c": 190.5}, "finnhub:quote:MSFT": {"c": 410.0}})
+    cache.clear_local()
+
+    found = await cache.get_many(["news:general", "finnhub:quote:AAPL", "finnhub:quote:MSFT", "news:crypto"])
+    assert found == {"news:general": [{"id": 1}], "finnhub:quote:AAPL": {"c": 190.5}, "finnhub:quote:MSFT": {"c": 410.0}}
+    # One upsert, one select
+    assert [request[0][0] for request in client.requests] == ["upsert", "select"]
+    assert threading.get_ident() not in client.threads
+
+    # Hits are served in-process, as copies
+    found["news:general"].append({"id": 2})
+    assert await cache.get("news:general") == [{"id": 1}]
+    assert len(client.requests) == 2
+
+    assert await cache.clear_expired() == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(cache):
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return [{"headline": "Markets rally"}]
+
+    waiting = [
+        asyncio.create_task(cache.get_or_set("news:company:AAPL", fetch, ttl_minutes=15, cache_type="news"))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await asyncio.gather(*waiting) == [[{"headline": "Markets rally"}]] * 5
+    assert calls == 1
+    assert cache.client.rows["news:company:AAPL"]["cache_type"] == "news"
@@ -0,0 +1,174 @@
+"""
+Tests for trade stream broadcasting: per-connection queues and subscriptions.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from starlette.websockets import WebSocketState
+
+from app.config import settings
+from app.services.trade_event_manager import Subscription, TradeEventManager
+
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+        self.close_code = None
+        # Sends wait until released, to simulate a slow client
+        self.released = asyncio.Event()
+        if not blocked:
+            self.released.set()
+
+    async def send_text(self, payload: str) -> None:
+        await self.released.wait()
+        self.sent.append(json.loads(payload))
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+
+def _trade_event(ticker: str, transaction_type: str = "BUY", value: str = "1000.00", trade_id: int = 1) -> dict:
+    return {
+        "type": "trade_created",
+        "trade": {
+            "id": trade_id,
+            "transaction_type": transaction_type,
+            "total_value": value,
+            "company": {"ticker": ticker},
+        },
+    }
+
+
+async def _drain() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = TradeEventManager()
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_filters_by_subscription(manager):
+    everything, apple, large_sells = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await manager.connect(everything)
+    await manager.connect(apple, Subscription.parse("aapl, msft"))
+    await manager.connect(large_sells, Subscription.parse(None, "sell", "50000"))
+
+    assert await manager.broadcast(_trade_event("AAPL", "BUY", "1000.00", 1)) == 2
+    assert await manager.broadcast(_trade_event("TSLA", "SELL", "99000.00", 2)) == 2
+    assert await manager.broadcast({"type": "trade_deleted", "trade_id": 3}) == 3
+    await _drain()
+
+    assert [m.get("trade", {}).get("id") for m in everything.sent] == [1, 2, None]
+    assert [m.get("trade", {}).get("id") for m in apple.sent] == [1, None]
+    assert [m.get("trade", {}).get("id") for m in large_sells.sent] == [2, None]
+
+    manager.subscribe(apple, Subscription.parse("TSLA"))
+    assert await manager.broadcast(_trade_event("TSLA", trade_id=4)) == 2
+    assert await manager.broadcast(_trade_event("AAPL", trade_id=5)) == 1
+
+    with pytest.raises(ValueError):
+        Subscription.parse(None, "HOLD")
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_unknown_values_as_strings(manager):
+    """A value the serializer does not know must not abort the broadcast."""
+    websocket = FakeWebSocket()
+    await manager.connect(websocket)
+    event = _trade_event("AAPL")
+    event["trade"]["source"] = Path("filings/0001.xml")
+
+    assert await manager.broadcast({**event, "seq": 1}) == 1
+    await _drain()
+    assert websocket.sent[-1]["trade"]["source"] == "filings/0001.xml"
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_drops_oldest_without_delaying_others(manager, monkeypatch):
+    monkeypatch.setattr(settings, "websocket_send_queue_size", 2)
+    monkeypatch.setattr(settings, "websocket_slow_consumer_policy", "drop_oldest")
+    slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+    await manager.connect(slow)
+    await manager.connect(fast)
+
+    for trade_id in range(1, 6):
+        await manager.broadcast(_trade_event("AAPL", trade_id=trade_id))
+        await _drain()
+
+    # The fast client got everything while the slow one was stuck on its first send
+    assert [m["trade"]["id"] for m in fast.sent] == [1, 2, 3, 4, 5]
+    assert slow.sent == []
+
+    slow.released.set()
+    await _drain()
+    # Message 1 was in flight; 2 and 3 were dropped for 4 and 5
+    assert [m["trade"]["id"] for m in slow.sent] == [1, 4, 5]
+    assert len(manager) == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_disconnect_policy(manager, monkeypatch):
+    monkeypatch.setattr(settings, "websocket_send_queue_size", 1)
+    monkeypatch.setattr(settings, "websocket_slow_consumer_policy", "disconnect")
+    slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+    await manager.connect(slow)
+    await manager.connect(fast)
+
+    for trade_id in range(1, 4):
+        await manager.broadcast(_trade_event("AAPL", trade_id=trade_id))
+        await _drain()
+
+    assert len(manager) == 1
+    assert slow.close_code == 1013
+    assert [m["trade"]["id"] for m in fast.sent] == [1, 2, 3]
+    # Disconnecting an already dropped connection is a no-op
+    await manager.disconnect(slow)
+    await manager.close()
+    assert fast.close_code == 1001
+
+
+@pytest.mark.asyncio
+async def test_reconnect_with_since_replays_missed_events(manager):
+    first = FakeWebSocket()
+    await manager.connect(first)
+    for seq, ticker in ((101, "AAPL"), (102, "MSFT"), (103, "AAPL"), (104, "TSLA")):
+        await manager.broadcast({**_trade_event(ticker, trade_id=seq), "seq": seq})
+    await _drain()
+    assert [m["seq"] for m in first.sent] == [101, 102, 103, 104]
+    await manager.disconnect(first)
+
+    # Missed 103 and 104 while away, and only wants AAPL now
+    again = FakeWebSocket()
+    await manager.connect(again, Subscription.parse("AAPL"), since=102)
+    await manager.broadcast({**_trade_event("AAPL", trade_id=105), "seq": 105})
+    await _drain()
+
+    assert again.sent[0] == {"type": "resumed", "since": 102, "replayed": 1, "latest_seq": 104}
+    assert [m["seq"] for m in again.sent[1:]] == [103, 105]
+    assert manager.last_seq == 105
+
+
+@pytest.mark.asyncio
+async def test_resume_beyond_the_buffer_asks_for_resync(manager, monkeypatch):
+    monkeypatch.setattr(settings, "websocket_replay_buffer_size", 3)
+    # Out of order arrivals (concurrent publishers) are kept sorted
+    for seq in (1, 2, 4, 3, 5):
+        await manager.broadcast({**_trade_event("AAPL", trade_id=seq), "seq": seq})
+
+    stale, recent = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(stale, since=1)
+    await manager.connect(recent, since=2)
+    await _drain()
+
+    assert stale.sent == [{"type": "resync", "since": 1, "latest_seq": 5}]
+    assert [m.get("seq") for m in recent.sent] == [None, 3, 4, 5]
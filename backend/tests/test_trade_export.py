@@ -0,0 +1,99 @@
+"""
+Tests for streaming trade exports.
+"""
+
+import csv
+import io
+import json
+import pytest
+from datetime import date
+
+from app.schemas.trade import TradeFilter
+from app.services.trade_export_service import EXPORT_COLUMNS, TradeExportService
+
+
+async def _seed(factory, count: int = 5):
+    apple, msft = await factory.companies("AAPL", "MSFT")
+    insider = await factory.insider(apple, title="CEO")
+
+    for i in range(count):
+        factory.trade(
+            apple if i % 2 == 0 else msft,
+            insider,
+            shares=10,
+            price="2.50",
+            transaction_date=date(2025, 11, 1 + i),
+            filing_date=date(2025, 11, 3 + i),
+        )
+    await factory.db.commit()
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_stream_batches_respects_batch_size_and_filters(test_db, factory):
+    """Rows arrive in fixed-size batches, ordered by id, with /trades filters."""
+    await _seed(factory)
+
+    sizes = []
+    ids = []
+    async for rows in TradeExportService.stream_batches(test_db, TradeFilter(), batch_size=2):
+        sizes.append(len(rows))
+        ids.extend(row[0] for row in rows)
+    assert sizes == [2, 2, 1]
+    assert ids == sorted(ids)
+
+    rows = []
+    async for batch in TradeExportService.stream_batches(test_db, TradeFilter(ticker="aapl")):
+        rows.extend(batch)
+    assert len(rows) == 3
+    assert {row[1] for row in rows} == {"AAPL"}
+
+
+@pytest.mark.asyncio
+async def test_ndjson_and_csv_encoding(test_db, factory):
+    """NDJSON emits one object per trade; CSV has a header and one row per trade."""
+    await _seed(factory, count=3)
+
+    body = await _collect(
+        TradeExportService.encode(
+            "ndjson", TradeExportService.stream_batches(test_db, batch_size=2)
+        )
+    )
+    records = [json.loads(line) for line in body.decode().splitlines()]
+    assert len(records) == 3
+    assert records[0]["ticker"] == "AAPL"
+    assert records[0]["insider_role"] == "CEO"
+    assert records[0]["total_value"] == 25.0
+    assert records[0]["filing_date"] == "2025-11-03"
+
+    body = await _collect(
+        TradeExportService.encode(
+            "csv", TradeExportService.stream_batches(test_db, batch_size=2)
+        )
+    )
+    reader = list(csv.reader(io.StringIO(body.decode())))
+    assert reader[0] == EXPORT_COLUMNS
+    assert len(reader) == 4
+    assert reader[2][1] == "MSFT"
+
+
+@pytest.mark.asyncio
+async def test_parquet_encoding(test_db, factory):
+    """Parquet output is a valid file with one row group per batch."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    await _seed(factory, count=5)
+
+    body = await _collect(
+        TradeExportService.encode(
+            "parquet", TradeExportService.stream_batches(test_db, batch_size=2)
+        )
+    )
+    parquet_file = pq.ParquetFile(io.BytesIO(body))
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.num_rows == 5
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.column("filing_date").to_pylist()[0] == date(2025, 11, 3)
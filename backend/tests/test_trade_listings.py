@@ -0,0 +1,113 @@
+"""
+Tests for the denormalized trade listing read model.
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event, select
+
+from app.models.trade_listing import TradeListing
+from app.schemas.trade import TradeFilter, TradeListItem, TradeWithDetails
+from app.services.trade_listing_service import TradeListingService
+from app.services.trade_service import TradeService
+
+
+async def _listing_rows(test_db):
+    result = await test_db.execute(
+        select(TradeListing)
+        .order_by(TradeListing.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+
+async def _seed(factory):
+    apple, msft = await factory.companies("AAPL", "MSFT")
+    jane = await factory.insider(apple, title="CEO", is_officer=True)
+    john = await factory.insider(msft, "John Roe", is_director=True)
+
+    trades = [
+        factory.trade(
+            company,
+            insider,
+            price=2000,
+            transaction_date=date(2025, 11, 1 + i),
+            filing_date=date(2025, 11, 3 + i),
+            transaction_type="BUY" if i % 2 == 0 else "SELL",
+        )
+        for i, (company, insider) in enumerate([(apple, jane), (msft, john), (apple, jane)])
+    ]
+    await factory.db.commit()
+    return apple, jane, trades
+
+
+@pytest.mark.asyncio
+async def test_listings_follow_orm_writes(test_db, factory):
+    """Inserts, updates, renames and deletes are reflected by the flush hook."""
+    apple, jane, trades = await _seed(factory)
+
+    rows = await _listing_rows(test_db)
+    assert [(row.id, row.ticker, row.insider_name) for row in rows] == [
+        (trades[0].id, "AAPL", "Jane Doe"),
+        (trades[1].id, "MSFT", "John Roe"),
+        (trades[2].id, "AAPL", "Jane Doe"),
+    ]
+
+    apple.name = "Apple"
+    jane.title = "Chief Executive Officer"
+    trades[1].shares = Decimal("5")
+    await test_db.commit()
+    await test_db.delete(trades[2])
+    await test_db.commit()
+
+    rows = await _listing_rows(test_db)
+    assert len(rows) == 2
+    assert rows[0].company_name == "Apple"
+    assert rows[0].insider_title == "Chief Executive Officer"
+    assert rows[1].shares == Decimal("5")
+
+    # A rebuild produces the same rows
+    incremental = [(row.id, row.company_name, row.insider_title, row.shares) for row in rows]
+    await TradeListingService.rebuild(test_db)
+    rows = await _listing_rows(test_db)
+    assert [(row.id, row.company_name, row.insider_title, row.shares) for row in rows] == incremental
+
+
+@pytest.mark.asyncio
+async def test_listing_page_matches_orm_listing(test_db, factory):
+    """One query per page; items match the ORM-built TradeWithDetails."""
+    await _seed(factory)
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = test_db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        page = await TradeListingService.get_page(
+            test_db, limit=2, filters=TradeFilter(ticker="aapl"), count_mode="none"
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert len(statements) == 1
+
+    items = [TradeListItem.model_validate(item) for item in TradeListingService.to_items(page.items)]
+    orm_page = await TradeService.get_page(
+        test_db, limit=2, filters=TradeFilter(ticker="aapl"), count_mode="none"
+    )
+    expected = [TradeWithDetails.model_validate(trade) for trade in orm_page.items]
+
+    assert [item.id for item in items] == [trade.id for trade in expected]
+    for item, trade in zip(items, expected):
+        assert item.model_dump(exclude={"company", "insider"}) == trade.model_dump(
+            exclude={"company", "insider"}
+        )
+        assert item.company.ticker == trade.company.ticker == "AAPL"
+        assert item.insider.name == trade.insider.name
+        assert item.insider.primary_role == "CEO"
+        assert item.insider.roles == ["Officer"]
+        assert item.is_significant
@@ -0,0 +1,131 @@
+"""
+Tests for the incrementally maintained daily trade rollup.
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade_daily_rollup import TradeDailyRollup
+from app.schemas.trade import TradeCreate, TradeFilter, TradeUpdate
+from app.services.company_service import CompanyService
+from app.services.trade_rollup_service import TradeRollupService
+from app.services.trade_service import TradeService
+
+
+async def _rollup_rows(test_db):
+    result = await test_db.execute(
+        select(TradeDailyRollup).order_by(
+            TradeDailyRollup.company_id,
+            TradeDailyRollup.day,
+            TradeDailyRollup.transaction_type,
+        )
+    )
+    return [
+        (
+            row.company_id,
+            row.day,
+            row.transaction_type,
+            row.trade_count,
+            float(row.total_value),
+            row.priced_count,
+            float(row.max_value) if row.max_value is not None else None,
+            row.insider_count,
+        )
+        for row in result.scalars().all()
+    ]
+
+
+async def _setup(test_db):
+    company = Company(cik="0000320193", ticker="AAPL", name="Apple Inc.")
+    test_db.add(company)
+    await test_db.commit()
+    jane = Insider(name="Jane Doe", company_id=company.id)
+    john = Insider(name="John Roe", company_id=company.id)
+    test_db.add_all([jane, john])
+    await test_db.commit()
+    return company, jane, john
+
+
+def _trade(company, insider, tx_type="BUY", day=date(2025, 11, 4), shares=100, price=10):
+    return TradeCreate(
+        company_id=company.id,
+        insider_id=insider.id,
+        transaction_date=day,
+        filing_date=day,
+        transaction_type=tx_type,
+        shares=Decimal(shares),
+        price_per_share=Decimal(price) if price else None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_rollup_follows_trade_writes(test_db, monkeypatch):
+    """Create, update and delete keep the rollup equal to a full rebuild."""
+    monkeypatch.setattr("app.services.trade_service.settings.alerts_enabled", False)
+    company, jane, john = await _setup(test_db)
+
+    first = await TradeService.create(test_db, _trade(company, jane))
+    await TradeService.create(test_db, _trade(company, john, price=20))
+    await TradeService.create(test_db, _trade(company, john, tx_type="SELL", price=None))
+
+    assert await _rollup_rows(test_db) == [
+        (company.id, date(2025, 11, 4), "BUY", 2, 3000.0, 2, 2000.0, 2),
+        (company.id, date(2025, 11, 4), "SELL", 1, 0.0, 0, None, 1),
+    ]
+
+    # Moving a trade to another day updates both the old and new bucket
+    await TradeService.update(test_db, first, TradeUpdate(filing_date=date(2025, 11, 5)))
+    assert await _rollup_rows(test_db) == [
+        (company.id, date(2025, 11, 4), "BUY", 1, 2000.0, 1, 2000.0, 1),
+        (company.id, date(2025, 11, 4), "SELL", 1, 0.0, 0, None, 1),
+        (company.id, date(2025, 11, 5), "BUY", 1, 1000.0, 1, 1000.0, 1),
+    ]
+
+    # Deleting the last trade of a bucket removes the bucket
+    await TradeService.delete(test_db, first)
+    incremental = await _rollup_rows(test_db)
+    assert len(incremental) == 2
+
+    await TradeRollupService.rebuild(test_db)
+    assert await _rollup_rows(test_db) == incremental
+
+
+@pytest.mark.asyncio
+async def test_rollup_backed_reads(test_db, monkeypatch):
+    """Timeline, company stats and statistics match the raw trades."""
+    monkeypatch.setattr("app.services.trade_service.settings.alerts_enabled", False)
+    TradeService.clear_statistics_cache()
+    company, jane, john = await _setup(test_db)
+    today = date.today()
+
+    await TradeService.create(test_db, _trade(company, jane, day=today, price=10))
+    await TradeService.create(test_db, _trade(company, john, day=today, price=30))
+    await TradeService.create(test_db, _trade(company, john, "SELL", day=today, shares=5))
+
+    timeline = await TradeRollupService.get_daily_timeline(test_db, company.id, today)
+    assert timeline == [
+        {"date": today.isoformat(), "count": 3, "total_value": 4050.0, "avg_price": 50 / 3}
+    ]
+
+    stats = await CompanyService.get_with_stats(test_db, company.id)
+    assert stats.total_trades == 3
+    assert stats.total_insiders == 2
+    assert stats.recent_buy_count == 2
+    assert stats.recent_sell_count == 1
+
+    rollup_stats = await TradeService.get_statistics(test_db, TradeFilter(ticker="aapl"))
+    # A date filter forces the raw-trade path; both must agree
+    raw_stats = await TradeService.get_statistics(
+        test_db, TradeFilter(ticker="aapl", transaction_date_from=date(2000, 1, 1))
+    )
+    assert rollup_stats == raw_stats
+    assert rollup_stats.total_trades == 3
+    assert rollup_stats.average_trade_size == 1350.0
+    assert rollup_stats.most_active_company == "AAPL"
+    assert rollup_stats.most_active_insider == "John Roe"
+    TradeService.clear_statistics_cache()
@@ -0,0 +1,118 @@
+"""
+Tests for single-pass trade statistics.
+"""
+
+import pytest
+
+from sqlalchemy import event
+
+from app.schemas.trade import TradeFilter
+from app.services.trade_rollup_service import TradeRollupService
+from app.services.trade_service import TradeService
+
+
+async def _seed(factory):
+    apple, msft = await factory.companies("AAPL", "MSFT")
+    jane = await factory.insider(apple)
+    john = await factory.insider(msft, "John Roe")
+
+    rows = [
+        (apple, jane, "BUY", 100, 10),
+        (apple, jane, "BUY", 50, 20),
+        (apple, john, "SELL", 10, 30),
+        (msft, john, "SELL", 200, 5),
+        (msft, john, "BUY", 1, 500),
+        # Excluded by the base filters (no price)
+        (msft, john, "BUY", 1000, None),
+    ]
+    for company, insider, tx_type, shares, price in rows:
+        factory.trade(company, insider, shares, price, transaction_type=tx_type)
+    await factory.db.commit()
+    # Rows were inserted directly, bypassing incremental rollup maintenance
+    await TradeRollupService.rebuild(factory.db)
+
+
+@pytest.mark.asyncio
+async def test_statistics_single_query(test_db, factory):
+    """All statistics come from one query."""
+    TradeService.clear_statistics_cache()
+    await _seed(factory)
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = test_db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        stats = await TradeService.get_statistics(test_db, TradeFilter())
+        # Second call is served from the short-TTL cache
+        await TradeService.get_statistics(test_db, TradeFilter())
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert len(statements) == 1
+    assert stats.total_buys == 3
+    assert stats.total_sells == 2
+    assert stats.total_trades == 5
+    assert stats.total_shares_traded == 361.0
+    assert stats.total_buy_value == 2500.0
+    assert stats.total_sell_value == 1300.0
+    assert stats.total_value == 1200.0
+    assert stats.average_trade_size == 760.0
+    assert stats.largest_trade == 1000.0
+    assert stats.most_active_company == "AAPL"
+    assert stats.most_active_insider == "John Roe"
+    TradeService.clear_statistics_cache()
+
+
+@pytest.mark.asyncio
+async def test_statistics_with_filters(test_db, factory):
+    """Filters apply to every aggregate, including the most active ranking."""
+    TradeService.clear_statistics_cache()
+    await _seed(factory)
+
+    stats = await TradeService.get_statistics(test_db, TradeFilter(ticker="MSFT"))
+    assert stats.total_buys == 1
+    assert stats.total_sells == 1
+    assert stats.total_buy_value == 500.0
+    assert stats.most_active_company == "MSFT"
+    assert stats.most_active_insider == "John Roe"
+
+    stats = await TradeService.get_statistics(test_db, TradeFilter(ticker="NONE"))
+    assert stats.total_trades == 0
+    assert stats.largest_trade is None
+    assert stats.most_active_company is None
+
+    # Value filters are not covered by the rollup and scan the trades
+    stats = await TradeService.get_statistics(test_db, TradeFilter(min_value=1000))
+    assert stats.total_trades == 3
+    assert stats.total_buy_value == 2000.0
+    assert stats.most_active_company == "AAPL"
+    TradeService.clear_statistics_cache()
+
+
+@pytest.mark.asyncio
+async def test_rollup_statistics_match_the_trade_scan(test_db, factory):
+    """The rollup path counts the same trades as scanning them, unattributed ones included."""
+    TradeService.clear_statistics_cache()
+    await _seed(factory)
+    factory.trade(shares=7, price=100)
+    await test_db.commit()
+
+    for transaction_type in (None, "BUY"):
+        assert TradeService._rollup_can_serve(TradeFilter(transaction_type=transaction_type))
+        from_rollup = await TradeService.get_statistics(test_db, TradeFilter(transaction_type=transaction_type))
+        # min_value=0 changes nothing but forces the trade scan
+        scanned = await TradeService.get_statistics(
+            test_db, TradeFilter(transaction_type=transaction_type, min_value=0)
+        )
+        assert from_rollup == scanned
+    assert from_rollup.total_buys == 4
+
+    # Without filters every trade counts, priced or not; the rollup cannot answer that
+    assert not TradeService._rollup_can_serve(None)
+    stats = await TradeService.get_statistics(test_db)
+    assert stats.total_buys == 5
+    TradeService.clear_statistics_cache()
@@ -0,0 +1,169 @@
+"""
+Tests for date-indexed price lookup and batch trade value estimation.
+"""
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.models.company import Company
+from app.models.insider import Insider
+from app.models.trade import Trade
+from app.services.stock_price_service import StockPriceService
+from app.services.trade_value_estimation_service import TradeValueEstimationService
+from app.utils.price_index import PriceIndex, to_epoch_day
+
+
+HISTORY = [
+    {"date": "2025-11-03", "close": 100.0},
+    {"date": "2025-11-04", "close": 101.0},
+    {"date": "2025-11-05", "close": 102.0},
+    {"date": "2025-11-07", "close": 104.0},
+    {"date": "2025-11-10", "close": 107.0},
+]
+
+
+class TestPriceIndex:
+    """Test bisect-based closest bar lookup."""
+
+    def test_exact_match(self):
+        index = PriceIndex.from_history("AAPL", HISTORY)
+        assert index.closest_close(date(2025, 11, 5)) == 102.0
+
+    def test_gap_resolves_to_nearest_bar(self):
+        index = PriceIndex.from_history("AAPL", HISTORY)
+        # Weekend: Saturday 8th is 1 day from the 7th, 2 days from the 10th
+        assert index.closest_close(date(2025, 11, 8)) == 104.0
+        assert index.closest_close(date(2025, 11, 9)) == 107.0
+
+    def test_tie_prefers_earlier_bar(self):
+        index = PriceIndex.from_history("AAPL", HISTORY)
+        # The 6th is one day from both the 5th and the 7th
+        assert index.closest_close(date(2025, 11, 6)) == 102.0
+
+    def test_outside_max_gap_returns_none(self):
+        index = PriceIndex.from_history("AAPL", HISTORY)
+        assert index.closest_close(date(2025, 10, 1), max_gap_days=5) is None
+        assert index.closest_close(date(2025, 11, 15), max_gap_days=5) == 107.0
+        assert index.closest_close(date(2025, 11, 16), max_gap_days=5) is None
+
+    def test_unsorted_and_invalid_points(self):
+        history = list(reversed(HISTORY)) + [
+            {"date": "not-a-date", "close": 1.0},
+            {"date": "2025-11-11T00:00:00Z", "close": 108.0},
+        ]
+        index = PriceIndex.from_history("AAPL", history)
+        assert len(index) == 6
+        assert index.first_day == to_epoch_day(date(2025, 11, 3))
+        assert index.closest_close(date(2025, 11, 11)) == 108.0
+
+    def test_empty_index(self):
+        index = PriceIndex.from_history("AAPL", [])
+        assert len(index) == 0
+        assert index.closest_close(date(2025, 11, 5)) is None
+
+
+@pytest.mark.asyncio
+async def test_estimate_prices_batch_fetches_history_once_per_ticker(
+    test_db, monkeypatch
+):
+    """Batch estimation builds one price index per ticker."""
+    TradeValueEstimationService._price_index_cache.clear()
+
+    today = date.today()
+    history = [
+        {"date": (today - timedelta(days=d)).isoformat(), "close": 50.0 + d}
+        for d in range(0, 20)
+    ]
+    calls = []
+
+    def fake_history(ticker, days=30):
+        calls.append((ticker, days))
+        return history
+
+    monkeypatch.setattr(StockPriceService, "get_price_history", fake_history)
+
+    company = Company(cik="0000320193", ticker="AAPL", name="Apple Inc.")
+    test_db.add(company)
+    await test_db.commit()
+    await test_db.refresh(company)
+
+    trades = []
+    for offset in (1, 3, 10):
+        trade = Trade(
+            company_id=company.id,
+            transaction_date=today - timedelta(days=offset),
+            filing_date=today,
+            transaction_type="BUY",
+            shares=Decimal("100"),
+        )
+        test_db.add(trade)
+        trades.append(trade)
+    await test_db.commit()
+    for trade in trades:
+        await test_db.refresh(trade, attribute_names=["company"])
+
+    service = TradeValueEstimationService(test_db)
+    prices = await service.estimate_prices_batch(trades)
+
+    assert len(calls) == 1
+    assert prices == {
+        trades[0].id: 51.0,
+        trades[1].id: 53.0,
+        trades[2].id: 60.0,
+    }
+
+    enriched = await service.enrich_trades_batch(trades)
+    assert [float(t.total_value) for t in enriched] == [5100.0, 5300.0, 6000.0]
+    assert all(t._estimation_metadata["method"] == "estimated_price" for t in enriched)
+    assert len(calls) == 1
+
+    TradeValueEstimationService._price_index_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_estimate_prices_batch_looks_up_similar_trades_in_one_query(
+    test_db, monkeypatch
+):
+    """Trades the price index cannot value are priced from earlier disclosed trades."""
+    TradeValueEstimationService._price_index_cache.clear()
+    monkeypatch.setattr(StockPriceService, "get_price_history", lambda ticker, days=30: [])
+    monkeypatch.setattr(StockPriceService, "get_stock_quote", lambda ticker: None)
+
+    async def per_trade_lookup(self, trade, days_back=90):
+        raise AssertionError("similar trades queried per trade")
+
+    monkeypatch.setattr(TradeValueEstimationService, "_get_similar_trades", per_trade_lookup)
+
+    company = Company(cik="0000320193", ticker="AAPL", name="Apple Inc.")
+    test_db.add(company)
+    await test_db.commit()
+    insider = Insider(name="Tim Cook", company_id=company.id)
+    test_db.add(insider)
+    await test_db.commit()
+
+    today = date.today()
+
+    def trade(offset, price=None, transaction_type="BUY"):
+        return Trade(
+            company_id=company.id,
+            insider_id=insider.id,
+            transaction_date=today - timedelta(days=offset),
+            filing_date=today,
+            transaction_type=transaction_type,
+            shares=Decimal("100"),
+            price_per_share=Decimal(price) if price else None,
+        )
+
+    # Disclosed history: 130 days ago (outside every window), 40, 20 and a SELL
+    test_db.add_all([trade(130, "10"), trade(40, "20"), trade(20, "30"), trade(20, "99", "SELL")])
+    unpriced = [trade(30), trade(5), trade(50, transaction_type="SELL")]
+    test_db.add_all(unpriced)
+    await test_db.commit()
+    for t in unpriced:
+        await test_db.refresh(t, attribute_names=["company"])
+
+    prices = await TradeValueEstimationService(test_db).estimate_prices_batch(unpriced)
+
+    assert prices == {unpriced[0].id: 20.0, unpriced[1].id: 25.0, unpriced[2].id: None}
+    TradeValueEstimationService._price_index_cache.clear()
@@ -0,0 +1,120 @@
+"""
+Tests for the webhook delivery engine: SQL event filtering, concurrent
+fan-out with a single signed body, and scheduled retries.
+"""
+
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.models.webhook import WebhookDelivery, WebhookEndpoint, WebhookStatus
+from app.services import webhook_service
+from app.services.webhook_service import WebhookService
+
+
+@pytest.fixture
+def http_responses(monkeypatch):
+    """Route the shared webhook client to an in-process handler."""
+    requests = []
+    responses = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        queued = responses.get(str(request.url), [200])
+        code = queued.pop(0) if len(queued) > 1 else queued[0]
+        return httpx.Response(code, text="ok" if code < 400 else "error")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(webhook_service, "_client", client)
+    return requests, responses
+
+
+async def _endpoint(db, user, url, event_types, secret=None, is_active=True):
+    endpoint = WebhookEndpoint(
+        user_id=user.id, url=url, event_types=event_types, secret=secret, is_active=is_active
+    )
+    db.add(endpoint)
+    await db.commit()
+    return endpoint
+
+
+@pytest.mark.asyncio
+async def test_fan_out_filters_in_sql_and_signs_one_body(test_db, test_user, http_responses):
+    requests, _ = http_responses
+    await _endpoint(test_db, test_user, "https://a.example/hook", ["trade_alert"], secret="s1")
+    await _endpoint(test_db, test_user, "https://b.example/hook", None, secret="s1")
+    await _endpoint(test_db, test_user, "https://c.example/hook", [])
+    await _endpoint(test_db, test_user, "https://d.example/hook", ["conversion", "tradeXalert"])
+    await _endpoint(test_db, test_user, "https://e.example/hook", ["trade_alert"], is_active=False)
+
+    deliveries = await WebhookService(test_db).deliver_event_to_all("trade_alert", {"ticker": "AAPL"})
+
+    assert sorted(str(r.url) for r in requests) == [
+        "https://a.example/hook",
+        "https://b.example/hook",
+        "https://c.example/hook",
+    ]
+    assert all(d.status == WebhookStatus.SUCCESS for d in deliveries)
+    assert all(d.duration_ms is not None and d.next_attempt_at is None for d in deliveries)
+
+    # Every endpoint receives the same bytes; the signature covers exactly those bytes
+    bodies = {r.content for r in requests}
+    assert len(bodies) == 1
+    body = bodies.pop()
+    assert json.loads(body)["event_type"] == "trade_alert"
+    expected = hmac.new(b"s1", body, hashlib.sha256).hexdigest()
+    signed = [r for r in requests if "X-Webhook-Signature" in r.headers]
+    assert len(signed) == 2
+    assert all(r.headers["X-Webhook-Signature"] == expected for r in signed)
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_retried_when_due(test_db, test_user, http_responses):
+    requests, responses = http_responses
+    endpoint = await _endpoint(test_db, test_user, "https://flaky.example/hook", None)
+    responses["https://flaky.example/hook"] = [503, 200]
+    service = WebhookService(test_db)
+
+    delivery = await service.deliver_webhook(endpoint.id, "custom", {"n": 1})
+    assert delivery.status == WebhookStatus.RETRYING
+    assert delivery.response_code == 503
+    assert delivery.next_attempt_at > datetime.utcnow()
+
+    # Not due yet
+    assert await service.retry_due() == 0
+
+    delivery.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    await test_db.commit()
+    assert await service.retry_due() == 1
+
+    delivery = await test_db.get(WebhookDelivery, delivery.id)
+    assert delivery.status == WebhookStatus.SUCCESS
+    assert delivery.attempts == 2
+    # The retry resends the stored body unchanged
+    assert requests[0].content == requests[1].content
+
+
+@pytest.mark.asyncio
+async def test_client_errors_fail_without_retry_and_feed_stats(test_db, test_user, http_responses):
+    _, responses = http_responses
+    endpoint = await _endpoint(test_db, test_user, "https://gone.example/hook", None)
+    responses["https://gone.example/hook"] = [200, 404]
+    service = WebhookService(test_db)
+
+    first = await service.deliver_webhook(endpoint.id, "custom", {})
+    second = await service.deliver_webhook(endpoint.id, "custom", {})
+    assert first.status == WebhookStatus.SUCCESS
+    assert second.status == WebhookStatus.FAILED
+    assert second.next_attempt_at is None
+    assert second.error == "HTTP 404"
+
+    stats = await service.get_endpoint_stats(endpoint.id)
+    assert stats["deliveries"] == 2
+    assert stats["success"] == 1
+    assert stats["failed"] == 1
+    assert stats["success_rate"] == 0.5
+    assert stats["latency_ms"]["p95"] is not None
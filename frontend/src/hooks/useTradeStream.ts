@@ -7,10 +7,12 @@ type TradeStreamMessage = {
 
 type TradeStreamStatus = 'idle' | 'connecting' | 'open' | 'closed';
 
-export function buildTradeStreamUrl(): string {
+export function buildTradeStreamUrl(since?: number | null): string {
   const httpBase = (import.meta.env.VITE_API_URL || 'https://api.tradesignal.capital').replace(/\/$/, '');
   const protocol = httpBase.startsWith('https') ? 'wss' : 'ws';
-  return httpBase.replace(/^https?/, protocol) + '/api/v1/trades/stream';
+  const url = httpBase.replace(/^https?/, protocol) + '/api/v1/trades/stream';
+  // Resume after a reconnect: the server replays events newer than `since`
+  return since != null ? `${url}?since=${since}` : url;
 }
 
 export default function useTradeStream(
@@ -19,6 +21,7 @@ export default function useTradeStream(
 ): TradeStreamStatus {
   const callbackRef = useRef(onMessage);
   const [status, setStatus] = useState<TradeStreamStatus>('idle');
+  const lastSeqRef = useRef<number | null>(null);
 
   useEffect(() => {
     callbackRef.current = onMessage;
@@ -35,7 +38,7 @@ export default function useTradeStream(
     let shouldReconnect = true;
 
     const connect = () => {
-      const url = buildTradeStreamUrl();
+      const url = buildTradeStreamUrl(lastSeqRef.current);
       setStatus('connecting');
 
       try {
@@ -60,6 +63,15 @@ export default function useTradeStream(
       socket.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
+          if (typeof data.seq === 'number') {
+            lastSeqRef.current = data.seq;
+          } else if (
+            typeof data.latest_seq === 'number' &&
+            (data.type === 'resync' || (data.type === 'connection_ack' && lastSeqRef.current === null))
+          ) {
+            // Fresh start, or a resync the consumer must answer by reloading: resume from the server's position
+            lastSeqRef.current = data.latest_seq;
+          }
           callbackRef.current?.(data);
         } catch (error) {
           console.error('Trade stream message parse error', error);
@@ -130,9 +130,16 @@ export default function TradesPage() {
   }, [data, chartTradesData, hasActiveFilters]);
 
   const handleStreamMessage = useCallback(
-    (payload: { type?: string; trade?: Trade }) => {
+    (payload: { type?: string; trade?: Trade; replayed?: number }) => {
       if (!payload || typeof payload !== 'object') return;
-      if (payload.type === 'trade_created' || payload.type === 'trade_updated') {
+      // A resync means events were missed beyond the replay buffer, so reload;
+      // a resume that replayed events changed the data as well
+      if (
+        payload.type === 'trade_created' ||
+        payload.type === 'trade_updated' ||
+        payload.type === 'resync' ||
+        (payload.type === 'resumed' && (payload.replayed ?? 0) > 0)
+      ) {
         queryClient.invalidateQueries({ queryKey: ['trades'] });
         queryClient.invalidateQueries({ queryKey: ['tradeStats'] });
       }